@@ -2,7 +2,8 @@
 # dialogs/parametres_dialog.py
 
 
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QFrame
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QSpinBox, QWidget, \
+    QCheckBox, QComboBox
 from qgis.PyQt.QtCore import Qt, QObject, QCoreApplication
 from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QPixmap, QDesktopServices
@@ -11,6 +12,15 @@ from qgis.PyQt import uic
 
 import os
 
+# Moteurs d'exécution des traitements raster proposés dans l'onglet Calcul : (code, libellé)
+MOTEURS_PARALLELES = [
+    ('auto', 'Automatique'),
+    ('serie', 'Série (un seul cœur)'),
+    ('threads', 'Threads'),
+    ('processus', 'Processus'),
+    ('dask', 'Dask (si installé)'),
+]
+
 
 class ParametresDialog(QDialog):
     """
@@ -48,6 +58,22 @@ class ParametresDialog(QDialog):
         Met à jour l'état du mode tracé en fonction de l'index sélectionné.
     get_field_settings()
         Retourne les paramètres de champ définis par l'utilisateur.
+    setup_onglet_cache()
+        Ajoute l'onglet du cache des MNT préparés.
+    set_cache_values(statistiques)
+        Affiche les statistiques et le budget disque du cache des MNT préparés.
+    get_cache_size_limit()
+        Retourne le budget disque du cache choisi par l'utilisateur.
+    set_mnt_compact(actif)
+        Coche ou décoche l'option du MNT compact en mémoire.
+    is_mnt_compact_checked()
+        Indique si l'option du MNT compact en mémoire est cochée.
+    setup_onglet_calcul()
+        Ajoute l'onglet du moteur d'exécution des traitements raster.
+    set_parallelisme(backend, nb_travailleurs)
+        Affiche le moteur d'exécution et le nombre de travailleurs configurés.
+    get_parallelisme()
+        Retourne le moteur d'exécution et le nombre de travailleurs choisis par l'utilisateur.
     """
 
     def __init__(self, parent=None):
@@ -72,6 +98,9 @@ class ParametresDialog(QDialog):
 
         self.pushButtonOpenPDF.clicked.connect(self.open_pdf)
 
+        self.setup_onglet_cache()
+        self.setup_onglet_calcul()
+
     def open_pdf(self):
         """
         Ouvre le fichier PDF d'aide utilisateur.
@@ -208,4 +237,150 @@ class ParametresDialog(QDialog):
             'SHAPE_LENGTH': self.radioButton_SHAPE_LENGTH_Oui.isChecked(),
             'HORADATEUR': self.radioButton_HORADATEUR_Oui.isChecked()
 
-        }
\ No newline at end of file
+        }
+
+    def setup_onglet_cache(self):
+        """
+        Ajoute l'onglet du cache des MNT préparés : statistiques d'utilisation, budget disque et mode compact
+        du MNT en mémoire.
+        """
+
+        onglet = QWidget()
+        disposition = QVBoxLayout(onglet)
+
+        self.labelCache = QLabel()
+        self.labelCache.setWordWrap(True)
+        disposition.addWidget(self.labelCache)
+
+        ligne_budget = QHBoxLayout()
+        ligne_budget.addWidget(QLabel("Espace disque maximal :"))
+        self.spinBoxCache = QSpinBox()
+        self.spinBoxCache.setRange(1, 1024)
+        self.spinBoxCache.setSuffix(" Go")
+        ligne_budget.addWidget(self.spinBoxCache)
+        ligne_budget.addStretch()
+        disposition.addLayout(ligne_budget)
+
+        self.checkBoxMntCompact = QCheckBox(
+            "MNT compact en mémoire (altitudes au décimètre, pentes au centième de degré)")
+        self.checkBoxMntCompact.setToolTip(
+            "Divise par deux la mémoire occupée par le MNT et ses pentes. "
+            "S'applique aux MNT ouverts après validation.")
+        disposition.addWidget(self.checkBoxMntCompact)
+        disposition.addStretch()
+
+        self.tabWidget.addTab(onglet, "Cache MNT")
+
+    def set_cache_values(self, statistiques):
+        """
+        Affiche les statistiques et le budget disque du cache des MNT préparés.
+
+        Parameters
+        ----------
+        statistiques : dict
+            Statistiques du cache (voir `CachePreparationMNT.statistiques`).
+        """
+
+        demandes = statistiques['succes'] + statistiques['echecs']
+        taux = f" ({100 * statistiques['succes'] / demandes:.0f} %)" if demandes else ""
+        self.labelCache.setText(
+            "Préparations MNT servies par le cache depuis l'ouverture de QGIS : "
+            f"{statistiques['succes']} sur {demandes}{taux}\n"
+            f"Préparations calculées : {statistiques['echecs']}\n"
+            f"Entrées en cache : {statistiques['entrees']} "
+            f"({statistiques['taille'] / 1024 ** 3:.2f} Go sur {statistiques['taille_max'] / 1024 ** 3:.0f} Go)"
+        )
+        self.spinBoxCache.setValue(max(1, round(statistiques['taille_max'] / 1024 ** 3)))
+
+    def get_cache_size_limit(self):
+        """
+        Retourne le budget disque du cache des MNT préparés choisi par l'utilisateur.
+
+        Returns
+        -------
+        int
+            Budget en octets.
+        """
+
+        return self.spinBoxCache.value() * 1024 ** 3
+
+    def set_mnt_compact(self, actif):
+        """
+        Coche ou décoche l'option du MNT compact en mémoire.
+
+        Parameters
+        ----------
+        actif : bool
+            True si le mode compact est actif.
+        """
+
+        self.checkBoxMntCompact.setChecked(actif)
+
+    def is_mnt_compact_checked(self):
+        """
+        Indique si l'option du MNT compact en mémoire est cochée.
+
+        Returns
+        -------
+        bool
+            True si le MNT doit être ouvert en mode compact.
+        """
+
+        return self.checkBoxMntCompact.isChecked()
+
+    def setup_onglet_calcul(self):
+        """
+        Ajoute l'onglet du moteur d'exécution des traitements raster (pentes, ombrage, préparation des MNT).
+        """
+
+        onglet = QWidget()
+        disposition = QVBoxLayout(onglet)
+
+        ligne_moteur = QHBoxLayout()
+        ligne_moteur.addWidget(QLabel("Moteur d'exécution :"))
+        self.comboBoxParallelisme = QComboBox()
+        for code, libelle in MOTEURS_PARALLELES:
+            self.comboBoxParallelisme.addItem(libelle, code)
+        ligne_moteur.addWidget(self.comboBoxParallelisme)
+        ligne_moteur.addStretch()
+        disposition.addLayout(ligne_moteur)
+
+        ligne_travailleurs = QHBoxLayout()
+        ligne_travailleurs.addWidget(QLabel("Nombre de travailleurs :"))
+        self.spinBoxTravailleurs = QSpinBox()
+        self.spinBoxTravailleurs.setRange(0, 256)
+        self.spinBoxTravailleurs.setSpecialValueText("Tous les cœurs")
+        ligne_travailleurs.addWidget(self.spinBoxTravailleurs)
+        ligne_travailleurs.addStretch()
+        disposition.addLayout(ligne_travailleurs)
+        disposition.addStretch()
+
+        self.tabWidget.addTab(onglet, "Calcul")
+
+    def set_parallelisme(self, backend, nb_travailleurs):
+        """
+        Affiche le moteur d'exécution et le nombre de travailleurs configurés.
+
+        Parameters
+        ----------
+        backend : str
+            Code du moteur, parmi ceux de MOTEURS_PARALLELES.
+        nb_travailleurs : int or None
+            Nombre de travailleurs, None pour tous les cœurs.
+        """
+
+        index = self.comboBoxParallelisme.findData(backend)
+        self.comboBoxParallelisme.setCurrentIndex(max(index, 0))
+        self.spinBoxTravailleurs.setValue(nb_travailleurs or 0)
+
+    def get_parallelisme(self):
+        """
+        Retourne le moteur d'exécution et le nombre de travailleurs choisis par l'utilisateur.
+
+        Returns
+        -------
+        tuple
+            (backend, nb_travailleurs), nb_travailleurs valant None pour tous les cœurs.
+        """
+
+        return self.comboBoxParallelisme.currentData(), self.spinBoxTravailleurs.value() or None
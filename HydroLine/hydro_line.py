@@ -22,7 +22,10 @@ from qgis.core import (
     QgsCoordinateReferenceSystem,
     QgsMapLayer,
     edit,
-    QgsWkbTypes
+    QgsWkbTypes,
+    QgsMessageLog,
+    QgsApplication,
+    Qgis
 )
 
 from .dialogs.choix_couches_dialog import ChoixCouchesDialogPourTrace, DialogueSelectionEpoint
@@ -30,21 +33,23 @@ from .dialogs.parametres_dialog import ParametresDialog
 from .dialogs.slider_dialog import SliderDialog
 from .sscreen.sscreen import SplashScreen
 from .sscreen.sscreen_load import SplashScreenLoad
+from .threads.preparation_mnt_task import PreparationMNTTask
+from .threads.reseau_drainage_thread import ReseauDrainageThread
 from .tools import prolongement
+from .tools.base_map_tool import BaseMapTool
 from .tools.fenetre_profil_elevation import FenetreProfilElevation
 from .tools.outil_rupture_pente import OutilRupturePente
 from .tools.outil_trace_crete import OutilTraceCrete
 from .tools.profil_graph_dock import ProfilGraphDock
 
+from .utils.cache_preparation import obtenir_cache_preparation_mnt
+from .utils.pipeline_mnt import TAILLE_PIXEL_TIN, SourcePipeline, chercher_preparation, formater_durees
+from .utils.parallele_utils import configuration_parallelisme, configurer_parallelisme
 from .utils.raster_utils import (
-    filtre_moyen_raster,
-    filtre_median_raster,
-    generer_ombrage,
-    fusionner_et_arrondir_rasters,
-    reprojeter_raster,
     convertir_tin_en_raster,
     convertir_points_en_tin
 )
+from .utils.session_mnt import RegistreSessionsMNT
 from .external.SIGPACK import Epoint
 
 class HydroLine(QObject):
@@ -64,6 +69,12 @@ class HydroLine(QObject):
         Chemin vers le répertoire du plugin contenant les ressources.
     actions : list of QAction
         Liste des actions disponibles pour le plugin.
+    registre_mnt : RegistreSessionsMNT
+        Sessions MNT partagées par les outils et le dock de profil, une par couche raster.
+    tache_preparation : PreparationMNTTask or None
+        Préparation du MNT en cours dans le gestionnaire de tâches de QGIS.
+    thread_reseau_drainage : ReseauDrainageThread or None
+        Extraction du réseau de drainage lancée en dernier.
     ...
 
     Methods
@@ -100,10 +111,20 @@ class HydroLine(QObject):
         Lance l'outil enveloppe sur semis de points en utilisant alphashape.
     afficher_outils_points_extremes()
         Affiche les boutons de la barre d'outils pour le tracé et la simplification de seuils.
+    lancer_reseau_drainage()
+        Extrait en une passe le réseau de drainage complet d'un MNT dans une couche vectorielle.
+    on_reseau_drainage_calcule(troncons, statistiques)
+        Crée la couche du réseau de drainage à partir des tronçons calculés.
+    on_reseau_drainage_error(error_message)
+        Traite les erreurs de l'extraction du réseau de drainage.
     afficher_outil_rupture_pente()
         Affiche les boutons de la barre d'outils pour le tracé de rupture de pente.
     basculer_points_bas(state)
         Active ou désactive le mode Points Bas dans l'outil.
+    changer_moteur_crete(index)
+        Change le moteur de calcul du chemin dynamique de l'outil trace crête.
+    changer_moteur_rupture(index)
+        Change le moteur de calcul du chemin dynamique de l'outil de rupture de pente.
     basculer_tracer_libre_rupture(coche)
         Active ou désactive le mode de tracé libre pour la rupture de pente.
     basculer_simplification_rupture_pente(coche)
@@ -116,6 +137,10 @@ class HydroLine(QObject):
         Active ou désactive le mode de tracé libre.
     preparation_mnt()
         Affiche le MNT avec ombrage, styles prédéfinis et gère les couches raster et TIN.
+    on_preparation_terminee()
+        Libère la tâche de préparation du MNT.
+    afficher_mnt_prepare(resultat, identifiants_a_retirer)
+        Ajoute au projet le MNT préparé et son ombrage.
     demarrer_rupture_pente()
         Activation de l'outil de tracé de rupture de pente.
     changer_mode_rupture(index)
@@ -155,6 +180,10 @@ class HydroLine(QObject):
         self.graphique_3d_active = False
         self.couche_crete = None
         self.couche_rupture = None
+        self.outil_rupture_pente = None
+        self.registre_mnt = RegistreSessionsMNT()
+        self.tache_preparation = None
+        self.thread_reseau_drainage = None
         QgsProject.instance().layerWillBeRemoved.connect(self.on_layer_will_be_removed)
         self.field_settings = {
             'OBJECTID': True,
@@ -196,6 +225,7 @@ class HydroLine(QObject):
             self.couche_rupture = None
         if self.couche_crete and self.couche_crete.id() == layer_id:
             self.couche_crete = None
+        self.registre_mnt.invalider(layer_id)
 
     def initGui(self):
         """
@@ -366,7 +396,8 @@ class HydroLine(QObject):
         Ouvre le dock de profil graphique.
         """
 
-        self.prof_graph_dock = ProfilGraphDock(self.canvas, self.interface_qgis.mainWindow())
+        self.prof_graph_dock = ProfilGraphDock(self.canvas, self.interface_qgis.mainWindow(),
+                                               registre_sessions=self.registre_mnt)
         self.interface_qgis.addDockWidget(Qt.BottomDockWidgetArea, self.prof_graph_dock)
 
     def unload(self):
@@ -382,10 +413,19 @@ class HydroLine(QObject):
 
         barre_menus = self.interface_qgis.mainWindow().menuBar()
         barre_menus.removeAction(self.menu_hydroline.menuAction())
+        if self.tache_preparation is not None:
+            self.tache_preparation.cancel()
+            self.tache_preparation = None
+        if self.thread_reseau_drainage is not None and self.thread_reseau_drainage.isRunning():
+            # Arrêt entre deux étapes du calcul : le thread ne doit pas être détruit en cours d'exécution
+            self.thread_reseau_drainage.requestInterruption()
+            self.thread_reseau_drainage.wait()
         if self.fenetre_profil is not None:
             self.interface_qgis.removeDockWidget(self.fenetre_profil)
             self.fenetre_profil = None
 
+        self.registre_mnt.fermer_tout()
+
     def ouvrir_parametres(self):
         """
         Ouvre la fenêtre de paramètres et ajuste les réglages des outils du plugin.
@@ -400,8 +440,18 @@ class HydroLine(QObject):
             distance_seuil = 10
 
         dialog.set_values(current_mode, distance_seuil, self.graphique_3d_active, self.field_settings)
+        cache_preparation = obtenir_cache_preparation_mnt()
+        dialog.set_cache_values(cache_preparation.statistiques())
+        dialog.set_mnt_compact(self.registre_mnt.compact)
+        dialog.set_parallelisme(*configuration_parallelisme())
 
         if dialog.exec_():
+            cache_preparation.taille_max = dialog.get_cache_size_limit()
+            cache_preparation.evincer()
+            # Les MNT déjà ouverts gardent leur représentation ; seules les nouvelles sessions sont concernées
+            self.registre_mnt.compact = dialog.is_mnt_compact_checked()
+            BaseMapTool.mnt_compact = self.registre_mnt.compact
+            configurer_parallelisme(*dialog.get_parallelisme())
             selected_mode = dialog.get_selected_mode()
             graphique_3d = dialog.is_graphique_3d_checked()
             self.graphique_3d_active = graphique_3d
@@ -565,13 +615,16 @@ class HydroLine(QObject):
                                 "Vous devez sélectionner une couche de polyligne ou cocher 'Nouvelle couche de travail'.")
             return
 
-        self.outil_rupture_pente = OutilRupturePente(self.canvas, couche_mnt, mode=mode_selectionne)
+        if self.outil_rupture_pente is not None:
+            self.outil_rupture_pente.liberer_session()
+        self.outil_rupture_pente = OutilRupturePente(self.canvas, couche_mnt, mode=mode_selectionne,
+                                                     session=self.registre_mnt.acquerir(couche_mnt))
         # Connecter le signal
         self.outil_rupture_pente.mode_trace_libre_changed.connect(self.action_tracer_libre_rupture.setChecked)
 
-        self.outil_rupture_pente = OutilRupturePente(self.canvas, couche_mnt, mode=mode_selectionne)
-
         self.outil_rupture_pente.definir_couche_vectorielle(self.couche_rupture)
+        if hasattr(self, 'combobox_moteur_rupture'):
+            self.outil_rupture_pente.definir_moteur_routage(self.combobox_moteur_rupture.currentData())
 
         self.canvas.setMapTool(self.outil_rupture_pente)
 
@@ -632,11 +685,15 @@ class HydroLine(QObject):
                                 "Vous devez sélectionner une couche de polyligne ou cocher 'Nouvelle couche de travail'.")
             return
 
-        self.outil_trace_crete = OutilTraceCrete(self.canvas, couche_mnt)
+        if self.outil_trace_crete is not None:
+            self.outil_trace_crete.liberer_session()
+        self.outil_trace_crete = OutilTraceCrete(self.canvas, couche_mnt, session=self.registre_mnt.acquerir(couche_mnt))
         # Connecter le signal
         self.outil_trace_crete.mode_trace_libre_changed.connect(self.action_tracer_libre.setChecked)
 
         self.outil_trace_crete.definir_couche_vectorielle(self.couche_crete)
+        if hasattr(self, 'combobox_moteur_crete'):
+            self.outil_trace_crete.definir_moteur_routage(self.combobox_moteur_crete.currentData())
         self.canvas.setMapTool(self.outil_trace_crete)
 
         if self.graphique_3d_active:
@@ -649,6 +706,126 @@ class HydroLine(QObject):
 
         self.outil_trace_crete.definir_mode(1)  # Mode 1 par défaut
 
+    def lancer_reseau_drainage(self):
+        """
+        Extrait en une passe le réseau de drainage complet d'un MNT dans une couche vectorielle.
+
+        Le MNT et la surface drainée minimale sont demandés à l'utilisateur ; le calcul (directions
+        d'écoulement, accumulation, vectorisation) s'exécute en arrière-plan ; une seule extraction peut être
+        en cours à la fois.
+        """
+        if self.thread_reseau_drainage is not None and self.thread_reseau_drainage.isRunning():
+            QMessageBox.warning(None, "Avertissement", "Une extraction du réseau de drainage est déjà en cours.")
+            return
+
+        couches_raster = [couche for couche in QgsProject.instance().mapLayers().values()
+                          if isinstance(couche, QgsRasterLayer)]
+        if not couches_raster:
+            QMessageBox.warning(None, "Avertissement", "Aucun MNT n'est chargé dans le projet.")
+            return
+
+        noms = [couche.name() for couche in couches_raster]
+        nom, ok = QInputDialog.getItem(self.interface_qgis.mainWindow(), "Réseau de drainage",
+                                       "MNT à traiter :", noms, 0, False)
+        if not ok:
+            return
+        couche_mnt = couches_raster[noms.index(nom)]
+
+        surface_ha, ok = QInputDialog.getDouble(self.interface_qgis.mainWindow(), "Réseau de drainage",
+                                                "Surface drainée minimale (ha) :", 1.0, 0.01, 100000.0, 2)
+        if not ok:
+            return
+        surface_pixel = abs(couche_mnt.rasterUnitsPerPixelX() * couche_mnt.rasterUnitsPerPixelY())
+        seuil = max(1, int(round(surface_ha * 10000.0 / surface_pixel)))
+
+        self.crs_reseau_drainage = couche_mnt.crs()
+        self.splash_screen_reseau = SplashScreenLoad()
+        self.splash_screen_reseau.setParent(self.interface_qgis.mainWindow())
+        self.splash_screen_reseau.show()
+
+        self.thread_reseau_drainage = ReseauDrainageThread(couche_mnt.dataProvider().dataSourceUri(), seuil)
+        self.thread_reseau_drainage.progress.connect(
+            lambda valeur: self.interface_qgis.mainWindow().statusBar().showMessage(
+                f"Extraction du réseau de drainage... {valeur} %", 2000))
+        self.thread_reseau_drainage.result_ready.connect(self.on_reseau_drainage_calcule)
+        self.thread_reseau_drainage.error.connect(self.on_reseau_drainage_error)
+        self.thread_reseau_drainage.start()
+
+    def on_reseau_drainage_calcule(self, troncons, statistiques):
+        """
+        Crée la couche du réseau de drainage à partir des tronçons calculés.
+
+        Parameters
+        ----------
+        troncons : list of list of tuple
+            Tronçons [(x, y, z), ...] dans le SCR du MNT, de l'amont vers l'aval.
+        statistiques : dict
+            Statistiques du traitement (cellules, troncons, duree, cellules_par_seconde).
+        """
+        self.splash_screen_reseau.close()
+
+        couche = QgsVectorLayer(f"MultiLineStringZ?crs={self.crs_reseau_drainage.authid()}",
+                                "Réseau de drainage", "memory")
+        if not couche.isValid():
+            QMessageBox.critical(None, "Erreur", "Impossible de créer la couche du réseau de drainage.")
+            return
+
+        champs = []
+        if self.field_settings.get('OBJECTID', True):
+            champs.append(QgsField('OBJECTID', QVariant.Int))
+        if self.field_settings.get('Denomination', True):
+            champs.append(QgsField('Denomination', QVariant.String))
+        if self.field_settings.get('SHAPE_LENGTH', True):
+            champs.append(QgsField('SHAPE_LENGTH', QVariant.Double))
+        if self.field_settings.get('HORADATEUR', True):
+            champs.append(QgsField('HORADATEUR', QVariant.String))
+        couche.dataProvider().addAttributes(champs)
+        couche.updateFields()
+
+        from datetime import datetime
+        horadateur = datetime.now().strftime('%d/%m/%y')
+        noms_champs = [champ.name() for champ in couche.fields()]
+        entites = []
+        for identifiant, troncon in enumerate(troncons, start=1):
+            geometrie = QgsGeometry.fromPolyline([QgsPoint(x, y, z) for x, y, z in troncon])
+            attributs = []
+            if 'OBJECTID' in noms_champs:
+                attributs.append(identifiant)
+            if 'Denomination' in noms_champs:
+                attributs.append('Réseau de drainage')
+            if 'SHAPE_LENGTH' in noms_champs:
+                attributs.append(geometrie.length())
+            if 'HORADATEUR' in noms_champs:
+                attributs.append(horadateur)
+            entite = QgsFeature()
+            entite.setGeometry(geometrie)
+            entite.setAttributes(attributs)
+            entites.append(entite)
+
+        couche.dataProvider().addFeatures(entites)
+        couche.updateExtents()
+        QgsProject.instance().addMapLayer(couche)
+        symbole = couche.renderer().symbol()
+        symbole.setColor(QColor('#0000FF'))
+        symbole.setWidth(0.5)
+
+        message = (f"{statistiques['troncons']} tronçons extraits de {statistiques['cellules']} cellules "
+                   f"en {statistiques['duree']:.1f} s ({statistiques['cellules_par_seconde']:,.0f} cellules/s).")
+        QgsMessageLog.logMessage(message, 'HydroLine', level=Qgis.Info)
+        self.interface_qgis.mainWindow().statusBar().showMessage(message, 10000)
+
+    def on_reseau_drainage_error(self, error_message):
+        """
+        Traite les erreurs de l'extraction du réseau de drainage.
+
+        Parameters
+        ----------
+        error_message : str
+            Message d'erreur émis par le thread.
+        """
+        self.splash_screen_reseau.close()
+        QMessageBox.critical(None, "Erreur", error_message)
+
     def afficher_outils_points_extremes(self):
         """
         Affiche les boutons pour le tracé de seuils et la simplification dans la barre d'outils.
@@ -665,6 +842,14 @@ class HydroLine(QObject):
         self.barre_outils.insertAction(self.action_bouton_menu, self.action_demarrer_mnt)
         self.actions.append(self.action_demarrer_mnt)
 
+        # Bouton extraction du réseau de drainage complet
+        self.action_reseau_drainage = QAction(QIcon(os.path.join(chemin_icones, "icon_toolbox.png")),
+                                              self.traduire(u'Extraire le réseau de drainage'),
+                                              self.interface_qgis.mainWindow())
+        self.action_reseau_drainage.triggered.connect(self.lancer_reseau_drainage)
+        self.barre_outils.insertAction(self.action_bouton_menu, self.action_reseau_drainage)
+        self.actions.append(self.action_reseau_drainage)
+
         # Bouton simplification
         self.bouton_simplification = QToolButton()
         self.bouton_simplification.setText("Simplification")
@@ -689,6 +874,15 @@ class HydroLine(QObject):
                                                                          self.checkbox_points_bas)
         self.actions.append(self.action_checkbox_points_bas)
 
+        # Choix du moteur de tracé
+        self.combobox_moteur_crete = QComboBox()
+        for code, libelle in OutilTraceCrete.MOTEURS_ROUTAGE:
+            self.combobox_moteur_crete.addItem(libelle, code)
+        self.combobox_moteur_crete.currentIndexChanged.connect(self.changer_moteur_crete)
+        self.action_combobox_moteur_crete = self.barre_outils.insertWidget(self.action_bouton_menu,
+                                                                           self.combobox_moteur_crete)
+        self.actions.append(self.action_combobox_moteur_crete)
+
         self.action_ligne_crete_suivante = QAction(
             QIcon(os.path.join(chemin_icones, "icon_next.png")),
             self.traduire(u'Ajouter la polyligne active à la couche / Démarrer une autre : Touche D'),
@@ -773,6 +967,15 @@ class HydroLine(QObject):
         self.action_mode_combobox = self.barre_outils.insertWidget(self.action_bouton_menu, self.mode_combobox)
         self.actions.append(self.action_mode_combobox)
 
+        # Choix du moteur de tracé
+        self.combobox_moteur_rupture = QComboBox()
+        for code, libelle in OutilRupturePente.MOTEURS_ROUTAGE:
+            self.combobox_moteur_rupture.addItem(libelle, code)
+        self.combobox_moteur_rupture.currentIndexChanged.connect(self.changer_moteur_rupture)
+        self.action_combobox_moteur_rupture = self.barre_outils.insertWidget(self.action_bouton_menu,
+                                                                             self.combobox_moteur_rupture)
+        self.actions.append(self.action_combobox_moteur_rupture)
+
     def basculer_points_bas(self, state):
         """
         Active ou désactive le mode Points Bas dans l'outil trace crête.
@@ -790,6 +993,39 @@ class HydroLine(QObject):
             QMessageBox.warning(None, "Avertissement", "Veuillez d'abord activer l'outil avec le bouton Lancer outil.")
             self.checkbox_points_bas.setChecked(False)
 
+    def changer_moteur_crete(self, index):
+        """
+        Change le moteur de calcul du chemin dynamique de l'outil trace crête.
+
+        Parameters
+        ----------
+        index : int
+            Index du moteur sélectionné dans la liste déroulante.
+        """
+
+        if self.outil_trace_crete is not None:
+            self.outil_trace_crete.definir_moteur_routage(self.combobox_moteur_crete.itemData(index))
+        elif index != 0:
+            QMessageBox.warning(None, "Avertissement", "Veuillez d'abord activer l'outil avec le bouton Lancer outil.")
+            self.combobox_moteur_crete.setCurrentIndex(0)
+
+    def changer_moteur_rupture(self, index):
+        """
+        Change le moteur de calcul du chemin dynamique de l'outil de rupture de pente.
+
+        Parameters
+        ----------
+        index : int
+            Index du moteur sélectionné dans la liste déroulante.
+        """
+
+        if hasattr(self, 'outil_rupture_pente') and self.outil_rupture_pente:
+            self.outil_rupture_pente.definir_moteur_routage(self.combobox_moteur_rupture.itemData(index))
+        elif index != 0:
+            QMessageBox.warning(None, "Avertissement",
+                                "Veuillez d'abord activer l'outil avec le bouton Démarrer rupture de pente.")
+            self.combobox_moteur_rupture.setCurrentIndex(0)
+
     def basculer_tracer_libre_rupture(self, coche):
         """
         Active ou désactive le mode de tracé libre pour la rupture de pente.
@@ -889,7 +1125,15 @@ class HydroLine(QObject):
         Affiche le MNT avec ombrage et style prédéfini, en gérant les couches raster, un unique TIN ou un shapefile de points.
         Permet la sélection multiple de rasters ou un seul TIN/shapefile de points, les convertit si nécessaire,
         les fusionne, et applique les traitements requis.
+
+        La conversion d'un TIN ou de points est faite ici ; la reprojection, les filtres, la fusion, l'arrondi et
+        l'ombrage sont confiés à une tâche de fond (PreparationMNTTask), annulable depuis le gestionnaire de
+        tâches, et les couches sont ajoutées au projet à la fin de la tâche.
         """
+        if self.tache_preparation is not None:
+            QMessageBox.warning(None, "Avertissement", "Une préparation du MNT est déjà en cours.")
+            return
+
         self.splash_screenLoad = SplashScreenLoad()
         self.splash_screenLoad.setParent(self.interface_qgis.mainWindow())
         self.splash_screenLoad.show()
@@ -939,10 +1183,12 @@ class HydroLine(QObject):
             self.splash_screenLoad.close()
             return
 
-        couche_tin = None
-
+        # Source issue d'un TIN ou de points, rastérisée avant la préparation : la clé du cache porte sur la
+        # couche d'origine et les paramètres de conversion, pour reprendre une préparation sans rastériser
+        couche_origine = None
+        selected_field = None
         if couches_points:
-            couche_points = couches_points[0]
+            couche_origine = couche_points = couches_points[0]
 
             # Récupérer les champs numériques disponibles pour le Z
             champs_numeriques = [
@@ -977,32 +1223,65 @@ class HydroLine(QObject):
                 self.splash_screenLoad.close()
                 return
 
-            # Appeler la fonction de conversion des points en TIN depuis raster_utils avec le nom du champ
-            couche_tin = convertir_points_en_tin(
-                couche_points,
-                selected_field=selected_field,
-                crs_target=f"EPSG:{code_epsg}",
-                feedback=retour
-            )
-
-            if couche_tin is None:
-                QMessageBox.critical(None, "Erreur",
-                                     f"Échec de la création du TIN à partir de la couche de points : {couche_points.name()}")
-                self.splash_screenLoad.close()
-                return
-
         # Si un TIN est directement sélectionné
         elif couches_tin:
-            couche_tin = couches_tin[0]
+            couche_origine = couches_tin[0]
+
+        # Sources du MNT : rasters d'origine (filtre moyen) et raster issu du TIN (filtre médian).
+        # Reprojection, filtrage, fusion, arrondi et ombrage sont enchaînés en un seul passage par bandes.
+        sources = [SourcePipeline(couche.source(), 'moyen') for couche in couches_raster]
+        source_convertie = None
+        if couche_origine is not None:
+            conversion = f"{'points' if selected_field is not None else 'tin'}|{couche_origine.source()}"
+            if selected_field is not None:
+                conversion += f"|champ={selected_field}"
+            conversion += f"|pixel={TAILLE_PIXEL_TIN}"
+            source_convertie = SourcePipeline(
+                None, 'median', origine=(couche_origine.source().split('|')[0], conversion))
+            sources.append(source_convertie)
+        if not sources:
+            QMessageBox.warning(None, "Avertissement", "Aucune couche raster valide à traiter.")
+            self.splash_screenLoad.close()
+            return
+
+        # Une préparation déjà faite sur les mêmes sources, inchangées, est reprise du cache sans calcul
+        # (ni conversion du TIN) ; sinon elle est confiée au gestionnaire de tâches, et l'interface reste
+        # utilisable pendant le calcul
+        cache = obtenir_cache_preparation_mnt()
+        identifiants_a_retirer = []
+        if len(sources) > 1:
+            identifiants_a_retirer = [couche.id() for couche in couches_raster]
+        resultat = chercher_preparation(sources, code_epsg, cache)
+        if resultat is not None:
+            self.splash_screenLoad.close()
+            if couches_tin:
+                QgsProject.instance().removeMapLayer(couches_tin[0].id())
+            self.afficher_mnt_prepare(resultat, identifiants_a_retirer)
+            return
 
         # Traitement du TIN s'il est présent
-        rasters_convertis = []
+        if couche_origine is not None:
+            couche_tin = couche_origine
+            if selected_field is not None:
+                # Appeler la fonction de conversion des points en TIN depuis raster_utils avec le nom du champ
+                couche_tin = convertir_points_en_tin(
+                    couche_origine,
+                    selected_field=selected_field,
+                    crs_target=f"EPSG:{code_epsg}",
+                    feedback=retour
+                )
+
+                if couche_tin is None:
+                    QMessageBox.critical(None, "Erreur",
+                                         f"Échec de la création du TIN à partir de la couche de points : "
+                                         f"{couche_origine.name()}")
+                    self.splash_screenLoad.close()
+                    return
 
-        if couche_tin:
             raster_converti = convertir_tin_en_raster(
                 couche_tin,
                 crs_target=f"EPSG:{code_epsg}",
-                pixel_size=1.0,
+                pixel_size=TAILLE_PIXEL_TIN,
                 feedback=retour
             )
             if raster_converti is None:
@@ -1010,71 +1289,52 @@ class HydroLine(QObject):
                 self.splash_screenLoad.close()
                 return
 
-            # Application du filtre médian au raster converti
-            raster_filtre_median = filtre_median_raster(raster_converti, kernel_size=5)
-            if raster_filtre_median is None:
-                QMessageBox.critical(None, "Erreur",
-                                     f"Échec de l'application du filtre médian au raster converti : {couche_tin.name()}")
-                self.splash_screenLoad.close()
-                return
-
-            rasters_convertis.append(raster_filtre_median)
+            source_convertie.chemin = raster_converti.source()
+            if len(sources) > 1:
+                identifiants_a_retirer.append(raster_converti.id())
 
             # Supprimer la couche TIN originale si elle était directement sélectionnée
             if couches_tin:
                 QgsProject.instance().removeMapLayer(couche_tin.id())
+        self.splash_screenLoad.close()
 
-        # Traitement des couches raster d'origine
-        rasters_filtrés = []
-
-        for couche in couches_raster:
-            # Reprojection de la couche raster
-            couche_reprojete = reprojeter_raster(couche, code_epsg=code_epsg)
-            if couche_reprojete is None:
-                QMessageBox.critical(None, "Erreur", f"Échec de la reprojection pour la couche {couche.name()}.")
-                continue
-
-            # Application du filtre moyen aux rasters reprojetés
-            couche_filtre = filtre_moyen_raster(couche_reprojete, kernel_size=3)
-            if couche_filtre is None:
-                QMessageBox.critical(None, "Erreur",
-                                     f"Échec de l'application du filtre moyen au raster : {couche.name()}")
-                continue
+        tache = PreparationMNTTask(sources, code_epsg=code_epsg, cache=cache)
+        tache.result_ready.connect(lambda resultat: self.afficher_mnt_prepare(resultat, identifiants_a_retirer))
+        tache.etape.connect(
+            lambda libelle: self.interface_qgis.statusBarIface().showMessage(f"Préparation du MNT : {libelle}", 5000))
+        tache.error.connect(lambda message: QMessageBox.critical(None, "Erreur", message))
+        tache.taskCompleted.connect(self.on_preparation_terminee)
+        tache.taskTerminated.connect(self.on_preparation_terminee)
+        self.tache_preparation = tache
+        QgsApplication.taskManager().addTask(tache)
+
+    def on_preparation_terminee(self):
+        """
+        Libère la tâche de préparation du MNT, terminée, annulée ou en échec.
+        """
 
-            rasters_filtrés.append(couche_filtre)
+        self.tache_preparation = None
 
-        # Ajouter les rasters convertis des TINs (générés à partir de points ou sélectionnés)
-        rasters_filtrés.extend(rasters_convertis)
+    def afficher_mnt_prepare(self, resultat, identifiants_a_retirer):
+        """
+        Ajoute au projet le MNT préparé et son ombrage, puis retire les couches sources fusionnées.
 
-        # Fusionner les rasters filtrés si plusieurs sont présents
-        if len(rasters_filtrés) > 1:
-            couche_combinee = fusionner_et_arrondir_rasters(rasters_filtrés, precision_decimales=1)
-            if couche_combinee is None:
-                QMessageBox.critical(None, "Erreur", "Échec de la création du raster combiné.")
-                self.splash_screenLoad.close()
-                return
-        elif len(rasters_filtrés) == 1:
-            couche_combinee = rasters_filtrés[0]
-        else:
-            QMessageBox.warning(None, "Avertissement", "Aucune couche raster valide à traiter.")
-            self.splash_screenLoad.close()
-            return
+        Parameters
+        ----------
+        resultat : dict
+            Résultat de la préparation (voir `preparer_mnt`).
+        identifiants_a_retirer : list of str
+            Identifiants des couches sources à retirer du projet.
+        """
 
-        # Appliquer à nouveau le filtre moyen si plusieurs rasters étaient fusionnés
-        if len(rasters_filtrés) > 1:
-            couche_combinee_filtre = filtre_moyen_raster(couche_combinee, kernel_size=3)
-            if couche_combinee_filtre is None:
-                QMessageBox.critical(None, "Erreur", "Échec de l'application du filtre moyen au raster combiné.")
-                self.splash_screenLoad.close()
-                return
-        else:
-            couche_combinee_filtre = couche_combinee
+        origine = " (cache)" if resultat['cache'] else ""
+        QgsMessageLog.logMessage(f"Préparation du MNT{origine} :\n{formater_durees(resultat['durees'])}",
+                                 'HydroLine', level=Qgis.Info)
 
-        # Générer l'ombrage pour le raster combiné filtré
-        couche_ombrage = generer_ombrage(couche_combinee_filtre)
-        if not couche_ombrage.isValid():
-            QMessageBox.critical(None, "Erreur", "Échec de la création de l'ombrage.")
-            self.splash_screenLoad.close()
+        couche_combinee_filtre = QgsRasterLayer(resultat['mnt'], 'MNT_HydroLine')
+        couche_ombrage = QgsRasterLayer(resultat['ombrage'], 'Ombrage_HydroLine')
+        if not couche_combinee_filtre.isValid() or not couche_ombrage.isValid():
+            QMessageBox.critical(None, "Erreur", "Échec de la création du MNT préparé ou de son ombrage.")
             return
 
         # Appliquer le style si disponible
@@ -1092,13 +1352,10 @@ class HydroLine(QObject):
         noeud_raster = racine.findLayer(couche_combinee_filtre.id())
         racine.insertLayer(racine.children().index(noeud_raster) + 1, couche_ombrage)
 
-        # Supprimer les rasters originaux si plusieurs rasters ont été fusionnés
-        if len(rasters_filtrés) > 1:
-            for couche in couches_raster:
-                QgsProject.instance().removeMapLayer(couche.id())
-            # Supprimer le raster converti du TIN s'il a été ajouté
-            for couche in rasters_convertis:
-                QgsProject.instance().removeMapLayer(couche.id())
+        # Supprimer les rasters originaux (et le raster converti du TIN) si plusieurs rasters ont été fusionnés
+        for identifiant in identifiants_a_retirer:
+            if QgsProject.instance().mapLayer(identifiant) is not None:
+                QgsProject.instance().removeMapLayer(identifiant)
 
         # Afficher un message informatif après le traitement
         QMessageBox.information(
@@ -1107,7 +1364,6 @@ class HydroLine(QObject):
             "Parfois le raster combiné peut apparaître incorrectement.\n"
             "Clic droit sur la couche -> Propriétés -> Cliquez sur 'Appliquer' en bas à droite."
         )
-        self.splash_screenLoad.close()
 
     def changer_mode_rupture(self, index):
         """
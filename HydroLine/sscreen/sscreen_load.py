@@ -4,9 +4,9 @@
 
 import os
 
-from PyQt5.QtCore import QPropertyAnimation, QSequentialAnimationGroup, Qt
+from PyQt5.QtCore import QPropertyAnimation, QSequentialAnimationGroup, Qt, pyqtSignal
 from PyQt5.QtGui import QPixmap, QGuiApplication, QFont
-from PyQt5.QtWidgets import QWidget, QLabel, QGraphicsOpacityEffect
+from PyQt5.QtWidgets import QWidget, QLabel, QGraphicsOpacityEffect, QProgressBar, QPushButton
 
 
 class SplashScreenLoad(QWidget):
@@ -28,14 +28,23 @@ class SplashScreenLoad(QWidget):
         Effet d'opacité appliqué sur l'image animée.
     anim_group : QSequentialAnimationGroup
         Groupe d'animations contrôlant le cycle de fondu.
+    progress_bar : QProgressBar or None
+        Barre d'avancement, présente si l'écran est annulable.
+    cancel_button : QPushButton or None
+        Bouton d'annulation, présent si l'écran est annulable.
+    annulation_demandee : pyqtSignal
+        Signal émis lorsque l'utilisateur demande l'annulation du chargement.
 
     Methods
     -------
     start_animation()
         Commence l'animation de fondu indéfinie pour l'image animée.
+    definir_progression(valeur)
+        Met à jour la barre d'avancement.
     """
+    annulation_demandee = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, annulable=False):
         """
         Initialise l'écran de chargement avec les paramètres nécessaires.
 
@@ -43,6 +52,8 @@ class SplashScreenLoad(QWidget):
         ----------
         parent : QWidget, optional
             Widget parent, par défaut None.
+        annulable : bool, optional
+            Affiche une barre d'avancement et un bouton d'annulation, par défaut False.
         """
 
         super(SplashScreenLoad, self).__init__(parent)
@@ -98,8 +109,32 @@ class SplashScreenLoad(QWidget):
         self.opacity_effect = QGraphicsOpacityEffect()
         self.moving_label.setGraphicsEffect(self.opacity_effect)
 
+        self.progress_bar = None
+        self.cancel_button = None
+        if annulable:
+            self.progress_bar = QProgressBar(self)
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(0)
+            self.progress_bar.setGeometry(60, height - 65, width - 120, 16)
+
+            self.cancel_button = QPushButton("Annuler", self)
+            self.cancel_button.setGeometry((width - 100) // 2, height - 40, 100, 26)
+            self.cancel_button.clicked.connect(self.annulation_demandee.emit)
+
         self.start_animation()
 
+    def definir_progression(self, valeur):
+        """
+        Met à jour la barre d'avancement.
+
+        Parameters
+        ----------
+        valeur : int
+            Avancement (0-100).
+        """
+        if self.progress_bar is not None:
+            self.progress_bar.setValue(valeur)
+
     def start_animation(self):
         """
         Commence l'animation de fondu indéfinie pour l'image animée.
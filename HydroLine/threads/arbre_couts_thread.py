@@ -0,0 +1,90 @@
+# threads/arbre_couts_thread.py
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..utils.routage_utils import (
+    extraire_fenetre,
+    surface_cout,
+    construire_arbre_moindre_cout
+)
+
+
+class ArbreCoutsThread(QThread):
+    """
+    Thread pour construire l'arbre des chemins de moindre coût (mode live-wire) autour d'un point d'ancrage.
+
+    L'arbre est calculé une seule fois par sommet confirmé, sur une fenêtre bornée du raster ; chaque
+    déplacement de la souris se contente ensuite de remonter l'arbre. Une interruption demandée
+    (`requestInterruption`) est prise en compte entre deux étapes, sans émettre de résultat.
+
+    Attributes
+    ----------
+    tableau : np.ndarray
+        Altitudes (types de coût 'hauts' et 'bas') ou pentes en degrés (types 'convexe' et 'concave').
+    source_px : tuple of int
+        Pixel d'ancrage (colonne, ligne).
+    rayon : int
+        Demi-largeur de la fenêtre de calcul en pixels.
+    type_cout : str
+        'hauts', 'bas', 'convexe' ou 'concave'.
+    nodata : float or None
+        Valeur sans donnée du tableau, remplacée par NaN avant la construction de la surface de coût.
+    cle : object
+        Identifiant transmis à l'arbre pour détecter les résultats périmés.
+    result_ready : pyqtSignal
+        Signal émis avec l'ArbreMoindreCout calculé.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute la construction de l'arbre.
+    """
+    result_ready = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, tableau, source_px, rayon, type_cout, nodata=None, cle=None, parent=None):
+        """
+        Initialise le thread de construction de l'arbre.
+
+        Parameters
+        ----------
+        tableau : np.ndarray
+            Altitudes ou pentes selon le type de coût.
+        source_px : tuple of int
+            Pixel d'ancrage (colonne, ligne).
+        rayon : int
+            Demi-largeur de la fenêtre de calcul en pixels.
+        type_cout : str
+            'hauts', 'bas', 'convexe' ou 'concave'.
+        nodata : float, optional
+            Valeur sans donnée du tableau, par défaut None.
+        cle : object, optional
+            Identifiant transmis à l'arbre, par défaut None.
+        parent : QObject, optional
+            Objet parent pour le thread, par défaut None.
+        """
+        super().__init__(parent)
+        self.tableau = tableau
+        self.source_px = source_px
+        self.rayon = rayon
+        self.type_cout = type_cout
+        self.nodata = nodata
+        self.cle = cle
+
+    def run(self):
+        """
+        Extrait la fenêtre, construit la surface de coût et calcule l'arbre des plus courts chemins.
+        """
+        try:
+            fenetre, x0, y0 = extraire_fenetre(self.tableau, self.source_px, self.rayon, nodata=self.nodata)
+            if self.isInterruptionRequested():
+                return
+            cout = surface_cout(fenetre, self.type_cout)
+            arbre = construire_arbre_moindre_cout(cout, x0, y0, self.source_px, cle=self.cle)
+            if self.isInterruptionRequested():
+                return
+            self.result_ready.emit(arbre)
+        except Exception as e:
+            self.error.emit(f"Erreur lors du calcul de l'arbre live-wire : {e}")
@@ -0,0 +1,74 @@
+# threads/arbre_couvrant_thread.py
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..utils.routage_utils import construire_arbre_couvrant_minimax
+
+
+class ArbreCouvrantThread(QThread):
+    """
+    Thread pour construire l'arbre couvrant minimax (crêtes ou thalwegs) d'un MNT entier.
+
+    L'arbre est construit une seule fois par MNT et par critère ; toutes les requêtes de la session
+    se résument ensuite à une remontée dans l'arbre. Une interruption demandée (`requestInterruption`)
+    est prise en compte entre deux tours de fusion, sans émettre de résultat.
+
+    Attributes
+    ----------
+    tableau : np.ndarray
+        Altitudes du MNT.
+    points_bas : bool
+        True pour l'arbre des thalwegs, False pour l'arbre des crêtes.
+    nodata : float or None
+        Valeur sans donnée du MNT, exclue du graphe.
+    cle : object
+        Identifiant transmis à l'arbre pour détecter les résultats périmés.
+    result_ready : pyqtSignal
+        Signal émis avec l'ArbreCouvrantMinimax calculé.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute la construction de l'arbre.
+    """
+    result_ready = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, tableau, points_bas, nodata=None, cle=None, parent=None):
+        """
+        Initialise le thread de construction de l'arbre couvrant.
+
+        Parameters
+        ----------
+        tableau : np.ndarray
+            Altitudes du MNT.
+        points_bas : bool
+            True pour l'arbre des thalwegs, False pour l'arbre des crêtes.
+        nodata : float, optional
+            Valeur sans donnée du MNT, par défaut None.
+        cle : object, optional
+            Identifiant transmis à l'arbre, par défaut None.
+        parent : QObject, optional
+            Objet parent pour le thread, par défaut None.
+        """
+        super().__init__(parent)
+        self.tableau = tableau
+        self.points_bas = points_bas
+        self.nodata = nodata
+        self.cle = cle
+
+    def run(self):
+        """
+        Construit l'arbre couvrant minimax du MNT.
+        """
+        try:
+            arbre = construire_arbre_couvrant_minimax(self.tableau, points_bas=self.points_bas,
+                                                      nodata=self.nodata, cle=self.cle,
+                                                      interrompre=self.isInterruptionRequested)
+            if arbre is None:
+                return
+            self.result_ready.emit(arbre)
+        except Exception as e:
+            self.error.emit(f"Erreur lors du calcul de l'arbre couvrant : {e}")
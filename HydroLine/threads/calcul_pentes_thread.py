@@ -2,34 +2,42 @@
 
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
-from qgis.PyQt.QtWidgets import QAction, QMessageBox
 
-try :
-    import dask
-except ImportError:
-    QMessageBox.warning(
-        None,
-        "HydroLine warning",
-        ("Pour utiliser pleinement HydroLine, l'installation \n"
-        "de dask est indispensable. Touche windows -> Osgeo4w shell > pip install dask \n"
-         " > relancer QGIS")
-    )
+from ..utils.terrain_utils import derivees_terrain, ombrage
+
 
 class CalculPentesThread(QThread):
     """
-    Thread pour calculer les pentes locales à partir d'un tableau de hillshade.
+    Thread pour calculer les pentes locales (et, sur demande, exposition, courbures et ombrage) à partir du MNT.
 
-    Cette classe utilise Dask pour le calcul des gradients et des pentes locales de manière asynchrone,
-    permettant ainsi de garder l'interface utilisateur réactive pendant le traitement.
+    Le calcul est fait par bandes de lignes avec une ligne de recouvrement (voir `derivees_terrain`),
+    directement sur les altitudes : le MNT n'est jamais converti en entier en float64 et seuls les produits
+    demandés, en float32, ont la taille du MNT.
 
     Attributes
     ----------
-    hillshade_array : np.ndarray
-        Tableau NumPy contenant les données de hillshade.
+    tableau : np.ndarray or AccesseurMNT
+        Altitudes du MNT.
     gt : tuple
         Transformation géospatiale associée aux données, contenant des informations telles que la taille du pixel.
+    produits : tuple of str
+        Produits à calculer parmi PRODUITS_DERIVEES.
+    methode : str
+        Méthode de dérivation ('horn' ou 'zt').
+    nodata : float or None
+        Valeur sans donnée du MNT.
+    avec_ombrage : bool
+        True pour calculer aussi l'ombrage 8 bits, après les dérivées.
     result_ready : pyqtSignal
         Signal émis lorsque le calcul est terminé, contenant le tableau des pentes locales en degrés.
+    derivees_ready : pyqtSignal
+        Signal émis lorsque le calcul est terminé, contenant le dictionnaire de tous les produits calculés.
+    ombrage_ready : pyqtSignal
+        Signal émis avec l'ombrage uint8 lorsqu'il est demandé.
+    progress : pyqtSignal
+        Signal émis avec l'avancement (0-100).
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
 
     Methods
     -------
@@ -37,41 +45,79 @@ class CalculPentesThread(QThread):
         Exécute le calcul des pentes locales.
     """
     result_ready = pyqtSignal(np.ndarray)  # Signal émis lorsque le calcul est terminé
+    derivees_ready = pyqtSignal(dict)
+    ombrage_ready = pyqtSignal(np.ndarray)
+    progress = pyqtSignal(int)
+    error = pyqtSignal(str)
 
-    def __init__(self, hillshade_array, gt, parent=None):
+    def __init__(self, tableau, gt, produits=('pente',), methode='horn', nodata=None, avec_ombrage=False,
+                 parent=None):
         """
         Initialise le thread de calcul des pentes locales.
 
         Parameters
         ----------
-        hillshade_array : np.ndarray
-            Tableau NumPy contenant les données de hillshade.
+        tableau : np.ndarray or AccesseurMNT
+            Altitudes du MNT.
         gt : tuple
             Transformation géospatiale associée aux données, contenant des informations telles que la taille du pixel.
+        produits : tuple of str, optional
+            Produits à calculer, par défaut ('pente',).
+        methode : str, optional
+            Méthode de dérivation ('horn' ou 'zt'), par défaut 'horn'.
+        nodata : float, optional
+            Valeur sans donnée du MNT, par défaut None.
+        avec_ombrage : bool, optional
+            True pour calculer aussi l'ombrage, par défaut False.
         parent : QObject, optional
             Objet parent pour le thread, par défaut None.
         """
         super().__init__(parent)
-        self.hillshade_array = hillshade_array
+        self.tableau = tableau
         self.gt = gt
+        self.produits = tuple(produits)
+        self.methode = methode
+        self.nodata = nodata
+        self.avec_ombrage = avec_ombrage
 
     def run(self):
         """
-        Exécute le calcul des pentes locales.
-
-        Cette méthode utilise Dask pour calculer les gradients et les pentes locales, puis émet un signal avec
-        le résultat une fois le calcul terminé.
+        Exécute le calcul des dérivées et émet les résultats, sauf en cas d'interruption.
         """
-        from ..external.dask import array as da
-        try:
-            dask_array = da.from_array(self.hillshade_array, chunks=(1000, 1000))  # Ajustez les chunks si nécessaire
+        # Avancement global réparti entre les étapes demandées
+        etapes = int(bool(self.produits)) + int(self.avec_ombrage)
+        faites = [0]
 
-            grad_y, grad_x = da.gradient(dask_array, self.gt[1], -self.gt[5])
-            magnitude = da.degrees(da.arctan(da.sqrt(grad_x ** 2 + grad_y ** 2)))
+        def progression(valeur):
+            self.progress.emit(int((100 * faites[0] + valeur) / max(etapes, 1)))
 
-            pentes_locales_degres = magnitude.compute()
+        try:
+            if self.produits:
+                derivees = derivees_terrain(
+                    self.tableau, self.gt[1], self.gt[5],
+                    produits=self.produits,
+                    methode=self.methode,
+                    nodata=self.nodata,
+                    progression=progression,
+                    interrompre=self.isInterruptionRequested
+                )
+                if derivees is None:
+                    return
 
-            self.result_ready.emit(pentes_locales_degres)
-        except Exception as e:
-            print("erreur pente")
+                self.derivees_ready.emit(derivees)
+                if 'pente' in derivees:
+                    self.result_ready.emit(derivees['pente'])
+                faites[0] += 1
 
+            if self.avec_ombrage:
+                valeurs = ombrage(
+                    self.tableau, self.gt[1], self.gt[5],
+                    nodata=self.nodata,
+                    progression=progression,
+                    interrompre=self.isInterruptionRequested
+                )
+                if valeurs is None:
+                    return
+                self.ombrage_ready.emit(valeurs)
+        except Exception as e:
+            self.error.emit(f"Erreur lors du calcul des pentes : {e}")
@@ -0,0 +1,107 @@
+# threads/chemin_a_etoile_thread.py
+
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..utils.routage_utils import (
+    remplacer_nodata,
+    surface_cout,
+    chemin_a_etoile
+)
+
+
+class CheminAEtoileThread(QThread):
+    """
+    Thread pour calculer le chemin de moindre coût optimal (A*) entre deux pixels, sur un corridor borné du raster.
+
+    Le calcul est lancé au clic : le canevas reste réactif pendant la recherche. Une interruption demandée
+    (`requestInterruption`) est prise en compte entre deux étapes, sans émettre de résultat.
+
+    Attributes
+    ----------
+    tableau : np.ndarray
+        Altitudes (types de coût 'hauts' et 'bas') ou pentes en degrés (types 'convexe' et 'concave').
+    depart_px, arrivee_px : tuple of int
+        Pixels (colonne, ligne) de départ et d'arrivée.
+    corridor : tuple of int
+        (x0, y0, x1, y1) bornes du corridor de recherche, x1 et y1 exclus.
+    type_cout : str
+        'hauts', 'bas', 'convexe' ou 'concave'.
+    nodata : float or None
+        Valeur sans donnée du tableau, remplacée par NaN avant la construction de la surface de coût.
+    cle : object
+        Identifiant renvoyé avec le résultat pour détecter les résultats périmés.
+    result_ready : pyqtSignal
+        Signal émis avec la clé, les pixels du chemin (ou None) et les statistiques du calcul.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute la recherche du chemin.
+    """
+    result_ready = pyqtSignal(object, object, dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, tableau, depart_px, arrivee_px, corridor, type_cout, nodata=None, cle=None, parent=None):
+        """
+        Initialise le thread de recherche A*.
+
+        Parameters
+        ----------
+        tableau : np.ndarray
+            Altitudes ou pentes selon le type de coût.
+        depart_px, arrivee_px : tuple of int
+            Pixels (colonne, ligne) de départ et d'arrivée.
+        corridor : tuple of int
+            (x0, y0, x1, y1) bornes du corridor de recherche.
+        type_cout : str
+            'hauts', 'bas', 'convexe' ou 'concave'.
+        nodata : float, optional
+            Valeur sans donnée du tableau, par défaut None.
+        cle : object, optional
+            Identifiant renvoyé avec le résultat, par défaut None.
+        parent : QObject, optional
+            Objet parent pour le thread, par défaut None.
+        """
+        super().__init__(parent)
+        self.tableau = tableau
+        self.depart_px = depart_px
+        self.arrivee_px = arrivee_px
+        self.corridor = corridor
+        self.type_cout = type_cout
+        self.nodata = nodata
+        self.cle = cle
+
+    def run(self):
+        """
+        Extrait le corridor, construit la surface de coût et recherche le chemin optimal.
+        """
+        try:
+            debut = time.perf_counter()
+            x0, y0, x1, y1 = self.corridor
+            fenetre = remplacer_nodata(self.tableau[y0:y1, x0:x1], self.nodata)
+            if self.isInterruptionRequested():
+                return
+            cout = surface_cout(fenetre, self.type_cout)
+            if self.isInterruptionRequested():
+                return
+            pixels, noeuds_developpes = chemin_a_etoile(
+                cout,
+                (self.depart_px[0] - x0, self.depart_px[1] - y0),
+                (self.arrivee_px[0] - x0, self.arrivee_px[1] - y0)
+            )
+            if self.isInterruptionRequested():
+                return
+            if pixels is not None:
+                pixels = [(px + x0, py + y0) for px, py in pixels]
+            statistiques = {
+                'noeuds_developpes': noeuds_developpes,
+                'pixels_corridor': cout.size,
+                'duree': time.perf_counter() - debut
+            }
+            self.result_ready.emit(self.cle, pixels, statistiques)
+        except Exception as e:
+            self.error.emit(f"Erreur lors du calcul du chemin A* : {e}")
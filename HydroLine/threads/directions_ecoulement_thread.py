@@ -0,0 +1,67 @@
+# threads/directions_ecoulement_thread.py
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..utils.hydro_utils import directions_ecoulement_d8
+
+
+class DirectionsEcoulementThread(QThread):
+    """
+    Thread pour calculer la grille des directions d'écoulement D8 d'un MNT.
+
+    Une interruption demandée (`requestInterruption`) est prise en compte en cours de calcul
+    (voir `directions_ecoulement_d8`), sans émettre de résultat.
+
+    Attributes
+    ----------
+    tableau : np.ndarray
+        Altitudes du MNT.
+    nodata : float or None
+        Valeur sans donnée du raster.
+    cle : object
+        Identifiant renvoyé avec le résultat pour détecter les résultats périmés.
+    result_ready : pyqtSignal
+        Signal émis avec la grille uint8 des codes D8 et la clé.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute le calcul des directions d'écoulement.
+    """
+    result_ready = pyqtSignal(object, object)
+    error = pyqtSignal(str)
+
+    def __init__(self, tableau, nodata=None, cle=None, parent=None):
+        """
+        Initialise le thread de calcul des directions d'écoulement.
+
+        Parameters
+        ----------
+        tableau : np.ndarray
+            Altitudes du MNT.
+        nodata : float, optional
+            Valeur sans donnée du raster, par défaut None.
+        cle : object, optional
+            Identifiant renvoyé avec le résultat, par défaut None.
+        parent : QObject, optional
+            Objet parent pour le thread, par défaut None.
+        """
+        super().__init__(parent)
+        self.tableau = tableau
+        self.nodata = nodata
+        self.cle = cle
+
+    def run(self):
+        """
+        Calcule la grille D8 conditionnée (comblement des dépressions, résolution des zones planes).
+        """
+        try:
+            directions = directions_ecoulement_d8(self.tableau, nodata=self.nodata,
+                                                  interrompre=self.isInterruptionRequested)
+            if directions is None:
+                return
+            self.result_ready.emit(directions, self.cle)
+        except Exception as e:
+            self.error.emit(f"Erreur lors du calcul des directions d'écoulement : {e}")
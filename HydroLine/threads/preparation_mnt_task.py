@@ -0,0 +1,164 @@
+# threads/preparation_mnt_task.py
+
+import os
+
+from PyQt5.QtCore import pyqtSignal
+from qgis.core import QgsTask
+
+from ..utils.pipeline_mnt import examiner_source, preparer_mnt
+
+
+class ExamenSourceTask(QgsTask):
+    """
+    Sous-tâche examinant une source de la préparation du MNT (voir `examiner_source`).
+
+    Les sources sont indépendantes : leurs sous-tâches s'exécutent en parallèle dans le gestionnaire de tâches
+    de QGIS, avant la tâche de préparation qui en dépend.
+
+    Attributes
+    ----------
+    source : SourcePipeline
+        Source à examiner.
+    code_epsg : int
+        Système de coordonnées cible.
+    erreur : str or None
+        Message d'erreur si l'examen a échoué.
+
+    Methods
+    -------
+    run()
+        Examine la source.
+    """
+
+    def __init__(self, source, code_epsg):
+        """
+        Initialise la sous-tâche d'examen d'une source.
+
+        Parameters
+        ----------
+        source : SourcePipeline
+            Source à examiner.
+        code_epsg : int
+            Système de coordonnées cible.
+        """
+        super().__init__(f"Lecture de {os.path.basename(source.chemin)}", QgsTask.CanCancel)
+        self.source = source
+        self.code_epsg = code_epsg
+        self.erreur = None
+
+    def run(self):
+        """
+        Examine la source ; retourne False en cas d'échec, ce qui met fin à la préparation.
+        """
+        try:
+            examiner_source(self.source, self.code_epsg)
+        except (IOError, RuntimeError) as e:
+            self.erreur = str(e)
+            return False
+        self.setProgress(100)
+        return not self.isCanceled()
+
+
+class PreparationMNTTask(QgsTask):
+    """
+    Tâche de fond préparant le MNT et son ombrage (voir `preparer_mnt`), suivie dans le gestionnaire de tâches
+    de QGIS.
+
+    Avec plusieurs sources, chacune est d'abord examinée par une sous-tâche (lecture, reprojection de son
+    emprise), en parallèle ; la préparation démarre quand toutes ont abouti. L'avancement de chaque source et
+    de la préparation est affiché par le gestionnaire de tâches, et le libellé de l'étape en cours est émis
+    par `etape`. L'annulation est prise en compte entre deux bandes : les fichiers partiels et les VRT en
+    mémoire sont alors supprimés, et aucun signal de résultat n'est émis.
+
+    Attributes
+    ----------
+    sources : list of SourcePipeline
+        Sources à préparer.
+    code_epsg : int
+        Système de coordonnées cible.
+    cache : CachePreparationMNT or None
+        Cache des MNT préparés.
+    resultat : dict or None
+        Résultat de `preparer_mnt` une fois la tâche terminée.
+    erreur : str or None
+        Message d'erreur si la préparation a échoué.
+    result_ready : pyqtSignal
+        Signal émis dans le thread principal avec le résultat de la préparation.
+    etape : pyqtSignal
+        Signal émis avec le libellé de chaque étape de la préparation.
+    error : pyqtSignal
+        Signal émis dans le thread principal avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute la préparation du MNT.
+    finished(resultat)
+        Émet le résultat ou l'erreur dans le thread principal.
+    """
+    result_ready = pyqtSignal(dict)
+    etape = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, sources, code_epsg=2154, cache=None):
+        """
+        Initialise la tâche de préparation du MNT et ses sous-tâches.
+
+        Parameters
+        ----------
+        sources : list of SourcePipeline
+            Sources à préparer ; en cas de recouvrement, la dernière l'emporte.
+        code_epsg : int, optional
+            Système de coordonnées cible, par défaut 2154.
+        cache : CachePreparationMNT, optional
+            Cache des MNT préparés, par défaut None.
+        """
+        super().__init__("Préparation du MNT HydroLine", QgsTask.CanCancel)
+        self.sources = sources
+        self.code_epsg = code_epsg
+        self.cache = cache
+        self.resultat = None
+        self.erreur = None
+
+        # Une seule source : son examen fait partie de la préparation, sans sous-tâche
+        self.sous_taches = []
+        if len(sources) > 1:
+            for source in sources:
+                sous_tache = ExamenSourceTask(source, code_epsg)
+                self.addSubTask(sous_tache, [], QgsTask.ParentDependsOnSubTask)
+                self.sous_taches.append(sous_tache)
+
+    def run(self):
+        """
+        Exécute la préparation ; retourne False en cas d'échec ou d'annulation.
+        """
+        try:
+            self.resultat = preparer_mnt(
+                self.sources,
+                code_epsg=self.code_epsg,
+                cache=self.cache,
+                progression=self.setProgress,
+                interrompre=self.isCanceled,
+                etape=self.etape.emit
+            )
+        except (IOError, RuntimeError, ValueError) as e:
+            self.erreur = str(e)
+            return False
+        return self.resultat is not None
+
+    def finished(self, resultat):
+        """
+        Émet le résultat ou l'erreur ; appelée par QGIS dans le thread principal.
+
+        Parameters
+        ----------
+        resultat : bool
+            Valeur retournée par `run`, False si une sous-tâche a échoué.
+        """
+        if resultat:
+            self.result_ready.emit(self.resultat)
+            return
+        if self.isCanceled():
+            return
+        erreur = self.erreur or next((t.erreur for t in self.sous_taches if t.erreur), None)
+        self.error.emit(f"Échec de la préparation du MNT : {erreur or 'erreur inconnue'}")
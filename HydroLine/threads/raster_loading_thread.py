@@ -1,34 +1,60 @@
 # threads/raster_loading_thread.py
 
-import numpy as np
-from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtCore import QThread, pyqtSignal
 from osgeo import gdal
 
+from ..utils.acces_mnt import AccesseurMNT
+from ..utils.cache_mnt import obtenir_cache_disque_mnt
+
 
 class RasterLoadingThread(QThread):
     """
-    Thread pour charger les données raster à partir d'une couche.
+    Thread pour charger les données raster d'une couche, bandeau par bandeau.
+
+    Le MNT est ouvert pour un accès fenêtré (AccesseurMNT), puis ses tuiles sont lues en arrière-plan
+    et placées dans le cache de l'accesseur, par bandeaux (rangées de tuiles). La fenêtre prioritaire
+    (typiquement l'emprise visible du canevas) est lue en premier : `raster_loaded` est émis dès qu'elle
+    est disponible, pour que le tracé puisse commencer avant la fin du chargement. Le reste du MNT est
+    ensuite lu du bandeau le plus proche au plus éloigné de cette fenêtre, tant que le plafond mémoire
+    du cache le permet. Les tuiles déjà en cache ne sont pas relues.
 
-    Cette classe utilise GDAL pour récupérer les données raster et leurs géotransformations,
-    permettant le traitement du chargement dans un thread séparé pour maintenir la réactivité de l'application.
+    Si l'accesseur dispose d'un cache disque qui ne contient pas encore le MNT, le chargement est mené jusqu'au
+    bout (sans plafond mémoire, les valeurs étant écrites sur disque au fil de l'eau) puis l'entrée est publiée
+    et l'accesseur bascule sur sa projection mémoire : les chargements suivants sont immédiats.
+
+    Le chargement s'interrompt proprement à la demande (`requestInterruption`) entre deux lectures.
 
     Attributes
     ----------
     couche_raster : QgsRasterLayer
         La couche raster à charger.
+    tableau_raster : AccesseurMNT or None
+        Accesseur déjà ouvert à remplir ; s'il est absent, le thread ouvre le MNT lui-même.
+    fenetre_prioritaire : tuple of int or None
+        Fenêtre (y0, y1, x0, x1) en pixels à lire en premier.
+    tuiles_par_lecture : int
+        Nombre maximal de tuiles lues en une seule lecture GDAL.
+    complet : bool
+        True si tout le MNT a été lu sans interruption.
+    progress : pyqtSignal
+        Signal émis avec l'avancement (0-100).
     raster_loaded : pyqtSignal
-        Signal émis une fois le raster chargé, contenant le tableau des données, la géotransformation,
+        Signal émis une fois la fenêtre prioritaire disponible, contenant l'AccesseurMNT, la géotransformation,
         son inverse, et les dimensions du raster.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
 
     Methods
     -------
     run()
         Exécute le chargement des données raster.
     """
-    raster_loaded = pyqtSignal(np.ndarray, tuple, tuple, int, int)  # Emitting the loaded raster data and other params
+    progress = pyqtSignal(int)
+    raster_loaded = pyqtSignal(object, tuple, tuple, int, int)
+    error = pyqtSignal(str)
 
-    def __init__(self, couche_raster, parent=None):
+    def __init__(self, couche_raster, tableau_raster=None, fenetre_prioritaire=None, tuiles_par_lecture=8,
+                 parent=None):
         """
         Initialise le thread de chargement du raster.
 
@@ -36,43 +62,115 @@ class RasterLoadingThread(QThread):
         ----------
         couche_raster : QgsRasterLayer
             La couche raster à charger.
+        tableau_raster : AccesseurMNT, optional
+            Accesseur déjà ouvert à remplir, par défaut None.
+        fenetre_prioritaire : tuple of int, optional
+            Fenêtre (y0, y1, x0, x1) en pixels à lire en premier, par défaut None.
+        tuiles_par_lecture : int, optional
+            Nombre maximal de tuiles lues en une seule lecture GDAL, par défaut 8.
         parent : QObject, optional
             Objet parent pour le thread, par défaut None.
         """
 
         super().__init__(parent)
         self.couche_raster = couche_raster
+        self.source = couche_raster.dataProvider().dataSourceUri()
+        self.tableau_raster = tableau_raster
+        self.fenetre_prioritaire = fenetre_prioritaire
+        self.tuiles_par_lecture = tuiles_par_lecture
+        self.complet = False
 
     def run(self):
         """
         Exécute le chargement des données raster.
 
-        Utilise GDAL pour ouvrir et lire les données raster dans un tableau NumPy,
-        tout en récupérant la géotransformation et ses dimensions, puis émet un signal avec ces données.
+        Ouvre le raster si nécessaire, lit la fenêtre prioritaire puis émet `raster_loaded`,
+        et poursuit avec le reste du MNT dans la limite du plafond mémoire du cache.
         """
 
+        ecriture = None
         try:
-            source = self.couche_raster.dataProvider().dataSourceUri()
-            dataset = gdal.Open(source)
-
-            if dataset is None:
-                return
+            if self.tableau_raster is None:
+                self.tableau_raster = AccesseurMNT(self.source, cache_disque=obtenir_cache_disque_mnt())
+            tableau_raster = self.tableau_raster
 
-            gt = dataset.GetGeoTransform()
+            gt = tableau_raster.gt
             inv_gt = gdal.InvGeoTransform(gt)
 
             if inv_gt is None:
-                return
-
-            bande_raster = dataset.GetRasterBand(1)
-            tableau_raster = bande_raster.ReadAsArray()
-
-            if tableau_raster is None:
+                self.error.emit(f"Géotransformation non inversible : {self.source}")
                 return
 
             raster_lignes, raster_colonnes = tableau_raster.shape
-
-
-            self.raster_loaded.emit(tableau_raster, gt, inv_gt, raster_lignes, raster_colonnes)
+            hauteur, largeur = tableau_raster.taille_tuile
+            nb_rangees = -(-raster_lignes // hauteur)
+            nb_colonnes = -(-raster_colonnes // largeur)
+
+            # Bandeaux de la fenêtre prioritaire, puis bandeaux complets par distance croissante à celle-ci
+            if self.fenetre_prioritaire is not None:
+                rangees_visibles, colonnes_visibles = tableau_raster.tuiles_fenetre(*self.fenetre_prioritaire)
+            else:
+                rangees_visibles, colonnes_visibles = range(0), range(0)
+            centre = (rangees_visibles.start + rangees_visibles.stop - 1) / 2 if rangees_visibles else 0
+            bandeaux = [(ty, colonnes_visibles.start, colonnes_visibles.stop) for ty in rangees_visibles]
+            nb_prioritaires = len(bandeaux)
+            bandeaux += [(ty, 0, nb_colonnes) for ty in sorted(range(nb_rangees), key=lambda ty: abs(ty - centre))]
+
+            nb_tuiles = sum(tx1 - tx0 for _, tx0, tx1 in bandeaux)
+            tuiles_traitees = 0
+            octets_tuile = hauteur * largeur * tableau_raster.dtype_stockage.itemsize
+
+            if tableau_raster.cache_disque is not None and tableau_raster.memmap is None:
+                ecriture = tableau_raster.cache_disque.creer(tableau_raster.chemin, tableau_raster.shape,
+                                                             tableau_raster.dtype_bande, gt, tableau_raster.nodata)
+
+            for numero, (ty, tx0, tx1) in enumerate(bandeaux):
+                if numero == nb_prioritaires:
+                    # Fenêtre prioritaire en cache : le tracé peut commencer
+                    self.raster_loaded.emit(tableau_raster, gt, inv_gt, raster_lignes, raster_colonnes)
+
+                for debut in range(tx0, tx1, self.tuiles_par_lecture):
+                    if self.isInterruptionRequested():
+                        if ecriture is not None:
+                            ecriture.abandonner()
+                        return
+                    fin = min(debut + self.tuiles_par_lecture, tx1)
+                    y0 = ty * hauteur
+                    y1 = min(y0 + hauteur, raster_lignes)
+                    x0 = debut * largeur
+                    x1 = min(fin * largeur, raster_colonnes)
+                    if tableau_raster.est_pret(y0, y1, x0, x1):
+                        bloc = None
+                        if ecriture is not None:
+                            # En mode compact, les tuiles en cache sont arrondies : le cache disque reçoit la bande
+                            bloc = (tableau_raster.lire_fenetre(y0, y1, x0, x1) if tableau_raster.codage is None
+                                    else tableau_raster.lire_bloc(y0, y1, x0, x1))
+                    elif numero < nb_prioritaires:
+                        bloc = tableau_raster.charger_tuiles(ty, debut, fin)
+                    elif ecriture is not None:
+                        # Écriture sur disque sans évincer les tuiles utiles à l'interface
+                        bloc = tableau_raster.lire_bloc(y0, y1, x0, x1)
+                    elif tableau_raster.memoire_utilisee + (fin - debut) * octets_tuile > tableau_raster.memoire_max:
+                        # Hors fenêtre prioritaire, ne pas évincer des tuiles déjà chargées
+                        self.progress.emit(100)
+                        return
+                    else:
+                        bloc = tableau_raster.charger_tuiles(ty, debut, fin)
+
+                    if ecriture is not None:
+                        try:
+                            ecriture.ecrire(y0, x0, bloc)
+                        except OSError:
+                            # Disque plein ou inaccessible : le chargement se poursuit sans cache disque
+                            ecriture.abandonner()
+                            ecriture = None
+                    tuiles_traitees += fin - debut
+                    self.progress.emit(int(100 * tuiles_traitees / nb_tuiles))
+
+            if ecriture is not None:
+                tableau_raster.attacher_memmap(ecriture.valider())
+            self.complet = True
         except Exception as e:
-            print(f"Erreur lors du chargement du raster: {e}")
\ No newline at end of file
+            if ecriture is not None:
+                ecriture.abandonner()
+            self.error.emit(f"Erreur lors du chargement du raster : {e}")
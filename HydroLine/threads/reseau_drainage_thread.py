@@ -0,0 +1,110 @@
+# threads/reseau_drainage_thread.py
+
+import time
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+from ..utils.acces_mnt import AccesseurMNT
+from ..utils.cache_mnt import obtenir_cache_disque_mnt
+from ..utils.hydro_tuiles import ReseauDrainageTuiles
+
+
+class ReseauDrainageThread(QThread):
+    """
+    Thread pour extraire en une passe le réseau de drainage complet d'un MNT préparé.
+
+    Le MNT est traité tuile par tuile (`ReseauDrainageTuiles`) : conditionnement Priority-Flood, directions D8,
+    accumulation d'écoulement et tronçons du réseau sont calculés sur des tuiles de TAILLE_TUILE_RESEAU pixels
+    de côté, reliées par des graphes construits sur leur seul pourtour. La mémoire utilisée est bornée par
+    la taille des tuiles, quelle que soit celle du MNT ; les grilles intermédiaires sont écrites dans
+    un répertoire temporaire.
+
+    Attributes
+    ----------
+    chemin_mnt : str
+        Chemin du MNT à traiter.
+    seuil : int
+        Accumulation minimale (en pixels) d'un pixel du réseau.
+    progress : pyqtSignal
+        Signal émis avec l'avancement (0-100).
+    result_ready : pyqtSignal
+        Signal émis avec la liste des tronçons [(x, y, z), ...] en coordonnées du raster
+        et le dictionnaire des statistiques du traitement.
+    error : pyqtSignal
+        Signal émis avec un message en cas d'échec.
+
+    Methods
+    -------
+    run()
+        Exécute l'extraction du réseau de drainage.
+    """
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(list, dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, chemin_mnt, seuil, parent=None):
+        """
+        Initialise le thread d'extraction du réseau de drainage.
+
+        Parameters
+        ----------
+        chemin_mnt : str
+            Chemin du MNT à traiter.
+        seuil : int
+            Accumulation minimale (en pixels) d'un pixel du réseau.
+        parent : QObject, optional
+            Objet parent pour le thread, par défaut None.
+        """
+        super().__init__(parent)
+        self.chemin_mnt = chemin_mnt
+        self.seuil = seuil
+
+    def run(self):
+        """
+        Traite le MNT tuile par tuile, puis vectorise le réseau.
+
+        Une interruption demandée (`requestInterruption`) est prise en compte entre deux tuiles et pendant
+        le traitement d'une tuile, sans émettre de résultat.
+        """
+        try:
+            debut = time.perf_counter()
+            try:
+                mnt = AccesseurMNT(self.chemin_mnt, cache_disque=obtenir_cache_disque_mnt())
+            except IOError as e:
+                self.error.emit(str(e))
+                return
+
+            try:
+                gt = mnt.gt
+                lignes, colonnes = mnt.shape
+                traitement = ReseauDrainageTuiles(
+                    mnt, self.seuil, progression=self.progress.emit, interrompre=self.isInterruptionRequested
+                )
+                troncons_px = traitement.executer()
+                if troncons_px is None:
+                    return
+
+                troncons = []
+                for troncon in troncons_px:
+                    colonnes_px = np.array([p[0] for p in troncon], dtype=np.int64)
+                    lignes_px = np.array([p[1] for p in troncon], dtype=np.int64)
+                    px = colonnes_px + 0.5
+                    py = lignes_px + 0.5
+                    xs = gt[0] + px * gt[1] + py * gt[2]
+                    ys = gt[3] + px * gt[4] + py * gt[5]
+                    zs = np.asarray(mnt[lignes_px, colonnes_px], dtype=np.float64)
+                    troncons.append(list(zip(xs.tolist(), ys.tolist(), zs.tolist())))
+            finally:
+                mnt.fermer()
+
+            duree = time.perf_counter() - debut
+            statistiques = {
+                'cellules': lignes * colonnes,
+                'troncons': len(troncons),
+                'duree': duree,
+                'cellules_par_seconde': lignes * colonnes / duree if duree > 0 else 0.0,
+            }
+            self.progress.emit(100)
+            self.result_ready.emit(troncons, statistiques)
+        except Exception as e:
+            self.error.emit(f"Erreur lors de l'extraction du réseau de drainage : {e}")
@@ -8,15 +8,22 @@ from osgeo import gdal
 from qgis._core import QgsPointXY
 from qgis.core import (
     QgsCoordinateTransform,
-    QgsProject
+    QgsProject,
+    QgsMessageLog,
+    Qgis
 )
 from qgis.gui import QgsMapTool
 from qgis.PyQt.QtWidgets import QMessageBox, QInputDialog
 
 
-from ..threads.calcul_pentes_thread import CalculPentesThread
+from ..threads.arbre_couts_thread import ArbreCoutsThread
+from ..threads.chemin_a_etoile_thread import CheminAEtoileThread
+from ..threads.raster_loading_thread import RasterLoadingThread
 from ..sscreen.sscreen_load import SplashScreenLoad
 from ..utils.error import afficher_message_epsg
+from ..utils.routage_utils import fenetre_corridor
+from ..utils.acces_mnt import AccesseurMNT, MEMOIRE_CACHE_MNT_DEFAUT
+from ..utils.cache_mnt import obtenir_cache_disque_mnt
 
 
 class BaseMapTool(QgsMapTool):
@@ -26,6 +33,10 @@ class BaseMapTool(QgsMapTool):
     Cette classe gère le chargement du raster en arrière-plan, les transformations de coordonnées,
     et fournit des méthodes utilitaires pour accéder aux données du raster.
 
+    Le MNT est ouvert à la construction de l'outil (lecture des seules métadonnées), puis ses tuiles sont
+    chargées en arrière-plan par bandeaux, l'emprise visible du canevas en premier : l'outil est utilisable
+    dès que cette emprise est disponible. Le chargement peut être annulé depuis l'écran de chargement.
+
     Attributes
     ----------
     canvas : QgsMapCanvas
@@ -34,6 +45,8 @@ class BaseMapTool(QgsMapTool):
         La couche raster (MNT).
     data_loaded : bool
         Indicateur si les données de raster ont été chargées avec succès.
+    raster_loading_thread : RasterLoadingThread or None
+        Thread de chargement du MNT par bandeaux.
     crs_canvas : QgsCoordinateReferenceSystem
         Système de coordonnées du canevas de la carte.
     crs_raster : QgsCoordinateReferenceSystem
@@ -42,24 +55,90 @@ class BaseMapTool(QgsMapTool):
         Transformation de coordonnées du canevas vers le raster.
     transformation_depuis_raster : QgsCoordinateTransform
         Transformation de coordonnées du raster vers le canevas.
+    moteur_routage : str
+        Moteur de calcul du chemin dynamique ('glouton', 'livewire' ou 'astar'), par défaut 'glouton'.
+    rayon_livewire : int
+        Demi-largeur (pixels) de la fenêtre sur laquelle l'arbre live-wire est construit, par défaut 400.
+    arbre_livewire : ArbreMoindreCout or None
+        Arbre des chemins de moindre coût issu du dernier point d'ancrage.
+    noeuds_developpes_astar : int
+        Nombre de nœuds développés lors du dernier calcul A*.
+    cle_a_etoile : tuple or None
+        Clé (départ, arrivée, type de coût) du calcul A* attendu ; les résultats d'une autre clé sont ignorés.
+    memoire_cache_mnt : int
+        Plafond mémoire (octets) du cache de tuiles du MNT.
+    mnt_compact : bool
+        True pour ouvrir le MNT en mode compact (altitudes en décimètres entiers) hors session partagée.
+    session : SessionMNT or None
+        Session MNT partagée fournie par le plugin ; None si l'outil ouvre lui-même le MNT.
 
     Methods
     -------
     on_pentes_calculees_error(error_message)
         Traite les erreurs liées aux calculs de pentes.
     on_raster_loaded(tableau_raster, gt, inv_gt, raster_lignes, raster_colonnes)
-        Callback exécuté lorsque le chargement du raster est terminé.
+        Callback exécuté lorsque l'emprise visible du raster est chargée.
+    fermer_ecran_chargement()
+        Ferme l'écran de chargement une fois l'outil utilisable.
+    lancer_chargement_raster()
+        Lance le chargement du MNT par bandeaux en arrière-plan, l'emprise visible en premier.
+    fenetre_visible()
+        Retourne l'emprise visible du canevas en pixels du raster.
+    on_raster_loading_error(error_message)
+        Traite les erreurs du chargement du raster.
+    annuler_chargement_raster()
+        Annule le chargement à la demande de l'utilisateur et désactive l'outil.
+    arreter_chargement_raster()
+        Interrompt le chargement en arrière-plan et attend la fin du thread.
     charger_donnees_raster()
-        Charge les données raster en mémoire pour un accès rapide.
+        Ouvre le MNT pour un accès fenêtré, sans le lire en entier.
+    utiliser_session()
+        Reprend les données du MNT déjà ouvertes par la session partagée.
+    liberer_session()
+        Rend la référence de l'outil sur la session partagée.
+    precharger_autour_du_point(point)
+        Demande le préchargement en arrière-plan des tuiles du MNT autour d'un point du canevas.
     obtenir_elevation_au_point_unique(point)
         Obtient l'élévation du raster au point donné.
     obtenir_elevation_aux_points_multiples(x_array, y_array)
         Obtient les élévations du raster pour des arrays de coordonnées x et y.
+    pixel_du_point(point)
+        Convertit un point du canevas en pixel (colonne, ligne) du raster.
+    nodata_mnt()
+        Retourne la valeur sans donnée de la première bande du MNT chargé.
+    definir_moteur_routage(moteur)
+        Sélectionne le moteur de calcul du chemin dynamique.
+    donnees_cout()
+        Retourne le tableau et le type de coût utilisés par les moteurs de moindre coût.
+    lancer_arbre_livewire(source_px)
+        Lance en arrière-plan la construction de l'arbre live-wire depuis un pixel d'ancrage.
+    pixels_livewire(depart_px, arrivee_px)
+        Retourne le chemin live-wire entre l'ancrage et le curseur, si l'arbre est disponible.
+    arreter_calculs()
+        Interrompt les calculs en arrière-plan sur le MNT et attend la fin de leurs threads.
+    lancer_a_etoile(depart_px, arrivee_px)
+        Lance en arrière-plan le calcul du chemin de moindre coût optimal (A*) entre deux pixels.
+    on_a_etoile_calcule(cle, pixels, statistiques)
+        Journalise le calcul A* terminé et transmet le chemin s'il est toujours attendu.
+    on_a_etoile_error(error_message)
+        Journalise l'échec du calcul A*.
+    appliquer_chemin_a_etoile(depart_px, pixels)
+        Reçoit le chemin A* calculé ; surchargée par les outils qui proposent ce moteur.
     nettoyer_ressources()
         Nettoyage des ressources et réinitialisation de l'outil.
     """
 
-    def __init__(self, canvas, couche_raster):
+    # Moteurs de calcul du chemin dynamique proposés dans la barre d'outils : (code, libellé)
+    MOTEURS_ROUTAGE = [
+        ('glouton', 'Moteur : Glouton'),
+        ('livewire', 'Moteur : Live-wire'),
+    ]
+
+    # Plafond mémoire du cache de tuiles du MNT
+    memoire_cache_mnt = MEMOIRE_CACHE_MNT_DEFAUT
+    mnt_compact = False
+
+    def __init__(self, canvas, couche_raster, session=None):
         """
         Initialise l'outil de carte avec les attributs nécessaires pour gérer les données raster.
 
@@ -69,12 +148,23 @@ class BaseMapTool(QgsMapTool):
             Le canevas de la carte.
         couche_raster : QgsRasterLayer
             La couche raster (MNT).
+        session : SessionMNT, optional
+            Session MNT partagée, déjà acquise pour l'outil, par défaut None.
         """
         super().__init__(canvas)
         self.canvas = canvas
         self.couche_raster = couche_raster
+        self.session = session
         self.data_loaded = False
         self.crs_warning_displayed = False
+        self.moteur_routage = 'glouton'
+        self.rayon_livewire = 400
+        self.arbre_livewire = None
+        self.cle_livewire = None
+        self.threads_livewire = []
+        self.noeuds_developpes_astar = 0
+        self.cle_a_etoile = None
+        self.threads_a_etoile = []
 
         self.crs_canvas = self.canvas.mapSettings().destinationCrs()
         self.crs_raster = self.couche_raster.crs()
@@ -85,14 +175,21 @@ class BaseMapTool(QgsMapTool):
             self.crs_raster, self.crs_canvas, QgsProject.instance()
         )
 
-        self.splash_screen_load = SplashScreenLoad()
+        self.raster_loading_thread = None
+        self.splash_screen_load = SplashScreenLoad(annulable=True)
         self.splash_screen_load.setParent(self.canvas.parent())
+        self.splash_screen_load.annulation_demandee.connect(self.annuler_chargement_raster)
         self.splash_screen_load.show()
 
-        self.charger_donnees_raster()
-        self.data_loaded = True
+        if self.session is not None:
+            self.utiliser_session()
+        else:
+            self.charger_donnees_raster()
 
-        self.splash_screen_load.close()
+        if getattr(self, 'tableau_raster', None) is not None and getattr(self, 'inv_gt', None) is not None:
+            self.lancer_chargement_raster()
+        else:
+            self.splash_screen_load.close()
 
     def on_pentes_calculees_error(self, error_message):
         """
@@ -108,11 +205,14 @@ class BaseMapTool(QgsMapTool):
 
     def on_raster_loaded(self, tableau_raster, gt, inv_gt, raster_lignes, raster_colonnes):
         """
-        Exécute le traitement final après le chargement du raster.
+        Exécute le traitement final une fois l'emprise visible du raster chargée.
+
+        Le reste du MNT continue d'être chargé en arrière-plan ; les tuiles pas encore chargées sont lues
+        à la demande.
 
         Parameters
         ----------
-        tableau_raster : np.ndarray
+        tableau_raster : AccesseurMNT or np.ndarray
             Tableau contenant les données du raster.
         gt : tuple
             Géotransformation associée au raster.
@@ -130,34 +230,155 @@ class BaseMapTool(QgsMapTool):
         self.raster_colonnes = raster_colonnes
         self.data_loaded = True
 
+        self.fermer_ecran_chargement()
+
+    def fermer_ecran_chargement(self):
+        """
+        Ferme l'écran de chargement une fois l'outil utilisable.
+        """
         self.splash_screen_load.close()
 
     def charger_donnees_raster(self):
         """
-        Charge les données raster en mémoire pour un accès rapide.
+        Ouvre le MNT pour un accès fenêtré, sans le lire en entier.
 
-        Cette méthode utilise GDAL pour ouvrir et lire les données du raster, et pour obtenir
-        la géotransformation et ses dimensions.
+        Le tableau `tableau_raster` est un AccesseurMNT : il s'indexe comme le tableau NumPy de la bande,
+        mais ne lit que les tuiles nécessaires, conservées dans un cache LRU plafonné à `memoire_cache_mnt`.
+        Si le MNT figure déjà dans le cache disque, il est lu directement par projection mémoire.
         """
         source = self.couche_raster.dataProvider().dataSourceUri()
-        self.dataset = gdal.Open(source)
-
-        if self.dataset is None:
+        try:
+            self.tableau_raster = AccesseurMNT(source, memoire_max=self.memoire_cache_mnt,
+                                              cache_disque=obtenir_cache_disque_mnt(), compact=self.mnt_compact)
+        except IOError:
             return
+        self.dataset = self.tableau_raster.dataset
 
-        self.gt = self.dataset.GetGeoTransform()
+        self.gt = self.tableau_raster.gt
         self.inv_gt = gdal.InvGeoTransform(self.gt)
 
         if self.inv_gt is None:
             return
 
-        bande_raster = self.dataset.GetRasterBand(1)
-        self.tableau_raster = bande_raster.ReadAsArray()
+        self.raster_lignes, self.raster_colonnes = self.tableau_raster.shape
+
+    def lancer_chargement_raster(self):
+        """
+        Lance le chargement du MNT par bandeaux en arrière-plan, l'emprise visible du canevas en premier.
+
+        L'avancement est affiché dans l'écran de chargement ; `on_raster_loaded` est appelé dès que
+        l'emprise visible est disponible.
+        """
+        self.raster_loading_thread = RasterLoadingThread(
+            self.couche_raster,
+            tableau_raster=self.tableau_raster,
+            fenetre_prioritaire=self.fenetre_visible()
+        )
+        self.raster_loading_thread.progress.connect(self.splash_screen_load.definir_progression)
+        self.raster_loading_thread.raster_loaded.connect(self.on_raster_loaded)
+        self.raster_loading_thread.error.connect(self.on_raster_loading_error)
+        self.raster_loading_thread.start()
+
+    def fenetre_visible(self):
+        """
+        Retourne l'emprise visible du canevas en pixels du raster.
 
-        if self.tableau_raster is None:
+        Returns
+        -------
+        tuple of int or None
+            Fenêtre (y0, y1, x0, x1) bornée au raster, ou None si l'emprise ne peut pas être convertie.
+        """
+        try:
+            emprise = self.canvas.extent()
+            if self.crs_raster != self.crs_canvas:
+                emprise = self.transformation_vers_raster.transformBoundingBox(emprise)
+        except Exception:
+            return None
+
+        coins = [gdal.ApplyGeoTransform(self.inv_gt, x, y)
+                 for x in (emprise.xMinimum(), emprise.xMaximum())
+                 for y in (emprise.yMinimum(), emprise.yMaximum())]
+        x0 = max(int(min(c[0] for c in coins)), 0)
+        x1 = min(int(max(c[0] for c in coins)) + 1, self.raster_colonnes)
+        y0 = max(int(min(c[1] for c in coins)), 0)
+        y1 = min(int(max(c[1] for c in coins)) + 1, self.raster_lignes)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return y0, y1, x0, x1
+
+    def on_raster_loading_error(self, error_message):
+        """
+        Traite les erreurs du chargement du raster.
+
+        Parameters
+        ----------
+        error_message : str
+            Message d'erreur émis par le thread de chargement.
+        """
+        self.splash_screen_load.close()
+        QgsMessageLog.logMessage(error_message, 'HydroLine', level=Qgis.Critical)
+        QMessageBox.critical(None, "Erreur", error_message)
+
+    def annuler_chargement_raster(self):
+        """
+        Annule le chargement à la demande de l'utilisateur et désactive l'outil.
+        """
+        self.arreter_chargement_raster()
+        self.splash_screen_load.close()
+        if not self.data_loaded and self.canvas.mapTool() is self:
+            self.canvas.unsetMapTool(self)
+        QgsMessageLog.logMessage("Chargement du MNT annulé.", 'HydroLine', level=Qgis.Info)
+
+    def arreter_chargement_raster(self):
+        """
+        Interrompt le chargement en arrière-plan et attend la fin du thread (au plus une lecture de tuiles).
+        """
+        if self.raster_loading_thread is None:
             return
+        self.raster_loading_thread.requestInterruption()
+        self.raster_loading_thread.wait()
+        self.raster_loading_thread = None
 
-        self.raster_lignes, self.raster_colonnes = self.tableau_raster.shape
+    def utiliser_session(self):
+        """
+        Reprend les données du MNT déjà ouvertes par la session partagée, sans relire le fichier.
+        """
+        self.tableau_raster = self.session.tableau_raster
+        self.dataset = self.tableau_raster.dataset
+        self.gt = self.session.gt
+        self.inv_gt = self.session.inv_gt
+        self.raster_lignes = self.session.raster_lignes
+        self.raster_colonnes = self.session.raster_colonnes
+
+    def liberer_session(self):
+        """
+        Rend la référence de l'outil sur la session partagée.
+
+        Les données de la session ne sont pas fermées : elles restent disponibles pour les autres outils
+        jusqu'à la suppression de la couche.
+        """
+        if self.session is None:
+            return
+        self.arreter_chargement_raster()
+        self.tableau_raster = None
+        self.dataset = None
+        self.session.liberer()
+        self.session = None
+
+    def precharger_autour_du_point(self, point):
+        """
+        Demande le préchargement en arrière-plan des tuiles du MNT autour d'un point du canevas.
+
+        Parameters
+        ----------
+        point : QgsPoint or QgsPointXY
+            Point (typiquement la position du curseur) dans le SCR du canevas.
+        """
+        if not self.data_loaded or getattr(self, 'tableau_raster', None) is None:
+            return
+        px, py = self.pixel_du_point(point)
+        if 0 <= px < self.raster_colonnes and 0 <= py < self.raster_lignes:
+            self.tableau_raster.precharger(px, py)
 
     def obtenir_elevation_au_point_unique(self, point):
         """
@@ -235,6 +456,274 @@ class BaseMapTool(QgsMapTool):
 
         return elevations
 
+    def pixel_du_point(self, point):
+        """
+        Convertit un point exprimé dans le SCR du canevas en pixel du raster.
+
+        Parameters
+        ----------
+        point : QgsPoint or QgsPointXY
+            Point à convertir.
+
+        Returns
+        -------
+        tuple of int
+            Pixel (colonne, ligne) arrondi, éventuellement hors des limites du raster.
+        """
+        point_xy = QgsPointXY(point.x(), point.y())
+        if self.crs_raster != self.crs_canvas:
+            point_xy = self.transformation_vers_raster.transform(point_xy)
+        px, py = gdal.ApplyGeoTransform(self.inv_gt, point_xy.x(), point_xy.y())
+        return int(round(px)), int(round(py))
+
+    def nodata_mnt(self):
+        """
+        Retourne la valeur sans donnée de la première bande du MNT chargé.
+
+        Returns
+        -------
+        float or None
+            Valeur sans donnée, ou None si la bande n'en définit pas.
+        """
+        fournisseur = self.couche_raster.dataProvider()
+        return fournisseur.sourceNoDataValue(1) if fournisseur.sourceHasNoDataValue(1) else None
+
+    def definir_moteur_routage(self, moteur):
+        """
+        Sélectionne le moteur de calcul du chemin dynamique.
+
+        Parameters
+        ----------
+        moteur : str
+            'glouton' pour le parcours pas à pas historique, 'livewire' pour l'arbre de moindre coût,
+            'astar' pour le chemin de moindre coût calculé au clic.
+        """
+        self.moteur_routage = moteur
+        self.arbre_livewire = None
+        self.cle_livewire = None
+        self.cle_a_etoile = None
+        if moteur == 'livewire' and getattr(self, 'liste_points', None) and self.data_loaded:
+            self.lancer_arbre_livewire(self.pixel_du_point(self.liste_points[-1]))
+
+    def donnees_cout(self):
+        """
+        Retourne le tableau et le type de coût utilisés par les moteurs de moindre coût.
+
+        Les sous-classes surchargent cette méthode selon leur critère de tracé.
+
+        Returns
+        -------
+        tuple
+            (tableau, type_cout) avec type_cout parmi 'hauts', 'bas', 'convexe' et 'concave',
+            ou (None, None) si les données ne sont pas disponibles.
+        """
+        return getattr(self, 'tableau_raster', None), 'hauts'
+
+    def lancer_arbre_livewire(self, source_px):
+        """
+        Lance en arrière-plan la construction de l'arbre live-wire depuis un pixel d'ancrage.
+
+        Ne fait rien si un arbre pour le même ancrage et le même critère est déjà disponible ou en cours de calcul.
+
+        Parameters
+        ----------
+        source_px : tuple of int
+            Pixel d'ancrage (colonne, ligne).
+        """
+        if self.moteur_routage != 'livewire':
+            return
+        tableau, type_cout = self.donnees_cout()
+        if tableau is None:
+            return
+        if not (0 <= source_px[0] < self.raster_colonnes and 0 <= source_px[1] < self.raster_lignes):
+            return
+
+        cle = (source_px, type_cout)
+        if cle == self.cle_livewire:
+            return
+
+        self.cle_livewire = cle
+        self.arbre_livewire = None
+
+        # La valeur sans donnée ne concerne que les altitudes, pas les pentes
+        nodata = self.nodata_mnt() if type_cout in ('hauts', 'bas') else None
+        thread = ArbreCoutsThread(tableau, source_px, self.rayon_livewire, type_cout, nodata=nodata, cle=cle)
+        thread.result_ready.connect(self.on_arbre_livewire_calcule)
+        thread.error.connect(self.on_arbre_livewire_error)
+        thread.finished.connect(lambda t=thread: self.threads_livewire.remove(t) if t in self.threads_livewire else None)
+        self.threads_livewire.append(thread)
+        thread.start()
+
+    def on_arbre_livewire_calcule(self, arbre):
+        """
+        Conserve l'arbre live-wire calculé s'il correspond toujours à l'ancrage courant.
+
+        Parameters
+        ----------
+        arbre : ArbreMoindreCout
+            Arbre des chemins de moindre coût calculé en arrière-plan.
+        """
+        if arbre.cle == self.cle_livewire:
+            self.arbre_livewire = arbre
+
+    def on_arbre_livewire_error(self, error_message):
+        """
+        Journalise l'échec du calcul de l'arbre live-wire ; le tracé revient au moteur glouton.
+
+        Parameters
+        ----------
+        error_message : str
+            Message d'erreur émis par le thread.
+        """
+        self.cle_livewire = None
+        QgsMessageLog.logMessage(error_message, 'HydroLine', level=Qgis.Warning)
+
+    def pixels_livewire(self, depart_px, arrivee_px):
+        """
+        Retourne le chemin live-wire entre l'ancrage et le curseur, si l'arbre est disponible.
+
+        Lorsque l'arbre de l'ancrage n'est pas encore prêt, son calcul est lancé et None est retourné :
+        l'appelant utilise alors le moteur glouton en attendant.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel d'ancrage (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel sous le curseur (colonne, ligne).
+
+        Returns
+        -------
+        list of tuple or None
+            Pixels du chemin, ou None si le mode live-wire est inactif, l'arbre indisponible
+            ou le curseur hors de la fenêtre de l'arbre.
+        """
+        if self.moteur_routage != 'livewire':
+            return None
+        _, type_cout = self.donnees_cout()
+        if self.arbre_livewire is None or self.arbre_livewire.cle != (depart_px, type_cout):
+            self.lancer_arbre_livewire(depart_px)
+            return None
+        return self.arbre_livewire.chemin_vers(arrivee_px)
+
+    def arreter_calculs(self):
+        """
+        Interrompt les calculs en arrière-plan sur le MNT et attend la fin de leurs threads.
+
+        À appeler avant de fermer l'accès au MNT : les threads lisent le MNT jusqu'à leur fin.
+        """
+        threads = list(self.threads_livewire) + list(self.threads_a_etoile)
+        for thread in threads:
+            thread.requestInterruption()
+        for thread in threads:
+            thread.wait()
+        self.threads_livewire = []
+        self.threads_a_etoile = []
+        self.arbre_livewire = None
+        self.cle_livewire = None
+        self.cle_a_etoile = None
+
+    def lancer_a_etoile(self, depart_px, arrivee_px):
+        """
+        Lance en arrière-plan le calcul du chemin de moindre coût optimal (A*) entre deux pixels.
+
+        La recherche est bornée à un corridor englobant les deux pixels, plafonné à PIXELS_MAX_CORRIDOR pixels.
+        Un calcul encore en cours est interrompu : seul le dernier clic est attendu. Le chemin est transmis
+        à `appliquer_chemin_a_etoile` une fois calculé.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel d'arrivée (colonne, ligne).
+
+        Returns
+        -------
+        bool
+            True si le calcul est lancé, False si le moteur A* est inactif, les données indisponibles
+            ou le corridor trop grand.
+        """
+        if self.moteur_routage != 'astar':
+            return False
+        tableau, type_cout = self.donnees_cout()
+        if tableau is None:
+            return False
+        corridor = fenetre_corridor(self.raster_lignes, self.raster_colonnes, depart_px, arrivee_px)
+        if corridor is None:
+            QgsMessageLog.logMessage(
+                "A* : points trop éloignés, corridor de recherche trop grand ; ajoutez un point intermédiaire.",
+                'HydroLine', level=Qgis.Warning
+            )
+            return False
+
+        for thread in self.threads_a_etoile:
+            thread.requestInterruption()
+        cle = (depart_px, arrivee_px, type_cout)
+        self.cle_a_etoile = cle
+
+        # La valeur sans donnée ne concerne que les altitudes, pas les pentes
+        nodata = self.nodata_mnt() if type_cout in ('hauts', 'bas') else None
+        thread = CheminAEtoileThread(tableau, depart_px, arrivee_px, corridor, type_cout, nodata=nodata, cle=cle)
+        thread.result_ready.connect(self.on_a_etoile_calcule)
+        thread.error.connect(self.on_a_etoile_error)
+        thread.finished.connect(lambda t=thread: self.threads_a_etoile.remove(t) if t in self.threads_a_etoile else None)
+        self.threads_a_etoile.append(thread)
+        thread.start()
+        return True
+
+    def on_a_etoile_calcule(self, cle, pixels, statistiques):
+        """
+        Journalise le calcul A* terminé et transmet le chemin s'il correspond toujours au dernier clic.
+
+        Parameters
+        ----------
+        cle : tuple
+            Clé (départ, arrivée, type de coût) du calcul.
+        pixels : list of tuple or None
+            Pixels du chemin, ou None si l'arrivée est inaccessible.
+        statistiques : dict
+            Nœuds développés, taille du corridor et durée du calcul.
+        """
+        if cle != self.cle_a_etoile:
+            return
+        self.cle_a_etoile = None
+        self.noeuds_developpes_astar = statistiques['noeuds_developpes']
+        QgsMessageLog.logMessage(
+            f"A* : {self.noeuds_developpes_astar} nœuds développés sur {statistiques['pixels_corridor']} "
+            f"en {statistiques['duree']:.2f} s",
+            'HydroLine', level=Qgis.Info
+        )
+        if pixels is not None:
+            self.appliquer_chemin_a_etoile(cle[0], pixels)
+
+    def on_a_etoile_error(self, error_message):
+        """
+        Journalise l'échec du calcul A*.
+
+        Parameters
+        ----------
+        error_message : str
+            Message d'erreur émis par le thread.
+        """
+        self.cle_a_etoile = None
+        QgsMessageLog.logMessage(error_message, 'HydroLine', level=Qgis.Warning)
+
+    def appliquer_chemin_a_etoile(self, depart_px, pixels):
+        """
+        Reçoit le chemin A* calculé en arrière-plan.
+
+        Les outils qui proposent le moteur A* surchargent cette méthode pour ajouter le chemin au tracé.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne) du calcul.
+        pixels : list of tuple
+            Pixels (colonne, ligne) du chemin, départ et arrivée inclus.
+        """
+        pass
+
     def nettoyer_ressources_1(self):
         """
             Nettoyages des ressources et réinitialisation de l'outil.
@@ -243,13 +732,19 @@ class BaseMapTool(QgsMapTool):
             pour réduire la consommation de mémoire.
         """
         self.reinitialiser()
+        self.arreter_chargement_raster()
+        self.arreter_calculs()
+
+        # Rendre la session partagée sans fermer ses données
+        self.liberer_session()
 
         # Libérer le dataset GDAL
-        if hasattr(self, 'dataset'):
+        if getattr(self, 'dataset', None) is not None:
             self.dataset.FlushCache()
             self.dataset = None
 
-        # Libérer les grands tableaux NumPy
-        if hasattr(self, 'tableau_raster'):
+        # Libérer le cache de tuiles du MNT
+        if getattr(self, 'tableau_raster', None) is not None:
+            self.tableau_raster.fermer()
             del self.tableau_raster
             self.tableau_raster = None
\ No newline at end of file
@@ -0,0 +1,143 @@
+# tools/moteur_parcours.py
+
+
+import numpy as np
+
+
+class MoteurParcoursExtreme:
+    """
+    Moteur de parcours glouton des points hauts / points bas sur un MNT raster.
+
+    Le voisinage de recherche (fenêtre carrée de rayon `rayon` autour du pixel courant) est décrit par des tables
+    précalculées de décalages et d'angles. À chaque pas, la fenêtre est lue en une seule tranche NumPy et tous les
+    voisins sont évalués de manière vectorisée. Les pixels déjà visités sont suivis dans un ensemble, ce qui rend
+    le test de boucle en O(1).
+
+    Le chemin produit est identique à celui de l'ancienne implémentation par listes de dictionnaires
+    (`select_next_pixel_points_hauts` / `select_next_pixel_bas` + `resoudre_egalite`) : même ordre de parcours
+    des voisins, même filtrage angulaire, même départage des égalités.
+
+    Attributes
+    ----------
+    rayon : int
+        Rayon du voisinage en pixels (2 pour une fenêtre 5x5).
+    decalages_x : np.ndarray
+        Décalages en colonnes des voisins, dans l'ordre historique (dx puis dy).
+    decalages_y : np.ndarray
+        Décalages en lignes des voisins.
+    angles : np.ndarray
+        Angle (radians) de chaque décalage, tel que calculé par `np.arctan2(dy, dx)`.
+
+    Methods
+    -------
+    calculer_pixels(tableau_raster, depart_px, arrivee_px, points_bas=False, iterations_max=10000)
+        Calcule la suite de pixels du chemin de plus haute (ou plus basse) altitude.
+    """
+
+    def __init__(self, rayon=2):
+        """
+        Initialise les tables de décalages et d'angles du voisinage.
+
+        Parameters
+        ----------
+        rayon : int, optional
+            Rayon du voisinage en pixels, par défaut 2 (fenêtre 5x5, 24 voisins).
+        """
+        self.rayon = rayon
+        plage = range(-rayon, rayon + 1)
+        decalages = [(dx, dy) for dx in plage for dy in plage if dx != 0 or dy != 0]
+        self.decalages_x = np.array([d[0] for d in decalages], dtype=np.int64)
+        self.decalages_y = np.array([d[1] for d in decalages], dtype=np.int64)
+        self.angles = np.arctan2(self.decalages_y, self.decalages_x)
+        # Index des voisins dans la fenêtre (rayon*2+1)² extraite autour du pixel courant
+        self.index_fenetre_y = self.decalages_y + rayon
+        self.index_fenetre_x = self.decalages_x + rayon
+
+    def calculer_pixels(self, tableau_raster, depart_px, arrivee_px, points_bas=False, iterations_max=10000):
+        """
+        Calcule la suite de pixels du chemin de plus haute (ou plus basse) altitude.
+
+        Parameters
+        ----------
+        tableau_raster : AccesseurMNT or np.ndarray
+            Tableau 2D des altitudes du MNT (lignes, colonnes). Un MNT compact est parcouru sur ses codes
+            entiers, qui conservent l'ordre et les égalités des altitudes.
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel d'arrivée (colonne, ligne).
+        points_bas : bool, optional
+            True pour suivre les points bas, False pour les points hauts, par défaut False.
+        iterations_max : int, optional
+            Nombre maximal de pas du parcours, par défaut 10000.
+
+        Returns
+        -------
+        list of tuple
+            Pixels (colonne, ligne) du chemin, départ inclus.
+        """
+        tableau_raster = getattr(tableau_raster, 'codes', tableau_raster)
+        raster_lignes, raster_colonnes = tableau_raster.shape[:2]
+        rayon = self.rayon
+        ax, ay = arrivee_px
+
+        pixels_chemin = [depart_px]
+        pixels_visites = {depart_px}
+        cx, cy = depart_px
+        iterations = 0
+
+        while (cx, cy) != arrivee_px and iterations < iterations_max:
+            iterations += 1
+
+            if rayon <= cx < raster_colonnes - rayon and rayon <= cy < raster_lignes - rayon:
+                # Cas courant : la fenêtre complète est dans le raster, une seule tranche suffit
+                fenetre = tableau_raster[cy - rayon:cy + rayon + 1, cx - rayon:cx + rayon + 1]
+                elevations = fenetre[self.index_fenetre_y, self.index_fenetre_x]
+                voisins_x = cx + self.decalages_x
+                voisins_y = cy + self.decalages_y
+                angles = self.angles
+            else:
+                voisins_x = cx + self.decalages_x
+                voisins_y = cy + self.decalages_y
+                dans_raster = ((voisins_x >= 0) & (voisins_x < raster_colonnes) &
+                               (voisins_y >= 0) & (voisins_y < raster_lignes))
+                if not dans_raster.any():
+                    break
+                voisins_x = voisins_x[dans_raster]
+                voisins_y = voisins_y[dans_raster]
+                angles = self.angles[dans_raster]
+                elevations = np.asarray(tableau_raster[voisins_y, voisins_x])
+
+            # Différence angulaire avec la direction du point d'arrivée
+            angle_vers_fin = np.arctan2(ay - cy, ax - cx)
+            differences = np.abs((angles - angle_vers_fin + np.pi) % (2 * np.pi) - np.pi)
+            dans_direction = differences <= np.pi / 2
+            if dans_direction.any():
+                voisins_x = voisins_x[dans_direction]
+                voisins_y = voisins_y[dans_direction]
+                elevations = elevations[dans_direction]
+
+            # Les trois cas historiques (plus haut / égal / le moins bas) reviennent toujours
+            # à retenir les voisins d'altitude extrême parmi les candidats.
+            if points_bas:
+                extremes = elevations == elevations.min()
+            else:
+                extremes = elevations == elevations.max()
+            if not extremes.any():
+                break
+
+            # Départage : le plus proche du point d'arrivée, le premier dans l'ordre de parcours
+            candidats_x = voisins_x[extremes]
+            candidats_y = voisins_y[extremes]
+            distances = np.hypot(ax - candidats_x, ay - candidats_y)
+            meilleur = int(np.argmin(distances))
+            prochain_px = (int(candidats_x[meilleur]), int(candidats_y[meilleur]))
+
+            if prochain_px in pixels_visites:
+                break  # Éviter les boucles infinies (inclut le pixel courant)
+
+            pixels_chemin.append(prochain_px)
+            pixels_visites.add(prochain_px)
+            cx, cy = prochain_px
+
+        return pixels_chemin
@@ -31,7 +31,9 @@ from qgis.gui import QgsMapTool, QgsRubberBand
 
 from .base_map_tool import BaseMapTool
 from ..threads.calcul_pentes_thread import CalculPentesThread
-from ..utils.raster_utils import generer_ombrage_invisible
+from ..utils.acces_mnt import AccesseurMNT
+from ..utils.cache_mnt import obtenir_cache_disque_mnt
+from ..utils.mnt_compact import quantifier_pentes
 from ..utils.undo_manager import UndoManager, AddPointsAction
 from ..utils.error import afficher_message_epsg, afficher_changer_vers_mode_convexe
 
@@ -76,6 +78,14 @@ class OutilRupturePente(BaseMapTool):
     -------
     on_pentes_calculees(pentes_locales_degres)
         Appelé lorsque le calcul des pentes est terminé.
+    on_pentes_progression(valeur)
+        Affiche l'avancement du calcul des pentes.
+    fermer_ecran_chargement()
+        Ferme l'écran de chargement une fois les pentes calculées.
+    annuler_chargement_raster()
+        Annule le chargement du MNT et le calcul des pentes.
+    arreter_calcul_pentes()
+        Interrompt le calcul des pentes en cours.
     activate()
         Active l'outil en installant le filtre d'événement.
     deactivate()
@@ -96,8 +106,6 @@ class OutilRupturePente(BaseMapTool):
         Active ou désactive le mode de tracé libre.
     charger_donnees_mnt()
         Charge les données du MNT en mémoire pour un accès rapide.
-    charger_donnees_hillshade()
-        Charge les données de l'ombrage en mémoire pour un accès rapide.
     definir_fenetre_profil(fenetre)
         Assigne la fenêtre du profil d'élévation.
     mettre_a_jour_bande_dynamique()
@@ -117,9 +125,13 @@ class OutilRupturePente(BaseMapTool):
     obtenir_elevation_au_point(point)
         Obtient l’élévation du raster au point donné.
     charger_donnees_raster()
-        Charge les données raster en mémoire pour un accès rapide.
+        Ouvre le MNT pour un accès fenêtré, sans le lire en entier.
     calculer_chemin_rupture_pente(point_depart, point_arrivee)
         Calcule le chemin de rupture de pente entre deux points.
+    calculer_pixels_rupture_glouton(depart_px, arrivee_px)
+        Parcourt le raster pas à pas en suivant la plus forte variation de pente.
+    donnees_cout()
+        Retourne les pentes locales et le mode de rupture utilisés par les moteurs de moindre coût.
     reinitialiser()
         Réinitialise l'outil pour un nouveau tracé.
     charger_nouveau_mnt(couche_raster)
@@ -128,7 +140,7 @@ class OutilRupturePente(BaseMapTool):
         Nettoyage des ressources et réinitialisation de l'outil.
     """
 
-    def __init__(self, canvas, couche_raster, mode='convexe'):
+    def __init__(self, canvas, couche_raster, mode='convexe', session=None):
         """
         Initialise l'outil de tracé de rupture de pente.
 
@@ -140,15 +152,18 @@ class OutilRupturePente(BaseMapTool):
             La couche raster MNT utilisée.
         mode : str, optional
             Le mode de rupture de pente ('concave' ou 'convexe'), par défaut 'convexe'.
+        session : SessionMNT, optional
+            Session MNT partagée : les pentes déjà calculées y sont reprises, par défaut None.
         """
 
-        super().__init__(canvas, couche_raster)
+        super().__init__(canvas, couche_raster, session=session)
         self.canvas = canvas
         self.couche_raster = couche_raster
         self.mode = mode # 'concave' ou 'convexe'
         self.simplification_activee = False
         self.tolerance_simplification = 2.0
         self.calcul_termine = False
+        self.calcul_pentes_thread = None
         self.undo_manager = UndoManager()
         self.crs_warning_displayed = False
 
@@ -180,19 +195,19 @@ class OutilRupturePente(BaseMapTool):
         self.bande_trace_libre.setColor(QColor(0, 255, 0))  # Couleur verte pour le tracé libre
         self.bande_trace_libre.setWidth(3)
 
-        self.charger_donnees_raster()
+        # Pentes déjà calculées par un outil précédent sur le même MNT
+        pentes = self.session.pentes_locales_degres if self.session is not None else None
 
-        self.calcul_pentes_thread = CalculPentesThread(self.tableau_raster, self.gt)
-        self.calcul_pentes_thread.result_ready.connect(self.on_pentes_calculees)
-        self.calcul_pentes_thread.start()
-
-        self.couche_ombrage = generer_ombrage_invisible(self.couche_raster)
-        if self.couche_ombrage is None:
-            QMessageBox.critical(None, "Erreur", "Impossible de générer l'ombrage pour le MNT.")
-            return
-
-        # Charger les données de l'ombrage (pour les calculs de pentes)
-        self.charger_donnees_hillshade()
+        if pentes is not None:
+            self.on_pentes_calculees(pentes)
+        else:
+            # Pentes calculées en mémoire, sans fichier intermédiaire
+            self.calcul_pentes_thread = CalculPentesThread(self.tableau_raster, self.gt,
+                                                           nodata=getattr(self.tableau_raster, 'nodata', None))
+            self.calcul_pentes_thread.result_ready.connect(self.on_pentes_calculees)
+            self.calcul_pentes_thread.error.connect(self.on_pentes_calculees_error)
+            self.calcul_pentes_thread.progress.connect(self.on_pentes_progression)
+            self.calcul_pentes_thread.start()
 
     mode_trace_libre_changed = pyqtSignal(bool)
 
@@ -202,14 +217,62 @@ class OutilRupturePente(BaseMapTool):
 
         Parameters
         ----------
-        pentes_locales_degres : np.ndarray
-            Tableau des pentes calculées en degrés.
+        pentes_locales_degres : np.ndarray or TableauQuantifie
+            Tableau des pentes calculées en degrés ; quantifié ici si le MNT est ouvert en mode compact.
         """
+        if isinstance(pentes_locales_degres, np.ndarray) and getattr(self.tableau_raster, 'codage', None) is not None:
+            pentes_locales_degres = quantifier_pentes(pentes_locales_degres)
         self.pentes_locales_degres = pentes_locales_degres
         self.calcul_termine = True
+        if self.session is not None:
+            self.session.pentes_locales_degres = pentes_locales_degres
 
         self.splash_screen_load.close()
 
+    def on_pentes_progression(self, valeur):
+        """
+        Affiche l'avancement du calcul des pentes une fois l'emprise visible du MNT chargée.
+
+        Parameters
+        ----------
+        valeur : int
+            Avancement (0-100).
+        """
+        if self.data_loaded:
+            self.splash_screen_load.definir_progression(valeur)
+
+    def fermer_ecran_chargement(self):
+        """
+        Ferme l'écran de chargement, sauf si les pentes sont encore en cours de calcul : l'écran affiche
+        alors leur avancement et se ferme à la fin du calcul.
+        """
+        if self.calcul_termine:
+            super().fermer_ecran_chargement()
+        elif self.raster_loading_thread is not None:
+            try:
+                self.raster_loading_thread.progress.disconnect(self.splash_screen_load.definir_progression)
+            except TypeError:
+                pass
+
+    def annuler_chargement_raster(self):
+        """
+        Annule le chargement du MNT et le calcul des pentes, et désactive l'outil si les pentes manquent.
+        """
+        self.arreter_calcul_pentes()
+        super().annuler_chargement_raster()
+        if not self.calcul_termine and self.canvas.mapTool() is self:
+            self.canvas.unsetMapTool(self)
+
+    def arreter_calcul_pentes(self):
+        """
+        Interrompt le calcul des pentes en cours et attend la fin du thread (au plus une bande).
+        """
+        if self.calcul_pentes_thread is None:
+            return
+        self.calcul_pentes_thread.requestInterruption()
+        self.calcul_pentes_thread.wait()
+        self.calcul_pentes_thread = None
+
     def activate(self):
         """
         Active l'outil en installant le filtre d'événement.
@@ -407,30 +470,6 @@ class OutilRupturePente(BaseMapTool):
                 self.bande_confirmee.addGeometry(self.polyligne_confirmee, None)
             self.points_trace_libre = []
 
-    def charger_donnees_hillshade(self):
-        """
-        Charge les données de l'ombrage en mémoire pour un accès rapide.
-        """
-        source = self.couche_ombrage.dataProvider().dataSourceUri()
-        self.hillshade_dataset = gdal.Open(source)
-
-        if self.hillshade_dataset is None:
-            return
-
-        self.gt = self.hillshade_dataset.GetGeoTransform()
-        self.inv_gt = gdal.InvGeoTransform(self.gt)
-
-        if self.inv_gt is None:
-            return
-
-        bande_raster = self.hillshade_dataset.GetRasterBand(1)
-        self.tableau_hillshade = bande_raster.ReadAsArray()
-
-        if self.tableau_hillshade is None:
-            return
-
-        self.raster_lignes, self.raster_colonnes = self.tableau_hillshade.shape
-
     def definir_fenetre_profil(self, fenetre):
         """
         Assigne la fenêtre du profil d'élévation.
@@ -746,26 +785,22 @@ class OutilRupturePente(BaseMapTool):
 
     def charger_donnees_raster(self):
         """
-        Charge les données raster en mémoire pour un accès rapide.
+        Ouvre le MNT pour un accès fenêtré, sans le lire en entier.
         """
         source = self.couche_raster.dataProvider().dataSourceUri()
-        self.dataset = gdal.Open(source)
-
-        if self.dataset is None:
+        try:
+            self.tableau_raster = AccesseurMNT(source, memoire_max=self.memoire_cache_mnt,
+                                              cache_disque=obtenir_cache_disque_mnt(), compact=self.mnt_compact)
+        except IOError:
             return
+        self.dataset = self.tableau_raster.dataset
 
-        self.gt = self.dataset.GetGeoTransform()
+        self.gt = self.tableau_raster.gt
         self.inv_gt = gdal.InvGeoTransform(self.gt)
 
         if self.inv_gt is None:
             return
 
-        bande_raster = self.dataset.GetRasterBand(1)
-        self.tableau_raster = bande_raster.ReadAsArray()
-
-        if self.tableau_raster is None:
-            return
-
         self.raster_lignes, self.raster_colonnes = self.tableau_raster.shape
 
     def definir_mode(self, mode):
@@ -773,6 +808,21 @@ class OutilRupturePente(BaseMapTool):
         Définit le mode de fonctionnement de l'outil.
         """
         self.mode = mode
+        if self.moteur_routage == 'livewire' and self.liste_points:
+            self.lancer_arbre_livewire(self.pixel_du_point(self.liste_points[-1]))
+
+    def donnees_cout(self):
+        """
+        Retourne les pentes locales et le mode de rupture utilisés par les moteurs de moindre coût.
+
+        Returns
+        -------
+        tuple
+            (pentes_locales_degres, 'concave' ou 'convexe'), ou (None, None) si les pentes ne sont pas calculées.
+        """
+        if not self.calcul_termine:
+            return None, None
+        return self.pentes_locales_degres, self.mode
 
     def canvasPressEvent(self, event):
         """
@@ -807,6 +857,7 @@ class OutilRupturePente(BaseMapTool):
                 # Créer une action pour ce point
                 action = AddPointsAction(self, point_carte)
                 self.undo_manager.add_action(action)
+                self.lancer_arbre_livewire(self.pixel_du_point(point_carte))
             else:
                 # Confirmer le segment dynamique
                 if self.chemin_dynamique:
@@ -841,6 +892,8 @@ class OutilRupturePente(BaseMapTool):
                     self.bande_confirmee.addGeometry(self.polyligne_confirmee, None)
                     self.chemin_dynamique = None
                     self.bande_dynamique.reset(QgsWkbTypes.LineGeometry)
+                    # Nouveau sommet confirmé : l'arbre live-wire est reconstruit depuis ce point
+                    self.lancer_arbre_livewire(self.pixel_du_point(self.liste_points[-1]))
 
     def canvasMoveEvent(self, event):
         """
@@ -857,6 +910,8 @@ class OutilRupturePente(BaseMapTool):
         if not self.calcul_termine:
             return
 
+        self.precharger_autour_du_point(self.toMapCoordinates(event.pos()))
+
         if self.mode_trace_libre:
             # Mode tracé libre
             point_actuel = self.toMapCoordinates(event.pos())
@@ -916,10 +971,50 @@ class OutilRupturePente(BaseMapTool):
         if not (0 <= arrivee_px[0] < self.raster_colonnes and 0 <= arrivee_px[1] < self.raster_lignes):
             return None
 
-        if self.mode == 'concave':
-            pentes_utilisees = -self.pentes_locales_degres
-        else:
-            pentes_utilisees = self.pentes_locales_degres
+        pixels_chemin = self.pixels_livewire(depart_px, arrivee_px)
+        if pixels_chemin is None:
+            pixels_chemin = self.calculer_pixels_rupture_glouton(depart_px, arrivee_px)
+
+        liste_points = []
+        for px, py in pixels_chemin:
+            x, y = gdal.ApplyGeoTransform(self.gt, px + 0.5, py + 0.5)
+            point = QgsPoint(x, y)
+            # Obtenir l'élévation au point
+            z = self.obtenir_elevation_au_point(point)
+            if z is None:
+                z = 0  # Valeur par défaut si l'élévation n'est pas disponible
+            point.setZ(z)
+            if self.crs_raster != self.crs_canvas:
+                # Transformer les coordonnées X et Y en utilisant QgsPointXY
+                point_xy = QgsPointXY(point.x(), point.y())
+                point_xy_transforme = self.transformation_depuis_raster.transform(point_xy)
+                # Reconstituer le QgsPoint avec la valeur Z
+                point = QgsPoint(point_xy_transforme.x(), point_xy_transforme.y(), point.z())
+            liste_points.append(point)
+
+        geometrie_chemin = QgsGeometry.fromPolyline(liste_points)
+
+        return geometrie_chemin
+
+    def calculer_pixels_rupture_glouton(self, depart_px, arrivee_px):
+        """
+        Parcourt le raster pas à pas en suivant la plus forte variation de pente.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel d'arrivée (colonne, ligne).
+
+        Returns
+        -------
+        list of tuple
+            Pixels (colonne, ligne) du chemin, départ inclus.
+        """
+        # Pentes lues pixel par pixel et changées de signe en mode concave, sans copie du raster entier
+        pentes = self.pentes_locales_degres
+        signe = -1.0 if self.mode == 'concave' else 1.0
 
         pixels_chemin = [depart_px]
         pixel_courant = depart_px
@@ -954,11 +1049,11 @@ class OutilRupturePente(BaseMapTool):
                 if difference <= np.pi / 2:  # 90 degrés
                     voisins_dans_direction.append((nx, ny, difference))
 
-            pente_courante = pentes_utilisees[cy, cx]
+            pente_courante = signe * pentes[cy, cx]
             candidats_voisins = []
 
             for nx, ny, difference_angle_valeur in voisins_dans_direction:
-                pente_voisin = pentes_utilisees[ny, nx]
+                pente_voisin = signe * pentes[ny, nx]
                 delta_pente = pente_voisin - pente_courante
                 candidats_voisins.append({
                     'position': (nx, ny),
@@ -996,26 +1091,7 @@ class OutilRupturePente(BaseMapTool):
             pixels_chemin.append(prochain_px)
             pixel_courant = prochain_px
 
-        liste_points = []
-        for px, py in pixels_chemin:
-            x, y = gdal.ApplyGeoTransform(self.gt, px + 0.5, py + 0.5)
-            point = QgsPoint(x, y)
-            # Obtenir l'élévation au point
-            z = self.obtenir_elevation_au_point(point)
-            if z is None:
-                z = 0  # Valeur par défaut si l'élévation n'est pas disponible
-            point.setZ(z)
-            if self.crs_raster != self.crs_canvas:
-                # Transformer les coordonnées X et Y en utilisant QgsPointXY
-                point_xy = QgsPointXY(point.x(), point.y())
-                point_xy_transforme = self.transformation_depuis_raster.transform(point_xy)
-                # Reconstituer le QgsPoint avec la valeur Z
-                point = QgsPoint(point_xy_transforme.x(), point_xy_transforme.y(), point.z())
-            liste_points.append(point)
-
-        geometrie_chemin = QgsGeometry.fromPolyline(liste_points)
-
-        return geometrie_chemin
+        return pixels_chemin
 
     def reinitialiser(self):
         """
@@ -1029,27 +1105,31 @@ class OutilRupturePente(BaseMapTool):
         self.bande_trace_libre.reset(QgsWkbTypes.LineGeometry)
         self.points_trace_libre = []
         self.mode_trace_libre = False
+        self.arbre_livewire = None
+        self.cle_livewire = None
 
     def nettoyer_ressources(self):
         """
         Nettoyage des ressources et réinitialisation de l'outil.
         """
         self.reinitialiser()
+        self.arreter_chargement_raster()
+        self.arreter_calcul_pentes()
+        self.arreter_calculs()
+
+        if self.session is not None:
+            # Les données appartiennent à la session partagée : on ne fait que rendre la référence
+            self.pentes_locales_degres = None
+            self.liberer_session()
 
         if hasattr(self, 'dataset'):
             self.dataset = None
 
-        if hasattr(self, 'hillshade_dataset'):
-            self.hillshade_dataset = None
-
-        if hasattr(self, 'tableau_raster'):
+        if getattr(self, 'tableau_raster', None) is not None:
+            self.tableau_raster.fermer()
             del self.tableau_raster
             self.tableau_raster = None
 
-        if hasattr(self, 'tableau_hillshade'):
-            del self.tableau_hillshade
-            self.tableau_hillshade = None
-
         if hasattr(self, 'pentes_locales_degres'):
             del self.pentes_locales_degres
             self.pentes_locales_degres = None
@@ -8,7 +8,6 @@ import sys
 from osgeo import gdal
 from qgis._core import QgsPoint
 
-from ..threads.raster_loading_thread import RasterLoadingThread
 
 # Ajouter le répertoire du plugin au PYTHONPATH
 chemin_plugin = os.path.dirname(__file__)
@@ -28,7 +27,9 @@ from qgis.PyQt.QtWidgets import QAction, QMessageBox, QMenu, QToolButton, QInput
 from qgis.core import (
     QgsProject,
     QgsRasterLayer,
-    QgsCoordinateTransform
+    QgsCoordinateTransform,
+    QgsMessageLog,
+    Qgis
 )
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QSlider, QLabel, QPushButton, QGridLayout
 from qgis.gui import QgsRubberBand
@@ -46,6 +47,10 @@ from PyQt5.QtGui import QColor
 import numpy as np
 import math
 
+from .moteur_parcours import MoteurParcoursExtreme
+from ..threads.arbre_couvrant_thread import ArbreCouvrantThread
+from ..threads.directions_ecoulement_thread import DirectionsEcoulementThread
+from ..utils.hydro_utils import suivre_ecoulement
 from .outil_points_bas import select_next_pixel_bas as select_next_pixel_points_bas
 from ..utils.undo_manager import UndoManager, AddPointsAction
 from ..utils.error import afficher_message_epsg
@@ -72,6 +77,8 @@ class OutilTraceCrete(BaseMapTool):
         Indicateur du mode de tracé utilisant les points bas, par défaut False.
     select_next_pixel_func : function
         Fonction utilisée pour sélectionner le prochain pixel pendant le tracé.
+    moteur_parcours : MoteurParcoursExtreme
+        Moteur vectorisé de parcours des points hauts / points bas (voisinage 5x5).
     undo_manager : UndoManager
         Gestionnaire d'annulation des actions réalisées sur le tracé.
     liste_points : list of QgsPoint
@@ -96,6 +103,10 @@ class OutilTraceCrete(BaseMapTool):
         Distance seuil utilisée pour les calculs, par défaut 10 mètres.
     dernier_point_deplacement : QgsPoint or None
         Dernier point ayant servi à un calcul lié aux déplacements.
+    arbres_minimax : dict
+        Arbres couvrants minimax du MNT chargé, indexés par critère (False crêtes, True thalwegs).
+    directions_d8 : np.ndarray or None
+        Grille uint8 des directions d'écoulement D8 du MNT chargé, suivie par le moteur 'ecoulement'.
 
     Methods
     -------
@@ -111,6 +122,30 @@ class OutilTraceCrete(BaseMapTool):
         Callback exécuté lorsque le chargement du raster est terminé.
     set_points_bas(active)
         Active ou désactive le mode Points Bas.
+    definir_moteur_routage(moteur)
+        Sélectionne le moteur de calcul du chemin dynamique.
+    cle_mnt()
+        Retourne l'identifiant du MNT chargé utilisé pour reconnaître les précalculs périmés.
+    lancer_arbre_minimax()
+        Lance la construction de l'arbre couvrant minimax du critère courant, si nécessaire.
+    on_arbre_minimax_calcule(arbre)
+        Conserve l'arbre couvrant calculé s'il se rapporte toujours au MNT chargé.
+    on_precalcul_mnt_error(error_message)
+        Journalise l'échec d'un précalcul sur le MNT (arbre couvrant, grille d'écoulement).
+    pixels_minimax(depart_px, arrivee_px)
+        Retourne le chemin minimax entre deux pixels par remontée dans l'arbre couvrant.
+    arreter_calculs()
+        Interrompt les calculs en arrière-plan sur le MNT (arbres, grille d'écoulement) et attend leurs threads.
+    lancer_directions_ecoulement()
+        Lance le calcul de la grille des directions d'écoulement D8, si nécessaire.
+    on_directions_ecoulement_calculees(directions, cle)
+        Conserve la grille D8 calculée si elle se rapporte toujours au MNT chargé.
+    on_directions_ecoulement_terminees()
+        Libère le thread de calcul des directions d'écoulement.
+    pixels_ecoulement(depart_px, arrivee_px)
+        Retourne le thalweg obtenu en suivant l'écoulement vers l'aval depuis le pixel de départ.
+    donnees_cout()
+        Retourne le MNT et le critère utilisés par les moteurs de moindre coût.
     obtenir_elevation_aux_points_multiples(x_array, y_array)
         Obtient les élévations du raster aux coordonnées données.
     definir_couche_vectorielle(couche_vectorielle)
@@ -135,6 +170,10 @@ class OutilTraceCrete(BaseMapTool):
         Retire le dernier point ajouté à la polyligne.
     canvasPressEvent(event)
         Gère les événements de clic de souris sur le canevas.
+    confirmer_chemin_dynamique()
+        Ajoute le chemin dynamique courant à la polyligne confirmée.
+    appliquer_chemin_a_etoile(depart_px, pixels)
+        Ajoute au tracé le chemin A* calculé en arrière-plan s'il part toujours du dernier point.
     canvasMoveEvent(event)
         Gère les événements de déplacement de la souris sur le canevas.
     keyPressEvent(event)
@@ -147,6 +186,8 @@ class OutilTraceCrete(BaseMapTool):
         Sélectionne le prochain pixel en favorisant les points hauts.
     calculer_chemin_extreme(point_depart, point_arrivee)
         Calcule le chemin de plus haute ou plus basse altitude entre deux points.
+    geometrie_depuis_pixels(pixels_chemin)
+        Convertit une suite de pixels du raster en polyligne dans le SCR du canevas.
     resoudre_egalite(candidats, arrivee_px)
         Départage les candidats en cas d'égalité.
     reinitialiser()
@@ -165,7 +206,7 @@ class OutilTraceCrete(BaseMapTool):
         Met à jour le profil d'élévation avec le segment dynamique.
     """
 
-    def __init__(self, canvas, couche_raster):
+    def __init__(self, canvas, couche_raster, session=None):
         """
         Initialise l'outil de tracé de crête.
 
@@ -175,15 +216,23 @@ class OutilTraceCrete(BaseMapTool):
             Le canevas de la carte utilisé comme contexte pour le tracé.
         couche_raster : QgsRasterLayer
             La couche raster contenant le MNT pour la référence d'altitude.
+        session : SessionMNT, optional
+            Session MNT partagée : les arbres couvrants et la grille d'écoulement déjà calculés
+            y sont repris, par défaut None.
         """
 
-        super().__init__(canvas, couche_raster)
+        super().__init__(canvas, couche_raster, session=session)
         self.canvas = canvas
         self.couche_raster = couche_raster
         self.id_counter = 1  # Compteur pour l'ID des polylignes
         self.data_loaded = False
         self.points_bas_active = False
         self.select_next_pixel_func = self.select_next_pixel_points_hauts
+        self.moteur_parcours = MoteurParcoursExtreme(rayon=2)
+        self.arbres_minimax = {}  # Arbre couvrant par critère : False (crêtes) / True (thalwegs)
+        self.threads_minimax = {}
+        self.directions_d8 = None
+        self.thread_ecoulement = None
         self.undo_manager = UndoManager()
         self.warned_crs_mismatch = False
 
@@ -217,12 +266,20 @@ class OutilTraceCrete(BaseMapTool):
         self.bande_trace_libre.setColor(QColor(0, 255, 0))
         self.bande_trace_libre.setWidth(3)
 
-        self.raster_loading_thread = RasterLoadingThread(self.couche_raster)
-        self.raster_loading_thread.raster_loaded.connect(self.on_raster_loaded)
-        self.raster_loading_thread.start()
+        if self.session is not None:
+            # Précalculs partagés avec les autres outils travaillant sur le même MNT
+            self.arbres_minimax = self.session.produits.setdefault('arbres_minimax', {})
+            self.directions_d8 = self.session.produits.get('directions_d8')
 
     mode_trace_libre_changed = pyqtSignal(bool)
 
+    # Le moteur A* calcule le tracé au clic et non au survol
+    MOTEURS_ROUTAGE = BaseMapTool.MOTEURS_ROUTAGE + [
+        ('astar', 'Moteur : A* (au clic)'),
+        ('minimax', 'Moteur : Minimax (arbre couvrant)'),
+        ('ecoulement', 'Moteur : Écoulement D8 (points bas)'),
+    ]
+
     def activate(self):
         """
         Active l'outil de tracé.
@@ -296,13 +353,13 @@ class OutilTraceCrete(BaseMapTool):
 
     def on_raster_loaded(self, tableau_raster, gt, inv_gt, raster_lignes, raster_colonnes):
         """
-        Callback après le chargement du raster.
+        Callback une fois l'emprise visible du raster chargée.
 
-        Configure les données de raster et ferme l'écran de démarrage.
+        Configure les données de raster, lance les précalculs du moteur courant et ferme l'écran de démarrage.
 
         Parameters
         ----------
-        tableau_raster : np.ndarray
+        tableau_raster : AccesseurMNT or np.ndarray
             Tableau des données raster chargées.
         gt : tuple
             Géotransformation du raster.
@@ -320,6 +377,13 @@ class OutilTraceCrete(BaseMapTool):
         self.raster_colonnes = raster_colonnes
         self.data_loaded = True
 
+        if self.session is None:
+            # Les arbres couvrants et la grille d'écoulement se rapportent au tableau précédent
+            self.arbres_minimax = {}
+            self.directions_d8 = None
+        self.lancer_arbre_minimax()
+        self.lancer_directions_ecoulement()
+
         self.splash_screen_load.close()
 
     def set_points_bas(self, active):
@@ -338,6 +402,201 @@ class OutilTraceCrete(BaseMapTool):
             self.select_next_pixel_func = select_next_pixel_points_bas
         else:
             self.select_next_pixel_func = self.select_next_pixel_points_hauts
+        self.lancer_arbre_minimax()
+
+    def definir_moteur_routage(self, moteur):
+        """
+        Sélectionne le moteur de calcul du chemin dynamique.
+
+        Avec le moteur 'minimax', l'arbre couvrant du critère courant est construit en arrière-plan
+        s'il ne l'a pas déjà été pour ce MNT ; avec le moteur 'ecoulement', c'est la grille D8.
+
+        Parameters
+        ----------
+        moteur : str
+            Code du moteur, parmi ceux de MOTEURS_ROUTAGE.
+        """
+        super().definir_moteur_routage(moteur)
+        self.lancer_arbre_minimax()
+        self.lancer_directions_ecoulement()
+
+    def cle_mnt(self):
+        """
+        Retourne l'identifiant du MNT chargé utilisé pour reconnaître les précalculs périmés.
+
+        Contrairement à l'identité Python du tableau, qui peut être réutilisée après sa libération,
+        l'identifiant associe la couche, sa source et la date de modification du fichier source.
+
+        Returns
+        -------
+        tuple
+            (identifiant de la couche, source, date de modification en ns ou None si la source
+            n'est pas un fichier local).
+        """
+        source = self.couche_raster.source()
+        try:
+            date_modification = os.stat(source).st_mtime_ns
+        except (OSError, ValueError):
+            date_modification = None
+        return self.couche_raster.id(), source, date_modification
+
+    def lancer_arbre_minimax(self):
+        """
+        Lance la construction de l'arbre couvrant minimax du critère courant, si nécessaire.
+        """
+        if self.moteur_routage != 'minimax' or not self.data_loaded:
+            return
+        points_bas = self.points_bas_active
+        if points_bas in self.arbres_minimax or points_bas in self.threads_minimax:
+            return
+
+        cle = (self.cle_mnt(), points_bas)
+        thread = ArbreCouvrantThread(self.tableau_raster, points_bas, nodata=self.nodata_mnt(), cle=cle)
+        thread.result_ready.connect(self.on_arbre_minimax_calcule)
+        thread.error.connect(self.on_precalcul_mnt_error)
+        thread.finished.connect(lambda p=points_bas: self.threads_minimax.pop(p, None))
+        self.threads_minimax[points_bas] = thread
+        thread.start()
+
+    def on_arbre_minimax_calcule(self, arbre):
+        """
+        Conserve l'arbre couvrant calculé s'il se rapporte toujours au MNT chargé.
+
+        Parameters
+        ----------
+        arbre : ArbreCouvrantMinimax
+            Arbre couvrant calculé en arrière-plan.
+        """
+        if arbre.cle == (self.cle_mnt(), arbre.points_bas):
+            self.arbres_minimax[arbre.points_bas] = arbre
+
+    def on_precalcul_mnt_error(self, error_message):
+        """
+        Journalise l'échec d'un précalcul sur le MNT (arbre couvrant, grille d'écoulement) ;
+        le tracé revient au moteur glouton.
+
+        Parameters
+        ----------
+        error_message : str
+            Message d'erreur émis par le thread.
+        """
+        QgsMessageLog.logMessage(error_message, 'HydroLine', level=Qgis.Warning)
+
+    def pixels_minimax(self, depart_px, arrivee_px):
+        """
+        Retourne le chemin minimax entre deux pixels par remontée dans l'arbre couvrant.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel d'arrivée (colonne, ligne).
+
+        Returns
+        -------
+        list of tuple or None
+            Pixels du chemin, ou None si le moteur minimax est inactif ou l'arbre pas encore disponible.
+        """
+        if self.moteur_routage != 'minimax':
+            return None
+        arbre = self.arbres_minimax.get(self.points_bas_active)
+        if arbre is None:
+            self.lancer_arbre_minimax()
+            return None
+        return arbre.chemin(depart_px, arrivee_px)
+
+    def arreter_calculs(self):
+        """
+        Interrompt les calculs en arrière-plan sur le MNT (arbres, grille d'écoulement) et attend leurs threads.
+        """
+        super().arreter_calculs()
+        threads = list(self.threads_minimax.values())
+        if self.thread_ecoulement is not None:
+            threads.append(self.thread_ecoulement)
+        for thread in threads:
+            thread.requestInterruption()
+        for thread in threads:
+            thread.wait()
+        self.threads_minimax = {}
+        self.thread_ecoulement = None
+
+    def lancer_directions_ecoulement(self):
+        """
+        Lance le calcul de la grille des directions d'écoulement D8 du MNT chargé, si nécessaire.
+        """
+        if self.moteur_routage != 'ecoulement' or not self.data_loaded:
+            return
+        if self.directions_d8 is not None or self.thread_ecoulement is not None:
+            return
+
+        self.thread_ecoulement = DirectionsEcoulementThread(self.tableau_raster, nodata=self.nodata_mnt(),
+                                                            cle=self.cle_mnt())
+        self.thread_ecoulement.result_ready.connect(self.on_directions_ecoulement_calculees)
+        self.thread_ecoulement.error.connect(self.on_precalcul_mnt_error)
+        self.thread_ecoulement.finished.connect(self.on_directions_ecoulement_terminees)
+        self.thread_ecoulement.start()
+
+    def on_directions_ecoulement_calculees(self, directions, cle):
+        """
+        Conserve la grille D8 calculée si elle se rapporte toujours au MNT chargé.
+
+        Parameters
+        ----------
+        directions : np.ndarray
+            Grille uint8 des codes D8.
+        cle : object
+            Identifiant du tableau à partir duquel la grille a été calculée.
+        """
+        if cle == self.cle_mnt():
+            self.directions_d8 = directions
+            if self.session is not None:
+                self.session.produits['directions_d8'] = directions
+
+    def on_directions_ecoulement_terminees(self):
+        """
+        Libère le thread de calcul des directions d'écoulement.
+        """
+        self.thread_ecoulement = None
+
+    def pixels_ecoulement(self, depart_px, arrivee_px):
+        """
+        Retourne le thalweg obtenu en suivant l'écoulement vers l'aval depuis le pixel de départ.
+
+        Le chemin est arrêté au pixel de l'écoulement le plus proche du curseur.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel sous le curseur (colonne, ligne).
+
+        Returns
+        -------
+        list of tuple or None
+            Pixels du chemin, ou None si le moteur d'écoulement est inactif, le mode Points Bas désactivé
+            ou la grille pas encore disponible.
+        """
+        if self.moteur_routage != 'ecoulement' or not self.points_bas_active:
+            return None
+        if self.directions_d8 is None:
+            self.lancer_directions_ecoulement()
+            return None
+        return suivre_ecoulement(self.directions_d8, depart_px, arrivee_px)
+
+    def donnees_cout(self):
+        """
+        Retourne le MNT et le critère (points hauts ou points bas) utilisés par les moteurs de moindre coût.
+
+        Returns
+        -------
+        tuple
+            (tableau_raster, 'bas' ou 'hauts'), ou (None, None) si le raster n'est pas chargé.
+        """
+        if not self.data_loaded:
+            return None, None
+        return self.tableau_raster, 'bas' if self.points_bas_active else 'hauts'
 
 
     def definir_couche_vectorielle(self, couche_vectorielle):
@@ -615,39 +874,73 @@ class OutilTraceCrete(BaseMapTool):
                 # Créer une action d'annulation pour ce point
                 action = AddPointsAction(self, [point_carte])
                 self.undo_manager.add_action(action)
+                self.lancer_arbre_livewire(self.pixel_du_point(point_carte))
             else:
+                if self.moteur_routage == 'astar':
+                    # Le chemin optimal est calculé en arrière-plan et ajouté au tracé à son arrivée
+                    if self.lancer_a_etoile(self.pixel_du_point(self.liste_points[-1]),
+                                            self.pixel_du_point(point_carte)):
+                        return
+                    self.chemin_dynamique = self.calculer_chemin_extreme(self.liste_points[-1], point_carte)
                 if self.chemin_dynamique:
-                    # Utiliser la géométrie simplifiée si la simplification est activée
-                    if self.simplification_activee:
-                        geometrie_a_utiliser = self.simplifier_geometrie(self.chemin_dynamique)
-                    else:
-                        geometrie_a_utiliser = self.chemin_dynamique
-
-                    # Extraire les nouveaux points (en excluant le premier point)
-                    nouveaux_points = geometrie_a_utiliser.asPolyline()[1:]
-
-                    # Convertir les nouveaux points en objets QgsPoint avec Z
-                    converted_points = []
-                    for p in nouveaux_points:
-                        elevation = self.obtenir_elevation_au_point(p)
-                        if elevation is not None:
-                            p_z = QgsPoint(p.x(), p.y(), elevation)
-                        else:
-                            p_z = QgsPoint(p.x(), p.y(), 0)
-                        converted_points.append(p_z)
-
-                    # Créer une action d'annulation pour ces points
-                    action = AddPointsAction(self, converted_points)
-                    self.undo_manager.add_action(action)
-
-                    # Ajouter les points à la liste
-                    self.liste_points.extend(converted_points)
-                    # Mettre à jour la polyligne confirmée
-                    self.polyligne_confirmee = QgsGeometry.fromPolyline(self.liste_points)
-                    self.bande_confirmee.reset(QgsWkbTypes.LineGeometry)
-                    self.bande_confirmee.addGeometry(self.polyligne_confirmee, None)
-                    self.chemin_dynamique = None
-                    self.bande_dynamique.reset(QgsWkbTypes.LineGeometry)
+                    self.confirmer_chemin_dynamique()
+
+    def confirmer_chemin_dynamique(self):
+        """
+        Ajoute le chemin dynamique courant à la polyligne confirmée.
+
+        Les nouveaux points reçoivent leur altitude, une action d'annulation est enregistrée
+        et l'arbre live-wire est reconstruit depuis le nouveau dernier point.
+        """
+        # Utiliser la géométrie simplifiée si la simplification est activée
+        if self.simplification_activee:
+            geometrie_a_utiliser = self.simplifier_geometrie(self.chemin_dynamique)
+        else:
+            geometrie_a_utiliser = self.chemin_dynamique
+
+        # Extraire les nouveaux points (en excluant le premier point)
+        nouveaux_points = geometrie_a_utiliser.asPolyline()[1:]
+
+        # Convertir les nouveaux points en objets QgsPoint avec Z
+        converted_points = []
+        for p in nouveaux_points:
+            elevation = self.obtenir_elevation_au_point(p)
+            if elevation is not None:
+                p_z = QgsPoint(p.x(), p.y(), elevation)
+            else:
+                p_z = QgsPoint(p.x(), p.y(), 0)
+            converted_points.append(p_z)
+
+        # Créer une action d'annulation pour ces points
+        action = AddPointsAction(self, converted_points)
+        self.undo_manager.add_action(action)
+
+        # Ajouter les points à la liste
+        self.liste_points.extend(converted_points)
+        # Mettre à jour la polyligne confirmée
+        self.polyligne_confirmee = QgsGeometry.fromPolyline(self.liste_points)
+        self.bande_confirmee.reset(QgsWkbTypes.LineGeometry)
+        self.bande_confirmee.addGeometry(self.polyligne_confirmee, None)
+        self.chemin_dynamique = None
+        self.bande_dynamique.reset(QgsWkbTypes.LineGeometry)
+        # Nouveau sommet confirmé : l'arbre live-wire est reconstruit depuis ce point
+        self.lancer_arbre_livewire(self.pixel_du_point(self.liste_points[-1]))
+
+    def appliquer_chemin_a_etoile(self, depart_px, pixels):
+        """
+        Ajoute au tracé le chemin A* calculé en arrière-plan, s'il part toujours du dernier point confirmé.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne) du calcul.
+        pixels : list of tuple
+            Pixels (colonne, ligne) du chemin, départ et arrivée inclus.
+        """
+        if not self.liste_points or self.pixel_du_point(self.liste_points[-1]) != depart_px:
+            return
+        self.chemin_dynamique = self.geometrie_depuis_pixels(pixels)
+        self.confirmer_chemin_dynamique()
 
     def canvasMoveEvent(self, event):
         """
@@ -664,6 +957,8 @@ class OutilTraceCrete(BaseMapTool):
         if not self.data_loaded:
             return
 
+        self.precharger_autour_du_point(self.toMapCoordinates(event.pos()))
+
         if self.mode_trace_libre:
             point_actuel_xy = self.toMapCoordinates(event.pos())
             point_actuel = QgsPoint(point_actuel_xy.x(), point_actuel_xy.y())
@@ -687,7 +982,12 @@ class OutilTraceCrete(BaseMapTool):
                     point_actuel.setZ(elevation)
                 else:
                     point_actuel.setZ(0)
-                if self.mode == 1:
+                if self.mode == 1 and self.moteur_routage == 'astar':
+                    # Aperçu rectiligne : le chemin A* est calculé au clic
+                    self.bande_dynamique.reset(QgsWkbTypes.LineGeometry)
+                    self.bande_dynamique.addPoint(QgsPointXY(self.liste_points[-1]))
+                    self.bande_dynamique.addPoint(QgsPointXY(point_actuel))
+                elif self.mode == 1:
                     if self.dernier_point_deplacement is None and self.liste_points:
                         self.dernier_point_deplacement = self.liste_points[-1]
                     if self.dernier_point_deplacement:  # Ajoutez une vérification ici
@@ -884,80 +1184,37 @@ class OutilTraceCrete(BaseMapTool):
         if not (0 <= arrivee_px[0] < self.raster_colonnes and 0 <= arrivee_px[1] < self.raster_lignes):
             return None
 
-        pixels_chemin = [depart_px]
-        pixel_courant = depart_px
-        iterations_max = 10000
-        iterations = 0
-
-        while pixel_courant != arrivee_px and iterations < iterations_max:
-            iterations += 1
-            cx, cy = pixel_courant
-
-            # Récupérer les voisins dans un rayon de 2 pixels
-            voisins = [
-                (cx + dx, cy + dy)
-                for dx in [-2, -1, 0, 1, 2]
-                for dy in [-2, -1, 0, 1, 2]
-                if (dx != 0 or dy != 0) and
-                   0 <= cx + dx < self.raster_colonnes and
-                   0 <= cy + dy < self.raster_lignes
-            ]
-
-            if not voisins:
-                break
-
-            # Calculer l'angle vers le point final
-            dx_fin = arrivee_px[0] - cx
-            dy_fin = arrivee_px[1] - cy
-            angle_vers_fin = np.arctan2(dy_fin, dx_fin)
-
-            def difference_angle(a1, a2):
-                return abs((a1 - a2 + np.pi) % (2 * np.pi) - np.pi)
-
-            # Filtrer les voisins dans la direction générale
-            voisins_dans_direction = []
-            for nx, ny in voisins:
-                ndx = nx - cx
-                ndy = ny - cy
-                angle_voisin = np.arctan2(ndy, ndx)
-                difference = difference_angle(angle_voisin, angle_vers_fin)
-                if difference <= np.pi / 2:  # 90 degrés
-                    voisins_dans_direction.append((nx, ny, difference))
-
-            if not voisins_dans_direction:
-                # Si aucun voisin dans la direction générale, considérer tous les voisins
-                voisins_dans_direction = [
-                    (nx, ny, difference_angle(np.arctan2(ny - cy, nx - cx), angle_vers_fin))
-                    for nx, ny in voisins
-                ]
-
-            elevation_courante = self.tableau_raster[cy, cx]
-
-            # Créer la liste des candidats voisins
-            candidats_voisins = []
-            for nx, ny, difference_angle_valeur in voisins_dans_direction:
-                elevation_voisin = self.tableau_raster[ny, nx]
-                candidats_voisins.append({
-                    'position': (nx, ny),
-                    'elevation': elevation_voisin,
-                    'difference_angle': difference_angle_valeur
-                })
-
-            # Sélectionner le prochain pixel en utilisant la fonction appropriée
-            prochain_px = self.select_next_pixel_func(
-                pixel_courant,
-                candidats_voisins,
-                elevation_courante,
+        pixels_chemin = self.pixels_livewire(depart_px, arrivee_px)
+        if pixels_chemin is None:
+            pixels_chemin = self.pixels_minimax(depart_px, arrivee_px)
+        if pixels_chemin is None:
+            pixels_chemin = self.pixels_ecoulement(depart_px, arrivee_px)
+        if pixels_chemin is None:
+            pixels_chemin = self.moteur_parcours.calculer_pixels(
+                self.tableau_raster,
+                depart_px,
                 arrivee_px,
-                self.resoudre_egalite  # Passer la méthode resoudre_egalite
+                points_bas=self.points_bas_active
             )
 
-            if prochain_px == pixel_courant or prochain_px in pixels_chemin:
-                break  # Éviter les boucles infinies
+        return self.geometrie_depuis_pixels(pixels_chemin)
+
+    def geometrie_depuis_pixels(self, pixels_chemin):
+        """
+        Convertit une suite de pixels du raster en polyligne dans le SCR du canevas.
+
+        Les points sont placés au centre des pixels ; la polyligne est simplifiée si la simplification est activée.
 
-            pixels_chemin.append(prochain_px)
-            pixel_courant = prochain_px
+        Parameters
+        ----------
+        pixels_chemin : list of tuple
+            Pixels (colonne, ligne) du chemin.
 
+        Returns
+        -------
+        QgsGeometry
+            Géométrie du chemin.
+        """
         # Conversion des pixels en coordonnées spatiales
         liste_points = []
         for px, py in pixels_chemin:
@@ -1018,6 +1275,8 @@ class OutilTraceCrete(BaseMapTool):
         self.points_trace_libre = []
         self.mode_trace_libre = False
         self.dernier_point_deplacement = None
+        self.arbre_livewire = None
+        self.cle_livewire = None
 
         if self.fenetre_profil:
             self.fenetre_profil.ax.clear()
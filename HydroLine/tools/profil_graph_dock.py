@@ -61,6 +61,8 @@ class ProfilGraphDock(QDockWidget):
         Étiquette de texte pour afficher l'altitude Z sur le graphique.
     points : list of QgsPoint
         Liste des points de la polyligne Z pour le suivi de la souris.
+    registre_sessions : RegistreSessionsMNT or None
+        Registre des sessions MNT du plugin, utilisé pour lire le MNT sans le rouvrir.
 
     Methods
     -------
@@ -94,7 +96,7 @@ class ProfilGraphDock(QDockWidget):
         Exporte le graphique actuel en PNG ou PDF sans les éléments interactifs.
     """
 
-    def __init__(self, canvas, parent=None):
+    def __init__(self, canvas, parent=None, registre_sessions=None):
         """
         Initialise le dock pour afficher le profil Z.
 
@@ -104,11 +106,14 @@ class ProfilGraphDock(QDockWidget):
             Canevas de la carte QGIS pour l'interaction spatiale.
         parent : QWidget, optional
             Widget parent du dock, par défaut None.
+        registre_sessions : RegistreSessionsMNT, optional
+            Registre des sessions MNT du plugin, par défaut None.
         """
 
         super().__init__(parent)
         self.setWindowTitle("Profil Z")
         self.canvas = canvas
+        self.registre_sessions = registre_sessions
 
         # Créer le widget principal
         main_widget = QWidget()
@@ -317,7 +322,10 @@ class ProfilGraphDock(QDockWidget):
             Entité sélectionnée pour la visualisation.
         """
 
-        ProfilGraph3D(feature, self.selected_layer, self.selected_raster_layer)
+        session = None
+        if self.registre_sessions is not None:
+            session = self.registre_sessions.session(self.selected_raster_layer)
+        ProfilGraph3D(feature, self.selected_layer, self.selected_raster_layer, session=session)
 
     def on_feature_identified(self, feature):
         """
@@ -693,6 +701,8 @@ class ProfilGraph3D(QWidget):
         La couche de polylignes.
     raster_layer : QgsRasterLayer
         La couche raster MNT.
+    session : SessionMNT or None
+        Session MNT partagée ; la zone du profil est alors lue dans son cache de tuiles.
 
     Methods
     -------
@@ -700,12 +710,13 @@ class ProfilGraph3D(QWidget):
         Crée la visualisation 3D du profil à partir des données de polyligne et du MNT.
     """
 
-    def __init__(self, feature, polyline_layer, raster_layer, parent=None):
+    def __init__(self, feature, polyline_layer, raster_layer, parent=None, session=None):
         super().__init__(parent)
         self.setWindowTitle("Profil 3D")
         self.feature = feature
         self.polyline_layer = polyline_layer
         self.raster_layer = raster_layer
+        self.session = session
 
         # Construire la visualisation 3D
         self.create_3d_visualization()
@@ -731,14 +742,23 @@ class ProfilGraph3D(QWidget):
 
         extent = buffered_geom.boundingBox()
 
-        raster_path = self.raster_layer.dataProvider().dataSourceUri()
-        ds = gdal.Open(raster_path, gdal.GA_ReadOnly)
-        if ds is None:
-            QMessageBox.warning(self, "Erreur", "Impossible d'ouvrir le fichier raster.")
-            return
-        band = ds.GetRasterBand(1)
-        gt = ds.GetGeoTransform()
-        inv_gt = gdal.InvGeoTransform(gt)
+        if self.session is not None:
+            mnt = self.session.tableau_raster
+            gt = self.session.gt
+            inv_gt = self.session.inv_gt
+            raster_lignes, raster_colonnes = mnt.shape
+            no_data_value = mnt.nodata
+        else:
+            raster_path = self.raster_layer.dataProvider().dataSourceUri()
+            ds = gdal.Open(raster_path, gdal.GA_ReadOnly)
+            if ds is None:
+                QMessageBox.warning(self, "Erreur", "Impossible d'ouvrir le fichier raster.")
+                return
+            band = ds.GetRasterBand(1)
+            gt = ds.GetGeoTransform()
+            inv_gt = gdal.InvGeoTransform(gt)
+            raster_lignes, raster_colonnes = ds.RasterYSize, ds.RasterXSize
+            no_data_value = band.GetNoDataValue()
 
         x_min = extent.xMinimum()
         x_max = extent.xMaximum()
@@ -748,10 +768,10 @@ class ProfilGraph3D(QWidget):
         ulx, uly = map(int, gdal.ApplyGeoTransform(inv_gt, x_min, y_max))
         lrx, lry = map(int, gdal.ApplyGeoTransform(inv_gt, x_max, y_min))
 
-        ulx = max(0, min(ulx, ds.RasterXSize - 1))
-        uly = max(0, min(uly, ds.RasterYSize - 1))
-        lrx = max(0, min(lrx, ds.RasterXSize - 1))
-        lry = max(0, min(lry, ds.RasterYSize - 1))
+        ulx = max(0, min(ulx, raster_colonnes - 1))
+        uly = max(0, min(uly, raster_lignes - 1))
+        lrx = max(0, min(lrx, raster_colonnes - 1))
+        lry = max(0, min(lry, raster_lignes - 1))
 
         xsize = abs(lrx - ulx)
         ysize = abs(lry - uly)
@@ -761,7 +781,12 @@ class ProfilGraph3D(QWidget):
             return
 
         # Lire la partie du MNT correspondant au buffer
-        dem_data = band.ReadAsArray(min(ulx, lrx), min(uly, lry), xsize, ysize).astype(np.float32)
+        if self.session is not None:
+            y0 = min(uly, lry)
+            x0 = min(ulx, lrx)
+            dem_data = mnt.lire_fenetre(y0, y0 + ysize, x0, x0 + xsize).astype(np.float32)
+        else:
+            dem_data = band.ReadAsArray(min(ulx, lrx), min(uly, lry), xsize, ysize).astype(np.float32)
         if dem_data is None:
             QMessageBox.warning(self, "Erreur", "Erreur lors de la lecture du MNT.")
             return
@@ -783,7 +808,6 @@ class ProfilGraph3D(QWidget):
         y = np.arange(nrows) * new_gt[5] + new_gt[3]
         x_grid, y_grid = np.meshgrid(x, y)
 
-        no_data_value = band.GetNoDataValue()
         if no_data_value is not None:
             dem_data[dem_data == no_data_value] = np.nan
 
@@ -4,8 +4,11 @@
 
 
 import os
+import math
+import bisect
 import logging
-import processing
+import numpy as np
+from osgeo import gdal
 from qgis.PyQt.QtWidgets import QMessageBox
 from qgis._core import QgsLineString
 from qgis.core import (
@@ -20,10 +23,14 @@ from qgis.core import (
     QgsSpatialIndex,
     QgsCoordinateReferenceSystem,
     QgsRaster,
+    QgsRectangle,
     QgsWkbTypes
 )
 from PyQt5.QtWidgets import QDialog
 from ..dialogs.choix_couches_dialog import DialogueSelectionCouchesPourProlongement
+from ..utils.acces_mnt import AccesseurMNT
+from ..utils.cache_mnt import obtenir_cache_disque_mnt
+from ..utils.maillage_tin import MaillageTIN
 
 # Configuration du logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -31,6 +38,13 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 # Obtenez le chemin du fichier actuel
 plugin_dir = os.path.dirname(__file__)
 
+# Au-delà de ce nombre de pixels, la fenêtre englobant un segment n'est pas lue d'un bloc : les altitudes sont
+# lues pixel par pixel dans le cache de tuiles du MNT
+PIXELS_MAX_FENETRE_SEGMENT = 16 * 1024 ** 2
+
+# Distance maximale entre un point bathymétrique et la ligne de profil qui le porte
+TOLERANCE_APPARIEMENT = 1e-6
+
 
 class ProlongementDesProfils:
     """
@@ -48,6 +62,24 @@ class ProlongementDesProfils:
         Couche contenant les profils tracés à prolonger.
     couche_emprise : QgsVectorLayer or None
         Couche d'emprise facultative pour limiter l'analyse, par défaut None.
+    tableau_mnt : AccesseurMNT or None
+        Accès par tuiles au MNT raster, None si le MNT n'est pas lisible par GDAL (lecture par `identify`).
+    maillage_tin : MaillageTIN or None
+        Sommets, faces et arêtes du TIN, lus une fois par exécution.
+    emprise_geom : QgsGeometry or None
+        Union des géométries de l'emprise, calculée une fois par exécution.
+    moteur_emprise : QgsGeometryEngine or None
+        Moteur géométrique préparé sur `emprise_geom`, pour les tests d'inclusion et d'intersection.
+    index_emprise : QgsSpatialIndex or None
+        Index spatial des entités de l'emprise.
+    geometries_emprise : dict
+        Géométries des entités de l'emprise, indexées par identifiant d'entité.
+    points_existants : dict
+        Points bathymétriques existants à géométrie non nulle, indexés par identifiant d'entité ;
+        construits à la demande par `indexer_points_existants` (mode Absc_proj uniquement).
+    points_par_ligne : dict
+        Points existants portés par chaque ligne de profil (identifiant de ligne -> liste de QgsFeature),
+        calculés une fois par `apparier_points_lignes` et réutilisés par `ajuster_densite`.
     ...
 
     Methods
@@ -62,16 +94,26 @@ class ProlongementDesProfils:
         Crée une nouvelle couche en mémoire pour les points prolongés.
     ajouter_points_existants()
         Ajoute les points existants de la couche de points à la nouvelle couche.
+    indexer_points_existants()
+        Construit l'index spatial et le tableau des coordonnées des points existants (mode Absc_proj).
+    apparier_points_lignes()
+        Associe en une passe chaque point existant à la ou les lignes de profil qui le portent.
     parcourir_lignes_profil()
         Traite chaque profil de la couche de lignes pour générer de nouveaux points.
     traiter_ligne(ligne)
         Traite une ligne spécifique pour générer de nouveaux points.
+    preparer_emprise()
+        Calcule une fois l'union de l'emprise, son moteur géométrique préparé et son index spatial.
+    decouper_hors_emprise(geom_ligne)
+        Retourne la partie d'une ligne située hors de l'emprise.
     extraire_sous_ligne(geom_ligne, distance_debut, distance_fin)
         Extrait une partie de la ligne entre deux distances.
     traiter_segment_raster(geom_segment)
         Traite un segment pour générer des points le long de celui-ci selon la pente (MNT raster).
+    lecteur_altitudes(sommets)
+        Retourne une fonction donnant l'altitude du MNT raster en un point du segment.
     traiter_segment_tin(geom_segment)
-        Traite un segment pour générer des points aux intersections avec le maillage (TIN).
+        Traite un segment pour générer, dans l'ordre, des points aux intersections avec le maillage (TIN).
     obtenir_z_tin(point_xy)
         Obtient la valeur Z du TIN au point donné.
     ajuster_densite()
@@ -97,10 +139,20 @@ class ProlongementDesProfils:
         self.couche_points_nouveaux = None
         self.fournisseur_donnees = None
         self.index_points_existants = None
+        self.points_existants = {}
+        self.coordonnees_points = None
+        self.points_par_ligne = {}
         self.index_objectid = None
         self.index_z = None
         self.index_abscisse_proj = None
         self.mnt_est_raster = True
+        self.tableau_mnt = None
+        self.inv_gt_mnt = None
+        self.maillage_tin = None
+        self.emprise_geom = None
+        self.moteur_emprise = None
+        self.index_emprise = None
+        self.geometries_emprise = {}
         self.nouveaux_points_par_ligne = {}
         self.min_espacement_initial = 0.5
         self.max_espacement_initial = 2.0
@@ -132,6 +184,10 @@ class ProlongementDesProfils:
         except Exception as e:
             QMessageBox.critical(None, 'Erreur', f'Une erreur est survenue : {str(e)}')
             logging.error(f'Erreur lors de l\'exécution: {str(e)}')
+        finally:
+            if self.tableau_mnt is not None:
+                self.tableau_mnt.fermer()
+                self.tableau_mnt = None
 
     def afficher_dialogue_selection_couches(self):
         """
@@ -204,6 +260,23 @@ class ProlongementDesProfils:
         # Construire les index pour les champs (si nécessaires)
         # Exemple: vous pouvez ajouter des index pour accélérer les recherches si besoin
 
+        if self.couche_emprise is not None:
+            self.preparer_emprise()
+
+        # MNT raster ouvert une fois pour tous les profils : les segments y sont lus par fenêtres
+        if self.mnt_est_raster:
+            try:
+                self.tableau_mnt = AccesseurMNT(self.couche_mnt.dataProvider().dataSourceUri(),
+                                                cache_disque=obtenir_cache_disque_mnt())
+                self.inv_gt_mnt = gdal.InvGeoTransform(self.tableau_mnt.gt)
+            except IOError:
+                logging.warning('MNT non lisible par GDAL : lecture des altitudes point par point.')
+                self.tableau_mnt = None
+        else:
+            # Arêtes du TIN extraites une fois pour tous les segments de tous les profils
+            self.maillage_tin = MaillageTIN.depuis_couche(self.couche_mnt)
+            logging.info(f'Maillage TIN lu : {len(self.maillage_tin.arete_a)} arêtes.')
+
     def creer_nouvelle_couche(self):
         """
         Crée une nouvelle couche en mémoire pour stocker les points prolongés.
@@ -224,7 +297,98 @@ class ProlongementDesProfils:
         self.fournisseur_donnees.addFeatures(elements_existants)
         logging.info(f'{len(elements_existants)} points existants ajoutés à la nouvelle couche.')
 
-        self.index_points_existants = QgsSpatialIndex(self.couche_points.getFeatures())
+    def indexer_points_existants(self):
+        """
+        Construit l'index spatial et le tableau des coordonnées des points existants.
+
+        N'est utile qu'à l'appariement des points aux lignes (mode Absc_proj) : le mode emprise ne le construit
+        pas. Les entités sans géométrie sont ignorées ; pour une géométrie multipartie, seule la première
+        partie est retenue.
+        """
+
+        self.points_existants = {}
+        self.index_points_existants = QgsSpatialIndex()
+        positions = {}
+        for element in self.couche_points.getFeatures():
+            geometrie = element.geometry()
+            if geometrie.isNull() or geometrie.isEmpty():
+                continue
+            if geometrie.isMultipart():
+                parties = geometrie.asMultiPoint()
+                if not parties:
+                    continue
+                point = parties[0]
+            else:
+                point = geometrie.asPoint()
+            self.points_existants[element.id()] = element
+            positions[element.id()] = (point.x(), point.y())
+            self.index_points_existants.addFeature(element.id(),
+                                                   QgsRectangle(point.x(), point.y(), point.x(), point.y()))
+
+        # Identifiants triés et coordonnées correspondantes, pour les distances point-ligne vectorisées
+        identifiants = np.array(sorted(positions), dtype=np.int64)
+        coordonnees = np.array([positions[i] for i in identifiants.tolist()], dtype=np.float64).reshape(-1, 2)
+        self.coordonnees_points = (identifiants, coordonnees)
+        logging.info(f'{len(identifiants)} points existants indexés.')
+
+    def apparier_points_lignes(self):
+        """
+        Associe en une passe chaque point existant à la ou les lignes de profil qui le portent.
+
+        Le résultat est conservé dans `points_par_ligne` : le traitement des lignes et l'ajustement de
+        densité le réutilisent sans nouvelle requête sur la couche de points.
+        """
+
+        if self.coordonnees_points is None:
+            self.indexer_points_existants()
+        self.points_par_ligne = {}
+        for ligne in self.couche_lignes.getFeatures():
+            self.points_par_ligne[ligne.id()] = self._points_sur_ligne(ligne.geometry())
+        total = sum(len(points) for points in self.points_par_ligne.values())
+        logging.info(f'{total} points existants associés à {len(self.points_par_ligne)} lignes de profil.')
+
+    def _points_sur_ligne(self, geom_ligne):
+        """
+        Retourne les points existants situés sur une ligne, à TOLERANCE_APPARIEMENT près.
+
+        Chaque tronçon de la ligne interroge l'index spatial des points avec son propre rectangle englobant,
+        élargi de la tolérance : une longue ligne en diagonale ne ramène pas tous les points de son rectangle
+        englobant. Les distances des candidats au tronçon sont calculées en une fois.
+
+        Parameters
+        ----------
+        geom_ligne : QgsGeometry
+            Ligne de profil.
+
+        Returns
+        -------
+        list of QgsFeature
+            Points portés par la ligne, par identifiant croissant.
+        """
+
+        if self.coordonnees_points is None:
+            self.indexer_points_existants()
+        sommets = self._sommets_segment(geom_ligne)
+        if sommets is None:
+            return []
+        identifiants, coordonnees = self.coordonnees_points
+        retenus = set()
+        for x0, y0, dx, dy, longueur in zip(*sommets[1:]):
+            rectangle = QgsRectangle(min(x0, x0 + dx) - TOLERANCE_APPARIEMENT,
+                                     min(y0, y0 + dy) - TOLERANCE_APPARIEMENT,
+                                     max(x0, x0 + dx) + TOLERANCE_APPARIEMENT,
+                                     max(y0, y0 + dy) + TOLERANCE_APPARIEMENT)
+            candidats = np.array(self.index_points_existants.intersects(rectangle), dtype=np.int64)
+            if not len(candidats):
+                continue
+            positions = np.searchsorted(identifiants, candidats)
+            px = coordonnees[positions, 0] - x0
+            py = coordonnees[positions, 1] - y0
+            # Distance au tronçon : projection bornée aux extrémités
+            t = np.clip((px * dx + py * dy) / (longueur * longueur), 0.0, 1.0)
+            distances = np.hypot(px - t * dx, py - t * dy)
+            retenus.update(candidats[distances < TOLERANCE_APPARIEMENT].tolist())
+        return [self.points_existants[i] for i in sorted(retenus)]
 
     def parcourir_lignes_profil(self):
         """
@@ -235,6 +399,9 @@ class ProlongementDesProfils:
         compteur_lignes = 0
         logging.info(f'Commence le traitement des {total_lignes} lignes de profil.')
 
+        if self.couche_emprise is None and self.index_abscisse_proj != -1:
+            self.apparier_points_lignes()
+
         for ligne in self.couche_lignes.getFeatures():
             compteur_lignes += 1
             ligne_id = ligne.id()
@@ -271,12 +438,8 @@ class ProlongementDesProfils:
         if self.couche_emprise is not None:
             segments_a_traiter = []
 
-            # Combiner toutes les géométries de l'emprise
-            emprise_geom = QgsGeometry.unaryUnion([feat.geometry() for feat in self.couche_emprise.getFeatures()])
-            logging.debug(f'Combinaison des géométries de l\'emprise.')
-
             # Découper la ligne en parties à l'intérieur et à l'extérieur de l'emprise
-            difference = geom_ligne.difference(emprise_geom)
+            difference = self.decouper_hors_emprise(geom_ligne)
             logging.debug(f'Découpage de la ligne ID {ligne.id()} avec l\'emprise.')
 
             if difference.isEmpty():
@@ -300,11 +463,11 @@ class ProlongementDesProfils:
                 return nouveaux_points_ligne
         elif self.index_abscisse_proj != -1:
             # Si le champ Absc_proj est disponible, on utilise la logique basée sur Absc_proj
-            requete = QgsFeatureRequest().setFilterRect(geom_ligne.boundingBox())
-            points_proches = [
-                pt for pt in self.couche_points.getFeatures(requete)
-                if geom_ligne.interpolate(geom_ligne.lineLocatePoint(pt.geometry())).distance(pt.geometry()) < 1e-6
-            ]
+            # Points portés par la ligne : appariement fait une fois pour toutes les lignes
+            points_proches = self.points_par_ligne.get(ligne.id())
+            if points_proches is None:
+                points_proches = self._points_sur_ligne(geom_ligne)
+                self.points_par_ligne[ligne.id()] = points_proches
             logging.debug(f'Requête de points proches pour la ligne ID {ligne.id()}: {len(points_proches)} trouvés.')
 
             if not points_proches:
@@ -358,6 +521,56 @@ class ProlongementDesProfils:
         logging.debug(f'{len(nouveaux_points_ligne)} nouveaux points générés pour la ligne ID {ligne.id()}.')
         return nouveaux_points_ligne
 
+    def preparer_emprise(self):
+        """
+        Calcule une fois pour toutes les lignes l'union des géométries de l'emprise, le moteur géométrique
+        préparé sur cette union, ainsi que l'index spatial et les géométries de ses entités.
+        """
+
+        self.geometries_emprise = {feat.id(): feat.geometry() for feat in self.couche_emprise.getFeatures()}
+        self.emprise_geom = QgsGeometry.unaryUnion(list(self.geometries_emprise.values()))
+        self.moteur_emprise = QgsGeometry.createGeometryEngine(self.emprise_geom.constGet())
+        self.moteur_emprise.prepareGeometry()
+        self.index_emprise = QgsSpatialIndex(self.couche_emprise.getFeatures())
+        logging.debug('Combinaison des géométries de l\'emprise.')
+
+    def decouper_hors_emprise(self, geom_ligne):
+        """
+        Retourne la partie d'une ligne située hors de l'emprise.
+
+        Les lignes dont l'emprise ne touche aucune entité de l'emprise, ou que le moteur préparé montre
+        disjointes, sont retournées telles quelles ; celles qu'il montre contenues donnent une géométrie vide.
+        La différence n'est calculée que pour les lignes qui traversent l'emprise, contre l'union des seules
+        entités candidates de l'index spatial, chacune découpée au rectangle englobant de la ligne : son coût
+        dépend des entités proches de la ligne et non du nombre total de sommets de l'emprise.
+
+        Parameters
+        ----------
+        geom_ligne : QgsGeometry
+            Ligne de profil.
+
+        Returns
+        -------
+        QgsGeometry
+            Partie de la ligne hors de l'emprise, vide si la ligne est entièrement à l'intérieur.
+        """
+
+        if self.emprise_geom is None:
+            self.preparer_emprise()
+        rectangle = geom_ligne.boundingBox()
+        candidats = self.index_emprise.intersects(rectangle)
+        if not candidats:
+            return geom_ligne
+        ligne = geom_ligne.constGet()
+        if not self.moteur_emprise.intersects(ligne):
+            return geom_ligne
+        if self.moteur_emprise.contains(ligne):
+            return QgsGeometry()
+        # Marge : les bords de l'union découpée ne doivent pas toucher la ligne
+        rectangle.grow(max(rectangle.width(), rectangle.height()) * 0.01 + 1.0)
+        emprise_locale = QgsGeometry.unaryUnion([self.geometries_emprise[i].clipped(rectangle) for i in candidats])
+        return geom_ligne.difference(emprise_locale)
+
     def extraire_sous_ligne(self, geom_ligne, distance_debut, distance_fin):
         """
         Extrait une partie de la ligne entre deux distances données, conservant les valeurs Z.
@@ -466,6 +679,11 @@ class ProlongementDesProfils:
         """
         Traite un segment pour générer des points basés sur la pente du MNT (raster).
 
+        Le segment est parcouru en une passe : ses sommets sont convertis une fois en tableaux NumPy et les
+        altitudes sont lues dans une fenêtre du MNT couvrant son emprise. L'espacement de chaque point dépend
+        de l'altitude du point précédent ; le parcours reste donc séquentiel, mais ne fait plus d'appel au
+        fournisseur de données par point.
+
         Parameters
         ----------
         geom_segment : QgsGeometry
@@ -482,43 +700,34 @@ class ProlongementDesProfils:
         if longueur_segment == 0:
             return nouveaux_points_segment
 
-        distance_parcourue = 0.0
-        point_geom_courant = geom_segment.interpolate(distance_parcourue)
-        point_courant = point_geom_courant.asPoint()
-        identifiant_mnt = self.couche_mnt.dataProvider().identify(point_courant, QgsRaster.IdentifyFormatValue)
-        if not identifiant_mnt.isValid():
-            logging.warning(f'Identification MNT invalide au point: {point_courant}')
-            return nouveaux_points_segment
-        valeurs_mnt = identifiant_mnt.results()
-        if not valeurs_mnt:
-            logging.warning(f'Aucune valeur MNT trouvée au point: {point_courant}')
+        sommets = self._sommets_segment(geom_segment)
+        if sommets is None:
             return nouveaux_points_segment
-        z_precedent = list(valeurs_mnt.values())[0]
+        debuts, x0, y0, dx, dy, longueurs = sommets
+        altitude = self.lecteur_altitudes(sommets)
+
+        def position(distance):
+            i = max(bisect.bisect_right(debuts, distance) - 1, 0)
+            t = min((distance - debuts[i]) / longueurs[i], 1.0)
+            return x0[i] + t * dx[i], y0[i] + t * dy[i]
+
+        distance_parcourue = 0.0
+        x, y = position(distance_parcourue)
+        z_precedent = altitude(x, y)
 
         # Vérifier que z_precedent n'est pas None
         if z_precedent is None:
-            logging.warning(f'Valeur MNT initiale est None au point: {point_courant}')
+            logging.warning(f'Valeur MNT initiale est None au point: ({x}, {y})')
             return nouveaux_points_segment
 
         while distance_parcourue <= longueur_segment:
-            point_geom_courant = geom_segment.interpolate(distance_parcourue)
-            point_courant = point_geom_courant.asPoint()
-            identifiant_mnt = self.couche_mnt.dataProvider().identify(point_courant, QgsRaster.IdentifyFormatValue)
-            if not identifiant_mnt.isValid():
-                logging.warning(f'Identification MNT invalide au point: {point_courant}')
-                break
-            valeurs_mnt = identifiant_mnt.results()
-            if not valeurs_mnt:
-                logging.warning(f'Aucune valeur MNT trouvée au point: {point_courant}')
-                break
-            z_courant = list(valeurs_mnt.values())[0]
+            x, y = position(distance_parcourue)
+            z_courant = altitude(x, y)
 
-            # Vérifier que z_courant n'est pas None
+            # Pixel sans donnée : on passe au point suivant, la pente est calculée depuis le dernier point valide
             if z_courant is None:
-                logging.warning(f'Valeur MNT est None au point: {point_courant}. Passage au point suivant.')
-                # Passer ce point et continuer
+                logging.warning(f'Valeur MNT est None au point: ({x}, {y}). Passage au point suivant.')
                 distance_parcourue += self.min_espacement_initial
-                z_precedent = z_courant
                 continue
 
             # Calcul de la différence d'élévation
@@ -539,13 +748,12 @@ class ProlongementDesProfils:
 
             # Créer le nouveau point
             feature_point = QgsFeature()
-            feature_point.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(point_courant)))
+            feature_point.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
             attributs = [None] * len(self.champs)
             attributs[self.index_objectid] = None
             attributs[self.index_z] = z_courant
             feature_point.setAttributes(attributs)
             nouveaux_points_segment.append(feature_point)
-            logging.debug(f'Point ajouté à {point_courant} avec Z={z_courant}')
 
             # Mettre à jour les variables
             distance_parcourue += espacement
@@ -556,10 +764,115 @@ class ProlongementDesProfils:
 
         return nouveaux_points_segment
 
+    @staticmethod
+    def _sommets_segment(geom_segment):
+        """
+        Retourne les troncons de longueur non nulle d'un segment, dans l'ordre de `interpolate`.
+
+        Parameters
+        ----------
+        geom_segment : QgsGeometry
+            Géométrie linéaire, simple ou multiple.
+
+        Returns
+        -------
+        tuple of list or None
+            (debuts, x0, y0, dx, dy, longueurs) : abscisse curviligne de début, origine, vecteur et longueur de
+            chaque tronçon, ou None si la géométrie n'a aucun tronçon.
+        """
+
+        parties = geom_segment.asMultiPolyline() if geom_segment.isMultipart() else [geom_segment.asPolyline()]
+        troncons = []
+        for partie in parties:
+            if len(partie) < 2:
+                continue
+            coordonnees = np.array([(pt.x(), pt.y()) for pt in partie], dtype=np.float64)
+            troncons.append((coordonnees[:-1], np.diff(coordonnees, axis=0)))
+        if not troncons:
+            return None
+        origines = np.concatenate([t[0] for t in troncons])
+        vecteurs = np.concatenate([t[1] for t in troncons])
+        longueurs = np.hypot(vecteurs[:, 0], vecteurs[:, 1])
+        non_nuls = longueurs > 0
+        if not non_nuls.any():
+            return None
+        debuts = np.concatenate(([0.0], np.cumsum(longueurs)[:-1]))[non_nuls]
+        origines, vecteurs, longueurs = origines[non_nuls], vecteurs[non_nuls], longueurs[non_nuls]
+        # Listes Python : la recherche et l'interpolation se font point par point dans le parcours
+        return (debuts.tolist(), origines[:, 0].tolist(), origines[:, 1].tolist(),
+                vecteurs[:, 0].tolist(), vecteurs[:, 1].tolist(), longueurs.tolist())
+
+    def lecteur_altitudes(self, sommets):
+        """
+        Retourne une fonction donnant l'altitude du MNT raster en un point du segment.
+
+        La fenêtre du MNT couvrant l'emprise du segment est lue une fois ; l'altitude est celle du pixel
+        contenant le point, comme `identify`.
+
+        Parameters
+        ----------
+        sommets : tuple of list
+            Tronçons du segment retournés par `_sommets_segment`.
+
+        Returns
+        -------
+        callable
+            Fonction (x, y) -> float or None, None hors du MNT ou sur un pixel sans donnée.
+        """
+
+        if self.tableau_mnt is None:
+            fournisseur = self.couche_mnt.dataProvider()
+
+            def altitude_fournisseur(x, y):
+                identifiant_mnt = fournisseur.identify(QgsPointXY(x, y), QgsRaster.IdentifyFormatValue)
+                valeurs_mnt = identifiant_mnt.results() if identifiant_mnt.isValid() else None
+                return list(valeurs_mnt.values())[0] if valeurs_mnt else None
+
+            return altitude_fournisseur
+
+        _, x0, y0, dx, dy, _ = sommets
+        xs = np.concatenate((x0, np.add(x0, dx)))
+        ys = np.concatenate((y0, np.add(y0, dy)))
+        ig = self.inv_gt_mnt
+        colonnes = ig[0] + ig[1] * xs + ig[2] * ys
+        lignes = ig[3] + ig[4] * xs + ig[5] * ys
+        raster_lignes, raster_colonnes = self.tableau_mnt.shape
+        ligne0 = max(int(math.floor(lignes.min())), 0)
+        ligne1 = min(int(math.floor(lignes.max())) + 1, raster_lignes)
+        colonne0 = max(int(math.floor(colonnes.min())), 0)
+        colonne1 = min(int(math.floor(colonnes.max())) + 1, raster_colonnes)
+        if ligne1 <= ligne0 or colonne1 <= colonne0:
+            return lambda x, y: None
+
+        if (ligne1 - ligne0) * (colonne1 - colonne0) <= PIXELS_MAX_FENETRE_SEGMENT:
+            fenetre = self.tableau_mnt.lire_fenetre(ligne0, ligne1, colonne0, colonne1)
+        else:
+            # Segment très long en diagonale : lecture pixel par pixel dans le cache de tuiles
+            fenetre = self.tableau_mnt
+            ligne0 = colonne0 = 0
+        hauteur, largeur = ligne1 - ligne0, colonne1 - colonne0
+        nodata = self.tableau_mnt.nodata
+
+        def altitude_fenetre(x, y):
+            colonne = math.floor(ig[0] + ig[1] * x + ig[2] * y) - colonne0
+            ligne = math.floor(ig[3] + ig[4] * x + ig[5] * y) - ligne0
+            if not (0 <= ligne < hauteur and 0 <= colonne < largeur):
+                return None
+            z = float(fenetre[ligne, colonne])
+            if z != z or z == nodata:
+                return None
+            return z
+
+        return altitude_fenetre
+
     def traiter_segment_tin(self, geom_segment):
         """
         Traite un segment pour générer des points aux intersections avec les arêtes du TIN.
 
+        Chaque tronçon du segment est suivi de triangle en triangle dans le maillage (voir
+        `MaillageTIN.traverser`) : les intersections sont obtenues dans l'ordre du profil, et leurs altitudes
+        interpolées en une fois sur les arêtes coupées.
+
         Parameters
         ----------
         geom_segment : QgsGeometry
@@ -573,68 +886,37 @@ class ProlongementDesProfils:
 
         nouveaux_points_segment = []
 
-        # Utiliser l'algorithme 'native:exportmeshedges' pour extraire les arêtes du maillage
-        params = {
-            'INPUT': self.couche_mnt,
-            'DATASET_GROUPS': [],
-            'DATASET_TIME': {'type': 'static'},
-            'VECTOR_OPTION': 0,
-            'OUTPUT': 'TEMPORARY_OUTPUT'  # Sortie en mémoire
-        }
-
-        result = processing.run('native:exportmeshedges', params)
-        edges_layer = result['OUTPUT']
-
-        # Créer un index spatial pour les arêtes
-        index_edges = QgsSpatialIndex(edges_layer.getFeatures())
-
-        # Récupérer les arêtes proches du segment
-        bbox_segment = geom_segment.boundingBox()
-        edge_ids = index_edges.intersects(bbox_segment)
-
-        if not edge_ids:
+        # Maillage lu une fois pour toute l'exécution
+        if self.maillage_tin is None:
+            self.maillage_tin = MaillageTIN.depuis_couche(self.couche_mnt)
+        sommets = self._sommets_segment(geom_segment)
+        if sommets is None:
             return nouveaux_points_segment
 
-        # Récupérer les arêtes pertinentes
-        requete = QgsFeatureRequest(edge_ids)
-        edges_features = [edge for edge in edges_layer.getFeatures(requete)]
-
-        # Parcourir chaque arête et vérifier l'intersection avec le segment
-        for edge in edges_features:
-            geom_edge = edge.geometry()
-            intersection = geom_segment.intersection(geom_edge)
-            if not intersection.isEmpty():
-                # Selon le type de géométrie résultante, extraire le(s) point(s) d'intersection
-                if intersection.type() == QgsWkbTypes.PointGeometry:
-                    points_intersection = [QgsPointXY(intersection.asPoint())]  # MODIFICATION
-                elif intersection.type() == QgsWkbTypes.MultiPointGeometry:
-                    points_intersection = [QgsPointXY(pt) for pt in intersection.asMultiPoint()]  # MODIFICATION
-                elif intersection.type() == QgsWkbTypes.LineGeometry:
-                    # Si l'intersection est une ligne (colinéarité), vous pouvez gérer cela si nécessaire
-                    continue
-                else:
+        dernier_point = None
+        for x0, y0, dx, dy in zip(*sommets[1:5]):
+            xs, ys, zs = self.maillage_tin.traverser(x0, y0, x0 + dx, y0 + dy)
+            for x, y, z_value in zip(xs.tolist(), ys.tolist(), zs.tolist()):
+                # Intersection à la jonction de deux tronçons : déjà ajoutée avec le tronçon précédent
+                if dernier_point is not None and abs(x - dernier_point[0]) + abs(y - dernier_point[1]) < 1e-9:
                     continue
+                dernier_point = (x, y)
 
-                for point in points_intersection:
-                    # Obtenir la valeur Z au point d'intersection
-                    z_value = self.obtenir_z_tin(point)
-                    if z_value is None:
-                        continue
-
-                    feature_point = QgsFeature()
-                    feature_point.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(point)))  # MODIFICATION
-                    attributs = [None] * len(self.champs)
-                    attributs[self.index_objectid] = None
-                    attributs[self.index_z] = z_value
-                    feature_point.setAttributes(attributs)
-                    nouveaux_points_segment.append(feature_point)
-                    logging.debug(f'Intersections: Point ajouté à {point} avec Z={z_value}')
+                feature_point = QgsFeature()
+                feature_point.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+                attributs = [None] * len(self.champs)
+                attributs[self.index_objectid] = None
+                attributs[self.index_z] = z_value
+                feature_point.setAttributes(attributs)
+                nouveaux_points_segment.append(feature_point)
 
+        logging.debug(f'Intersections : {len(nouveaux_points_segment)} points ajoutés sur le segment.')
         return nouveaux_points_segment
 
     def obtenir_z_tin(self, point_xy):
         """
-        Obtient la valeur Z du TIN au point donné.
+        Obtient la valeur Z du TIN au point donné, par interpolation barycentrique dans le triangle qui le
+        contient.
 
         Parameters
         ----------
@@ -647,11 +929,11 @@ class ProlongementDesProfils:
             La valeur Z ou None si non disponible.
         """
 
-        # Utiliser le dataProvider pour identifier la valeur Z au point donné
-        mesh_dp = self.couche_mnt.dataProvider()
-        z_value, ok = mesh_dp.sample(point_xy, -1)  # -1 pour la valeur de temps par défaut
-        if not ok:
-            logging.warning(f'Échantillonnage MNT échoué au point: {point_xy}')
+        if self.maillage_tin is None:
+            self.maillage_tin = MaillageTIN.depuis_couche(self.couche_mnt)
+        z_value = float(self.maillage_tin.altitudes(point_xy.x(), point_xy.y())[0])
+        if z_value != z_value:
+            logging.warning(f'Point hors du maillage : {point_xy}')
             return None
         return z_value
 
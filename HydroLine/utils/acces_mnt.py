@@ -0,0 +1,642 @@
+# utils/acces_mnt.py
+
+
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from osgeo import gdal, gdal_array
+
+from .mnt_compact import codage_altitudes
+
+# Plafond mémoire par défaut du cache de tuiles d'un MNT (octets)
+MEMOIRE_CACHE_MNT_DEFAUT = 512 * 1024 ** 2
+
+
+class AccesseurMNT:
+    """
+    Accès fenêtré à la bande d'un MNT, avec cache LRU de tuiles et préchargement.
+
+    L'objet se manipule comme le tableau NumPy de la bande : `mnt[py, px]`, `mnt[y0:y1, x0:x1]`,
+    `mnt[tableau_py, tableau_px]`, `mnt.shape`, `mnt.dtype`. Les tuiles (alignées sur les blocs GDAL
+    du fichier lorsqu'ils ont une taille raisonnable) sont lues à la demande et conservées dans un cache LRU
+    dont l'empreinte mémoire est plafonnée. Seule la conversion explicite en tableau (`np.asarray(mnt)`)
+    lit la bande entière.
+
+    Lorsqu'un cache disque est fourni et contient déjà le MNT, les lectures se font directement dans sa projection
+    mémoire (np.memmap, lecture seule) : ni décodage GDAL ni cache de tuiles ne sont alors nécessaires.
+
+    En mode compact, les tuiles sont conservées sous forme d'altitudes entières en décimètres (int16, ou int32
+    si la plage d'altitudes l'exige ; voir `codage_altitudes`) et décodées à la lecture : le cache contient deux
+    fois plus de tuiles sous le même plafond mémoire. Le codage est sans perte pour le MNT préparé, arrondi au
+    décimètre ; pour un autre MNT, les altitudes lues sont arrondies au décimètre. La vue `codes` donne accès
+    aux codes eux-mêmes, dont l'ordre et les égalités sont ceux des altitudes.
+
+    L'objet peut être partagé entre l'interface et les threads de calcul : chaque thread lit le fichier par
+    son propre dataset GDAL, hors de tout verrou, et le verrou ne protège que le cache de tuiles. Une lecture
+    longue (conversion de la bande entière, remplissage du cache disque) ne bloque donc pas les lectures de
+    l'interface.
+
+    Attributes
+    ----------
+    chemin : str
+        Source GDAL du MNT.
+    shape : tuple of int
+        Dimensions (lignes, colonnes) de la bande.
+    dtype : np.dtype
+        Type des valeurs lues (celui de la bande, float32 en mode compact).
+    dtype_bande : np.dtype
+        Type des valeurs de la bande dans le fichier (et dans le cache disque).
+    dtype_stockage : np.dtype
+        Type des tuiles conservées dans le cache mémoire.
+    nodata : float or None
+        Valeur sans donnée de la bande.
+    taille_tuile : tuple of int
+        Dimensions (lignes, colonnes) d'une tuile du cache.
+    memoire_max : int
+        Plafond mémoire du cache en octets.
+    rayon_prechargement : int
+        Nombre de tuiles préchargées de part et d'autre de la tuile demandée.
+    cache_disque : CacheDisqueMNT or None
+        Cache disque dans lequel le MNT décodé est conservé entre les sessions.
+    memmap : np.memmap or None
+        Projection mémoire du MNT dans le cache disque, si elle est disponible.
+    codage : CodageLineaire or None
+        Codage entier des tuiles en mode compact, None sinon.
+    codes : AccesseurMNT or VueCodesMNT
+        Accès aux altitudes codées (l'accesseur lui-même hors mode compact).
+
+    Methods
+    -------
+    lire_fenetre(y0, y1, x0, x1)
+        Lit une fenêtre rectangulaire de la bande.
+    tuiles_fenetre(y0, y1, x0, x1)
+        Retourne les indices (ty, tx) des tuiles couvrant une fenêtre.
+    est_pret(y0, y1, x0, x1)
+        Indique si toutes les tuiles d'une fenêtre sont en cache.
+    charger_tuiles(ty, tx0, tx1)
+        Lit en une fois une suite de tuiles d'une même rangée et les place en cache.
+    lire_bloc(y0, y1, x0, x1)
+        Lit une fenêtre directement dans le fichier, sans passer par le cache de tuiles.
+    attacher_memmap(memmap)
+        Bascule les lectures sur la projection mémoire du cache disque.
+    remplir_cache_disque()
+        Écrit le MNT dans le cache disque bloc par bloc, puis bascule sur sa projection mémoire.
+    precharger(px, py)
+        Demande le chargement en arrière-plan des tuiles autour d'un pixel.
+    vider_cache()
+        Libère toutes les tuiles en cache.
+    fermer()
+        Arrête le préchargement et ferme le dataset GDAL.
+    """
+
+    ndim = 2
+
+    def __init__(self, chemin, numero_bande=1, memoire_max=MEMOIRE_CACHE_MNT_DEFAUT, rayon_prechargement=1,
+                 cache_disque=None, compact=False):
+        """
+        Ouvre la bande du MNT sans la lire.
+
+        Parameters
+        ----------
+        chemin : str
+            Source GDAL du MNT.
+        numero_bande : int, optional
+            Numéro de la bande à lire, par défaut 1.
+        memoire_max : int, optional
+            Plafond mémoire du cache en octets, par défaut MEMOIRE_CACHE_MNT_DEFAUT.
+        rayon_prechargement : int, optional
+            Nombre de tuiles préchargées autour de la tuile demandée, par défaut 1.
+        cache_disque : CacheDisqueMNT, optional
+            Cache disque du MNT décodé, par défaut None.
+        compact : bool, optional
+            True pour conserver les tuiles en décimètres entiers, par défaut False.
+
+        Raises
+        ------
+        IOError
+            Si le MNT ne peut pas être ouvert.
+        """
+        self.chemin = chemin
+        self.dataset = gdal.Open(chemin)
+        if self.dataset is None:
+            raise IOError(f"Impossible d'ouvrir le MNT : {chemin}")
+        self.bande = self.dataset.GetRasterBand(numero_bande)
+        self.numero_bande = numero_bande
+        self.shape = (self.dataset.RasterYSize, self.dataset.RasterXSize)
+        self.dtype = np.dtype(gdal_array.GDALTypeCodeToNumericTypeCode(self.bande.DataType))
+        self.dtype_bande = self.dtype
+        self.nodata = self.bande.GetNoDataValue()
+        self.gt = self.dataset.GetGeoTransform()
+
+        bloc_x, bloc_y = self.bande.GetBlockSize()
+        self.taille_tuile = (bloc_y if 256 <= bloc_y <= 2048 else 512,
+                             bloc_x if 256 <= bloc_x <= 2048 else 512)
+        self.memoire_max = memoire_max
+        self.rayon_prechargement = rayon_prechargement
+
+        self.cache = OrderedDict()
+        self.memoire_utilisee = 0
+        self.verrou = threading.RLock()
+        # Datasets GDAL ouverts par les autres threads que celui de création, par identifiant de thread
+        self.thread_creation = threading.get_ident()
+        self.bandes_threads = {}
+        self.file_prechargement = queue.Queue()
+        self.thread_prechargement = None
+
+        self.cache_disque = cache_disque
+        self.memmap = None
+        if cache_disque is not None and numero_bande == 1:
+            self.memmap = cache_disque.ouvrir(chemin, self.shape, self.dtype_bande)
+
+        self.codage = None
+        if compact:
+            # Plage approchée (aperçus) : la marge du codage couvre l'écart avec les extrêmes réels
+            zmin, zmax = self.bande.ComputeRasterMinMax(True)
+            self.codage = codage_altitudes(zmin, zmax, self.nodata)
+            self.dtype = np.dtype(np.float32)
+        self.dtype_stockage = self.codage.dtype if self.codage is not None else self.dtype_bande
+
+    @property
+    def codes(self):
+        return VueCodesMNT(self) if self.codage is not None else self
+
+    def _stocker(self, valeurs):
+        """
+        Retourne la tuile telle qu'elle est conservée en cache (codée en mode compact), en lecture seule.
+        """
+        if self.codage is not None:
+            valeurs = self.codage.encoder(valeurs)
+        valeurs.setflags(write=False)
+        return valeurs
+
+    def _restituer(self, valeurs, codes=False, brutes=False):
+        """
+        Convertit des valeurs lues vers l'espace demandé (altitudes ou codes) ; `brutes` indique des valeurs
+        de la bande (projection mémoire) plutôt que des valeurs du cache de tuiles.
+        """
+        if self.codage is None:
+            return valeurs
+        if brutes:
+            # Valeurs de la bande arrondies comme celles du cache de tuiles
+            valeurs = self.codage.encoder(valeurs)
+        return valeurs if codes else self.codage.decoder(valeurs)
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def _bande_thread(self):
+        """
+        Retourne la bande GDAL propre au thread appelant, ouverte à sa première lecture.
+
+        Un dataset GDAL ne doit pas être lu par plusieurs threads à la fois : chaque thread a le sien, ce qui
+        permet de lire le fichier sans tenir le verrou du cache.
+
+        Raises
+        ------
+        IOError
+            Si le MNT a été fermé.
+        """
+        bande = self.bande
+        if bande is None:
+            raise IOError(f"MNT fermé : {self.chemin}")
+        identifiant = threading.get_ident()
+        if identifiant == self.thread_creation:
+            return bande
+        with self.verrou:
+            ouvert = self.bandes_threads.get(identifiant)
+        if ouvert is None:
+            dataset = gdal.Open(self.chemin)
+            if dataset is None:
+                raise IOError(f"Impossible d'ouvrir le MNT : {self.chemin}")
+            ouvert = (dataset, dataset.GetRasterBand(self.numero_bande))
+            with self.verrou:
+                if self.bande is None:
+                    raise IOError(f"MNT fermé : {self.chemin}")
+                self.bandes_threads[identifiant] = ouvert
+        return ouvert[1]
+
+    def _lire(self, x0=None, y0=None, largeur=None, hauteur=None):
+        """
+        Lit une fenêtre de la bande (la bande entière sans argument) par le dataset du thread, sans verrou.
+        """
+        bande = self._bande_thread()
+        if x0 is None:
+            return bande.ReadAsArray()
+        return bande.ReadAsArray(x0, y0, largeur, hauteur)
+
+    def _inserer(self, cle, tuile):
+        """
+        Place une tuile en cache et évince les plus anciennes au-delà du plafond ; à appeler sous le verrou.
+        """
+        self.cache[cle] = tuile
+        self.memoire_utilisee += tuile.nbytes
+        while self.memoire_utilisee > self.memoire_max and len(self.cache) > 1:
+            _, ancienne = self.cache.popitem(last=False)
+            self.memoire_utilisee -= ancienne.nbytes
+
+    def _tuile(self, ty, tx):
+        """
+        Retourne la tuile (ty, tx) du cache de tuiles (codée en mode compact), lue dans le fichier si besoin.
+
+        Le verrou n'est tenu que pour consulter et compléter le cache : deux threads demandant la même tuile
+        absente peuvent la lire tous deux, la première insérée est conservée.
+        """
+        with self.verrou:
+            tuile = self.cache.get((ty, tx))
+            if tuile is not None:
+                self.cache.move_to_end((ty, tx))
+                return tuile
+
+        hauteur, largeur = self.taille_tuile
+        y0 = ty * hauteur
+        x0 = tx * largeur
+        tuile = self._stocker(self._lire(x0, y0, min(largeur, self.shape[1] - x0), min(hauteur, self.shape[0] - y0)))
+
+        with self.verrou:
+            existante = self.cache.get((ty, tx))
+            if existante is not None:
+                self.cache.move_to_end((ty, tx))
+                return existante
+            self._inserer((ty, tx), tuile)
+        return tuile
+
+    def lire_fenetre(self, y0, y1, x0, x1, codes=False):
+        """
+        Lit une fenêtre rectangulaire de la bande en assemblant les tuiles du cache.
+
+        Parameters
+        ----------
+        y0, y1 : int
+            Première et dernière (exclue) lignes de la fenêtre, bornées à la bande.
+        x0, x1 : int
+            Première et dernière (exclue) colonnes de la fenêtre, bornées à la bande.
+        codes : bool, optional
+            True pour lire les altitudes codées du mode compact, par défaut False.
+
+        Returns
+        -------
+        np.ndarray
+            Copie des valeurs de la fenêtre.
+        """
+        memmap = self.memmap
+        if memmap is not None:
+            return self._restituer(np.array(memmap[y0:max(y1, y0), x0:max(x1, x0)]), codes, brutes=True)
+        hauteur, largeur = self.taille_tuile
+        fenetre = np.empty((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=self.dtype_stockage)
+        if fenetre.size == 0:
+            return self._restituer(fenetre, codes)
+        rangees, colonnes = self.tuiles_fenetre(y0, y1, x0, x1)
+        for ty in rangees:
+            for tx in colonnes:
+                tuile = self._tuile(ty, tx)
+                ty0 = ty * hauteur
+                tx0 = tx * largeur
+                a0 = max(y0, ty0)
+                a1 = min(y1, ty0 + tuile.shape[0])
+                b0 = max(x0, tx0)
+                b1 = min(x1, tx0 + tuile.shape[1])
+                fenetre[a0 - y0:a1 - y0, b0 - x0:b1 - x0] = tuile[a0 - ty0:a1 - ty0, b0 - tx0:b1 - tx0]
+        return self._restituer(fenetre, codes)
+
+    def tuiles_fenetre(self, y0, y1, x0, x1):
+        """
+        Retourne les indices des tuiles couvrant une fenêtre.
+
+        Parameters
+        ----------
+        y0, y1 : int
+            Première et dernière (exclue) lignes de la fenêtre.
+        x0, x1 : int
+            Première et dernière (exclue) colonnes de la fenêtre.
+
+        Returns
+        -------
+        tuple of range
+            Rangées (ty) et colonnes (tx) de tuiles couvrant la fenêtre, vides si la fenêtre l'est.
+        """
+        hauteur, largeur = self.taille_tuile
+        y0, y1 = max(y0, 0), min(y1, self.shape[0])
+        x0, x1 = max(x0, 0), min(x1, self.shape[1])
+        if y1 <= y0 or x1 <= x0:
+            return range(0), range(0)
+        return range(y0 // hauteur, (y1 - 1) // hauteur + 1), range(x0 // largeur, (x1 - 1) // largeur + 1)
+
+    def est_pret(self, y0, y1, x0, x1):
+        """
+        Indique si toutes les tuiles d'une fenêtre sont en cache (lecture sans accès disque).
+
+        Parameters
+        ----------
+        y0, y1 : int
+            Première et dernière (exclue) lignes de la fenêtre.
+        x0, x1 : int
+            Première et dernière (exclue) colonnes de la fenêtre.
+
+        Returns
+        -------
+        bool
+            True si la fenêtre peut être lue depuis le cache.
+        """
+        if self.memmap is not None:
+            return True
+        rangees, colonnes = self.tuiles_fenetre(y0, y1, x0, x1)
+        with self.verrou:
+            return all((ty, tx) in self.cache for ty in rangees for tx in colonnes)
+
+    def charger_tuiles(self, ty, tx0, tx1):
+        """
+        Lit en une seule lecture GDAL les tuiles (ty, tx0) à (ty, tx1 - 1) et les place en cache.
+
+        Les tuiles déjà en cache ne sont pas remplacées. Utilisé pour le chargement du MNT par bandeaux,
+        plus efficace que des lectures tuile par tuile sur les fichiers organisés en bandes.
+
+        Parameters
+        ----------
+        ty : int
+            Rangée de tuiles.
+        tx0, tx1 : int
+            Première et dernière (exclue) colonnes de tuiles.
+
+        Returns
+        -------
+        np.ndarray or None
+            Valeurs lues (lignes de la rangée, colonnes des tuiles), ou None si les tuiles sont hors du MNT.
+        """
+        hauteur, largeur = self.taille_tuile
+        tx1 = min(tx1, -(-self.shape[1] // largeur))
+        y0 = ty * hauteur
+        x0 = tx0 * largeur
+        h = min(hauteur, self.shape[0] - y0)
+        w = min(tx1 * largeur, self.shape[1]) - x0
+        if h <= 0 or w <= 0:
+            return None
+        bloc = self._lire(x0, y0, w, h)
+        tuiles = {}
+        for tx in range(tx0, tx1):
+            a = tx * largeur - x0
+            tuiles[(ty, tx)] = self._stocker(bloc[:, a:a + largeur].copy())
+        with self.verrou:
+            for cle, tuile in tuiles.items():
+                if cle not in self.cache:
+                    self._inserer(cle, tuile)
+        return bloc
+
+    def lire_bloc(self, y0, y1, x0, x1):
+        """
+        Lit une fenêtre directement dans le fichier, sans passer par le cache de tuiles.
+
+        Utilisé pour remplir le cache disque sans évincer les tuiles utiles à l'interface.
+
+        Parameters
+        ----------
+        y0, y1 : int
+            Première et dernière (exclue) lignes de la fenêtre, bornées à la bande.
+        x0, x1 : int
+            Première et dernière (exclue) colonnes de la fenêtre, bornées à la bande.
+
+        Returns
+        -------
+        np.ndarray
+            Valeurs de la fenêtre.
+        """
+        return self._lire(x0, y0, x1 - x0, y1 - y0)
+
+    def attacher_memmap(self, memmap):
+        """
+        Bascule les lectures sur la projection mémoire du cache disque et libère le cache de tuiles.
+
+        Parameters
+        ----------
+        memmap : np.memmap
+            Valeurs du MNT projetées depuis le cache disque.
+        """
+        if memmap is None or tuple(memmap.shape) != tuple(self.shape):
+            return
+        with self.verrou:
+            self.memmap = memmap
+            self.cache.clear()
+            self.memoire_utilisee = 0
+
+    def remplir_cache_disque(self):
+        """
+        Écrit le MNT dans le cache disque par bandeaux de tuiles lus avec `lire_bloc`, puis bascule les lectures
+        sur la projection mémoire de l'entrée.
+
+        La bande n'est jamais lue en entier en mémoire : seul un bandeau est présent à la fois, et le cache
+        de tuiles n'est pas sollicité.
+
+        Returns
+        -------
+        bool
+            True si le MNT est désormais lu depuis le cache disque.
+        """
+        if self.memmap is not None:
+            return True
+        if self.cache_disque is None or self.numero_bande != 1:
+            return False
+        ecriture = self.cache_disque.creer(self.chemin, self.shape, self.dtype_bande, self.gt, self.nodata)
+        if ecriture is None:
+            return False
+        lignes, colonnes = self.shape
+        hauteur = self.taille_tuile[0]
+        try:
+            for y0 in range(0, lignes, hauteur):
+                y1 = min(y0 + hauteur, lignes)
+                ecriture.ecrire(y0, 0, self.lire_bloc(y0, y1, 0, colonnes))
+        except OSError:
+            # Disque plein ou inaccessible : lecture directe du fichier
+            ecriture.abandonner()
+            return False
+        self.attacher_memmap(ecriture.valider())
+        return self.memmap is not None
+
+    def _lire_points(self, lignes, colonnes, codes=False):
+        """
+        Lit des pixels dispersés, tuile par tuile.
+        """
+        lignes = np.asarray(lignes, dtype=np.int64)
+        colonnes = np.asarray(colonnes, dtype=np.int64)
+        lignes, colonnes = np.broadcast_arrays(lignes, colonnes)
+        lignes = np.where(lignes < 0, lignes + self.shape[0], lignes)
+        colonnes = np.where(colonnes < 0, colonnes + self.shape[1], colonnes)
+        if ((lignes < 0) | (lignes >= self.shape[0]) | (colonnes < 0) | (colonnes >= self.shape[1])).any():
+            raise IndexError("Indice hors des limites du MNT")
+
+        memmap = self.memmap
+        if memmap is not None:
+            return self._restituer(np.asarray(memmap[lignes, colonnes]), codes, brutes=True)
+
+        hauteur, largeur = self.taille_tuile
+        valeurs = np.empty(lignes.shape, dtype=self.dtype_stockage)
+        numeros = (lignes // hauteur) * (self.shape[1] // largeur + 1) + colonnes // largeur
+        for numero in np.unique(numeros):
+            selection = numeros == numero
+            sel_lignes = lignes[selection]
+            sel_colonnes = colonnes[selection]
+            ty = int(sel_lignes.flat[0]) // hauteur
+            tx = int(sel_colonnes.flat[0]) // largeur
+            tuile = self._tuile(ty, tx)
+            valeurs[selection] = tuile[sel_lignes - ty * hauteur, sel_colonnes - tx * largeur]
+        return self._restituer(valeurs, codes)
+
+    def __getitem__(self, cle):
+        return self._indexer(cle)
+
+    def _indexer(self, cle, codes=False):
+        """
+        Indexation NumPy du MNT : pixel, tranches ou tableaux d'indices ; altitudes ou codes du mode compact.
+        """
+        if not isinstance(cle, tuple):
+            cle = (cle, slice(None))
+        if len(cle) != 2:
+            raise IndexError("Le MNT est indexé par (ligne, colonne)")
+
+        if all(isinstance(c, (int, np.integer)) for c in cle):
+            py = int(cle[0]) + self.shape[0] if cle[0] < 0 else int(cle[0])
+            px = int(cle[1]) + self.shape[1] if cle[1] < 0 else int(cle[1])
+            if not (0 <= py < self.shape[0] and 0 <= px < self.shape[1]):
+                raise IndexError("Indice hors des limites du MNT")
+            memmap = self.memmap
+            if memmap is not None:
+                return self._restituer(memmap[py, px], codes, brutes=True)
+            hauteur, largeur = self.taille_tuile
+            return self._restituer(self._tuile(py // hauteur, px // largeur)[py % hauteur, px % largeur], codes)
+
+        if all(isinstance(c, (slice, int, np.integer)) for c in cle):
+            # Fenêtre englobante lue depuis le cache, puis pas et indices entiers appliqués par NumPy
+            bornes = []
+            selection = []
+            for c, taille in zip(cle, self.shape):
+                if isinstance(c, slice):
+                    debut, fin, pas = c.indices(taille)
+                    if pas < 0:
+                        return self._restituer(self.__array__(brut=True)[cle], codes, brutes=True)
+                    bornes.append((debut, max(fin, debut)))
+                    selection.append(slice(None, None, pas))
+                else:
+                    indice = int(c) + taille if c < 0 else int(c)
+                    if not 0 <= indice < taille:
+                        raise IndexError("Indice hors des limites du MNT")
+                    bornes.append((indice, indice + 1))
+                    selection.append(0)
+            (y0, y1), (x0, x1) = bornes
+            return self.lire_fenetre(y0, y1, x0, x1, codes)[tuple(selection)]
+
+        # Indexation avancée par tableaux d'indices
+        return self._lire_points(cle[0], cle[1], codes)
+
+    def __array__(self, dtype=None, copy=None, brut=False):
+        if self.memmap is None:
+            # Le MNT entier est demandé : il passe par le cache disque plutôt que par une lecture d'un seul bloc
+            self.remplir_cache_disque()
+        if self.memmap is not None:
+            # Vue en lecture seule sur les pages partagées, sauf conversion ou copie demandée
+            tableau = np.asarray(self.memmap).view(np.ndarray)
+            if copy:
+                tableau = tableau.copy()
+        else:
+            tableau = self._lire()
+        if self.codage is not None and not brut:
+            # Valeurs identiques à celles des lectures fenêtrées (arrondies au décimètre), par bandes de lignes
+            arrondi = np.empty(tableau.shape, dtype=self.dtype)
+            for y0 in range(0, tableau.shape[0], 1024):
+                arrondi[y0:y0 + 1024] = self._restituer(tableau[y0:y0 + 1024], brutes=True)
+            tableau = arrondi
+        if dtype is not None:
+            tableau = tableau.astype(dtype, copy=False)
+        return tableau
+
+    def __len__(self):
+        return self.shape[0]
+
+    def precharger(self, px, py):
+        """
+        Demande le chargement en arrière-plan des tuiles autour d'un pixel.
+
+        Parameters
+        ----------
+        px, py : int
+            Pixel (colonne, ligne) autour duquel précharger.
+        """
+        if self.memmap is not None:
+            return
+        hauteur, largeur = self.taille_tuile
+        ty_centre = py // hauteur
+        tx_centre = px // largeur
+        rayon = self.rayon_prechargement
+        for ty in range(ty_centre - rayon, ty_centre + rayon + 1):
+            for tx in range(tx_centre - rayon, tx_centre + rayon + 1):
+                if 0 <= ty * hauteur < self.shape[0] and 0 <= tx * largeur < self.shape[1] \
+                        and (ty, tx) not in self.cache:
+                    self.file_prechargement.put((ty, tx))
+
+        if self.thread_prechargement is None or not self.thread_prechargement.is_alive():
+            self.thread_prechargement = threading.Thread(target=self._boucle_prechargement, daemon=True)
+            self.thread_prechargement.start()
+
+    def _boucle_prechargement(self):
+        """
+        Charge les tuiles demandées jusqu'à épuisement de la file.
+        """
+        while True:
+            try:
+                tuile = self.file_prechargement.get(timeout=1.0)
+            except queue.Empty:
+                return
+            if tuile is None or self.memmap is not None:
+                return
+            self._tuile(*tuile)
+
+    def vider_cache(self):
+        """
+        Libère toutes les tuiles en cache.
+        """
+        with self.verrou:
+            self.cache.clear()
+            self.memoire_utilisee = 0
+
+    def fermer(self):
+        """
+        Arrête le préchargement et ferme le dataset GDAL.
+        """
+        self.file_prechargement.put(None)
+        with self.verrou:
+            self.vider_cache()
+            self.memmap = None
+            self.bande = None
+            self.dataset = None
+            self.bandes_threads.clear()
+
+
+class VueCodesMNT:
+    """
+    Vue des altitudes codées d'un AccesseurMNT en mode compact.
+
+    La vue s'indexe comme l'accesseur mais retourne les codes entiers, sans décodage : les comparaisons
+    (extrêmes, égalités) portent sur des entiers deux à quatre fois plus petits que les altitudes flottantes.
+
+    Attributes
+    ----------
+    accesseur : AccesseurMNT
+        Accesseur du MNT.
+    shape : tuple of int
+        Dimensions du MNT.
+    dtype : np.dtype
+        Type des codes.
+    """
+
+    ndim = 2
+
+    def __init__(self, accesseur):
+        self.accesseur = accesseur
+        self.shape = accesseur.shape
+        self.dtype = accesseur.codage.dtype
+
+    def __getitem__(self, cle):
+        return self.accesseur._indexer(cle, codes=True)
+
+    def __len__(self):
+        return self.shape[0]
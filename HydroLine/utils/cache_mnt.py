@@ -0,0 +1,349 @@
+# utils/cache_mnt.py
+
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Répertoire et taille maximale par défaut du cache disque des MNT
+REPERTOIRE_CACHE_MNT_DEFAUT = os.path.join(tempfile.gettempdir(), 'hydroline_cache_mnt')
+TAILLE_MAX_CACHE_MNT_DEFAUT = 8 * 1024 ** 3
+
+_cache_disque_mnt = None
+
+
+def obtenir_cache_disque_mnt():
+    """
+    Retourne le cache disque des MNT partagé par tous les outils du plugin.
+
+    Returns
+    -------
+    CacheDisqueMNT
+        Cache disque créé au premier appel avec les paramètres par défaut.
+    """
+    global _cache_disque_mnt
+    if _cache_disque_mnt is None:
+        _cache_disque_mnt = CacheDisqueMNT()
+    return _cache_disque_mnt
+
+
+class CacheDisqueMNT:
+    """
+    Cache disque des MNT décodés, lus par projection mémoire (np.memmap).
+
+    Chaque entrée est un fichier brut (valeurs de la bande en ordre ligne par ligne, type natif de la bande)
+    accompagné d'un petit en-tête JSON (dimensions, type, géotransformation, valeur sans donnée, source).
+    L'entrée est identifiée par le chemin, la taille et la date de modification du fichier source : un MNT
+    modifié n'est jamais lu depuis une entrée périmée. Les entrées étant projetées en lecture seule, plusieurs
+    instances de QGIS du même poste partagent leurs pages via le cache du système au lieu d'en garder chacune
+    une copie. Les entrées les moins récemment utilisées sont supprimées au-delà de la taille maximale.
+
+    Attributes
+    ----------
+    repertoire : str
+        Répertoire du cache.
+    taille_max : int
+        Taille maximale cumulée des entrées en octets.
+
+    Methods
+    -------
+    cle(source)
+        Retourne la clé d'entrée d'un MNT source.
+    ouvrir(source, shape, dtype)
+        Projette en mémoire l'entrée d'un MNT, si elle existe.
+    creer(source, shape, dtype, gt, nodata)
+        Prépare l'écriture d'une nouvelle entrée.
+    evincer(conserver=None)
+        Supprime les entrées les moins récemment utilisées au-delà de la taille maximale.
+    taille_totale()
+        Retourne la taille cumulée des entrées.
+    """
+
+    def __init__(self, repertoire=REPERTOIRE_CACHE_MNT_DEFAUT, taille_max=TAILLE_MAX_CACHE_MNT_DEFAUT):
+        """
+        Initialise le cache disque.
+
+        Parameters
+        ----------
+        repertoire : str, optional
+            Répertoire du cache, par défaut REPERTOIRE_CACHE_MNT_DEFAUT.
+        taille_max : int, optional
+            Taille maximale cumulée des entrées en octets, par défaut TAILLE_MAX_CACHE_MNT_DEFAUT.
+        """
+        self.repertoire = repertoire
+        self.taille_max = taille_max
+
+    def cle(self, source):
+        """
+        Retourne la clé d'entrée d'un MNT source.
+
+        Parameters
+        ----------
+        source : str
+            Chemin du MNT.
+
+        Returns
+        -------
+        str or None
+            Empreinte du chemin, de la taille et de la date de modification, ou None si la source
+            n'est pas un fichier local (le MNT n'est alors pas mis en cache).
+        """
+        try:
+            chemin = os.path.abspath(source)
+            etat = os.stat(chemin)
+        except (OSError, ValueError):
+            return None
+        empreinte = f"{os.path.normcase(chemin)}|{etat.st_size}|{etat.st_mtime_ns}"
+        return hashlib.sha1(empreinte.encode('utf-8')).hexdigest()
+
+    def _chemins(self, cle):
+        base = os.path.join(self.repertoire, cle)
+        return base + '.raw', base + '.json'
+
+    def ouvrir(self, source, shape, dtype):
+        """
+        Projette en mémoire, en lecture seule, l'entrée d'un MNT si elle existe et correspond au raster.
+
+        Parameters
+        ----------
+        source : str
+            Chemin du MNT.
+        shape : tuple of int
+            Dimensions (lignes, colonnes) attendues.
+        dtype : np.dtype
+            Type attendu des valeurs.
+
+        Returns
+        -------
+        np.memmap or None
+            Valeurs du MNT, ou None si l'entrée est absente ou invalide.
+        """
+        cle = self.cle(source)
+        if cle is None:
+            return None
+        chemin_brut, chemin_entete = self._chemins(cle)
+        try:
+            with open(chemin_entete, 'r', encoding='utf-8') as fichier:
+                entete = json.load(fichier)
+            if tuple(entete['shape']) != tuple(shape) or np.dtype(entete['dtype']) != np.dtype(dtype):
+                return None
+            if os.path.getsize(chemin_brut) != int(np.prod(shape)) * np.dtype(dtype).itemsize:
+                return None
+            valeurs = np.memmap(chemin_brut, dtype=np.dtype(dtype), mode='r', shape=tuple(shape))
+            # La date de l'en-tête sert de date de dernier accès pour l'éviction
+            os.utime(chemin_entete)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return valeurs
+
+    def creer(self, source, shape, dtype, gt, nodata):
+        """
+        Prépare l'écriture d'une nouvelle entrée dans un fichier temporaire.
+
+        Parameters
+        ----------
+        source : str
+            Chemin du MNT.
+        shape : tuple of int
+            Dimensions (lignes, colonnes) du MNT.
+        dtype : np.dtype
+            Type des valeurs.
+        gt : tuple
+            Géotransformation du MNT.
+        nodata : float or None
+            Valeur sans donnée de la bande.
+
+        Returns
+        -------
+        EcritureCacheMNT or None
+            Entrée en cours d'écriture, ou None si la source ne peut pas être mise en cache.
+        """
+        cle = self.cle(source)
+        if cle is None:
+            return None
+        taille = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if taille > self.taille_max:
+            return None
+        try:
+            os.makedirs(self.repertoire, exist_ok=True)
+            return EcritureCacheMNT(self, cle, source, shape, dtype, gt, nodata)
+        except OSError:
+            return None
+
+    def _entrees(self):
+        """
+        Retourne les entrées complètes du cache : (date de dernier accès, taille, clé).
+        """
+        entrees = []
+        try:
+            noms = os.listdir(self.repertoire)
+        except OSError:
+            return entrees
+        for nom in noms:
+            if not nom.endswith('.json'):
+                continue
+            cle = nom[:-5]
+            chemin_brut, chemin_entete = self._chemins(cle)
+            try:
+                entrees.append((os.path.getmtime(chemin_entete), os.path.getsize(chemin_brut), cle))
+            except OSError:
+                continue
+        return entrees
+
+    def taille_totale(self):
+        """
+        Retourne la taille cumulée des entrées du cache.
+
+        Returns
+        -------
+        int
+            Taille en octets.
+        """
+        return sum(taille for _, taille, _ in self._entrees())
+
+    def evincer(self, conserver=None):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à revenir sous la taille maximale,
+        ainsi que les écritures temporaires abandonnées.
+
+        Parameters
+        ----------
+        conserver : str, optional
+            Clé d'une entrée à ne pas supprimer, par défaut None.
+        """
+        entrees = sorted(self._entrees())
+        taille = sum(t for _, t, _ in entrees)
+        for _, taille_entree, cle in entrees:
+            if taille <= self.taille_max:
+                break
+            if cle == conserver:
+                continue
+            chemin_brut, chemin_entete = self._chemins(cle)
+            try:
+                # L'en-tête d'abord : une entrée sans en-tête n'est plus jamais ouverte
+                os.remove(chemin_entete)
+                os.remove(chemin_brut)
+            except OSError:
+                # Entrée encore projetée par une autre instance (Windows) : conservée
+                continue
+            taille -= taille_entree
+
+        limite = time.time() - 24 * 3600
+        try:
+            noms = os.listdir(self.repertoire)
+        except OSError:
+            return
+        for nom in noms:
+            chemin = os.path.join(self.repertoire, nom)
+            try:
+                if nom.endswith('.tmp') and os.path.getmtime(chemin) < limite:
+                    os.remove(chemin)
+            except OSError:
+                continue
+
+
+class EcritureCacheMNT:
+    """
+    Entrée du cache disque en cours d'écriture.
+
+    Les valeurs sont écrites par blocs dans un fichier temporaire, à n'importe quelle position ; l'entrée n'est
+    publiée (renommage atomique, puis en-tête) qu'une fois le MNT entièrement écrit. L'écriture passe par des
+    écritures fichier classiques plutôt que par une projection mémoire, pour qu'un disque plein lève une OSError.
+
+    Methods
+    -------
+    ecrire(y0, x0, bloc)
+        Écrit un bloc de valeurs à sa position dans le MNT.
+    valider()
+        Publie l'entrée et retourne sa projection en lecture seule.
+    abandonner()
+        Supprime le fichier temporaire.
+    """
+
+    def __init__(self, cache, cle, source, shape, dtype, gt, nodata):
+        self.cache = cache
+        self.cle = cle
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.entete = {
+            'source': source,
+            'shape': list(self.shape),
+            'dtype': self.dtype.str,
+            'gt': list(gt),
+            'nodata': nodata,
+        }
+        self.chemin_brut, self.chemin_entete = cache._chemins(cle)
+        self.chemin_temporaire = f"{self.chemin_brut}.{os.getpid()}.{id(self)}.tmp"
+        self.fichier = open(self.chemin_temporaire, 'w+b')
+        self.fichier.truncate(int(np.prod(self.shape)) * self.dtype.itemsize)
+
+    def ecrire(self, y0, x0, bloc):
+        """
+        Écrit un bloc de valeurs à sa position dans le MNT.
+
+        Parameters
+        ----------
+        y0, x0 : int
+            Ligne et colonne du coin supérieur gauche du bloc.
+        bloc : np.ndarray
+            Valeurs à écrire.
+
+        Raises
+        ------
+        OSError
+            Si l'écriture échoue (disque plein, fichier inaccessible).
+        """
+        bloc = np.ascontiguousarray(bloc, dtype=self.dtype)
+        colonnes = self.shape[1]
+        taille_valeur = self.dtype.itemsize
+        if x0 == 0 and bloc.shape[1] == colonnes:
+            self.fichier.seek(y0 * colonnes * taille_valeur)
+            self.fichier.write(bloc.tobytes())
+            return
+        for i in range(bloc.shape[0]):
+            self.fichier.seek(((y0 + i) * colonnes + x0) * taille_valeur)
+            self.fichier.write(bloc[i].tobytes())
+
+    def valider(self):
+        """
+        Publie l'entrée et retourne sa projection en lecture seule.
+
+        Returns
+        -------
+        np.memmap or None
+            Valeurs du MNT, ou None si l'entrée n'a pas pu être publiée.
+        """
+        try:
+            self.fichier.close()
+            try:
+                os.replace(self.chemin_temporaire, self.chemin_brut)
+            except OSError:
+                # Entrée publiée entre-temps par une autre instance et projetée par celle-ci
+                self.abandonner()
+            if not os.path.exists(self.chemin_entete):
+                chemin_entete_temporaire = f"{self.chemin_entete}.{os.getpid()}.tmp"
+                with open(chemin_entete_temporaire, 'w', encoding='utf-8') as fichier:
+                    json.dump(self.entete, fichier)
+                os.replace(chemin_entete_temporaire, self.chemin_entete)
+        except OSError:
+            self.abandonner()
+            return None
+        self.cache.evincer(conserver=self.cle)
+        return self.cache.ouvrir(self.entete['source'], self.shape, self.dtype)
+
+    def abandonner(self):
+        """
+        Supprime le fichier temporaire.
+        """
+        try:
+            self.fichier.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self.chemin_temporaire)
+        except OSError:
+            pass
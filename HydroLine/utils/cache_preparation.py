@@ -0,0 +1,332 @@
+# utils/cache_preparation.py
+
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+# Répertoire et budget disque par défaut du cache des MNT préparés
+REPERTOIRE_CACHE_PREPARATION_DEFAUT = os.path.join(tempfile.gettempdir(), 'hydroline_cache_preparation')
+TAILLE_MAX_CACHE_PREPARATION_DEFAUT = 4 * 1024 ** 3
+
+_cache_preparation_mnt = None
+
+
+def obtenir_cache_preparation_mnt():
+    """
+    Retourne le cache des MNT préparés partagé par toutes les préparations du plugin.
+
+    Returns
+    -------
+    CachePreparationMNT
+        Cache créé au premier appel avec les paramètres par défaut.
+    """
+    global _cache_preparation_mnt
+    if _cache_preparation_mnt is None:
+        _cache_preparation_mnt = CachePreparationMNT()
+    return _cache_preparation_mnt
+
+
+class CachePreparationMNT:
+    """
+    Cache disque des produits de la préparation du MNT (MNT final et ombrage).
+
+    Une entrée est un dossier contenant les deux GeoTIFF produits, accompagné d'un en-tête JSON qui la rend
+    visible. Elle est identifiée par une empreinte du contenu des entrées : chemin, taille et date de
+    modification de chaque source, filtre associé, puis paramètres de traitement (système cible, tailles de
+    noyau, arrondi, ombrage). Une source modifiée ou un paramètre changé donnent donc une autre clé, et une
+    entrée n'est jamais réécrite : les couches encore ouvertes sur une entrée restent valides. Les entrées les
+    moins récemment utilisées sont supprimées au-delà du budget disque.
+
+    Attributes
+    ----------
+    repertoire : str
+        Répertoire du cache.
+    taille_max : int
+        Budget disque des entrées en octets.
+    succes : int
+        Nombre de préparations servies par le cache depuis la création de l'instance.
+    echecs : int
+        Nombre de préparations absentes du cache, calculées puis publiées, depuis la création de l'instance.
+
+    Methods
+    -------
+    cle(sources, parametres)
+        Retourne la clé d'entrée d'une préparation.
+    ouvrir(cle)
+        Retourne les fichiers d'une entrée, si elle existe.
+    creer(cle)
+        Crée le dossier temporaire d'une nouvelle entrée.
+    publier(cle, dossier, fichiers, entete=None)
+        Publie une entrée écrite dans son dossier temporaire.
+    abandonner(dossier)
+        Supprime le dossier temporaire d'une entrée.
+    evincer(conserver=None)
+        Supprime les entrées les moins récemment utilisées au-delà du budget.
+    taille_totale()
+        Retourne la taille cumulée des entrées.
+    statistiques()
+        Retourne les compteurs et l'occupation du cache.
+    """
+
+    def __init__(self, repertoire=REPERTOIRE_CACHE_PREPARATION_DEFAUT,
+                 taille_max=TAILLE_MAX_CACHE_PREPARATION_DEFAUT):
+        """
+        Initialise le cache des MNT préparés.
+
+        Parameters
+        ----------
+        repertoire : str, optional
+            Répertoire du cache, par défaut REPERTOIRE_CACHE_PREPARATION_DEFAUT.
+        taille_max : int, optional
+            Budget disque des entrées en octets, par défaut TAILLE_MAX_CACHE_PREPARATION_DEFAUT.
+        """
+        self.repertoire = repertoire
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+
+    def cle(self, sources, parametres):
+        """
+        Retourne la clé d'entrée d'une préparation.
+
+        Parameters
+        ----------
+        sources : list of tuple
+            Sources dans l'ordre de la mosaïque : (chemin, filtre).
+        parametres : dict
+            Paramètres de traitement, sérialisables en JSON.
+
+        Returns
+        -------
+        str or None
+            Empreinte des sources et des paramètres, ou None si une source n'est pas un fichier local
+            (la préparation n'est alors pas mise en cache).
+        """
+        empreinte = hashlib.sha1()
+        for chemin, filtre in sources:
+            try:
+                chemin = os.path.abspath(chemin)
+                etat = os.stat(chemin)
+            except (OSError, ValueError):
+                return None
+            empreinte.update(f"{os.path.normcase(chemin)}|{etat.st_size}|{etat.st_mtime_ns}|{filtre}\n"
+                             .encode('utf-8'))
+        empreinte.update(json.dumps(parametres, sort_keys=True).encode('utf-8'))
+        return empreinte.hexdigest()
+
+    def _chemins(self, cle):
+        base = os.path.join(self.repertoire, cle)
+        return base, base + '.json'
+
+    def ouvrir(self, cle):
+        """
+        Retourne les fichiers d'une entrée si elle existe, et compte le succès.
+
+        Un échec n'est compté qu'à la publication de l'entrée calculée : une préparation cherchée plusieurs
+        fois, ou interrompue, ne compte pas plusieurs échecs.
+
+        Parameters
+        ----------
+        cle : str
+            Clé de l'entrée.
+
+        Returns
+        -------
+        dict or None
+            Chemins des fichiers de l'entrée par nom de produit, ou None si l'entrée est absente ou incomplète.
+        """
+        dossier, chemin_entete = self._chemins(cle)
+        try:
+            with open(chemin_entete, 'r', encoding='utf-8') as fichier:
+                entete = json.load(fichier)
+            fichiers = {nom: os.path.join(dossier, fichier) for nom, fichier in entete['fichiers'].items()}
+            if not all(os.path.isfile(chemin) for chemin in fichiers.values()):
+                raise OSError(f"Entrée incomplète : {cle}")
+            # La date de l'en-tête sert de date de dernier accès pour l'éviction
+            os.utime(chemin_entete)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        self.succes += 1
+        return fichiers
+
+    def creer(self, cle):
+        """
+        Crée le dossier temporaire d'une nouvelle entrée.
+
+        Parameters
+        ----------
+        cle : str
+            Clé de l'entrée.
+
+        Returns
+        -------
+        str or None
+            Dossier où écrire les produits, ou None s'il ne peut pas être créé.
+        """
+        dossier = f"{self._chemins(cle)[0]}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(dossier)
+        except OSError:
+            return None
+        return dossier
+
+    def publier(self, cle, dossier, fichiers, entete=None):
+        """
+        Publie une entrée écrite dans son dossier temporaire (renommage atomique, puis en-tête).
+
+        Parameters
+        ----------
+        cle : str
+            Clé de l'entrée.
+        dossier : str
+            Dossier temporaire retourné par `creer`.
+        fichiers : dict
+            Chemins des produits écrits dans le dossier temporaire, par nom de produit.
+        entete : dict, optional
+            Informations descriptives ajoutées à l'en-tête (sources, paramètres).
+
+        Returns
+        -------
+        dict or None
+            Chemins des fichiers de l'entrée publiée, ou None si elle n'a pas pu être publiée
+            (les fichiers temporaires sont alors supprimés).
+        """
+        dossier_entree, chemin_entete = self._chemins(cle)
+        contenu = dict(entete or {})
+        contenu['fichiers'] = {nom: os.path.basename(chemin) for nom, chemin in fichiers.items()}
+        try:
+            try:
+                os.rename(dossier, dossier_entree)
+            except OSError:
+                # Entrée publiée entre-temps par une autre préparation : celle-ci est conservée
+                self.abandonner(dossier)
+                if not os.path.isdir(dossier_entree):
+                    return None
+            if not os.path.exists(chemin_entete):
+                chemin_entete_temporaire = f"{chemin_entete}.{os.getpid()}.tmp"
+                with open(chemin_entete_temporaire, 'w', encoding='utf-8') as fichier:
+                    json.dump(contenu, fichier)
+                os.replace(chemin_entete_temporaire, chemin_entete)
+        except OSError:
+            return None
+        self.echecs += 1
+        self.evincer(conserver=cle)
+        return {nom: os.path.join(dossier_entree, fichier) for nom, fichier in contenu['fichiers'].items()}
+
+    def abandonner(self, dossier):
+        """
+        Supprime le dossier temporaire d'une entrée.
+
+        Parameters
+        ----------
+        dossier : str
+            Dossier retourné par `creer`.
+        """
+        shutil.rmtree(dossier, ignore_errors=True)
+
+    @staticmethod
+    def _taille_dossier(dossier):
+        taille = 0
+        for nom in os.listdir(dossier):
+            taille += os.path.getsize(os.path.join(dossier, nom))
+        return taille
+
+    def _entrees(self):
+        """
+        Retourne les entrées publiées du cache : (date de dernier accès, taille, clé).
+        """
+        entrees = []
+        try:
+            noms = os.listdir(self.repertoire)
+        except OSError:
+            return entrees
+        for nom in noms:
+            if not nom.endswith('.json'):
+                continue
+            cle = nom[:-5]
+            dossier, chemin_entete = self._chemins(cle)
+            try:
+                entrees.append((os.path.getmtime(chemin_entete), self._taille_dossier(dossier), cle))
+            except OSError:
+                continue
+        return entrees
+
+    def taille_totale(self):
+        """
+        Retourne la taille cumulée des entrées du cache.
+
+        Returns
+        -------
+        int
+            Taille en octets.
+        """
+        return sum(taille for _, taille, _ in self._entrees())
+
+    def statistiques(self):
+        """
+        Retourne les compteurs et l'occupation du cache.
+
+        Returns
+        -------
+        dict
+            'succes', 'echecs', 'entrees' (nombre d'entrées), 'taille' et 'taille_max' (octets).
+        """
+        entrees = self._entrees()
+        return {
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'entrees': len(entrees),
+            'taille': sum(taille for _, taille, _ in entrees),
+            'taille_max': self.taille_max,
+        }
+
+    def evincer(self, conserver=None):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à revenir sous le budget, ainsi que les
+        écritures temporaires et les dossiers sans en-tête abandonnés depuis plus d'un jour.
+
+        Parameters
+        ----------
+        conserver : str, optional
+            Clé d'une entrée à ne pas supprimer, par défaut None.
+        """
+        entrees = sorted(self._entrees())
+        taille = sum(t for _, t, _ in entrees)
+        for _, taille_entree, cle in entrees:
+            if taille <= self.taille_max:
+                break
+            if cle == conserver:
+                continue
+            dossier, chemin_entete = self._chemins(cle)
+            try:
+                # L'en-tête d'abord : une entrée sans en-tête n'est plus jamais ouverte
+                os.remove(chemin_entete)
+            except OSError:
+                continue
+            # Fichiers encore ouverts par une couche (Windows) : supprimés au nettoyage suivant
+            shutil.rmtree(dossier, ignore_errors=True)
+            taille -= taille_entree
+
+        limite = time.time() - 24 * 3600
+        try:
+            noms = os.listdir(self.repertoire)
+        except OSError:
+            return
+        for nom in noms:
+            chemin = os.path.join(self.repertoire, nom)
+            try:
+                if nom.endswith('.tmp') and os.path.getmtime(chemin) < limite:
+                    if os.path.isdir(chemin):
+                        shutil.rmtree(chemin, ignore_errors=True)
+                    else:
+                        os.remove(chemin)
+                elif (os.path.isdir(chemin) and not os.path.exists(chemin + '.json')
+                      and os.path.getmtime(chemin) < limite):
+                    shutil.rmtree(chemin, ignore_errors=True)
+            except OSError:
+                continue
@@ -0,0 +1,772 @@
+# utils/hydro_tuiles.py
+
+
+import heapq
+import os
+import shutil
+import tempfile
+from array import array
+from collections import deque
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import minimum_spanning_tree, breadth_first_order
+
+from .hydro_utils import CODES_D8, DECALAGES_D8, PAS_INTERRUPTION, recepteurs_d8, accumulation_ecoulement
+
+# Côté (en pixels) des tuiles traitées une à une : l'empreinte mémoire du traitement est proportionnelle
+# au carré de ce côté, pas à la taille du MNT
+TAILLE_TUILE_RESEAU = 1024
+
+# Répartition de l'avancement (en %) entre les étapes du traitement
+ETAPES_RESEAU = [
+    ('inondation', 0, 35),
+    ('comblement', 35, 40),
+    ('zones_planes', 40, 50),
+    ('directions', 50, 65),
+    ('sorties', 65, 75),
+    ('accumulation', 75, 85),
+    ('troncons', 85, 95),
+]
+
+# Connexité 8 des zones planes
+STRUCTURE_8 = np.ones((3, 3), dtype=bool)
+
+
+def _voisin(tableau, dx, dy):
+    """
+    Retourne la vue des voisins (dx, dy) des pixels intérieurs d'un tableau (bordure d'un pixel exclue).
+    """
+    lignes, colonnes = tableau.shape
+    return tableau[1 + dy:lignes - 1 + dy, 1 + dx:colonnes - 1 + dx]
+
+
+def _interieur(tableau):
+    """
+    Retourne la vue des pixels intérieurs d'un tableau (bordure d'un pixel exclue).
+    """
+    return tableau[1:-1, 1:-1]
+
+
+def _exutoires(valeurs):
+    """
+    Repère les exutoires des pixels intérieurs : pixels avec donnée au contact d'un pixel sans donnée (NaN).
+
+    La bordure du tableau est un halo : au bord du MNT, il est rempli de NaN et les pixels de bordure
+    du MNT sont donc des exutoires.
+    """
+    valide = np.isfinite(valeurs)
+    exutoires = np.zeros((valeurs.shape[0] - 2, valeurs.shape[1] - 2), dtype=bool)
+    for dx, dy in DECALAGES_D8:
+        exutoires |= ~_voisin(valide, dx, dy)
+    return exutoires & _interieur(valide)
+
+
+def _classer_pixels(altitudes):
+    """
+    Classe les pixels intérieurs d'une surface comblée bordée d'un halo d'un pixel.
+
+    Parameters
+    ----------
+    altitudes : np.ndarray
+        Altitudes comblées, NaN sans donnée.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (altitudes, valides, exutoires, sorties, plats) des pixels intérieurs : une sortie est un exutoire
+        ou un pixel ayant un voisin strictement plus bas ; les autres pixels valides sont plats.
+    """
+    centre = _interieur(altitudes)
+    plus_bas = np.zeros(centre.shape, dtype=bool)
+    for dx, dy in DECALAGES_D8:
+        plus_bas |= _voisin(altitudes, dx, dy) < centre
+    valides = np.isfinite(centre)
+    exutoires = _exutoires(altitudes)
+    sorties = valides & (exutoires | plus_bas)
+    return centre, valides, exutoires, sorties, valides & ~sorties
+
+
+def inonder_tuile(valeurs, interrompre=None):
+    """
+    Comble les dépressions d'une tuile par Priority-Flood, depuis son pourtour, en étiquetant les bassins.
+
+    Chaque pixel du pourtour de la tuile est une graine portant sa propre étiquette (1, 2, ...), les exutoires
+    (pixels au contact d'une zone sans donnée ou du bord du MNT) portent l'étiquette 0 de l'océan. Chaque pixel
+    inondé hérite de l'étiquette du pixel qui l'a atteint. Lorsque deux bassins d'étiquettes différentes
+    se touchent, l'altitude de débordement de l'un vers l'autre (la plus haute des deux altitudes comblées)
+    est retenue, la plus basse par paire de bassins.
+
+    Parameters
+    ----------
+    valeurs : np.ndarray
+        Altitudes de la tuile bordée d'un halo d'un pixel (float64, NaN sans donnée ou hors du MNT).
+    interrompre : callable, optional
+        Fonction sans argument retournant True pour interrompre le calcul, appelée tous les
+        PAS_INTERRUPTION pixels traités.
+
+    Returns
+    -------
+    tuple or None
+        (altitudes, etiquettes, nb_etiquettes, aretes) : altitudes comblées localement, étiquettes int32
+        (-1 sans donnée), nombre d'étiquettes du pourtour et dictionnaire {(a, b): altitude de débordement}
+        avec a < b ; None si le calcul a été interrompu.
+    """
+    lignes, colonnes = valeurs.shape[0] - 2, valeurs.shape[1] - 2
+    nb_noeuds = lignes * colonnes
+
+    # Même représentation que directions_ecoulement_d8 : accès élément par élément sur des tableaux Python
+    z = array('d', [0.0]) * nb_noeuds
+    altitudes = np.frombuffer(z, dtype=np.float64).reshape(lignes, colonnes)
+    altitudes[:] = _interieur(valeurs)
+    sans_donnee = np.isnan(altitudes)
+    exutoires = _exutoires(valeurs)
+
+    pourtour = np.zeros((lignes, colonnes), dtype=bool)
+    pourtour[0, :] = pourtour[-1, :] = True
+    pourtour[:, 0] = pourtour[:, -1] = True
+    pourtour &= ~sans_donnee & ~exutoires
+    graines = np.flatnonzero(pourtour)
+    nb_etiquettes = graines.size
+
+    etiquettes_np = np.full(nb_noeuds, -1, dtype=np.int32)
+    etiquettes_np[exutoires.ravel()] = 0
+    etiquettes_np[graines] = np.arange(1, nb_etiquettes + 1, dtype=np.int32)
+    etiquettes = array('i', etiquettes_np.tobytes())
+    traites = bytearray(sans_donnee.ravel().tobytes())
+    voisins_8 = [(dx, dy * colonnes + dx) for dx, dy in DECALAGES_D8]
+    base = nb_etiquettes + 1
+
+    tas = []
+    compteur = 0
+    for noeud in np.flatnonzero(etiquettes_np >= 0).tolist():
+        traites[noeud] = 1
+        tas.append((z[noeud], compteur, noeud))
+        compteur += 1
+    heapq.heapify(tas)
+    file_fosse = deque()
+    aretes = {}
+    pas = 0
+
+    while tas or file_fosse:
+        pas += 1
+        if pas == PAS_INTERRUPTION:
+            pas = 0
+            if interrompre is not None and interrompre():
+                return None
+        if file_fosse:
+            noeud = file_fosse.popleft()
+            niveau = z[noeud]
+        else:
+            niveau, _, noeud = heapq.heappop(tas)
+
+        etiquette = etiquettes[noeud]
+        x = noeud % colonnes
+        for dx, decalage in voisins_8:
+            nx = x + dx
+            voisin = noeud + decalage
+            if nx < 0 or nx >= colonnes or voisin < 0 or voisin >= nb_noeuds:
+                continue
+            if traites[voisin]:
+                autre = etiquettes[voisin]
+                if autre != etiquette and autre >= 0:
+                    cle = etiquette * base + autre if etiquette < autre else autre * base + etiquette
+                    debordement = niveau if niveau >= z[voisin] else z[voisin]
+                    if debordement < aretes.get(cle, np.inf):
+                        aretes[cle] = debordement
+                continue
+            traites[voisin] = 1
+            etiquettes[voisin] = etiquette
+            if z[voisin] <= niveau:
+                z[voisin] = niveau
+                file_fosse.append(voisin)
+            else:
+                heapq.heappush(tas, (z[voisin], compteur, voisin))
+                compteur += 1
+
+    etiquettes_np = np.frombuffer(etiquettes, dtype=np.intc).astype(np.int32).reshape(lignes, colonnes)
+    aretes = {(cle // base, cle % base): debordement for cle, debordement in aretes.items()}
+    return altitudes.copy(), etiquettes_np, nb_etiquettes, aretes
+
+
+def niveaux_debordement(nb_noeuds, sources, cibles, altitudes):
+    """
+    Calcule le niveau de débordement de chaque bassin vers l'océan (nœud 0) dans le graphe des bassins.
+
+    Le niveau d'un bassin est le plus petit, sur les chemins vers l'océan, du plus haut débordement rencontré :
+    il se lit le long de l'arbre couvrant minimal du graphe, qui contient ces chemins minimax.
+
+    Parameters
+    ----------
+    nb_noeuds : int
+        Nombre de bassins, océan compris.
+    sources, cibles : np.ndarray
+        Bassins reliés par chaque arête.
+    altitudes : np.ndarray
+        Altitude de débordement de chaque arête.
+
+    Returns
+    -------
+    np.ndarray
+        Niveau de débordement float64 de chaque bassin (-inf pour l'océan et les bassins qui n'y sont pas reliés).
+    """
+    niveaux = np.full(nb_noeuds, -np.inf)
+    if sources.size == 0:
+        return niveaux
+
+    # Une seule arête par paire, la plus basse ; les poids de l'arbre couvrant sont les rangs des altitudes
+    # (strictement positifs, un poids nul signifiant l'absence d'arête)
+    a = np.minimum(sources, cibles).astype(np.int64)
+    b = np.maximum(sources, cibles).astype(np.int64)
+    cles = a * nb_noeuds + b
+    ordre = np.lexsort((altitudes, cles))
+    premiers = ordre[np.r_[True, cles[ordre][1:] != cles[ordre][:-1]]]
+    a, b, altitudes = a[premiers], b[premiers], altitudes[premiers]
+    valeurs, rangs = np.unique(altitudes, return_inverse=True)
+
+    graphe = csr_matrix((rangs.astype(np.float64) + 1.0, (a, b)), shape=(nb_noeuds, nb_noeuds))
+    arbre = minimum_spanning_tree(graphe)
+    arbre = (arbre + arbre.T).tocsr()
+    ordre, predecesseurs = breadth_first_order(arbre, 0, directed=False, return_predecessors=True)
+    poids = np.asarray(arbre[predecesseurs[ordre[1:]], ordre[1:]]).ravel()
+    debordements = valeurs[poids.astype(np.int64) - 1]
+
+    niveaux_liste = niveaux.tolist()
+    for noeud, parent, debordement in zip(ordre[1:].tolist(), predecesseurs[ordre[1:]].tolist(),
+                                          debordements.tolist()):
+        niveau_parent = niveaux_liste[parent]
+        niveaux_liste[noeud] = debordement if debordement > niveau_parent else niveau_parent
+    return np.array(niveaux_liste)
+
+
+def directions_tuile(altitudes, plaques, rangs, interrompre=None):
+    """
+    Calcule les directions D8 d'une tuile de la surface comblée.
+
+    Les exutoires n'ont pas de direction (code 0). Un pixel ayant un voisin strictement plus bas s'écoule
+    vers le plus bas de ses voisins. Les pixels plats s'écoulent par le plus court chemin (parcours en largeur)
+    vers la sortie de leur zone plane : une sortie de même niveau pour une zone de rang 0, sinon la zone plane
+    de rang immédiatement inférieur dans une tuile voisine. Le rang décroît donc strictement d'une tuile
+    à l'autre, ce qui exclut tout cycle entre tuiles.
+
+    Parameters
+    ----------
+    altitudes : np.ndarray
+        Surface comblée de la tuile bordée d'un halo de deux pixels (NaN sans donnée ou hors du MNT).
+    plaques : np.ndarray
+        Zone plane (indice global, -1 hors zone plane) de la tuile bordée d'un halo d'un pixel.
+    rangs : np.ndarray
+        Rang de chaque zone plane (-1 pour une zone sans sortie).
+    interrompre : callable, optional
+        Fonction sans argument retournant True pour interrompre le calcul.
+
+    Returns
+    -------
+    np.ndarray or None
+        Codes D8 uint8 de la tuile, ou None si le calcul a été interrompu.
+    """
+    centre, _, exutoires, sorties, plats = _classer_pixels(altitudes)
+    lignes, colonnes = centre.shape[0] - 2, centre.shape[1] - 2
+    z = _interieur(centre)
+    directions = np.zeros((lignes, colonnes), dtype=np.uint8)
+
+    # Pixels en pente : vers le voisin le plus bas (le premier dans l'ordre D8 en cas d'égalité)
+    pente = _interieur(sorties) & ~_interieur(exutoires)
+    voisins = np.stack([_voisin(centre, dx, dy) for dx, dy in DECALAGES_D8])
+    voisins[np.isnan(voisins)] = np.inf
+    codes = np.array(CODES_D8, dtype=np.uint8)
+    directions[pente] = codes[np.argmin(voisins, axis=0)[pente]]
+    del voisins
+
+    # Pixels plats au contact de la sortie de leur zone : sources du parcours en largeur
+    plats_tuile = _interieur(plats)
+    rang_plaque = np.full(plaques.shape, -2, dtype=np.int64)
+    rang_plaque[plaques >= 0] = rangs[plaques[plaques >= 0]]
+    rang_centre = _interieur(rang_plaque)
+    halo = np.ones(plaques.shape, dtype=bool)
+    halo[1:-1, 1:-1] = False
+    sources = np.zeros((lignes, colonnes), dtype=bool)
+    for k, (dx, dy) in enumerate(DECALAGES_D8):
+        vers_sortie = _voisin(sorties, dx, dy) & (_voisin(centre, dx, dy) == z)
+        vers_tuile_voisine = _voisin(halo, dx, dy) & (_voisin(rang_plaque, dx, dy) == rang_centre - 1)
+        condition = plats_tuile & ~sources & np.where(rang_centre == 0, vers_sortie, vers_tuile_voisine)
+        directions[condition] = CODES_D8[k]
+        sources |= condition
+
+    # Parcours en largeur dans les zones planes depuis leurs sources
+    nb_noeuds = lignes * colonnes
+    codes_tuile = bytearray(directions.tobytes())
+    a_traiter = bytearray((plats_tuile & ~sources).tobytes())
+    voisins_d8 = [(dx, dy * colonnes + dx, CODES_D8[(k + 4) % 8]) for k, (dx, dy) in enumerate(DECALAGES_D8)]
+    file = deque(np.flatnonzero(sources).tolist())
+    pas = 0
+    while file:
+        pas += 1
+        if pas == PAS_INTERRUPTION:
+            pas = 0
+            if interrompre is not None and interrompre():
+                return None
+        noeud = file.popleft()
+        x = noeud % colonnes
+        for dx, decalage, code in voisins_d8:
+            nx = x + dx
+            voisin = noeud + decalage
+            if nx < 0 or nx >= colonnes or voisin < 0 or voisin >= nb_noeuds or not a_traiter[voisin]:
+                continue
+            a_traiter[voisin] = 0
+            codes_tuile[voisin] = code
+            file.append(voisin)
+
+    return np.frombuffer(bytes(codes_tuile), dtype=np.uint8).reshape(lignes, colonnes).copy()
+
+
+class ReseauDrainageTuiles:
+    """
+    Extraction du réseau de drainage d'un MNT traité tuile par tuile, en mémoire bornée par la taille des tuiles.
+
+    Le traitement enchaîne des passes sur les tuiles, reliées par de petits graphes construits sur leur seul
+    pourtour (Barnes, Parallel Priority-Flood et Parallel non-divergent flow accumulation) :
+
+    1. chaque tuile est comblée par Priority-Flood depuis son pourtour, en étiquetant les bassins ; le graphe
+       des débordements entre bassins, y compris d'une tuile à l'autre, donne le niveau de débordement de chaque
+       bassin vers l'océan, et la surface comblée globale est le maximum du comblement local et de ce niveau ;
+    2. les zones planes qui traversent les limites de tuiles sont rangées par leur distance (en tuiles)
+       à une sortie, puis les directions D8 de chaque tuile sont calculées (`directions_tuile`) ;
+    3. l'accumulation locale de chaque tuile est calculée, les écoulements qui sortent des tuiles sont propagés
+       de pourtour en pourtour, puis l'accumulation de chaque tuile est recalculée avec ces apports ;
+    4. les tronçons sont suivis dans chaque tuile, puis raboutés d'une tuile à l'autre.
+
+    Les grilles intermédiaires (surface comblée, étiquettes, directions, accumulation : environ 9 octets par
+    cellule, plus la taille du type des altitudes) sont projetées en mémoire (np.memmap) dans un répertoire
+    temporaire supprimé à la fin du traitement.
+
+    Attributes
+    ----------
+    mnt : AccesseurMNT
+        MNT à traiter (`shape`, `dtype`, `nodata`, `memmap` et `lire_bloc`).
+    seuil : int
+        Accumulation minimale (en pixels) d'un pixel du réseau.
+    taille_tuile : int
+        Côté des tuiles en pixels.
+    progression : callable or None
+        Fonction appelée avec l'avancement (0-100).
+    interrompre : callable or None
+        Fonction sans argument retournant True pour interrompre le traitement.
+    tuiles : list of tuple
+        Bornes (y0, y1, x0, x1) des tuiles, y1 et x1 exclus.
+
+    Methods
+    -------
+    executer()
+        Exécute le traitement et retourne les tronçons du réseau.
+    """
+
+    def __init__(self, mnt, seuil, taille_tuile=TAILLE_TUILE_RESEAU, repertoire=None, progression=None,
+                 interrompre=None):
+        """
+        Prépare le découpage du MNT en tuiles.
+
+        Parameters
+        ----------
+        mnt : AccesseurMNT
+            MNT à traiter.
+        seuil : int
+            Accumulation minimale (en pixels) d'un pixel du réseau.
+        taille_tuile : int, optional
+            Côté des tuiles en pixels, par défaut TAILLE_TUILE_RESEAU.
+        repertoire : str, optional
+            Répertoire des grilles intermédiaires, par défaut le répertoire temporaire du système.
+        progression : callable, optional
+            Fonction appelée avec l'avancement (0-100), par défaut None.
+        interrompre : callable, optional
+            Fonction sans argument retournant True pour interrompre le traitement, par défaut None.
+        """
+        self.mnt = mnt
+        self.seuil = seuil
+        self.taille_tuile = taille_tuile
+        self.repertoire = repertoire
+        self.progression = progression
+        self.interrompre = interrompre
+        self.lignes, self.colonnes = mnt.shape
+        self.tuiles = [
+            (y0, min(y0 + taille_tuile, self.lignes), x0, min(x0 + taille_tuile, self.colonnes))
+            for y0 in range(0, self.lignes, taille_tuile)
+            for x0 in range(0, self.colonnes, taille_tuile)
+        ]
+        self.dtype_altitudes = np.result_type(mnt.dtype, np.float32)
+
+    def _interrompu(self):
+        return self.interrompre is not None and self.interrompre()
+
+    def _avancer(self, etape, index):
+        """
+        Signale l'avancement après la tuile `index` de l'étape nommée.
+        """
+        if self.progression is None:
+            return
+        for nom, debut, fin in ETAPES_RESEAU:
+            if nom == etape:
+                self.progression(int(debut + (fin - debut) * (index + 1) / len(self.tuiles)))
+                return
+
+    def _lire(self, source, y0, y1, x0, x1, halo, remplissage, dtype):
+        """
+        Lit une fenêtre bordée d'un halo, complété par `remplissage` hors du MNT.
+
+        `source` est une grille (np.memmap) ou une fonction lire(y0, y1, x0, x1).
+        """
+        ya, yb = max(y0 - halo, 0), min(y1 + halo, self.lignes)
+        xa, xb = max(x0 - halo, 0), min(x1 + halo, self.colonnes)
+        sortie = np.full((y1 - y0 + 2 * halo, x1 - x0 + 2 * halo), remplissage, dtype=dtype)
+        valeurs = source(ya, yb, xa, xb) if callable(source) else source[ya:yb, xa:xb]
+        sortie[ya - y0 + halo:yb - y0 + halo, xa - x0 + halo:xb - x0 + halo] = valeurs
+        return sortie
+
+    def _lire_mnt(self, y0, y1, x0, x1):
+        """
+        Lit une fenêtre du MNT en float64, NaN sans donnée.
+        """
+        if getattr(self.mnt, 'memmap', None) is not None:
+            valeurs = np.asarray(self.mnt.memmap[y0:y1, x0:x1])
+        else:
+            valeurs = self.mnt.lire_bloc(y0, y1, x0, x1)
+        altitudes = valeurs.astype(np.float64)
+        if self.mnt.nodata is not None:
+            altitudes[valeurs == self.mnt.nodata] = np.nan
+        return altitudes
+
+    def _grille(self, nom, dtype):
+        return np.memmap(os.path.join(self.repertoire_travail, f"{nom}.raw"), dtype=dtype, mode='w+',
+                         shape=(self.lignes, self.colonnes))
+
+    def _paires_limites(self, grille):
+        """
+        Retourne les paires de valeurs de pixels 8-voisins situés de part et d'autre d'une limite de tuiles.
+        """
+        premieres, secondes = [], []
+        for b in range(self.taille_tuile, self.lignes, self.taille_tuile):
+            haut, bas = np.asarray(grille[b - 1]), np.asarray(grille[b])
+            for dx in (-1, 0, 1):
+                xa, xb = max(0, -dx), self.colonnes - max(0, dx)
+                premieres.append(haut[xa:xb])
+                secondes.append(bas[xa + dx:xb + dx])
+        for b in range(self.taille_tuile, self.colonnes, self.taille_tuile):
+            gauche, droite = np.asarray(grille[:, b - 1]), np.asarray(grille[:, b])
+            for dy in (-1, 0, 1):
+                ya, yb = max(0, -dy), self.lignes - max(0, dy)
+                premieres.append(gauche[ya:yb])
+                secondes.append(droite[ya + dy:yb + dy])
+        if not premieres:
+            vide = np.zeros(0, dtype=grille.dtype)
+            return vide, vide
+        return np.concatenate(premieres), np.concatenate(secondes)
+
+    def executer(self):
+        """
+        Exécute le traitement complet.
+
+        Returns
+        -------
+        list of list of tuple or None
+            Tronçons, chacun sous forme de liste de pixels (colonne, ligne) de l'amont vers l'aval,
+            ou None si le traitement a été interrompu.
+        """
+        self.repertoire_travail = tempfile.mkdtemp(prefix='hydroline_reseau_', dir=self.repertoire)
+        try:
+            self.altitudes = self._grille('altitudes', self.dtype_altitudes)
+            self.etiquettes = self._grille('etiquettes', np.int32)
+            if not self._combler():
+                return None
+            self.directions = self._grille('directions', np.uint8)
+            if not self._calculer_directions():
+                return None
+            del self.etiquettes
+            self.accumulation = self._grille('accumulation', np.uint32)
+            if not self._accumuler():
+                return None
+            return self._extraire_troncons()
+        finally:
+            for nom in ('altitudes', 'etiquettes', 'directions', 'accumulation'):
+                if hasattr(self, nom):
+                    delattr(self, nom)
+            shutil.rmtree(self.repertoire_travail, ignore_errors=True)
+
+    def _combler(self):
+        """
+        Calcule la surface comblée globale dans la grille `altitudes`.
+        """
+        sources, cibles, debordements = [], [], []
+        decalage = 0
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            valeurs = self._lire(self._lire_mnt, y0, y1, x0, x1, 1, np.nan, np.float64)
+            resultat = inonder_tuile(valeurs, self.interrompre)
+            if resultat is None:
+                return False
+            altitudes, etiquettes, nb_etiquettes, aretes = resultat
+            # Étiquettes globales : l'océan reste 0, celles du pourtour sont décalées d'une tuile à l'autre
+            etiquettes[etiquettes > 0] += decalage
+            self.altitudes[y0:y1, x0:x1] = altitudes
+            self.etiquettes[y0:y1, x0:x1] = etiquettes
+            if aretes:
+                paires = np.array(list(aretes.keys()), dtype=np.int64)
+                paires[paires > 0] += decalage
+                sources.append(paires[:, 0])
+                cibles.append(paires[:, 1])
+                debordements.append(np.fromiter(aretes.values(), dtype=np.float64, count=len(aretes)))
+            decalage += nb_etiquettes
+            self._avancer('inondation', index)
+
+        # Débordements entre pixels voisins de part et d'autre des limites de tuiles (pixels du pourtour,
+        # dont l'altitude comblée est l'altitude d'origine)
+        etiquettes_a, etiquettes_b = self._paires_limites(self.etiquettes)
+        altitudes_a, altitudes_b = self._paires_limites(self.altitudes)
+        garder = (etiquettes_a >= 0) & (etiquettes_b >= 0) & (etiquettes_a != etiquettes_b)
+        sources.append(etiquettes_a[garder].astype(np.int64))
+        cibles.append(etiquettes_b[garder].astype(np.int64))
+        debordements.append(np.maximum(altitudes_a[garder], altitudes_b[garder]).astype(np.float64))
+
+        niveaux = niveaux_debordement(
+            decalage + 1, np.concatenate(sources), np.concatenate(cibles), np.concatenate(debordements)
+        )
+        if self._interrompu():
+            return False
+
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            etiquettes = np.asarray(self.etiquettes[y0:y1, x0:x1])
+            altitudes = np.asarray(self.altitudes[y0:y1, x0:x1])
+            valides = etiquettes >= 0
+            altitudes[valides] = np.maximum(altitudes[valides], niveaux[etiquettes[valides]])
+            self.altitudes[y0:y1, x0:x1] = altitudes
+            self._avancer('comblement', index)
+        return True
+
+    def _calculer_directions(self):
+        """
+        Range les zones planes par leur distance à une sortie, puis calcule la grille `directions`.
+        """
+        # Zones planes de chaque tuile, numérotées globalement dans la grille `etiquettes` (réutilisée)
+        avec_sortie = []
+        decalage = 0
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            if self._interrompu():
+                return False
+            valeurs = self._lire(self.altitudes, y0, y1, x0, x1, 2, np.nan, self.dtype_altitudes)
+            centre, _, _, sorties, plats = _classer_pixels(valeurs)
+            plats_tuile = _interieur(plats)
+            pres_sortie = np.zeros(plats_tuile.shape, dtype=bool)
+            for dx, dy in DECALAGES_D8:
+                pres_sortie |= _voisin(sorties, dx, dy) & (_voisin(centre, dx, dy) == _interieur(centre))
+            plaques, nb_plaques = ndimage.label(plats_tuile, structure=STRUCTURE_8)
+            avec_sortie.append(np.bincount(plaques[plats_tuile & pres_sortie], minlength=nb_plaques + 1)[1:] > 0)
+            self.etiquettes[y0:y1, x0:x1] = np.where(plaques > 0, plaques + (decalage - 1), -1)
+            decalage += nb_plaques
+            self._avancer('zones_planes', index)
+
+        # Rang des zones planes : distance, en zones, à une zone qui a sa propre sortie
+        avec_sortie = np.concatenate(avec_sortie) if avec_sortie else np.zeros(0, dtype=bool)
+        plaques_a, plaques_b = self._paires_limites(self.etiquettes)
+        garder = (plaques_a >= 0) & (plaques_b >= 0)
+        a, b = plaques_a[garder], plaques_b[garder]
+        graphe = csr_matrix(
+            (np.ones(2 * a.size, dtype=np.int32), (np.r_[a, b], np.r_[b, a])), shape=(decalage, decalage)
+        )
+        rangs = np.where(avec_sortie, 0, -1).astype(np.int64)
+        front = avec_sortie.astype(np.int32)
+        rang = 0
+        while front.any():
+            rang += 1
+            atteintes = (graphe @ front > 0) & (rangs < 0)
+            rangs[atteintes] = rang
+            front = atteintes.astype(np.int32)
+
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            valeurs = self._lire(self.altitudes, y0, y1, x0, x1, 2, np.nan, self.dtype_altitudes)
+            plaques = self._lire(self.etiquettes, y0, y1, x0, x1, 1, -1, np.int64)
+            directions = directions_tuile(valeurs, plaques, rangs, self.interrompre)
+            if directions is None:
+                return False
+            self.directions[y0:y1, x0:x1] = directions
+            self._avancer('directions', index)
+        return True
+
+    def _accumuler(self):
+        """
+        Calcule la grille `accumulation` en propageant d'une tuile à l'autre les écoulements sortants.
+        """
+        # Sorties de tuile (pixels s'écoulant vers une autre tuile) et pixel de sortie atteint depuis chaque
+        # pixel du pourtour
+        sorties, recepteurs, apports = [], [], []
+        pourtour, terminaux = [], []
+        pas_aval = np.zeros(256, dtype=np.int64)
+        for code, (dx, dy) in zip(CODES_D8, DECALAGES_D8):
+            pas_aval[code] = dy * self.colonnes + dx
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            if self._interrompu():
+                return False
+            directions = np.asarray(self.directions[y0:y1, x0:x1])
+            valides = self._lire(self._valides, y0, y1, x0, x1, 0, False, bool)
+            hauteur, largeur = directions.shape
+            accumulation = accumulation_ecoulement(directions, valides).ravel()
+            recepteurs_locaux = recepteurs_d8(directions)
+            codes = directions.ravel()
+            sortants = np.flatnonzero((codes != 0) & (recepteurs_locaux < 0))
+            globaux = (np.arange(hauteur * largeur) // largeur + y0) * self.colonnes \
+                + np.arange(hauteur * largeur) % largeur + x0
+
+            sorties.append(globaux[sortants])
+            recepteurs.append(globaux[sortants] + pas_aval[codes[sortants]])
+            apports.append(accumulation[sortants])
+
+            # Pixel terminal de chaque pixel (sortie de tuile ou exutoire), par doublement des pointeurs
+            suivant = np.where(recepteurs_locaux >= 0, recepteurs_locaux, np.arange(hauteur * largeur))
+            while True:
+                suivant_2 = suivant[suivant]
+                if np.array_equal(suivant_2, suivant):
+                    break
+                suivant = suivant_2
+            bord = np.zeros((hauteur, largeur), dtype=bool)
+            bord[0, :] = bord[-1, :] = True
+            bord[:, 0] = bord[:, -1] = True
+            bord = np.flatnonzero(bord.ravel() & (codes != 0))
+            pourtour.append(globaux[bord])
+            terminaux.append(globaux[suivant[bord]])
+            self._avancer('sorties', index)
+
+        apports_entrees = self._propager_sorties(sorties, recepteurs, apports, pourtour, terminaux)
+
+        tuile_entree = self._indice_tuile(apports_entrees[0])
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            if self._interrompu():
+                return False
+            directions = np.asarray(self.directions[y0:y1, x0:x1])
+            poids = self._lire(self._valides, y0, y1, x0, x1, 0, False, bool).astype(np.uint32)
+            dans_tuile = tuile_entree == index
+            entrees, valeurs = apports_entrees[0][dans_tuile], apports_entrees[1][dans_tuile]
+            poids[entrees // self.colonnes - y0, entrees % self.colonnes - x0] += valeurs.astype(np.uint32)
+            self.accumulation[y0:y1, x0:x1] = accumulation_ecoulement(directions, poids)
+            self._avancer('accumulation', index)
+        return True
+
+    def _valides(self, y0, y1, x0, x1):
+        """
+        Lit le masque des pixels avec donnée d'une fenêtre de la surface comblée.
+        """
+        return np.isfinite(np.asarray(self.altitudes[y0:y1, x0:x1]))
+
+    def _indice_tuile(self, pixels):
+        """
+        Retourne l'indice de la tuile contenant chaque pixel (indices aplatis du MNT).
+        """
+        tuiles_par_ligne = -(-self.colonnes // self.taille_tuile)
+        return (pixels // self.colonnes // self.taille_tuile) * tuiles_par_ligne \
+            + pixels % self.colonnes // self.taille_tuile
+
+    @staticmethod
+    def _propager_sorties(sorties, recepteurs, apports, pourtour, terminaux):
+        """
+        Propage les écoulements de sortie en sortie d'une tuile à l'autre (ordre topologique, Kahn).
+
+        Returns
+        -------
+        tuple of np.ndarray
+            (entrees, apports) : pixels d'entrée d'une tuile (indices aplatis) et écoulement total qu'ils reçoivent
+            des tuiles voisines.
+        """
+        sorties = np.concatenate(sorties)
+        recepteurs = np.concatenate(recepteurs)
+        totaux = np.concatenate(apports).astype(np.uint64)
+        pourtour = np.concatenate(pourtour)
+        terminaux = np.concatenate(terminaux)
+
+        # Sortie atteinte dans la tuile voisine depuis le récepteur de chaque sortie (-1 pour un exutoire)
+        ordre_pourtour = np.argsort(pourtour)
+        pourtour, terminaux = pourtour[ordre_pourtour], terminaux[ordre_pourtour]
+        position = np.minimum(np.searchsorted(pourtour, recepteurs), max(pourtour.size - 1, 0))
+        terminal = np.where(pourtour[position] == recepteurs, terminaux[position], -1) if pourtour.size \
+            else np.full(recepteurs.size, -1)
+        ordre_sorties = np.argsort(sorties)
+        position = np.minimum(np.searchsorted(sorties[ordre_sorties], terminal), max(sorties.size - 1, 0))
+        suivante = np.where(sorties[ordre_sorties][position] == terminal, ordre_sorties[position], -1) \
+            if sorties.size else np.zeros(0, dtype=np.int64)
+
+        a_suivante = suivante >= 0
+        entrants = np.bincount(suivante[a_suivante], minlength=sorties.size)
+        front = np.flatnonzero((entrants == 0) & a_suivante)
+        while front.size:
+            aval = suivante[front]
+            np.add.at(totaux, aval, totaux[front])
+            np.subtract.at(entrants, aval, 1)
+            aval = np.unique(aval)
+            front = aval[(entrants[aval] == 0) & a_suivante[aval]]
+
+        entrees, inverse = np.unique(recepteurs, return_inverse=True)
+        return entrees, np.bincount(inverse, weights=totaux, minlength=entrees.size).astype(np.uint64)
+
+    def _extraire_troncons(self):
+        """
+        Suit les tronçons du réseau dans chaque tuile, puis les raboute d'une tuile à l'autre.
+        """
+        troncons = []
+        ouverts = []
+        suites = {}
+        opposes = [CODES_D8[(k + 4) % 8] for k in range(8)]
+        for index, (y0, y1, x0, x1) in enumerate(self.tuiles):
+            if self._interrompu():
+                return None
+            accumulation = self._lire(self.accumulation, y0, y1, x0, x1, 2, 0, np.uint32)
+            directions = self._lire(self.directions, y0, y1, x0, x1, 2, 0, np.uint8)
+            reseau = accumulation >= self.seuil
+            # Nombre de pixels du réseau s'écoulant dans chaque pixel (tuile et premier anneau du halo),
+            # et part de ces pixels situés dans la tuile
+            amont = np.zeros((reseau.shape[0] - 2, reseau.shape[1] - 2), dtype=np.uint8)
+            interieur = np.zeros(reseau.shape, dtype=bool)
+            interieur[2:-2, 2:-2] = True
+            amont_interne = np.zeros(amont.shape, dtype=np.uint8)
+            for (dx, dy), code in zip(DECALAGES_D8, opposes):
+                entrant = _voisin(reseau, dx, dy) & (_voisin(directions, dx, dy) == code)
+                amont += entrant
+                amont_interne += entrant & _voisin(interieur, dx, dy)
+            reseau_1 = _interieur(reseau)
+            dans_tuile = _interieur(interieur)
+            departs = np.flatnonzero((reseau_1 & dans_tuile & (amont != 1)).ravel())
+            entrees = np.flatnonzero((reseau_1 & dans_tuile & (amont == 1) & (amont_interne == 0)).ravel())
+
+            largeur = amont.shape[1]
+            codes = _interieur(directions).ravel().tolist()
+            confluences = (amont != 1).ravel().tolist()
+            dans_tuile = dans_tuile.ravel().tolist()
+            pas_aval = [0] * 256
+            for code, (dx, dy) in zip(CODES_D8, DECALAGES_D8):
+                pas_aval[code] = dy * largeur + dx
+
+            def globaux(noeud):
+                return (noeud // largeur - 1 + y0) * self.colonnes + noeud % largeur - 1 + x0
+
+            def suivre(depart):
+                troncon = [globaux(depart)]
+                noeud = depart
+                while codes[noeud]:
+                    noeud += pas_aval[codes[noeud]]
+                    if not dans_tuile[noeud] and not confluences[noeud]:
+                        return troncon, globaux(noeud)
+                    troncon.append(globaux(noeud))
+                    if confluences[noeud] or not dans_tuile[noeud]:
+                        break
+                return troncon, None
+
+            for depart in departs.tolist():
+                troncon, suite = suivre(depart)
+                troncons.append(troncon)
+                if suite is not None:
+                    ouverts.append((troncon, suite))
+            for entree in entrees.tolist():
+                suites[globaux(entree)] = suivre(entree)
+            self._avancer('troncons', index)
+
+        for troncon, suite in ouverts:
+            while suite is not None:
+                complement, suite = suites.pop(suite)
+                troncon.extend(complement)
+
+        return [[(n % self.colonnes, n // self.colonnes) for n in troncon] for troncon in troncons if len(troncon) > 1]
@@ -0,0 +1,237 @@
+# utils/hydro_utils.py
+
+
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+# Codes D8 (convention ESRI) et décalages (dx, dy) correspondants ; 0 désigne un exutoire ou un pixel sans donnée
+CODES_D8 = [1, 2, 4, 8, 16, 32, 64, 128]
+DECALAGES_D8 = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+
+# Tables de décodage indexées par le code D8
+DECALAGE_X_D8 = np.zeros(256, dtype=np.int64)
+DECALAGE_Y_D8 = np.zeros(256, dtype=np.int64)
+for _code, (_dx, _dy) in zip(CODES_D8, DECALAGES_D8):
+    DECALAGE_X_D8[_code] = _dx
+    DECALAGE_Y_D8[_code] = _dy
+
+# Nombre de pixels traités par Priority-Flood entre deux tests d'interruption
+PAS_INTERRUPTION = 1 << 16
+
+
+def directions_ecoulement_d8(tableau, nodata=None, interrompre=None):
+    """
+    Calcule la grille des directions d'écoulement D8 d'un MNT, conditionnée hydrologiquement.
+
+    Le calcul suit l'algorithme Priority-Flood : les pixels de bordure (et ceux qui touchent une zone sans
+    donnée) sont des exutoires, puis le MNT est inondé depuis ces exutoires par altitude croissante à l'aide
+    d'un tas binaire. Chaque pixel atteint s'écoule vers le pixel qui l'a atteint. Les pixels situés sous le
+    niveau courant (dépressions) ou à ce niveau (zones planes) sont traités dans une file FIFO : les dépressions
+    sont ainsi comblées implicitement et les zones planes s'écoulent vers le terrain plus bas par lequel elles
+    se déversent, par le plus court chemin. La complexité est en O(n log n).
+
+    Parameters
+    ----------
+    tableau : np.ndarray
+        Altitudes du MNT (lignes, colonnes).
+    nodata : float, optional
+        Valeur sans donnée du raster ; les valeurs non finies sont toujours considérées sans donnée.
+    interrompre : callable, optional
+        Fonction sans argument retournant True pour interrompre le calcul, appelée tous les
+        PAS_INTERRUPTION pixels traités.
+
+    Returns
+    -------
+    np.ndarray or None
+        Grille uint8 des codes D8 (1 E, 2 SE, 4 S, 8 SO, 16 O, 32 NO, 64 N, 128 NE, 0 exutoire ou sans donnée),
+        ou None si le calcul a été interrompu.
+    """
+    lignes, colonnes = tableau.shape[:2]
+    nb_noeuds = lignes * colonnes
+
+    # Les accès élément par élément sont nettement plus rapides sur des tableaux Python (array, bytearray)
+    # que sur des tableaux NumPy ; le tableau des altitudes est rempli en place via une vue NumPy,
+    # pour une empreinte de 8 octets par pixel sans copie intermédiaire.
+    z = array('d', [0.0]) * nb_noeuds
+    altitudes = np.frombuffer(z, dtype=np.float64).reshape(lignes, colonnes)
+    altitudes[:] = tableau
+    sans_donnee = ~np.isfinite(altitudes)
+    if nodata is not None:
+        sans_donnee |= altitudes == nodata
+
+    # Exutoires : pixels valides en bordure du raster ou au contact d'un pixel sans donnée
+    exutoires = np.zeros((lignes, colonnes), dtype=bool)
+    exutoires[0, :] = exutoires[-1, :] = True
+    exutoires[:, 0] = exutoires[:, -1] = True
+    if sans_donnee.any():
+        bordure = np.pad(sans_donnee, 1, mode='constant', constant_values=False)
+        for dx, dy in DECALAGES_D8:
+            exutoires |= bordure[1 + dy:1 + dy + lignes, 1 + dx:1 + dx + colonnes]
+    exutoires &= ~sans_donnee
+
+    del altitudes
+    traites = bytearray(sans_donnee.ravel().tobytes())
+    directions = bytearray(nb_noeuds)
+    # (dx, décalage aplati, code D8 du voisin vers le pixel courant)
+    voisins_d8 = [(dx, dy * colonnes + dx, CODES_D8[(k + 4) % 8]) for k, (dx, dy) in enumerate(DECALAGES_D8)]
+
+    tas = []
+    compteur = 0  # départage FIFO des altitudes égales dans le tas
+    for noeud in np.flatnonzero(exutoires).tolist():
+        traites[noeud] = 1
+        tas.append((z[noeud], compteur, noeud))
+        compteur += 1
+    heapq.heapify(tas)
+    file_fosse = deque()
+    pas = 0
+
+    while tas or file_fosse:
+        pas += 1
+        if pas == PAS_INTERRUPTION:
+            pas = 0
+            if interrompre is not None and interrompre():
+                return None
+        if file_fosse:
+            noeud = file_fosse.popleft()
+            niveau = z[noeud]
+        else:
+            niveau, _, noeud = heapq.heappop(tas)
+
+        x = noeud % colonnes
+        for dx, decalage, code in voisins_d8:
+            nx = x + dx
+            voisin = noeud + decalage
+            if nx < 0 or nx >= colonnes or voisin < 0 or voisin >= nb_noeuds or traites[voisin]:
+                continue
+            traites[voisin] = 1
+            directions[voisin] = code
+            if z[voisin] <= niveau:
+                # Dépression ou zone plane : comblée au niveau courant, traitée en largeur
+                z[voisin] = niveau
+                file_fosse.append(voisin)
+            else:
+                heapq.heappush(tas, (z[voisin], compteur, voisin))
+                compteur += 1
+
+    return np.frombuffer(bytes(directions), dtype=np.uint8).reshape(lignes, colonnes).copy()
+
+
+def suivre_ecoulement(directions, depart_px, arrivee_px=None, iterations_max=None):
+    """
+    Suit les pointeurs d'écoulement D8 vers l'aval depuis un pixel.
+
+    Sans pixel d'arrivée, le chemin va jusqu'à l'exutoire. Avec un pixel d'arrivée, il s'arrête au pixel de
+    l'écoulement le plus proche de celui-ci (l'arrivée elle-même si l'écoulement la traverse).
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Grille uint8 des codes D8.
+    depart_px : tuple of int
+        Pixel de départ (colonne, ligne).
+    arrivee_px : tuple of int, optional
+        Pixel visé (colonne, ligne), par défaut None.
+    iterations_max : int, optional
+        Nombre maximal de pas, par défaut le nombre de pixels du raster.
+
+    Returns
+    -------
+    list of tuple
+        Pixels (colonne, ligne) du chemin d'écoulement, départ inclus.
+    """
+    lignes, colonnes = directions.shape
+    if iterations_max is None:
+        iterations_max = lignes * colonnes
+    x, y = depart_px
+    chemin = [(x, y)]
+    if arrivee_px is not None:
+        ax, ay = arrivee_px
+        distance_min = (ax - x) ** 2 + (ay - y) ** 2
+        index_plus_proche = 0
+
+    for _ in range(iterations_max):
+        code = int(directions[y, x])
+        if code == 0 or (arrivee_px is not None and distance_min == 0):
+            break
+        x += int(DECALAGE_X_D8[code])
+        y += int(DECALAGE_Y_D8[code])
+        if not (0 <= x < colonnes and 0 <= y < lignes):
+            break
+        chemin.append((x, y))
+        if arrivee_px is not None:
+            distance = (ax - x) ** 2 + (ay - y) ** 2
+            if distance < distance_min:
+                distance_min = distance
+                index_plus_proche = len(chemin) - 1
+
+    if arrivee_px is not None:
+        return chemin[:index_plus_proche + 1]
+    return chemin
+
+
+def recepteurs_d8(directions):
+    """
+    Retourne, pour chaque pixel, l'indice aplati du pixel vers lequel il s'écoule.
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Grille uint8 des codes D8.
+
+    Returns
+    -------
+    np.ndarray
+        Indice aplati du pixel aval (int64), -1 pour les exutoires, les pixels sans donnée
+        et les écoulements sortant du raster.
+    """
+    lignes, colonnes = directions.shape
+    codes = directions.ravel()
+    index = np.arange(lignes * colonnes, dtype=np.int64)
+    x = index % colonnes + DECALAGE_X_D8[codes]
+    y = index // colonnes + DECALAGE_Y_D8[codes]
+    recepteurs = y * colonnes + x
+    recepteurs[(codes == 0) | (x < 0) | (x >= colonnes) | (y < 0) | (y >= lignes)] = -1
+    return recepteurs
+
+
+def accumulation_ecoulement(directions, valides=None):
+    """
+    Calcule l'accumulation d'écoulement (nombre de pixels drainés, pixel lui-même inclus).
+
+    Le graphe d'écoulement est parcouru par ordre topologique (algorithme de Kahn) : à chaque tour, tous les
+    pixels dont l'amont est entièrement traité transmettent en bloc leur accumulation à leur pixel aval.
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Grille uint8 des codes D8.
+    valides : np.ndarray, optional
+        Masque booléen des pixels avec donnée, par défaut tous les pixels ; un tableau d'entiers donne
+        l'écoulement propre de chaque pixel (apports d'une tuile voisine compris).
+
+    Returns
+    -------
+    np.ndarray
+        Grille uint32 des accumulations (0 pour les pixels sans donnée).
+    """
+    lignes, colonnes = directions.shape
+    recepteurs = recepteurs_d8(directions)
+    a_recepteur = recepteurs >= 0
+
+    entrants = np.bincount(recepteurs[a_recepteur], minlength=lignes * colonnes).astype(np.uint8)
+    if valides is None:
+        accumulation = np.ones(lignes * colonnes, dtype=np.uint32)
+    else:
+        accumulation = np.asarray(valides, dtype=np.uint32).ravel().copy()
+    front = np.flatnonzero((entrants == 0) & a_recepteur)
+    while front.size:
+        aval = recepteurs[front]
+        np.add.at(accumulation, aval, accumulation[front])
+        np.subtract.at(entrants, aval, 1)
+        aval = np.unique(aval)
+        front = aval[(entrants[aval] == 0) & a_recepteur[aval]]
+
+    return accumulation.reshape(lignes, colonnes)
@@ -0,0 +1,453 @@
+# utils/maillage_tin.py
+
+
+import itertools
+
+import numpy as np
+from qgis.core import QgsMesh
+
+# Tolérance sur les coordonnées barycentriques d'un point situé sur un côté de triangle
+TOLERANCE_BARYCENTRIQUE = 1e-9
+
+# Tolérance sur les paramètres d'intersection (fraction du segment ou de l'arête)
+TOLERANCE_PARAMETRE = 1e-9
+
+
+class MaillageTIN:
+    """
+    Maillage d'une couche TIN (QgsMeshLayer) lu une fois en tableaux NumPy : sommets, faces et arêtes.
+
+    Les arêtes sont indexées par abscisse minimale croissante : une recherche par emprise se limite à une
+    tranche du tableau trié (voir `aretes_emprise`), sans couche vectorielle temporaire ni index spatial QGIS.
+
+    Les faces sont découpées en triangles (en éventail pour les faces de plus de trois sommets) dont on
+    connaît les voisins par arête. Une grille régulière range les triangles par case : le triangle contenant
+    un point est trouvé parmi les quelques triangles de sa case (voir `localiser`). Un segment est alors
+    suivi de triangle en triangle à partir de celui qui contient son origine (voir `traverser`) : le coût est
+    proportionnel au nombre de triangles traversés, et les intersections sont obtenues dans l'ordre du
+    segment.
+
+    Attributes
+    ----------
+    x, y, z : np.ndarray
+        Coordonnées des sommets.
+    sommets_faces : np.ndarray
+        Indices des sommets de toutes les faces, mis bout à bout.
+    debuts_faces : np.ndarray
+        Position du premier sommet de chaque face dans `sommets_faces` (une valeur de plus que de faces).
+    arete_a, arete_b : np.ndarray
+        Sommets extrémités de chaque arête (a < b), chaque arête n'étant présente qu'une fois.
+    arete_xmin, arete_xmax, arete_ymin, arete_ymax : np.ndarray
+        Emprise de chaque arête, dans l'ordre de `arete_xmin` croissant.
+    largeur_max : float
+        Plus grande étendue en x d'une arête.
+    triangles : np.ndarray
+        Sommets des triangles (m, 3).
+    voisins : np.ndarray
+        Triangle voisin par l'arête opposée à chaque sommet (m, 3), -1 en bordure du maillage.
+    arete_reelle : np.ndarray
+        True pour les côtés de triangle qui sont des arêtes du maillage (et non des diagonales de découpage).
+
+    Methods
+    -------
+    depuis_couche(couche_mesh)
+        Lit le maillage d'une couche TIN.
+    aretes_emprise(xmin, ymin, xmax, ymax)
+        Retourne les indices des arêtes dont l'emprise recoupe un rectangle.
+    localiser(px, py)
+        Retourne le triangle contenant un point.
+    altitudes(px, py)
+        Retourne les altitudes interpolées de points quelconques.
+    traverser(x0, y0, x1, y1)
+        Retourne, dans l'ordre, les intersections d'un segment avec les arêtes du maillage.
+    """
+
+    def __init__(self, x, y, z, sommets_faces, debuts_faces):
+        """
+        Construit les arêtes, les triangles, leurs voisins et les index à partir des sommets et des faces.
+
+        Parameters
+        ----------
+        x, y, z : np.ndarray
+            Coordonnées des sommets.
+        sommets_faces : np.ndarray
+            Indices des sommets de toutes les faces, mis bout à bout.
+        debuts_faces : np.ndarray
+            Position du premier sommet de chaque face dans `sommets_faces`, suivie du nombre total d'indices.
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.z = np.asarray(z, dtype=np.float64)
+        self.sommets_faces = np.asarray(sommets_faces, dtype=np.int64)
+        self.debuts_faces = np.asarray(debuts_faces, dtype=np.int64)
+
+        # Sommet suivant de chaque sommet de face, le dernier revenant au premier
+        suivants = np.arange(1, len(self.sommets_faces) + 1)
+        suivants[self.debuts_faces[1:] - 1] = self.debuts_faces[:-1]
+        a = self.sommets_faces
+        b = self.sommets_faces[suivants] if len(suivants) else a
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        # Arête partagée par deux faces : conservée une seule fois
+        cles = np.unique(a * len(self.x) + b)
+        a, b = cles // len(self.x), cles % len(self.x)
+
+        xmin = np.minimum(self.x[a], self.x[b])
+        ordre = np.argsort(xmin, kind='stable')
+        self.arete_a, self.arete_b = a[ordre], b[ordre]
+        self.arete_xmin = xmin[ordre]
+        self.arete_xmax = np.maximum(self.x[self.arete_a], self.x[self.arete_b])
+        self.arete_ymin = np.minimum(self.y[self.arete_a], self.y[self.arete_b])
+        self.arete_ymax = np.maximum(self.y[self.arete_a], self.y[self.arete_b])
+        self.largeur_max = float((self.arete_xmax - self.arete_xmin).max()) if len(ordre) else 0.0
+
+        self._construire_triangles(cles)
+        self._construire_grille()
+
+    def _construire_triangles(self, cles_aretes):
+        """
+        Découpe les faces en triangles et calcule leurs voisins par arête.
+
+        Parameters
+        ----------
+        cles_aretes : np.ndarray
+            Clés triées (a * nombre de sommets + b) des arêtes du maillage.
+        """
+        nombre_sommets = len(self.x)
+        tailles = np.diff(self.debuts_faces)
+        # Triangles en éventail : (s0, sj, sj+1) pour j de 1 à taille - 2
+        nombres = np.maximum(tailles - 2, 0)
+        faces = np.repeat(np.arange(len(tailles)), nombres)
+        rangs = np.arange(int(nombres.sum())) - np.repeat(np.cumsum(nombres) - nombres, nombres) + 1
+        debuts = self.debuts_faces[faces]
+        triangles = np.stack((self.sommets_faces[debuts],
+                              self.sommets_faces[debuts + rangs],
+                              self.sommets_faces[debuts + rangs + 1]), axis=1)
+
+        # Orientation directe, pour des coordonnées barycentriques de même signe dans tout le maillage
+        xs, ys = self.x[triangles], self.y[triangles]
+        aires = ((xs[:, 1] - xs[:, 0]) * (ys[:, 2] - ys[:, 0]) - (xs[:, 2] - xs[:, 0]) * (ys[:, 1] - ys[:, 0]))
+        inverses = aires < 0
+        triangles[inverses, 1], triangles[inverses, 2] = triangles[inverses, 2], triangles[inverses, 1].copy()
+        self.triangles = triangles
+
+        # Côté i : arête opposée au sommet i
+        a = triangles[:, [1, 2, 0]]
+        b = triangles[:, [2, 0, 1]]
+        cles = (np.minimum(a, b) * nombre_sommets + np.maximum(a, b)).ravel()
+        self.arete_reelle = np.isin(cles, cles_aretes).reshape(-1, 3)
+
+        # Deux côtés de même clé se font face : chaque triangle est le voisin de l'autre
+        ordre = np.argsort(cles, kind='stable')
+        cles_triees = cles[ordre]
+        paires = np.flatnonzero(cles_triees[1:] == cles_triees[:-1])
+        if len(paires) > 1:
+            # Arête non manifold partagée par plus de deux triangles : seule la première paire est reliée
+            paires = paires[np.concatenate(([True], paires[1:] != paires[:-1] + 1))]
+        voisins = np.full(len(cles), -1, dtype=np.int64)
+        cote_1, cote_2 = ordre[paires], ordre[paires + 1]
+        voisins[cote_1] = cote_2 // 3
+        voisins[cote_2] = cote_1 // 3
+        self.voisins = voisins.reshape(-1, 3)
+        # Côtés triés par clé : triangles bordant une arête donnée
+        self._cles_cotes = cles_triees
+        self._ordre_cotes = ordre
+
+    def _construire_grille(self):
+        """
+        Range les triangles dans une grille régulière, par cases recoupant leur emprise.
+        """
+        xs, ys = self.x[self.triangles], self.y[self.triangles]
+        nombre_triangles = len(self.triangles)
+        if nombre_triangles == 0:
+            self.grille = None
+            return
+        self.grille_x0, self.grille_y0 = float(xs.min()), float(ys.min())
+        largeur = max(float(xs.max()) - self.grille_x0, 1e-9)
+        hauteur = max(float(ys.max()) - self.grille_y0, 1e-9)
+        # Environ deux triangles par case
+        taille = max(np.sqrt(largeur * hauteur * 2.0 / nombre_triangles), 1e-9)
+        self.grille_nx = int(largeur / taille) + 1
+        self.grille_ny = int(hauteur / taille) + 1
+        self.grille_pas_x = largeur / self.grille_nx
+        self.grille_pas_y = hauteur / self.grille_ny
+
+        ix0, ix1 = self._cases_x(xs.min(axis=1)), self._cases_x(xs.max(axis=1))
+        iy0, iy1 = self._cases_y(ys.min(axis=1)), self._cases_y(ys.max(axis=1))
+        largeurs = ix1 - ix0 + 1
+        nombres = largeurs * (iy1 - iy0 + 1)
+        triangles = np.repeat(np.arange(nombre_triangles), nombres)
+        rangs = np.arange(int(nombres.sum())) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+        largeurs = largeurs[triangles]
+        cases = (iy0[triangles] + rangs // largeurs) * self.grille_nx + ix0[triangles] + rangs % largeurs
+        ordre = np.argsort(cases, kind='stable')
+        self.grille = triangles[ordre]
+        self.grille_debuts = np.searchsorted(cases[ordre], np.arange(self.grille_nx * self.grille_ny + 1))
+
+    def _cases_x(self, valeurs):
+        return np.clip(((valeurs - self.grille_x0) / self.grille_pas_x).astype(np.int64), 0, self.grille_nx - 1)
+
+    def _cases_y(self, valeurs):
+        return np.clip(((valeurs - self.grille_y0) / self.grille_pas_y).astype(np.int64), 0, self.grille_ny - 1)
+
+    def _barycentriques(self, triangles, px, py):
+        """
+        Retourne les coordonnées barycentriques (n, 3) de points dans des triangles.
+        """
+        xs, ys = self.x[self.triangles[triangles]], self.y[self.triangles[triangles]]
+        dx, dy = px - xs[..., 2], py - ys[..., 2]
+        det = ((ys[..., 1] - ys[..., 2]) * (xs[..., 0] - xs[..., 2])
+               + (xs[..., 2] - xs[..., 1]) * (ys[..., 0] - ys[..., 2]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            l1 = ((ys[..., 1] - ys[..., 2]) * dx + (xs[..., 2] - xs[..., 1]) * dy) / det
+            l2 = ((ys[..., 2] - ys[..., 0]) * dx + (xs[..., 0] - xs[..., 2]) * dy) / det
+        return np.stack((l1, l2, 1.0 - l1 - l2), axis=-1)
+
+    def localiser(self, px, py):
+        """
+        Retourne le triangle contenant un point, cherché parmi les triangles de sa case de la grille.
+
+        Parameters
+        ----------
+        px, py : float
+            Coordonnées du point.
+
+        Returns
+        -------
+        int
+            Indice du triangle, -1 si le point est hors du maillage.
+        """
+        if self.grille is None:
+            return -1
+        ix = int((px - self.grille_x0) // self.grille_pas_x)
+        iy = int((py - self.grille_y0) // self.grille_pas_y)
+        # Points du bord supérieur de l'emprise : rattachés à la dernière case
+        if ix == self.grille_nx and px <= self.grille_x0 + self.grille_nx * self.grille_pas_x:
+            ix -= 1
+        if iy == self.grille_ny and py <= self.grille_y0 + self.grille_ny * self.grille_pas_y:
+            iy -= 1
+        if not (0 <= ix < self.grille_nx and 0 <= iy < self.grille_ny):
+            return -1
+        case = iy * self.grille_nx + ix
+        candidats = self.grille[self.grille_debuts[case]:self.grille_debuts[case + 1]]
+        if not len(candidats):
+            return -1
+        poids = self._barycentriques(candidats, px, py)
+        dedans = np.flatnonzero((poids >= -TOLERANCE_BARYCENTRIQUE).all(axis=1))
+        return int(candidats[dedans[0]]) if len(dedans) else -1
+
+    def altitudes(self, px, py):
+        """
+        Retourne les altitudes de points quelconques, interpolées par coordonnées barycentriques dans le
+        triangle qui contient chacun d'eux.
+
+        Parameters
+        ----------
+        px, py : array_like
+            Coordonnées des points.
+
+        Returns
+        -------
+        np.ndarray
+            Altitudes, NaN hors du maillage.
+        """
+        px = np.atleast_1d(np.asarray(px, dtype=np.float64))
+        py = np.atleast_1d(np.asarray(py, dtype=np.float64))
+        triangles = np.array([self.localiser(x, y) for x, y in zip(px.tolist(), py.tolist())], dtype=np.int64)
+        resultat = np.full(len(px), np.nan)
+        dedans = triangles >= 0
+        if dedans.any():
+            poids = self._barycentriques(triangles[dedans], px[dedans], py[dedans])
+            resultat[dedans] = (poids * self.z[self.triangles[triangles[dedans]]]).sum(axis=1)
+        return resultat
+
+    def _intersections_aretes(self, x0, y0, dx, dy, t_min):
+        """
+        Cherche la première intersection, au-delà de t_min, du segment avec une arête du maillage.
+
+        Sert à entrer dans le maillage quand le segment commence, ou repasse, à l'extérieur.
+
+        Returns
+        -------
+        list of tuple
+            Intersections (t, a, b, u) de paramètre t minimal, triées par t ; vide si aucune.
+        """
+        xa, ya = x0 + t_min * dx, y0 + t_min * dy
+        xb, yb = x0 + dx, y0 + dy
+        indices = self.aretes_emprise(min(xa, xb), min(ya, yb), max(xa, xb), max(ya, yb))
+        if not len(indices):
+            return []
+        a, b = self.arete_a[indices], self.arete_b[indices]
+        qx, qy = self.x[a], self.y[a]
+        sx, sy = self.x[b] - qx, self.y[b] - qy
+        denominateur = dx * sy - dy * sx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = ((qx - x0) * sy - (qy - y0) * sx) / denominateur
+            u = ((qx - x0) * dy - (qy - y0) * dx) / denominateur
+        valides = ((denominateur != 0) & (t > t_min + TOLERANCE_PARAMETRE) & (t <= 1.0 + TOLERANCE_PARAMETRE)
+                   & (u >= -TOLERANCE_PARAMETRE) & (u <= 1.0 + TOLERANCE_PARAMETRE))
+        if not valides.any():
+            return []
+        t, a, b, u = t[valides], a[valides], b[valides], np.clip(u[valides], 0.0, 1.0)
+        premieres = np.flatnonzero(t <= t.min() + TOLERANCE_PARAMETRE)
+        return [(float(t[i]), int(a[i]), int(b[i]), float(u[i])) for i in premieres]
+
+    def _triangle_entree(self, a, b, dx, dy):
+        """
+        Retourne le triangle bordant l'arête (a, b) du côté vers lequel va la direction (dx, dy), -1 sinon.
+        """
+        cle = min(a, b) * len(self.x) + max(a, b)
+        debut = np.searchsorted(self._cles_cotes, cle, side='left')
+        fin = np.searchsorted(self._cles_cotes, cle, side='right')
+        qx, qy = self.x[a], self.y[a]
+        sx, sy = self.x[b] - qx, self.y[b] - qy
+        sens = sx * dy - sy * dx
+        for cote in self._ordre_cotes[debut:fin].tolist():
+            triangle, rang = divmod(cote, 3)
+            c = self.triangles[triangle, rang]
+            if (sx * (self.y[c] - qy) - sy * (self.x[c] - qx)) * sens > 0:
+                return triangle
+        return -1
+
+    def traverser(self, x0, y0, x1, y1):
+        """
+        Retourne, dans l'ordre du segment, ses intersections avec les arêtes du maillage.
+
+        Le segment est suivi de triangle en triangle : dans chaque triangle, le côté de sortie est celui que
+        la droite du segment coupe le plus loin, et le triangle suivant est son voisin par ce côté. Hors du
+        maillage (origine extérieure, bordure ou trou), la marche reprend à la première arête coupée plus loin.
+        Les diagonales de découpage des faces non triangulaires sont traversées sans donner d'intersection.
+
+        Le segment est fermé : une extrémité située sur une arête ou un sommet donne une intersection, comme
+        n'importe quel point du segment. Un point commun à plusieurs arêtes (sommet) n'est retourné qu'une fois.
+
+        Parameters
+        ----------
+        x0, y0, x1, y1 : float
+            Extrémités du segment.
+
+        Returns
+        -------
+        tuple of np.ndarray
+            (x, y, z) des intersections ; z est interpolé en une fois entre les extrémités de chaque arête
+            coupée (coordonnées barycentriques d'un point situé sur un côté du triangle).
+        """
+        dx, dy = x1 - x0, y1 - y0
+        # Origine sur une arête ou un sommet : la marche ne retient que les coupures au-delà de t = 0
+        coupures = [(max(t, 0.0), a, b, u) for t, a, b, u in
+                    self._intersections_aretes(x0, y0, dx, dy, -2.0 * TOLERANCE_PARAMETRE)
+                    if t <= TOLERANCE_PARAMETRE][:1]
+        t_courant = 0.0
+        triangle = self.localiser(x0, y0)
+        # Pas de relocalisation lorsque la marche bute sur un sommet
+        pas_relance = TOLERANCE_PARAMETRE * 1e3
+
+        for _ in range(4 * len(self.triangles) + 8):
+            if t_courant >= 1.0:
+                break
+            if triangle < 0:
+                # Hors du maillage : entrée par la prochaine arête coupée
+                entrees = self._intersections_aretes(x0, y0, dx, dy, t_courant)
+                if not entrees:
+                    break
+                coupures.append(entrees[0])
+                t_courant = entrees[0][0]
+                # Arête de bordure : triangle situé en avant ; arête intérieure (trou traversé en biais) : idem
+                for _, a, b, _ in entrees:
+                    triangle = self._triangle_entree(a, b, dx, dy)
+                    if triangle >= 0:
+                        break
+                continue
+
+            sommets = self.triangles[triangle].tolist()
+            sortie = None
+            for cote in range(3):
+                a, b = sommets[(cote + 1) % 3], sommets[(cote + 2) % 3]
+                qx, qy = self.x[a], self.y[a]
+                sx, sy = self.x[b] - qx, self.y[b] - qy
+                denominateur = dx * sy - dy * sx
+                if denominateur == 0:
+                    continue
+                t = ((qx - x0) * sy - (qy - y0) * sx) / denominateur
+                u = ((qx - x0) * dy - (qy - y0) * dx) / denominateur
+                if (t > t_courant + TOLERANCE_PARAMETRE and -TOLERANCE_PARAMETRE <= u <= 1.0 + TOLERANCE_PARAMETRE
+                        and (sortie is None or t > sortie[0])):
+                    sortie = (t, cote, a, b, min(max(u, 0.0), 1.0))
+
+            if sortie is None:
+                # Segment passant par un sommet : reprise juste après, dans le triangle qui contient ce point
+                t_relance = min(t_courant + pas_relance, 1.0)
+                suivant = self.localiser(x0 + t_relance * dx, y0 + t_relance * dy)
+                t_courant = t_relance
+                triangle = suivant
+                continue
+
+            t, cote, a, b, u = sortie
+            if t > 1.0 + TOLERANCE_PARAMETRE:
+                break
+            if self.arete_reelle[triangle, cote]:
+                coupures.append((t, a, b, u))
+            t_courant = t
+            triangle = int(self.voisins[triangle, cote])
+
+        if not coupures:
+            vide = np.empty(0)
+            return vide, vide, vide
+        t, a, b, u = (np.array(valeurs) for valeurs in zip(*coupures))
+        # Passage par un sommet : une seule intersection pour les arêtes qui s'y rejoignent
+        distincts = np.concatenate(([True], np.diff(t) > TOLERANCE_PARAMETRE))
+        t, a, b, u = t[distincts], a[distincts].astype(np.int64), b[distincts].astype(np.int64), u[distincts]
+        z = (1.0 - u) * self.z[a] + u * self.z[b]
+        return x0 + t * dx, y0 + t * dy, z
+
+    @classmethod
+    def depuis_couche(cls, couche_mesh):
+        """
+        Lit le maillage d'une couche TIN auprès de son fournisseur de données.
+
+        Parameters
+        ----------
+        couche_mesh : QgsMeshLayer
+            Couche du maillage.
+
+        Returns
+        -------
+        MaillageTIN
+            Maillage lu, dans le système de coordonnées de la couche.
+        """
+        maillage = QgsMesh()
+        couche_mesh.dataProvider().populateMesh(maillage)
+
+        nombre_sommets = maillage.vertexCount()
+        coordonnees = np.empty((nombre_sommets, 3), dtype=np.float64)
+        for i in range(nombre_sommets):
+            sommet = maillage.vertex(i)
+            coordonnees[i] = (sommet.x(), sommet.y(), sommet.z())
+
+        faces = [maillage.face(i) for i in range(maillage.faceCount())]
+        tailles = np.fromiter(map(len, faces), dtype=np.int64, count=len(faces))
+        debuts_faces = np.concatenate(([0], np.cumsum(tailles)))
+        sommets_faces = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.int64,
+                                    count=int(debuts_faces[-1]))
+        return cls(coordonnees[:, 0], coordonnees[:, 1], coordonnees[:, 2], sommets_faces, debuts_faces)
+
+    def aretes_emprise(self, xmin, ymin, xmax, ymax):
+        """
+        Retourne les indices des arêtes dont l'emprise recoupe un rectangle.
+
+        Parameters
+        ----------
+        xmin, ymin, xmax, ymax : float
+            Rectangle de recherche.
+
+        Returns
+        -------
+        np.ndarray
+            Indices des arêtes, dans l'ordre de `arete_xmin` croissant.
+        """
+        debut = np.searchsorted(self.arete_xmin, xmin - self.largeur_max, side='left')
+        fin = np.searchsorted(self.arete_xmin, xmax, side='right')
+        indices = np.arange(debut, fin)
+        retenues = ((self.arete_xmax[debut:fin] >= xmin) &
+                    (self.arete_ymin[debut:fin] <= ymax) &
+                    (self.arete_ymax[debut:fin] >= ymin))
+        return indices[retenues]
@@ -0,0 +1,194 @@
+# utils/mnt_compact.py
+
+
+import numpy as np
+
+# Pas de quantification des altitudes : le décimètre, arrondi du MNT préparé (le codage est alors sans perte)
+PAS_ALTITUDE_COMPACT = 0.1
+
+# Marge ajoutée à la plage d'altitudes estimée (sur les aperçus, donc approchée) avant de choisir le type
+MARGE_ALTITUDE_COMPACT = 100.0
+
+# Pas de quantification des pentes en degrés : uint16 au centième de degré
+PAS_PENTE_COMPACT = 0.01
+
+
+class CodageLineaire:
+    """
+    Codage entier d'un raster flottant : valeur = code * echelle + decalage.
+
+    Le codage est monotone : l'ordre et les égalités entre valeurs codées sont ceux des valeurs d'origine
+    arrondies au pas `echelle`. Un code est réservé aux pixels sans donnée (et aux NaN).
+
+    Attributes
+    ----------
+    echelle : float
+        Pas de quantification.
+    decalage : float
+        Valeur du code 0.
+    dtype : np.dtype
+        Type entier des codes.
+    code_nodata : int
+        Code réservé aux pixels sans donnée.
+    nodata : float or None
+        Valeur sans donnée restituée au décodage (NaN si None).
+
+    Methods
+    -------
+    encoder(valeurs)
+        Retourne les codes entiers des valeurs.
+    decoder(codes)
+        Retourne les valeurs float32 des codes.
+    """
+
+    def __init__(self, echelle, decalage, dtype, code_nodata, nodata=None):
+        self.echelle = float(echelle)
+        self.decalage = float(decalage)
+        self.dtype = np.dtype(dtype)
+        self.code_nodata = int(code_nodata)
+        self.nodata = nodata
+        info = np.iinfo(self.dtype)
+        # Bornes des codes valides, le code réservé exclu
+        self.code_min = info.min + 1 if self.code_nodata == info.min else info.min
+        self.code_max = info.max - 1 if self.code_nodata == info.max else info.max
+
+    def encoder(self, valeurs):
+        """
+        Retourne les codes entiers des valeurs ; les valeurs hors plage sont ramenées aux bornes du type.
+
+        Parameters
+        ----------
+        valeurs : np.ndarray
+            Valeurs flottantes.
+
+        Returns
+        -------
+        np.ndarray
+            Codes de type `dtype`.
+        """
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        invalides = ~np.isfinite(valeurs)
+        if self.nodata is not None:
+            invalides |= valeurs == self.nodata
+        codes = np.rint((valeurs - self.decalage) / self.echelle)
+        np.clip(codes, self.code_min, self.code_max, out=codes)
+        codes[invalides] = self.code_nodata
+        codes = codes.astype(self.dtype)
+        return codes[()] if codes.ndim == 0 else codes
+
+    def decoder(self, codes):
+        """
+        Retourne les valeurs float32 des codes.
+
+        Le calcul est fait en float64 puis arrondi en float32 : une altitude arrondie au décimètre en float32
+        est restituée exactement.
+
+        Parameters
+        ----------
+        codes : np.ndarray or np.integer
+            Codes entiers.
+
+        Returns
+        -------
+        np.ndarray or np.float32
+            Valeurs décodées, `nodata` (ou NaN) pour le code réservé.
+        """
+        codes = np.asarray(codes)
+        valeurs = (codes * self.echelle + self.decalage).astype(np.float32)
+        invalides = codes == self.code_nodata
+        if invalides.any():
+            valeurs = np.where(invalides, np.float32(self.nodata if self.nodata is not None else np.nan), valeurs)
+        return valeurs[()] if valeurs.ndim == 0 else valeurs
+
+
+def codage_altitudes(zmin, zmax, nodata=None, pas=PAS_ALTITUDE_COMPACT):
+    """
+    Retourne le codage compact d'altitudes comprises entre zmin et zmax : int16 si la plage le permet
+    (6 553 m au décimètre, marge comprise), int32 sinon.
+
+    Parameters
+    ----------
+    zmin, zmax : float
+        Plage d'altitudes, éventuellement approchée.
+    nodata : float, optional
+        Valeur sans donnée du MNT, par défaut None.
+    pas : float, optional
+        Pas de quantification en mètres, par défaut PAS_ALTITUDE_COMPACT.
+
+    Returns
+    -------
+    CodageLineaire
+        Codage centré sur la plage, de décalage multiple du pas.
+    """
+    decalage = round((zmin + zmax) / 2.0 / pas) * pas
+    demi_etendue = (zmax - zmin) / 2.0 + MARGE_ALTITUDE_COMPACT
+    dtype = np.int16 if demi_etendue / pas < np.iinfo(np.int16).max - 1 else np.int32
+    return CodageLineaire(pas, decalage, dtype, np.iinfo(dtype).min, nodata)
+
+
+class TableauQuantifie:
+    """
+    Raster stocké sous forme de codes entiers, lu comme le tableau NumPy des valeurs décodées.
+
+    L'objet s'indexe comme un tableau 2D (`t[py, px]`, `t[y0:y1, x0:x1]`, `t[tableau_py, tableau_px]`) et
+    seules les valeurs lues sont décodées ; `np.asarray(t)` décode le raster entier.
+
+    Attributes
+    ----------
+    codes : np.ndarray
+        Codes entiers.
+    codage : CodageLineaire
+        Codage des valeurs.
+    shape : tuple of int
+        Dimensions du raster.
+    dtype : np.dtype
+        Type des valeurs décodées (float32).
+    """
+
+    def __init__(self, codes, codage):
+        self.codes = codes
+        self.codage = codage
+        self.shape = codes.shape
+        self.ndim = codes.ndim
+        self.dtype = np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def __getitem__(self, cle):
+        return self.codage.decoder(self.codes[cle])
+
+    def __array__(self, dtype=None, copy=None):
+        valeurs = self.codage.decoder(self.codes)
+        if dtype is not None:
+            valeurs = valeurs.astype(dtype, copy=False)
+        return valeurs
+
+    def __len__(self):
+        return self.shape[0]
+
+
+def quantifier_pentes(pentes, pas=PAS_PENTE_COMPACT):
+    """
+    Quantifie des pentes en degrés : uint8 si le pas le permet (0,36° et plus), uint16 sinon.
+
+    Parameters
+    ----------
+    pentes : np.ndarray
+        Pentes en degrés (0 à 90), NaN sans donnée.
+    pas : float, optional
+        Pas de quantification en degrés, par défaut PAS_PENTE_COMPACT.
+
+    Returns
+    -------
+    TableauQuantifie
+        Pentes codées, décodées en float32 à la lecture.
+    """
+    dtype = np.uint8 if 90.0 / pas < np.iinfo(np.uint8).max else np.uint16
+    codage = CodageLineaire(pas, 0.0, dtype, np.iinfo(dtype).max)
+    codes = np.empty(pentes.shape, dtype=dtype)
+    # Par bandes de lignes : pas de copie float64 du raster entier
+    for y0 in range(0, pentes.shape[0], 1024):
+        codes[y0:y0 + 1024] = codage.encoder(pentes[y0:y0 + 1024])
+    return TableauQuantifie(codes, codage)
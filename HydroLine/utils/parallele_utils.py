@@ -0,0 +1,579 @@
+# utils/parallele_utils.py
+
+
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Moteurs d'exécution proposés pour les traitements raster
+BACKENDS_PARALLELES = ('auto', 'serie', 'threads', 'processus', 'dask')
+
+# En dessous de ce nombre de pixels, le découpage coûte plus qu'il ne rapporte
+SEUIL_PIXELS_PARALLELE = 1 << 22
+
+# Volume visé pour les données d'entrée d'une bande, en octets
+OCTETS_BANDE_CIBLE = 16 * 1024 ** 2
+
+_configuration = {'backend': 'auto', 'nb_travailleurs': None}
+
+
+def configurer_parallelisme(backend='auto', nb_travailleurs=None):
+    """
+    Définit le moteur d'exécution et le nombre de travailleurs utilisés par défaut par `appliquer_par_bandes`.
+
+    Parameters
+    ----------
+    backend : str, optional
+        Moteur parmi BACKENDS_PARALLELES, par défaut 'auto'.
+    nb_travailleurs : int, optional
+        Nombre de travailleurs ; None pour utiliser tous les cœurs, par défaut None.
+    """
+    if backend not in BACKENDS_PARALLELES:
+        raise ValueError(f"Moteur d'exécution inconnu : {backend}")
+    _configuration['backend'] = backend
+    _configuration['nb_travailleurs'] = nb_travailleurs
+
+
+def configuration_parallelisme():
+    """
+    Retourne le moteur d'exécution et le nombre de travailleurs configurés.
+
+    Returns
+    -------
+    tuple
+        (backend, nb_travailleurs), nb_travailleurs valant None pour tous les cœurs.
+    """
+    return _configuration['backend'], _configuration['nb_travailleurs']
+
+
+def nombre_travailleurs(nb_travailleurs=None):
+    """
+    Retourne le nombre de travailleurs à utiliser.
+
+    Parameters
+    ----------
+    nb_travailleurs : int, optional
+        Nombre demandé ; à défaut, valeur configurée, puis nombre de cœurs disponibles.
+
+    Returns
+    -------
+    int
+        Nombre de travailleurs (au moins 1).
+    """
+    if nb_travailleurs is None:
+        nb_travailleurs = _configuration['nb_travailleurs']
+    if nb_travailleurs is None:
+        try:
+            nb_travailleurs = len(os.sched_getaffinity(0))
+        except AttributeError:
+            nb_travailleurs = os.cpu_count() or 1
+    return max(int(nb_travailleurs), 1)
+
+
+def memoire_disponible():
+    """
+    Retourne la mémoire physique disponible, lorsque le système permet de la connaître.
+
+    Returns
+    -------
+    int or None
+        Mémoire disponible en octets, None si elle ne peut pas être déterminée.
+    """
+    if sys.platform == 'win32':
+        import ctypes
+
+        class _EtatMemoire(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        etat = _EtatMemoire()
+        etat.dwLength = ctypes.sizeof(_EtatMemoire)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(etat)):
+            return int(etat.ullAvailPhys)
+        return None
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def hauteur_bande_auto(lignes, colonnes, octets_pixel, nb_travailleurs, halo=0):
+    """
+    Choisit la hauteur des bandes de lignes d'un traitement.
+
+    Les bandes visent OCTETS_BANDE_CIBLE d'entrée, pour que les temporaires d'un travailleur restent
+    dans les caches du processeur sans multiplier les appels, et sont assez nombreuses (au moins quatre
+    par travailleur) pour équilibrer la charge. Elles restent nettement plus hautes que le recouvrement.
+
+    Parameters
+    ----------
+    lignes, colonnes : int
+        Dimensions du raster.
+    octets_pixel : int
+        Taille d'une valeur d'entrée.
+    nb_travailleurs : int
+        Nombre de travailleurs.
+    halo : int, optional
+        Nombre de lignes de recouvrement de chaque côté d'une bande, par défaut 0.
+
+    Returns
+    -------
+    int
+        Hauteur des bandes en lignes.
+    """
+    hauteur = OCTETS_BANDE_CIBLE // max(colonnes * octets_pixel, 1)
+    if nb_travailleurs > 1:
+        hauteur = min(hauteur, -(-lignes // (4 * nb_travailleurs)))
+    hauteur = max(hauteur, 4 * halo, 16)
+    return int(min(hauteur, max(lignes, 1)))
+
+
+def choisir_backend(backend, lignes, colonnes, nb_travailleurs, libere_gil=True):
+    """
+    Résout le moteur 'auto' selon la taille du raster et la nature du noyau.
+
+    Parameters
+    ----------
+    backend : str
+        Moteur demandé.
+    lignes, colonnes : int
+        Dimensions du raster.
+    nb_travailleurs : int
+        Nombre de travailleurs.
+    libere_gil : bool, optional
+        True si le noyau passe l'essentiel de son temps dans du code NumPy qui libère le GIL, par défaut True.
+
+    Returns
+    -------
+    str
+        Moteur effectif ('serie', 'threads', 'processus' ou 'dask').
+    """
+    if backend != 'auto':
+        return backend
+    if nb_travailleurs == 1 or lignes * colonnes < SEUIL_PIXELS_PARALLELE:
+        return 'serie'
+    return 'threads' if libere_gil else 'processus'
+
+
+def _decouper(lignes, hauteur, halo):
+    """
+    Bandes (y0, y1, h0, h1) : lignes produites et lignes lues, recouvrement compris.
+    """
+    return [(y0, min(y0 + hauteur, lignes), max(y0 - halo, 0), min(y0 + hauteur + halo, lignes))
+            for y0 in range(0, lignes, hauteur)]
+
+
+def _lignes_utiles(resultat, y0, y1, h0):
+    """
+    Retire le recouvrement du résultat d'un noyau (tableau ou dictionnaire de tableaux).
+    """
+    debut = y0 - h0
+    fin = debut + (y1 - y0)
+    if isinstance(resultat, dict):
+        return {nom: grille[debut:fin] for nom, grille in resultat.items()}
+    return resultat[debut:fin]
+
+
+def _ecrire(sorties, resultat, y0, y1, h0):
+    """
+    Recopie les lignes utiles du résultat d'un noyau dans la ou les grilles de sortie.
+    """
+    utiles = _lignes_utiles(resultat, y0, y1, h0)
+    if isinstance(sorties, dict):
+        for nom, sortie in sorties.items():
+            sortie[y0:y1] = utiles[nom]
+    else:
+        sorties[y0:y1] = utiles
+
+
+def appliquer_par_bandes(noyau, entree, halo=0, dtype=np.float32, sorties=None, backend=None,
+                         nb_travailleurs=None, hauteur_bande=None, libere_gil=True, destination=None,
+                         progression=None, interrompre=None, **parametres):
+    """
+    Applique un noyau raster à un tableau, par bandes de lignes, avec le moteur d'exécution choisi.
+
+    Le noyau reçoit une bande d'entrée augmentée d'au plus `halo` lignes au-dessus et au-dessous (moins
+    sur les bords du raster) et retourne un résultat de mêmes dimensions ; seules les lignes propres à la
+    bande sont conservées. Pour un noyau local de rayon au plus `halo`, le résultat est donc identique à un
+    appel sur le raster entier, quel que soit le découpage.
+
+    Avec `destination`, aucune grille de la taille du raster n'est allouée : chaque bande terminée est
+    transmise, dans le thread appelant, à cette fonction (typiquement une écriture GDAL par bloc), et la
+    mémoire reste proportionnelle à la hauteur des bandes et au nombre de travailleurs.
+
+    Moteurs :
+    - 'serie' : une bande après l'autre dans le thread appelant ;
+    - 'threads' : bandes réparties sur un pool de threads (noyaux NumPy qui libèrent le GIL) ;
+    - 'processus' : bandes réparties sur un pool de processus, l'entrée et les sorties en mémoire partagée
+      (noyaux qui gardent le GIL) ; le noyau doit être une fonction de module importable sans QGIS ;
+    - 'dask' : `map_overlap` de dask (si disponible), ordonnanceur à threads ;
+    - 'auto' : série pour les petits rasters, sinon threads ou processus selon `libere_gil`.
+
+    Parameters
+    ----------
+    noyau : callable
+        Fonction noyau(bande, **parametres) retournant un tableau, ou un dictionnaire de tableaux si
+        `sorties` est fourni.
+    entree : np.ndarray or AccesseurMNT
+        Raster d'entrée (lignes, colonnes) ; seul l'accès par tranches de lignes est utilisé.
+    halo : int, optional
+        Nombre de lignes de recouvrement nécessaires au noyau de chaque côté, par défaut 0.
+    dtype : np.dtype, optional
+        Type des grilles de sortie, par défaut float32.
+    sorties : tuple of str, optional
+        Noms des grilles produites par un noyau à plusieurs sorties, par défaut None.
+    backend : str, optional
+        Moteur parmi BACKENDS_PARALLELES ; None pour le moteur configuré, par défaut None.
+    nb_travailleurs : int, optional
+        Nombre de travailleurs ; None pour la valeur configurée, par défaut None.
+    hauteur_bande : int, optional
+        Hauteur des bandes ; None pour un choix automatique, par défaut None.
+    libere_gil : bool, optional
+        True si le noyau libère le GIL (guide le choix du moteur 'auto'), par défaut True.
+    destination : callable, optional
+        Fonction destination(y0, valeurs) recevant chaque bande terminée, dans un ordre quelconque ;
+        impose le moteur série ou threads, par défaut None.
+    progression : callable, optional
+        Fonction appelée avec l'avancement (0-100) dans le thread appelant.
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner le traitement.
+    **parametres
+        Paramètres nommés transmis au noyau.
+
+    Returns
+    -------
+    np.ndarray, dict, bool or None
+        Grille de sortie, ou dictionnaire des grilles si `sorties` est fourni, ou True si les bandes ont été
+        transmises à `destination` ; None en cas d'interruption.
+    """
+    lignes, colonnes = entree.shape[:2]
+    nb_travailleurs = nombre_travailleurs(nb_travailleurs)
+    backend = choisir_backend(backend or _configuration['backend'], lignes, colonnes, nb_travailleurs,
+                              libere_gil)
+    if destination is not None and backend in ('processus', 'dask'):
+        # Ces moteurs produisent des grilles complètes : incompatible avec une écriture par blocs
+        backend = 'threads'
+    if hauteur_bande is None:
+        hauteur_bande = hauteur_bande_auto(lignes, colonnes, np.dtype(entree.dtype).itemsize,
+                                           1 if backend == 'serie' else nb_travailleurs, halo)
+
+    if backend == 'dask':
+        try:
+            import dask.array  # noqa: F401
+        except ImportError:
+            backend = 'threads'
+    if backend == 'processus':
+        try:
+            return _appliquer_processus(noyau, entree, halo, dtype, sorties, nb_travailleurs, hauteur_bande,
+                                        progression, interrompre, parametres)
+        except (OSError, ImportError, RuntimeError, pickle.PicklingError, AttributeError, TypeError):
+            # Mémoire partagée ou processus indisponibles (noyau non sérialisable, environnement restreint)
+            backend = 'threads'
+
+    if destination is not None:
+        grilles = None
+    elif sorties is None:
+        grilles = np.empty((lignes, colonnes), dtype=dtype)
+    else:
+        grilles = {nom: np.empty((lignes, colonnes), dtype=dtype) for nom in sorties}
+
+    if backend == 'dask':
+        return _appliquer_dask(noyau, entree, halo, dtype, grilles, nb_travailleurs, hauteur_bande, parametres)
+
+    def traiter(y0, y1):
+        h0, h1 = max(y0 - halo, 0), min(y1 + halo, lignes)
+        resultat = noyau(entree[h0:h1, :], **parametres)
+        if destination is not None:
+            return _lignes_utiles(resultat, y0, y1, h0)
+        _ecrire(grilles, resultat, y0, y1, h0)
+        return None
+
+    def recevoir(y0, y1, utiles):
+        if utiles is not None:
+            destination(y0, utiles)
+
+    if not executer_par_bandes(traiter, lignes, hauteur_bande, recevoir, backend, nb_travailleurs, progression,
+                               interrompre):
+        return None
+    return grilles if destination is None else True
+
+
+def executer_par_bandes(traiter, lignes, hauteur_bande, recevoir=None, backend='threads', nb_travailleurs=None,
+                        progression=None, interrompre=None):
+    """
+    Exécute un calcul bande par bande, en série ou sur un pool de threads.
+
+    Forme générique du découpage d'`appliquer_par_bandes`, pour les traitements qui lisent eux-mêmes leurs
+    données (sources GDAL ouvertes par thread, par exemple) : seuls les moteurs 'serie' et 'threads'
+    s'appliquent, tout autre moteur est exécuté sur le pool de threads.
+
+    Parameters
+    ----------
+    traiter : callable
+        Fonction traiter(y0, y1) calculant les lignes y0 (incluse) à y1 (exclue) et retournant leur résultat.
+    lignes : int
+        Nombre de lignes du raster.
+    hauteur_bande : int
+        Hauteur des bandes en lignes.
+    recevoir : callable, optional
+        Fonction recevoir(y0, y1, resultat) appelée dans le thread appelant avec chaque bande terminée,
+        dans un ordre quelconque, par défaut None.
+    backend : str, optional
+        Moteur effectif (voir `choisir_backend`), par défaut 'threads'.
+    nb_travailleurs : int, optional
+        Nombre de travailleurs ; None pour la valeur configurée, par défaut None.
+    progression : callable, optional
+        Fonction appelée avec l'avancement (0-100) dans le thread appelant.
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner le traitement.
+
+    Returns
+    -------
+    bool
+        True si toutes les bandes ont été traitées, False en cas d'interruption.
+    """
+    nb_travailleurs = nombre_travailleurs(nb_travailleurs)
+    bandes = [(y0, min(y0 + hauteur_bande, lignes)) for y0 in range(0, lignes, hauteur_bande)]
+
+    def terminer(bande, resultat):
+        # Dans le thread appelant : transmission du résultat, nombre de lignes traitées
+        y0, y1 = bande
+        if recevoir is not None:
+            recevoir(y0, y1, resultat)
+        return y1 - y0
+
+    if backend == 'serie' or nb_travailleurs == 1:
+        faites = 0
+        for bande in bandes:
+            if interrompre is not None and interrompre():
+                return False
+            faites += terminer(bande, traiter(*bande))
+            if progression is not None:
+                progression(int(100 * faites / lignes))
+        return True
+
+    with ThreadPoolExecutor(max_workers=nb_travailleurs) as executeur:
+        return _suivre(lambda bande: executeur.submit(lambda: (bande, traiter(*bande))), bandes, nb_travailleurs,
+                       lignes, progression, interrompre, lambda resultat: terminer(*resultat))
+
+
+def _suivre(soumettre, taches, nb_travailleurs, lignes, progression, interrompre, recevoir=None):
+    """
+    Soumet les bandes au fil de l'eau (deux par travailleur au plus en attente), suit l'avancement
+    et abandonne sur interruption. `recevoir` traite chaque résultat dans le thread appelant et retourne
+    le nombre de lignes correspondant. Retourne False si le traitement a été interrompu.
+    """
+    restantes = iter(taches)
+    en_cours = set()
+    faites = 0
+    try:
+        while True:
+            while len(en_cours) < 2 * nb_travailleurs:
+                tache = next(restantes, None)
+                if tache is None:
+                    break
+                en_cours.add(soumettre(tache))
+            if not en_cours:
+                return True
+            terminees, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in terminees:
+                faites += future.result() if recevoir is None else recevoir(future.result())
+            if progression is not None:
+                progression(int(100 * faites / lignes))
+            if interrompre is not None and interrompre():
+                return False
+    finally:
+        for future in en_cours:
+            future.cancel()
+
+
+def _appliquer_dask(noyau, entree, halo, dtype, grilles, nb_travailleurs, hauteur_bande, parametres):
+    """
+    Exécute le noyau avec dask.array.map_overlap (sans bordure ajoutée sur les bords du raster).
+
+    Un noyau à plusieurs sorties n'est appelé qu'une fois par bloc : ses grilles sont réunies dans un
+    tableau structuré, dont chaque champ est ensuite écrit dans sa grille par un unique `da.store`.
+    """
+    import dask.array as da
+
+    if not hasattr(entree, 'ndim'):
+        entree = np.asarray(entree)
+    tableau = da.from_array(entree, chunks=(hauteur_bande, entree.shape[1]))
+
+    if not isinstance(grilles, dict):
+        calcul = tableau.map_overlap(lambda bande: noyau(bande, **parametres), depth={0: halo, 1: 0},
+                                     boundary='none', dtype=dtype)
+        da.store(calcul, grilles, lock=False, scheduler='threads', num_workers=nb_travailleurs)
+        return grilles
+
+    type_bloc = np.dtype([(nom, dtype) for nom in grilles])
+
+    def noyau_bloc(bande):
+        resultat = noyau(bande, **parametres)
+        bloc = np.empty(bande.shape, dtype=type_bloc)
+        for nom in grilles:
+            bloc[nom] = resultat[nom]
+        return bloc
+
+    calcul = tableau.map_overlap(noyau_bloc, depth={0: halo, 1: 0}, boundary='none', dtype=type_bloc)
+    da.store([calcul[nom] for nom in grilles], list(grilles.values()), lock=False, scheduler='threads',
+             num_workers=nb_travailleurs)
+    return grilles
+
+
+def _contexte_processus():
+    """
+    Contexte multiprocessing des pools de processus.
+
+    'spawn' partout : un fork de QGIS dupliquerait ses threads Qt. Sous Windows, l'exécutable de QGIS
+    n'est pas un interpréteur Python : les travailleurs sont lancés avec le pythonw de son environnement.
+    """
+    contexte = multiprocessing.get_context('spawn')
+    if os.name == 'nt':
+        python = os.path.join(sys.exec_prefix, 'pythonw.exe')
+        if os.path.exists(python):
+            contexte.set_executable(python)
+    return contexte
+
+
+def _attacher_memoire(nom):
+    """
+    Attache un segment de mémoire partagée existant sans le confier au suivi de ressources du travailleur.
+    """
+    try:
+        return shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        # Python < 3.13
+        return shared_memory.SharedMemory(name=nom)
+
+
+def _travail_processus(noyau, source, shape, memoires_sorties, dtype, bande, parametres):
+    """
+    Traite une bande dans un processus travailleur, à partir de la mémoire partagée ou d'un fichier projeté.
+
+    `source` est (type, référence, type des valeurs stockées, codage) ; avec un codage (MNT compact projeté),
+    les valeurs de la bande sont arrondies et décodées comme le fait l'accesseur.
+    """
+    y0, y1, h0, h1 = bande
+    type_source, reference, dtype_source, codage = source
+    segments = []
+    try:
+        if type_source == 'memmap':
+            entree = np.memmap(reference, dtype=dtype_source, mode='r', shape=shape)
+        else:
+            segment = _attacher_memoire(reference)
+            segments.append(segment)
+            entree = np.ndarray(shape, dtype=dtype_source, buffer=segment.buf)
+
+        valeurs = entree[h0:h1, :]
+        if codage is not None:
+            valeurs = codage.decoder(codage.encoder(valeurs))
+        resultat = noyau(valeurs, **parametres)
+        del valeurs
+
+        debut = y0 - h0
+        fin = debut + (y1 - y0)
+        for nom, nom_memoire in memoires_sorties.items():
+            segment = _attacher_memoire(nom_memoire)
+            segments.append(segment)
+            sortie = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+            sortie[y0:y1] = resultat[debut:fin] if nom is None else resultat[nom][debut:fin]
+            del sortie
+        del entree
+    finally:
+        for segment in segments:
+            segment.close()
+    return y1 - y0
+
+
+class _GrillePartagee:
+    """
+    Porteur d'une grille de sortie située dans un segment de mémoire partagée.
+
+    Le tableau est construit sur l'adresse du segment (`__array_interface__`) plutôt que sur son tampon :
+    aucune vue du tampon n'est exportée, le porteur est la base de tous les tableaux qui en dérivent et
+    le segment est fermé lorsque le dernier d'entre eux est libéré.
+    """
+
+    def __init__(self, segment, shape, dtype):
+        self.segment = segment
+        octets = np.frombuffer(segment.buf, dtype=np.uint8)
+        adresse = octets.ctypes.data
+        del octets
+        self.__array_interface__ = {'shape': shape, 'typestr': np.dtype(dtype).str, 'data': (adresse, False),
+                                    'version': 3}
+
+    def __del__(self):
+        self.segment.close()
+
+
+def _appliquer_processus(noyau, entree, halo, dtype, sorties, nb_travailleurs, hauteur_bande, progression,
+                         interrompre, parametres):
+    """
+    Exécute le noyau sur un pool de processus, entrée et sorties en mémoire partagée.
+
+    Un MNT déjà projeté depuis le cache disque est relu directement par les travailleurs, sans copie, dans le
+    type de la projection (celui de la bande) ; en mode compact, les travailleurs appliquent l'arrondi de
+    l'accesseur. Les grilles retournées sont les segments de sortie eux-mêmes, sans recopie : leur nom est supprimé
+    dès la fin du calcul et leur mémoire libérée avec la dernière référence aux grilles.
+    """
+    lignes, colonnes = entree.shape[:2]
+    shape = (lignes, colonnes)
+    dtype_entree = np.dtype(entree.dtype)
+    dtype = np.dtype(dtype)
+    segments = []
+    try:
+        memmap = entree if isinstance(entree, np.memmap) else getattr(entree, 'memmap', None)
+        if isinstance(memmap, np.memmap) and memmap.filename and memmap.shape == shape:
+            source = ('memmap', memmap.filename, memmap.dtype,
+                      None if memmap is entree else getattr(entree, 'codage', None))
+        else:
+            segment = shared_memory.SharedMemory(create=True, size=max(lignes * colonnes * dtype_entree.itemsize, 1))
+            segments.append(segment)
+            copie = np.ndarray(shape, dtype=dtype_entree, buffer=segment.buf)
+            for y0 in range(0, lignes, hauteur_bande):
+                copie[y0:y0 + hauteur_bande] = entree[y0:y0 + hauteur_bande, :]
+            del copie
+            source = ('partagee', segment.name, dtype_entree, None)
+
+        segments_sorties = {}
+        for nom in (sorties if sorties is not None else (None,)):
+            segment = shared_memory.SharedMemory(create=True, size=max(lignes * colonnes * dtype.itemsize, 1))
+            segments.append(segment)
+            segments_sorties[nom] = segment
+        memoires_sorties = {nom: segment.name for nom, segment in segments_sorties.items()}
+
+        bandes = _decouper(lignes, hauteur_bande, halo)
+        with ProcessPoolExecutor(max_workers=nb_travailleurs, mp_context=_contexte_processus()) as executeur:
+            termine = _suivre(
+                lambda bande: executeur.submit(_travail_processus, noyau, source, shape, memoires_sorties,
+                                               dtype, bande, parametres),
+                bandes, nb_travailleurs, lignes, progression, interrompre)
+        if not termine:
+            return None
+
+        # Les segments de sortie deviennent les grilles retournées : ils ne sont plus libérés ci-dessous
+        grilles = {}
+        for nom, segment in segments_sorties.items():
+            segments.remove(segment)
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+            grilles[nom] = np.asarray(_GrillePartagee(segment, shape, dtype))
+        return grilles[None] if sorties is None else grilles
+    finally:
+        for segment in segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,607 @@
+# utils/pipeline_mnt.py
+
+
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from osgeo import gdal, osr
+
+from .parallele_utils import (
+    choisir_backend,
+    configuration_parallelisme,
+    executer_par_bandes,
+    hauteur_bande_auto,
+    nombre_travailleurs
+)
+from .raster_utils import convertir_en_cog, creer_geotiff_tuile
+from .terrain_utils import noyau_median, noyau_moyen, noyau_ombrage
+
+# Valeur sans donnée du MNT préparé
+NODATA_MNT = -9999.0
+
+# Filtres appliqués à chaque source avant la fusion : (noyau, taille)
+FILTRES_SOURCE = {
+    'moyen': (noyau_moyen, 3),
+    'median': (noyau_median, 5),
+}
+
+# Traitement de la mosaïque en cas de fusion : arrondi (décimales) puis filtre moyen (taille)
+DECIMALES_FUSION = 1
+TAILLE_FILTRE_FUSION = 3
+
+# Taille des pixels (m) des TIN rastérisés avant la préparation
+TAILLE_PIXEL_TIN = 1.0
+
+# Ombrage du MNT préparé : azimut, altitude, facteur z, multidirectionnel
+PARAMETRES_OMBRAGE = (315.0, 45.0, 1.0, False)
+
+# À incrémenter à chaque changement du calcul, pour ne pas resservir des entrées de cache obsolètes
+VERSION_PREPARATION = 2
+
+
+class SourcePipeline:
+    """
+    Raster source du pipeline de préparation, ramené sur la grille commune du MNT.
+
+    Attributes
+    ----------
+    chemin : str or None
+        Chemin du raster d'origine ; None tant qu'une source convertie (voir `origine`) n'est pas rastérisée.
+    filtre : str
+        Filtre appliqué avant la fusion ('moyen' ou 'median', voir FILTRES_SOURCE).
+    origine : tuple or None
+        Pour un raster issu d'une conversion (TIN, points) : (chemin de la couche d'origine, description de la
+        conversion). La clé du cache porte alors sur la couche d'origine plutôt que sur le raster converti,
+        réécrit à chaque conversion.
+    chemin_lecture : str
+        Raster réellement lu : le fichier d'origine s'il est déjà dans le système cible et aligné sur la
+        grille, sinon un VRT de reprojection en mémoire (/vsimem), calculé à la lecture.
+    ligne0, colonne0 : int
+        Position du coin supérieur gauche de la source dans la grille commune.
+    lignes, colonnes : int
+        Dimensions de la source dans la grille commune.
+    nodata : float or None
+        Valeur sans donnée de la source.
+    examen : dict or None
+        Description de la source dans le système cible (voir `examiner_source`), None tant qu'elle n'a pas
+        été examinée.
+    """
+
+    def __init__(self, chemin, filtre='moyen', origine=None):
+        """
+        Décrit une source du pipeline.
+
+        Parameters
+        ----------
+        chemin : str or None
+            Chemin du raster d'origine.
+        filtre : str, optional
+            Filtre appliqué avant la fusion, par défaut 'moyen'.
+        origine : tuple, optional
+            (chemin de la couche d'origine, description de la conversion) d'un raster converti, par défaut None.
+        """
+        if filtre not in FILTRES_SOURCE:
+            raise ValueError(f"Filtre inconnu : {filtre}")
+        self.chemin = chemin
+        self.filtre = filtre
+        self.origine = origine
+        self.chemin_lecture = chemin
+        self.ligne0 = self.colonne0 = 0
+        self.lignes = self.colonnes = 0
+        self.nodata = None
+        self.examen = None
+
+
+def _meme_systeme(dataset, srs_cible):
+    srs = osr.SpatialReference()
+    wkt = dataset.GetProjection()
+    if not wkt:
+        return False
+    srs.ImportFromWkt(wkt)
+    return bool(srs.IsSame(srs_cible))
+
+
+def _vrt_reprojection(dataset, srs_cible, nodata, bornes=None, resolution=None):
+    """
+    Crée un VRT de reprojection (plus proche voisin) en mémoire ; aucun pixel n'est calculé à ce stade.
+    """
+    chemin = f"/vsimem/hydroline_{uuid.uuid4().hex}.vrt"
+    options = gdal.WarpOptions(
+        format='VRT',
+        dstSRS=srs_cible.ExportToWkt(),
+        resampleAlg='near',
+        outputBounds=bornes,
+        xRes=resolution[0] if resolution else None,
+        yRes=resolution[1] if resolution else None,
+        srcNodata=nodata,
+        dstNodata=nodata if nodata is not None else NODATA_MNT,
+        multithread=True
+    )
+    vrt = gdal.Warp(chemin, dataset, options=options)
+    if vrt is None:
+        raise IOError(f"Reprojection impossible : {dataset.GetDescription()}")
+    vrt = None
+    return chemin
+
+
+def _bornes(gt, lignes, colonnes):
+    x0, y0 = gt[0], gt[3]
+    x1, y1 = x0 + colonnes * gt[1], y0 + lignes * gt[5]
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _srs_cible(code_epsg):
+    srs_cible = osr.SpatialReference()
+    srs_cible.ImportFromEPSG(code_epsg)
+    srs_cible.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return srs_cible
+
+
+def examiner_source(source, code_epsg=2154):
+    """
+    Examine une source indépendamment des autres : valeur sans donnée, et emprise et résolution dans le
+    système cible.
+
+    Pour une source hors du système cible, l'emprise reprojetée est estimée par GDAL à partir des bords du
+    raster, seule étape de l'alignement dont le coût dépend de la source ; les sources peuvent donc être
+    examinées en parallèle avant la préparation. Une source non examinée l'est par `preparer_mnt`.
+
+    Parameters
+    ----------
+    source : SourcePipeline
+        Source à examiner ; son attribut `examen` est renseigné.
+    code_epsg : int, optional
+        Système de coordonnées cible, par défaut 2154.
+
+    Raises
+    ------
+    IOError
+        Si la source ne peut être lue ou reprojetée.
+    """
+    srs_cible = _srs_cible(code_epsg)
+    dataset = gdal.Open(source.chemin)
+    if dataset is None:
+        raise IOError(f"Raster illisible : {source.chemin}")
+    source.nodata = dataset.GetRasterBand(1).GetNoDataValue()
+
+    dans_systeme = _meme_systeme(dataset, srs_cible)
+    if dans_systeme:
+        gt, lignes, colonnes = dataset.GetGeoTransform(), dataset.RasterYSize, dataset.RasterXSize
+    else:
+        provisoire = _vrt_reprojection(dataset, srs_cible, source.nodata)
+        apercu = gdal.Open(provisoire)
+        gt, lignes, colonnes = apercu.GetGeoTransform(), apercu.RasterYSize, apercu.RasterXSize
+        apercu = None
+        gdal.Unlink(provisoire)
+
+    source.examen = {
+        'epsg': int(code_epsg),
+        'nodata': source.nodata,
+        'dans_systeme': dans_systeme,
+        'gt': gt,
+        'emprise': _bornes(gt, lignes, colonnes),
+        'lignes': lignes,
+        'colonnes': colonnes,
+    }
+
+
+def _aligner(sources, code_epsg, durees):
+    """
+    Ramène les sources sur une grille commune (résolution et origine de la première source) et retourne
+    la géotransformation, les dimensions et la projection de cette grille.
+    """
+    debut = time.perf_counter()
+    srs_cible = _srs_cible(code_epsg)
+    for source in sources:
+        if source.examen is None or source.examen['epsg'] != int(code_epsg):
+            examiner_source(source, code_epsg)
+
+    gt_grille = sources[0].examen['gt']
+    for source in sources:
+        examen = source.examen
+        gt = examen['gt']
+        decalage_x = (gt[0] - gt_grille[0]) / gt_grille[1]
+        decalage_y = (gt[3] - gt_grille[3]) / gt_grille[5]
+        alignee = (
+            examen['dans_systeme']
+            and math.isclose(gt[1], gt_grille[1]) and math.isclose(gt[5], gt_grille[5])
+            and gt[2] == 0 and gt[4] == 0
+            and abs(decalage_x - round(decalage_x)) < 1e-6 and abs(decalage_y - round(decalage_y)) < 1e-6
+        )
+        source.chemin_lecture = source.chemin
+        source.nodata = examen['nodata']
+        lignes, colonnes = examen['lignes'], examen['colonnes']
+        if not alignee:
+            # Emprise dans le système cible, étendue aux pixels entiers de la grille commune
+            xmin, ymin, xmax, ymax = examen['emprise']
+            pas_x, pas_y = gt_grille[1], abs(gt_grille[5])
+            xmin = gt_grille[0] + math.floor((xmin - gt_grille[0]) / pas_x) * pas_x
+            xmax = gt_grille[0] + math.ceil((xmax - gt_grille[0]) / pas_x) * pas_x
+            ymin = gt_grille[3] - math.ceil((gt_grille[3] - ymin) / pas_y) * pas_y
+            ymax = gt_grille[3] - math.floor((gt_grille[3] - ymax) / pas_y) * pas_y
+            dataset = gdal.Open(source.chemin)
+            if dataset is None:
+                raise IOError(f"Raster illisible : {source.chemin}")
+            source.chemin_lecture = _vrt_reprojection(dataset, srs_cible, source.nodata,
+                                                      bornes=(xmin, ymin, xmax, ymax), resolution=(pas_x, pas_y))
+            dataset = gdal.Open(source.chemin_lecture)
+            source.nodata = dataset.GetRasterBand(1).GetNoDataValue()
+            gt = dataset.GetGeoTransform()
+            lignes, colonnes = dataset.RasterYSize, dataset.RasterXSize
+            dataset = None
+            decalage_x = (gt[0] - gt_grille[0]) / gt_grille[1]
+            decalage_y = (gt[3] - gt_grille[3]) / gt_grille[5]
+
+        source.colonne0 = int(round(decalage_x))
+        source.ligne0 = int(round(decalage_y))
+        source.lignes, source.colonnes = lignes, colonnes
+
+    # Grille commune : union des emprises
+    ligne_min = min(s.ligne0 for s in sources)
+    colonne_min = min(s.colonne0 for s in sources)
+    for source in sources:
+        source.ligne0 -= ligne_min
+        source.colonne0 -= colonne_min
+    lignes = max(s.ligne0 + s.lignes for s in sources)
+    colonnes = max(s.colonne0 + s.colonnes for s in sources)
+    gt = (gt_grille[0] + colonne_min * gt_grille[1], gt_grille[1], 0.0,
+          gt_grille[3] + ligne_min * gt_grille[5], 0.0, gt_grille[5])
+
+    durees['alignement'] = time.perf_counter() - debut
+    return gt, lignes, colonnes, srs_cible.ExportToWkt()
+
+
+class _Compteurs:
+    """
+    Temps cumulés des étapes fusionnées dans le passage par bandes (tous travailleurs confondus).
+    """
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.durees = {}
+
+    def ajouter(self, etape, duree):
+        with self.verrou:
+            self.durees[etape] = self.durees.get(etape, 0.0) + duree
+
+
+def _calculer_bande(sources, ouverts, bande, lignes, colonnes, fusion, gt, compteurs):
+    """
+    Calcule une bande du MNT préparé et de son ombrage.
+
+    Les sources sont lues avec le recouvrement nécessaire à leur filtre, filtrées, puis placées dans la
+    mosaïque (la dernière source l'emporte là où elle a des données) ; en cas de fusion, la mosaïque est
+    arrondie au décimètre et filtrée à nouveau. Une ligne supplémentaire est calculée de part et d'autre
+    pour l'ombrage.
+    """
+    y0, y1 = bande
+    f0, f1 = max(y0 - 1, 0), min(y1 + 1, lignes)
+    marge = TAILLE_FILTRE_FUSION // 2 if fusion else 0
+    m0, m1 = max(f0 - marge, 0), min(f1 + marge, lignes)
+
+    mosaique = np.full((m1 - m0, colonnes), NODATA_MNT, dtype=np.float32)
+    for index, source in enumerate(sources):
+        a0, a1 = max(m0, source.ligne0), min(m1, source.ligne0 + source.lignes)
+        if a0 >= a1:
+            continue
+        noyau, taille = FILTRES_SOURCE[source.filtre]
+        halo = taille // 2
+        l0, l1 = a0 - source.ligne0, a1 - source.ligne0
+        r0, r1 = max(l0 - halo, 0), min(l1 + halo, source.lignes)
+
+        debut = time.perf_counter()
+        bloc = ouverts(index).ReadAsArray(0, r0, source.colonnes, r1 - r0)
+        if bloc is None:
+            raise IOError(f"Lecture impossible : {source.chemin}")
+        bloc = bloc.astype(np.float32, copy=False)
+        compteurs.ajouter('lecture', time.perf_counter() - debut)
+
+        debut = time.perf_counter()
+        filtre = noyau(bloc, taille=taille, nodata=source.nodata).astype(np.float32, copy=False)
+        if source.nodata is not None:
+            filtre[bloc == np.float32(source.nodata)] = NODATA_MNT
+        filtre[np.isnan(filtre)] = NODATA_MNT
+        filtre = filtre[l0 - r0:l1 - r0]
+        cible = mosaique[a0 - m0:a1 - m0, source.colonne0:source.colonne0 + source.colonnes]
+        valide = filtre != NODATA_MNT
+        cible[valide] = filtre[valide]
+        compteurs.ajouter('filtrage', time.perf_counter() - debut)
+
+    if fusion:
+        debut = time.perf_counter()
+        valide = mosaique != NODATA_MNT
+        mosaique[valide] = np.round(mosaique[valide], DECIMALES_FUSION)
+        final = noyau_moyen(mosaique, taille=TAILLE_FILTRE_FUSION, nodata=NODATA_MNT)
+        compteurs.ajouter('fusion_arrondi', time.perf_counter() - debut)
+    else:
+        final = mosaique
+    final = final[f0 - m0:f1 - m0]
+
+    debut = time.perf_counter()
+    ombre = noyau_ombrage(final, abs(gt[1]), abs(gt[5]), *PARAMETRES_OMBRAGE, NODATA_MNT)
+    compteurs.ajouter('ombrage', time.perf_counter() - debut)
+
+    return final[y0 - f0:y1 - f0], ombre[y0 - f0:y1 - f0]
+
+
+def parametres_preparation(code_epsg):
+    """
+    Retourne les paramètres de traitement qui déterminent le résultat d'une préparation.
+
+    Parameters
+    ----------
+    code_epsg : int
+        Système de coordonnées cible.
+
+    Returns
+    -------
+    dict
+        Paramètres sérialisables en JSON, qui entrent dans la clé du cache des MNT préparés.
+    """
+    return {
+        'version': VERSION_PREPARATION,
+        'epsg': int(code_epsg),
+        'filtres': {nom: taille for nom, (_, taille) in FILTRES_SOURCE.items()},
+        'decimales_fusion': DECIMALES_FUSION,
+        'taille_filtre_fusion': TAILLE_FILTRE_FUSION,
+        'ombrage': list(PARAMETRES_OMBRAGE),
+        'nodata': NODATA_MNT,
+    }
+
+
+def _cle_cache(sources, code_epsg, cache):
+    parametres = parametres_preparation(code_epsg)
+    empreintes = [(source.chemin, source.filtre) if source.origine is None
+                  else (source.origine[0], f"{source.filtre}|{source.origine[1]}") for source in sources]
+    return cache.cle(empreintes, parametres), empreintes, parametres
+
+
+def chercher_preparation(sources, code_epsg, cache):
+    """
+    Cherche une préparation dans le cache, sans rien calculer.
+
+    Parameters
+    ----------
+    sources : list of SourcePipeline
+        Sources de la préparation.
+    code_epsg : int
+        Système de coordonnées cible.
+    cache : CachePreparationMNT
+        Cache des MNT préparés.
+
+    Returns
+    -------
+    dict or None
+        Résultat de la préparation, comme celui de `preparer_mnt`, ou None si elle n'est pas en cache.
+    """
+    debut = time.perf_counter()
+    cle = _cle_cache(sources, code_epsg, cache)[0]
+    fichiers = cache.ouvrir(cle) if cle is not None else None
+    if fichiers is None:
+        return None
+    return {'mnt': fichiers['mnt'], 'ombrage': fichiers['ombrage'],
+            'durees': {'total': time.perf_counter() - debut}, 'cache': True}
+
+
+def preparer_mnt(sources, code_epsg=2154, dossier=None, cache=None, progression=None, interrompre=None,
+                 etape=None):
+    """
+    Prépare le MNT et son ombrage à partir d'une ou plusieurs sources, en un seul passage par bandes.
+
+    Aucun fichier intermédiaire n'est écrit : les sources hors du système cible sont lues au travers de VRT
+    de reprojection en mémoire (/vsimem), et ne sont pas reprojetées du tout si elles y sont déjà ; filtrage,
+    fusion, arrondi, second filtrage et ombrage sont enchaînés bande par bande, réparties sur les travailleurs
+    du moteur configuré (voir `executer_par_bandes`), et seuls le MNT final et son ombrage sont écrits,
+    au format COG (voir `convertir_en_cog`).
+
+    Avec un cache, la préparation est d'abord cherchée par l'empreinte de ses sources et de ses paramètres
+    (voir `parametres_preparation`) : une préparation déjà faite est retournée sans aucun calcul, sinon ses
+    produits sont écrits directement dans une nouvelle entrée du cache.
+
+    Parameters
+    ----------
+    sources : list of SourcePipeline
+        Sources à préparer ; en cas de recouvrement, la dernière l'emporte.
+    code_epsg : int, optional
+        Système de coordonnées cible, par défaut 2154.
+    dossier : str, optional
+        Dossier des fichiers produits hors cache, par défaut le répertoire temporaire.
+    cache : CachePreparationMNT, optional
+        Cache des MNT préparés, par défaut None (pas de cache).
+    progression : callable, optional
+        Fonction appelée avec l'avancement (0-100).
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner la préparation.
+    etape : callable, optional
+        Fonction appelée avec le libellé de chaque étape, au moment où elle commence.
+
+    Returns
+    -------
+    dict or None
+        {'mnt': chemin, 'ombrage': chemin, 'durees': {étape: secondes}, 'cache': bool}, ou None si la
+        préparation a été interrompue. 'cache' indique une préparation servie par le cache. Les durées
+        d'alignement, d'écriture et d'aperçus sont des temps réels ; celles des étapes fusionnées (lecture,
+        filtrage, fusion_arrondi, ombrage) sont cumulées sur les travailleurs.
+
+    Raises
+    ------
+    IOError
+        Si une source ne peut être lue ou reprojetée, ou si un fichier ne peut être écrit.
+    """
+    if not sources:
+        raise ValueError("Aucune source à préparer.")
+    debut_total = time.perf_counter()
+
+    cle = None
+    if cache is not None:
+        resultat = chercher_preparation(sources, code_epsg, cache)
+        if resultat is not None:
+            if progression is not None:
+                progression(100)
+            return resultat
+        cle, empreintes, parametres = _cle_cache(sources, code_epsg, cache)
+    if cle is not None:
+        dossier_entree = cache.creer(cle)
+        if dossier_entree is None:
+            cle = None
+
+    if cle is not None:
+        chemin_mnt = os.path.join(dossier_entree, 'mnt.tif')
+        chemin_ombrage = os.path.join(dossier_entree, 'ombrage.tif')
+    else:
+        dossier = dossier or tempfile.gettempdir()
+        identifiant = uuid.uuid4().hex[:8]
+        chemin_mnt = os.path.join(dossier, f"mnt_hydroline_{identifiant}.tif")
+        chemin_ombrage = os.path.join(dossier, f"ombrage_hydroline_{identifiant}.tif")
+
+    durees = None
+    try:
+        durees = _produire(sources, code_epsg, chemin_mnt, chemin_ombrage, progression, interrompre, etape)
+    finally:
+        if cle is not None and durees is None:
+            cache.abandonner(dossier_entree)
+    if durees is None:
+        return None
+
+    if cle is not None:
+        fichiers = cache.publier(cle, dossier_entree, {'mnt': chemin_mnt, 'ombrage': chemin_ombrage},
+                                 {'sources': empreintes, 'parametres': parametres})
+        if fichiers is None:
+            raise IOError(f"Publication impossible dans le cache : {cache.repertoire}")
+        chemin_mnt, chemin_ombrage = fichiers['mnt'], fichiers['ombrage']
+    durees['total'] = time.perf_counter() - debut_total
+    return {'mnt': chemin_mnt, 'ombrage': chemin_ombrage, 'durees': durees, 'cache': False}
+
+
+def _produire(sources, code_epsg, chemin_mnt, chemin_ombrage, progression, interrompre, etape):
+    """
+    Calcule et écrit le MNT préparé et son ombrage (voir `preparer_mnt`).
+
+    Returns
+    -------
+    dict or None
+        Durées par étape, ou None si la préparation a été interrompue ; les fichiers sont alors supprimés,
+        comme en cas d'erreur.
+    """
+    durees = {}
+    dataset_mnt = dataset_ombrage = None
+    termine = False
+    # Bandes écrites dans des GeoTIFF intermédiaires, convertis en COG une fois complets
+    bruts = {chemin: f"{os.path.splitext(chemin)[0]}_brut.tif" for chemin in (chemin_mnt, chemin_ombrage)}
+    if etape is None:
+        def etape(_):
+            pass
+
+    try:
+        etape("Alignement des sources")
+        gt, lignes, colonnes, projection = _aligner(sources, code_epsg, durees)
+        fusion = len(sources) > 1
+
+        dataset_mnt = creer_geotiff_tuile(bruts[chemin_mnt], lignes, colonnes, gdal.GDT_Float32, gt, projection,
+                                          NODATA_MNT, rapide=True)
+        dataset_ombrage = creer_geotiff_tuile(bruts[chemin_ombrage], lignes, colonnes, gdal.GDT_Byte, gt,
+                                              projection, 0, rapide=True)
+        if dataset_mnt is None or dataset_ombrage is None:
+            raise IOError(f"Écriture impossible dans {os.path.dirname(chemin_mnt)}")
+        bande_mnt = dataset_mnt.GetRasterBand(1)
+        bande_ombrage = dataset_ombrage.GetRasterBand(1)
+
+        # Un jeu de données GDAL par thread : les descripteurs ne sont pas partagés entre threads
+        locaux = threading.local()
+
+        def ouverts(index):
+            if not hasattr(locaux, 'bandes'):
+                locaux.datasets = [gdal.Open(s.chemin_lecture) for s in sources]
+                locaux.bandes = [d.GetRasterBand(1) for d in locaux.datasets]
+            return locaux.bandes[index]
+
+        # Moteur et nombre de travailleurs de l'onglet Calcul ; les sources étant lues par GDAL dans chaque
+        # travailleur, les moteurs à processus et dask s'exécutent sur le pool de threads
+        backend, nb_travailleurs = configuration_parallelisme()
+        nb_travailleurs = nombre_travailleurs(nb_travailleurs)
+        backend = choisir_backend(backend, lignes, colonnes, nb_travailleurs)
+        hauteur = hauteur_bande_auto(lignes, colonnes, 4, 1 if backend == 'serie' else nb_travailleurs, halo=4)
+        compteurs = _Compteurs()
+        ecriture = [0.0]
+
+        def traiter(y0, y1):
+            return _calculer_bande(sources, ouverts, (y0, y1), lignes, colonnes, fusion, gt, compteurs)
+
+        def ecrire(y0, y1, resultat):
+            # Dans le thread appelant : les jeux de données en écriture ne sont pas partagés entre threads
+            valeurs, ombre = resultat
+            debut = time.perf_counter()
+            bande_mnt.WriteArray(valeurs, 0, y0)
+            bande_ombrage.WriteArray(ombre, 0, y0)
+            ecriture[0] += time.perf_counter() - debut
+
+        etape("Filtrage, fusion, arrondi et ombrage" if fusion else "Filtrage et ombrage")
+        debut_passage = time.perf_counter()
+        termine_passage = executer_par_bandes(
+            traiter, lignes, hauteur, ecrire, backend, nb_travailleurs,
+            progression=(lambda valeur: progression(int(0.9 * valeur))) if progression is not None else None,
+            interrompre=interrompre
+        )
+        if not termine_passage:
+            return None
+        durees.update(compteurs.durees)
+        durees['passage_bandes'] = time.perf_counter() - debut_passage
+        durees['ecriture'] = ecriture[0]
+
+        bande_mnt = bande_ombrage = None
+        dataset_mnt = dataset_ombrage = None
+
+        # MNT et ombrage convertis en même temps ; chaque conversion compresse déjà sur tous les cœurs
+        etape("Écriture COG et aperçus")
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executeur:
+            conversions = [executeur.submit(convertir_en_cog, brut, chemin, 'AVERAGE', interrompre)
+                           for chemin, brut in bruts.items()]
+            ecrits = [conversion.result() for conversion in conversions]
+        if interrompre is not None and interrompre():
+            return None
+        if not all(ecrits):
+            raise IOError(f"Écriture impossible dans {os.path.dirname(chemin_mnt)}")
+        durees['cog_apercus'] = time.perf_counter() - debut
+        if progression is not None:
+            progression(100)
+
+        termine = True
+        return durees
+    finally:
+        dataset_mnt = dataset_ombrage = None
+        for source in sources:
+            if source.chemin_lecture != source.chemin:
+                gdal.Unlink(source.chemin_lecture)
+                source.chemin_lecture = source.chemin
+        temporaires = [b for brut in bruts.values() for b in (brut, brut + '.ovr')]
+        if not termine:
+            temporaires += list(bruts)
+        for chemin in temporaires:
+            try:
+                os.remove(chemin)
+            except OSError:
+                pass
+
+
+def formater_durees(durees):
+    """
+    Met en forme les durées d'une préparation pour le journal.
+
+    Parameters
+    ----------
+    durees : dict
+        Durées par étape en secondes.
+
+    Returns
+    -------
+    str
+        Une étape par ligne.
+    """
+    return "\n".join(f"{etape} : {duree:.2f} s" for etape, duree in durees.items())
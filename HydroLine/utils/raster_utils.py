@@ -4,318 +4,158 @@
 
 import os
 import tempfile
+import uuid
 
-import numpy as np
 import processing
 from osgeo import gdal
 from qgis.core import QgsRasterLayer, QgsProject, QgsVectorLayer, QgsMeshLayer, QgsCoordinateReferenceSystem, QgsWkbTypes
-from scipy.ndimage import median_filter
 
-def filtre_moyen_raster(couche_raster_entree, kernel_size=3):
-    """
-    Applique un filtre moyen à la couche raster d'entrée pour lisser les valeurs.
-
-    Parameters
-    ----------
-    couche_raster_entree : QgsRasterLayer
-        La couche raster d'entrée à filtrer.
-    kernel_size : int, optional
-        La taille du noyau pour le filtre moyen, par défaut 3.
-
-    Returns
-    -------
-    QgsRasterLayer or None
-        La couche raster filtrée ou None si le traitement échoue.
-    """
-
-
-    input_path = couche_raster_entree.source()
-    input_dataset = gdal.Open(input_path, gdal.GA_ReadOnly)
-    if input_dataset is None:
-        return None
-    input_band = input_dataset.GetRasterBand(1)
-
-    input_array = input_band.ReadAsArray()
-    if input_array is None:
-        return None
-
-
-    kernel = np.ones((kernel_size, kernel_size), dtype=float) / (kernel_size * kernel_size)
-    try:
-        from scipy.signal import convolve2d
-        output_array = convolve2d(input_array, kernel, mode='same', boundary='symm')
-    except ImportError:
-        pad_size = kernel_size // 2
-        padded_array = np.pad(input_array, pad_size, mode='edge')
-
-        output_array = np.zeros_like(input_array, dtype=float)
-
-        # Boucler sur l'array pour appliquer le filtre
-        for i in range(output_array.shape[0]):
-            for j in range(output_array.shape[1]):
-                # Extraire la sous-matrice
-                sub_array = padded_array[i:i + kernel_size, j:j + kernel_size]
-                # Calculer la moyenne
-                output_array[i, j] = np.sum(sub_array * kernel)
-
-    temp_dir = tempfile.gettempdir()
-    output_path = os.path.join(temp_dir, 'filtered_raster.tif')
-
-    driver = gdal.GetDriverByName('GTiff')
-    output_dataset = driver.Create(
-        output_path,
-        input_dataset.RasterXSize,
-        input_dataset.RasterYSize,
-        1,
-        gdal.GDT_Float32
-    )
-    if output_dataset is None:
-        return None
-
-    output_dataset.SetGeoTransform(input_dataset.GetGeoTransform())
-    output_dataset.SetProjection(input_dataset.GetProjection())
 
-    output_band = output_dataset.GetRasterBand(1)
-    output_band.WriteArray(output_array)
-    output_band.FlushCache()
+# Côté des blocs des GeoTIFF produits, identique à celui des COG : les lectures fenêtrées de AccesseurMNT,
+# calées sur les blocs du fichier, ne décompressent que les blocs qu'elles couvrent
+TAILLE_BLOC_GEOTIFF = 512
 
-    input_dataset = None
-    output_dataset = None
+_compression = None
 
-    output_raster_layer = QgsRasterLayer(output_path, 'MNT_HydroLine')
 
-    if not output_raster_layer.isValid():
-        return None
-
-    return output_raster_layer
-
-
-import os
-import tempfile
-
-def generer_ombrage(couche_raster_entree):
+def compression_disponible():
     """
-    Génère un ombrage à partir de la couche raster d'entrée.
-
-    Parameters
-    ----------
-    couche_raster_entree : QgsRasterLayer
-        La couche raster d'origine.
+    Retourne la compression des GeoTIFF produits : ZSTD si la version de GDAL la propose, sinon DEFLATE.
 
     Returns
     -------
-    QgsRasterLayer or None
-        La couche raster d'ombrage ou None si le traitement échoue.
+    str
+        'ZSTD' ou 'DEFLATE'.
     """
-
-    temp_dir = tempfile.gettempdir()  # Utilisation du répertoire temporaire
-    ombrage_filename = f"{os.path.splitext(os.path.basename(couche_raster_entree.source()))[0]}_ombrage.tif"
-    output_path = os.path.join(temp_dir, ombrage_filename)
-
-    params = {
-        'INPUT': couche_raster_entree.source(),
-        'BAND': 1,
-        'Z_FACTOR': 1.0,
-        'SCALE': 1.0,
-        'AZIMUTH': 315.0,
-        'ALTITUDE': 45.0,
-        'COMPUTE_EDGES': False,
-        'ZEVENBERGEN': False,
-        'MULTIDIRECTIONAL': False,
-        'COMBINED': False,
-        'OUTPUT': output_path
-    }
-    output = processing.run("gdal:hillshade", params)
-    couche_ombrage = QgsRasterLayer(output['OUTPUT'], 'Ombrage_HydroLine')
-
-    if not couche_ombrage.isValid():
-        return None
-
-    return couche_ombrage
+    global _compression
+    if _compression is None:
+        options = gdal.GetDriverByName('GTiff').GetMetadataItem('DMD_CREATIONOPTIONLIST') or ''
+        _compression = 'ZSTD' if 'ZSTD' in options else 'DEFLATE'
+    return _compression
 
 
-
-def fusionner_et_arrondir_rasters(couches_raster, precision_decimales=1):
+def _options_compression(type_gdal, rapide=False):
     """
-    Combine plusieurs rasters en un seul et arrondit les valeurs du raster résultant.
-
-    Parameters
-    ----------
-    couches_raster : list of QgsRasterLayer
-        Liste de couches raster à fusionner.
-    precision_decimales : int, optional
-        Nombre de décimales pour arrondir les valeurs, par défaut 1.
-
-    Returns
-    -------
-    QgsRasterLayer or None
-        La couche raster fusionnée et arrondie ou None si le traitement échoue.
+    Options de création GTiff : compression, prédicteur adapté au type et compression multithread.
     """
+    compression = compression_disponible()
+    flottant = type_gdal in (gdal.GDT_Float32, gdal.GDT_Float64)
+    options = [f'COMPRESS={compression}', f'PREDICTOR={3 if flottant else 2}', 'NUM_THREADS=ALL_CPUS']
+    if rapide:
+        # Fichier intermédiaire : compression la plus rapide, il ne sert qu'à produire le COG
+        options.append('ZSTD_LEVEL=1' if compression == 'ZSTD' else 'ZLEVEL=1')
+    return options
 
-    raster_sources = [layer.source() for layer in couches_raster]
-
-    merge_params = {
-        'INPUT': raster_sources,
-        'PCT': False,
-        'SEPARATE': False,
-        'NODATA_INPUT': None,
-        'NODATA_OUTPUT': None,
-        'OPTIONS': '',
-        'DATA_TYPE': 6,  # Float32
-        'OUTPUT': 'TEMPORARY_OUTPUT'
-    }
-    fusion_output = processing.run("gdal:merge", merge_params)
-    couche_fusionnee = QgsRasterLayer(fusion_output['OUTPUT'], 'Raster_Combine_HydroLine')
-
-    if not couche_fusionnee.isValid():
-        return None
 
-    calc_params = {
-        'INPUT_A': couche_fusionnee.source(),
-        'BAND_A': 1,
-        'FORMULA': f'round(A, {precision_decimales})',
-        'OUTPUT': 'TEMPORARY_OUTPUT',
-        'RTYPE': 6  # Float32
-    }
-    calc_output = processing.run("gdal:rastercalculator", calc_params)
-    couche_arrondie = QgsRasterLayer(calc_output['OUTPUT'], 'MNT_Raster_HydroLine')
-    return couche_arrondie if couche_arrondie.isValid() else None
-
-
-def generer_ombrage_invisible(couche_raster_entree):
+def creer_geotiff_tuile(chemin, lignes, colonnes, type_gdal, gt, projection, nodata=None, rapide=False):
     """
-    Génère un ombrage à partir de la couche raster d'entrée sans l'ajouter au projet.
+    Crée un GeoTIFF tuilé et compressé (avec prédicteur), prêt à être écrit par blocs.
 
     Parameters
     ----------
-    couche_raster_entree : QgsRasterLayer
-        La couche raster d'origine.
+    chemin : str
+        Chemin du fichier à créer.
+    lignes, colonnes : int
+        Dimensions du raster.
+    type_gdal : int
+        Type GDAL des valeurs (gdal.GDT_*).
+    gt : tuple
+        Géotransformation du raster.
+    projection : str
+        Système de coordonnées (WKT).
+    nodata : float, optional
+        Valeur sans donnée, par défaut None.
+    rapide : bool, optional
+        True pour un fichier intermédiaire, compressé au niveau le plus rapide, par défaut False.
 
     Returns
     -------
-    QgsRasterLayer or None
-        La couche raster d'ombrage ou None si le traitement échoue.
+    gdal.Dataset or None
+        Jeu de données ouvert en écriture, ou None si la création échoue.
     """
+    driver = gdal.GetDriverByName('GTiff')
+    options = ['TILED=YES', f'BLOCKXSIZE={TAILLE_BLOC_GEOTIFF}', f'BLOCKYSIZE={TAILLE_BLOC_GEOTIFF}',
+               'BIGTIFF=IF_SAFER'] + _options_compression(type_gdal, rapide)
+    dataset = driver.Create(chemin, colonnes, lignes, 1, type_gdal, options=options)
+    if dataset is None:
+        return None
 
-    params = {
-        'INPUT': couche_raster_entree.source(),
-        'BAND': 1,
-        'Z_FACTOR': 1.0,
-        'SCALE': 1.0,
-        'AZIMUTH': 315.0,
-        'ALTITUDE': 45.0,
-        'COMPUTE_EDGES': False,
-        'ZEVENBERGEN': False,
-        'MULTIDIRECTIONAL': False,
-        'COMBINED': False,
-        'OUTPUT': 'TEMPORARY_OUTPUT'
-    }
-    output = processing.run("gdal:hillshade", params, feedback=None)
-    couche_ombrage = QgsRasterLayer(output['OUTPUT'], 'Ombrage')
-
-    # Ne pas ajouter la couche au projet
-    return couche_ombrage if couche_ombrage.isValid() else None
-
-# utils/raster_utils.py
-
+    dataset.SetGeoTransform(gt)
+    dataset.SetProjection(projection)
+    if nodata is not None:
+        dataset.GetRasterBand(1).SetNoDataValue(nodata)
+    return dataset
 
 
-def filtre_median_raster(couche_raster_entree, kernel_size=5):
+def construire_apercus(dataset, reechantillonnage='AVERAGE'):
     """
-    Applique un filtre médian à la couche raster d'entrée pour lisser les valeurs et éliminer les artefacts.
+    Construit les aperçus d'un raster (facteurs 2, 4, 8... jusqu'à environ 256 pixels de côté).
 
     Parameters
     ----------
-    couche_raster_entree : QgsRasterLayer
-        La couche raster d'entrée à filtrer.
-    kernel_size : int, optional
-        La taille du noyau pour le filtre médian, par défaut 5.
-
-    Returns
-    -------
-    QgsRasterLayer or None
-        La couche raster filtrée ou None si le traitement échoue.
+    dataset : gdal.Dataset
+        Jeu de données (aperçus internes s'il est ouvert en écriture, fichier .ovr sinon).
+    reechantillonnage : str, optional
+        Méthode de rééchantillonnage GDAL, par défaut 'AVERAGE'.
     """
-    input_path = couche_raster_entree.source()
-    input_dataset = gdal.Open(input_path, gdal.GA_ReadOnly)
-    if input_dataset is None:
-        return None
-    input_band = input_dataset.GetRasterBand(1)
+    facteurs = []
+    facteur = 2
+    while max(dataset.RasterXSize, dataset.RasterYSize) // facteur >= 256:
+        facteurs.append(facteur)
+        facteur *= 2
+    if facteurs:
+        dataset.BuildOverviews(reechantillonnage, facteurs)
 
-    input_array = input_band.ReadAsArray()
-    if input_array is None:
-        return None
-
-    try:
-        output_array = median_filter(input_array, size=kernel_size)
-    except Exception as e:
-        print(f"Erreur lors de l'application du filtre médian : {e}")
-        return None
-
-    temp_dir = tempfile.gettempdir()
-    output_path = os.path.join(temp_dir, 'filtered_median_raster.tif')
-
-    driver = gdal.GetDriverByName('GTiff')
-    output_dataset = driver.Create(
-        output_path,
-        input_dataset.RasterXSize,
-        input_dataset.RasterYSize,
-        1,
-        gdal.GDT_Float32
-    )
-    if output_dataset is None:
-        return None
-
-    output_dataset.SetGeoTransform(input_dataset.GetGeoTransform())
-    output_dataset.SetProjection(input_dataset.GetProjection())
 
-    output_band = output_dataset.GetRasterBand(1)
-    output_band.WriteArray(output_array)
-    output_band.FlushCache()
-
-    input_dataset = None
-    output_dataset = None
-
-    output_raster_layer = QgsRasterLayer(output_path, 'MNT_HydroLine')
-
-    if not output_raster_layer.isValid():
-        return None
-
-    return output_raster_layer
-
-def reprojeter_raster(couche_raster, code_epsg=2154):
+def convertir_en_cog(source, chemin, reechantillonnage='AVERAGE', interrompre=None):
     """
-    Reprojette la couche raster vers le système de coordonnées spécifié.
+    Écrit un raster au format Cloud Optimized GeoTIFF : blocs de TAILLE_BLOC_GEOTIFF pixels, compression avec
+    prédicteur, aperçus internes placés avant les données pleine résolution.
+
+    Au zoom arrière, QGIS ne lit que les aperçus ; les lectures fenêtrées ne touchent que les blocs couverts.
+    Le pilote COG (GDAL 3.1 et plus) calcule les aperçus et compresse sur tous les cœurs ; avec une version
+    plus ancienne, la même organisation est obtenue en copiant les aperçus de la source (COPY_SRC_OVERVIEWS).
 
     Parameters
     ----------
-    couche_raster : QgsRasterLayer
-        La couche raster à reprojeter.
-    code_epsg : int, optional
-        Le code EPSG vers lequel reprojeter, par défaut EPSG:2154.
+    source : str or gdal.Dataset
+        Raster à convertir.
+    chemin : str
+        Chemin du COG à créer.
+    reechantillonnage : str, optional
+        Méthode de rééchantillonnage des aperçus, par défaut 'AVERAGE'.
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner la conversion.
 
     Returns
     -------
-    QgsRasterLayer or None
-        La couche raster reprojetée ou None si le traitement échoue.
+    bool
+        True si le COG a été écrit, False en cas d'échec ou d'interruption.
     """
-    crs = f"EPSG:{code_epsg}"
-    temp_dir = tempfile.gettempdir()
-    output_path = os.path.join(temp_dir,
-                               f"{os.path.splitext(os.path.basename(couche_raster.source()))[0]}_reprojected.tif")
-
-    params = {
-        'INPUT': couche_raster.source(),
-        'TARGET_CRS': crs,
-        'RESAMPLING': 0,
-        'NODATA': None,
-        'DATA_TYPE': 0,
-        'OUTPUT': output_path
-    }
+    if isinstance(source, str):
+        source = gdal.Open(source)
+        if source is None:
+            return False
+
+    def rappel(avancement, message, donnees):
+        return 0 if interrompre is not None and interrompre() else 1
+
+    type_gdal = source.GetRasterBand(1).DataType
+    if gdal.GetDriverByName('COG') is not None:
+        options = ['COMPRESS=' + compression_disponible(), 'PREDICTOR=YES', f'BLOCKSIZE={TAILLE_BLOC_GEOTIFF}',
+                   'OVERVIEWS=AUTO', f'RESAMPLING={reechantillonnage}', 'NUM_THREADS=ALL_CPUS',
+                   'BIGTIFF=IF_SAFER']
+        resultat = gdal.Translate(chemin, source, format='COG', creationOptions=options, callback=rappel)
+    else:
+        construire_apercus(source, reechantillonnage)
+        options = ['TILED=YES', f'BLOCKXSIZE={TAILLE_BLOC_GEOTIFF}', f'BLOCKYSIZE={TAILLE_BLOC_GEOTIFF}',
+                   'COPY_SRC_OVERVIEWS=YES', 'BIGTIFF=IF_SAFER'] + _options_compression(type_gdal)
+        resultat = gdal.Translate(chemin, source, format='GTiff', creationOptions=options, callback=rappel)
+    if resultat is None:
+        return False
+    resultat = None
+    return True
 
-    output = processing.run("gdal:warpreproject", params)
-    couche_reprojete = QgsRasterLayer(output['OUTPUT'], f"{couche_raster.name()}_reprojected")
-    return couche_reprojete if couche_reprojete.isValid() else None
 
 def convertir_tin_en_raster(couche_tin, crs_target, pixel_size=1.0, feedback=None):
     """
@@ -339,7 +179,8 @@ def convertir_tin_en_raster(couche_tin, crs_target, pixel_size=1.0, feedback=Non
     """
     temp_dir = tempfile.gettempdir()
     nom_couche = couche_tin.name()
-    output_path = os.path.join(temp_dir, f"{nom_couche}_raster.tif")
+    # Nom unique, sans créer le fichier : deux préparations ne s'écrasent pas
+    output_path = os.path.join(temp_dir, f"{nom_couche}_{uuid.uuid4().hex[:8]}_raster.tif")
 
     parametres_meshrasterize = {
         'INPUT': couche_tin.source(),
@@ -0,0 +1,724 @@
+# utils/routage_utils.py
+
+
+import math
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra, breadth_first_order
+
+# Décalages (dy, dx) des 8 voisins et longueurs de pas associées
+DECALAGES_8_VOISINS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+LONGUEURS_8_VOISINS = [np.sqrt(2.0), 1.0, np.sqrt(2.0), 1.0, 1.0, np.sqrt(2.0), 1.0, np.sqrt(2.0)]
+
+# Taille maximale (en pixels) du corridor de recherche A*
+PIXELS_MAX_CORRIDOR = 1_000_000
+
+# Poids minimal d'une arête en coûts réduits : les arrondis ne doivent pas produire de poids négatifs
+POIDS_MIN_ARETE = 1e-12
+
+
+def remplacer_nodata(fenetre, nodata=None):
+    """
+    Remplace la valeur sans donnée d'une fenêtre du MNT par NaN.
+
+    Les surfaces de coût normalisent les valeurs finies : sans ce remplacement, une valeur sans donnée
+    (souvent -9999) fausserait l'étendue de la normalisation.
+
+    Parameters
+    ----------
+    fenetre : np.ndarray
+        Fenêtre du MNT.
+    nodata : float, optional
+        Valeur sans donnée du raster, par défaut None (aucun remplacement).
+
+    Returns
+    -------
+    np.ndarray
+        Fenêtre float64, nouvelle si des valeurs ont été remplacées (le tableau source n'est jamais modifié).
+    """
+    fenetre = np.asarray(fenetre, dtype=np.float64)
+    if nodata is None:
+        return fenetre
+    return np.where(fenetre == nodata, np.nan, fenetre)
+
+
+def extraire_fenetre(tableau, centre_px, rayon, nodata=None):
+    """
+    Extrait une fenêtre carrée bornée aux limites du raster autour d'un pixel.
+
+    Parameters
+    ----------
+    tableau : np.ndarray
+        Tableau 2D source (lignes, colonnes).
+    centre_px : tuple of int
+        Pixel central (colonne, ligne).
+    rayon : int
+        Demi-largeur de la fenêtre en pixels.
+    nodata : float, optional
+        Valeur sans donnée du raster, remplacée par NaN dans la fenêtre, par défaut None.
+
+    Returns
+    -------
+    tuple
+        (fenetre, x0, y0) : tableau float64 de la fenêtre et décalage (colonne, ligne) de son coin haut-gauche.
+    """
+    lignes, colonnes = tableau.shape[:2]
+    cx, cy = centre_px
+    x0 = max(cx - rayon, 0)
+    y0 = max(cy - rayon, 0)
+    x1 = min(cx + rayon + 1, colonnes)
+    y1 = min(cy + rayon + 1, lignes)
+    fenetre = remplacer_nodata(tableau[y0:y1, x0:x1], nodata)
+    return fenetre, x0, y0
+
+
+def _normaliser(valeurs):
+    """
+    Ramène des valeurs dans [0, 1] en ignorant les NaN (les NaN deviennent 1).
+    """
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    finies = np.isfinite(valeurs)
+    if not finies.any():
+        return np.ones_like(valeurs)
+    vmin = valeurs[finies].min()
+    vmax = valeurs[finies].max()
+    etendue = vmax - vmin
+    if etendue == 0:
+        normalise = np.zeros_like(valeurs)
+    else:
+        normalise = (valeurs - vmin) / etendue
+    normalise[~finies] = 1.0
+    return normalise
+
+
+def surface_cout_elevation(fenetre, points_bas=False, poids_distance=0.05):
+    """
+    Construit une surface de coût à partir des altitudes.
+
+    Pour les points hauts, les pixels les plus élevés sont les moins coûteux ; pour les points bas,
+    ce sont les pixels les plus bas. Un coût minimal `poids_distance` est ajouté pour que les chemins
+    restent courts sur les zones planes.
+
+    Parameters
+    ----------
+    fenetre : np.ndarray
+        Altitudes de la fenêtre de calcul.
+    points_bas : bool, optional
+        True pour favoriser les points bas, False pour les points hauts, par défaut False.
+    poids_distance : float, optional
+        Coût minimal strictement positif d'un pixel, par défaut 0.05.
+
+    Returns
+    -------
+    np.ndarray
+        Coût par pixel, strictement positif.
+    """
+    normalise = _normaliser(fenetre)
+    if not points_bas:
+        normalise = 1.0 - normalise
+        normalise[~np.isfinite(fenetre)] = 1.0
+    return poids_distance + normalise
+
+
+def surface_cout_rupture(fenetre_pentes, poids_distance=0.05):
+    """
+    Construit une surface de coût à partir des variations de pente.
+
+    Le critère est celui de l'outil de rupture de pente : en chaque pixel, la plus forte variation de pente
+    vers l'un de ses 8 voisins (pente voisin - pente courante). Les pixels offrant une forte variation sont
+    les moins coûteux. Les pentes doivent déjà être signées selon le mode (négatives pour le mode concave).
+
+    Parameters
+    ----------
+    fenetre_pentes : np.ndarray
+        Pentes (degrés) de la fenêtre de calcul, signées selon le mode.
+    poids_distance : float, optional
+        Coût minimal strictement positif d'un pixel, par défaut 0.05.
+
+    Returns
+    -------
+    np.ndarray
+        Coût par pixel, strictement positif.
+    """
+    pentes = np.asarray(fenetre_pentes, dtype=np.float64)
+    lignes, colonnes = pentes.shape
+    bordure = np.pad(pentes, 1, mode='edge')
+    delta_max = np.full(pentes.shape, -np.inf)
+    for dy, dx in DECALAGES_8_VOISINS:
+        voisin = bordure[1 + dy:1 + dy + lignes, 1 + dx:1 + dx + colonnes]
+        np.fmax(delta_max, voisin - pentes, out=delta_max)
+    delta_max[~np.isfinite(delta_max)] = np.nan
+    return poids_distance + 1.0 - _normaliser(delta_max)
+
+
+def surface_cout(fenetre, type_cout):
+    """
+    Construit la surface de coût d'une fenêtre selon le critère de tracé.
+
+    Parameters
+    ----------
+    fenetre : np.ndarray
+        Altitudes (critères 'hauts' et 'bas') ou pentes en degrés (critères 'convexe' et 'concave').
+    type_cout : str
+        'hauts', 'bas', 'convexe' ou 'concave'.
+
+    Returns
+    -------
+    np.ndarray
+        Coût par pixel, strictement positif.
+    """
+    if type_cout == 'concave':
+        return surface_cout_rupture(-fenetre)
+    if type_cout == 'convexe':
+        return surface_cout_rupture(fenetre)
+    return surface_cout_elevation(fenetre, points_bas=(type_cout == 'bas'))
+
+
+def fenetre_corridor(lignes, colonnes, depart_px, arrivee_px, marge_min=50, marge_relative=0.25,
+                     pixels_max=PIXELS_MAX_CORRIDOR):
+    """
+    Calcule la fenêtre (corridor) englobant deux pixels, élargie d'une marge.
+
+    La marge est réduite si la fenêtre dépasse `pixels_max` pixels ; le corridor est refusé si même
+    le rectangle englobant les deux points, sans marge, reste trop grand.
+
+    Parameters
+    ----------
+    lignes, colonnes : int
+        Dimensions du raster.
+    depart_px, arrivee_px : tuple of int
+        Pixels (colonne, ligne) de départ et d'arrivée.
+    marge_min : int, optional
+        Marge minimale en pixels autour des deux points, par défaut 50.
+    marge_relative : float, optional
+        Marge proportionnelle à la distance entre les deux points, par défaut 0.25.
+    pixels_max : int, optional
+        Nombre maximal de pixels de la fenêtre, par défaut PIXELS_MAX_CORRIDOR.
+
+    Returns
+    -------
+    tuple of int or None
+        (x0, y0, x1, y1) bornes de la fenêtre, x1 et y1 exclus, ou None si le corridor dépasse `pixels_max`.
+    """
+    largeur = abs(arrivee_px[0] - depart_px[0]) + 1
+    hauteur = abs(arrivee_px[1] - depart_px[1]) + 1
+    if largeur * hauteur > pixels_max:
+        return None
+    distance = math.hypot(largeur - 1, hauteur - 1)
+    marge = int(max(marge_min, marge_relative * distance))
+    if (largeur + 2 * marge) * (hauteur + 2 * marge) > pixels_max:
+        # Plus grande marge m telle que (largeur + 2m) * (hauteur + 2m) <= pixels_max
+        somme = largeur + hauteur
+        marge = int((math.sqrt(somme * somme - 4 * (largeur * hauteur - pixels_max)) - somme) / 4)
+    x0 = max(min(depart_px[0], arrivee_px[0]) - marge, 0)
+    y0 = max(min(depart_px[1], arrivee_px[1]) - marge, 0)
+    x1 = min(max(depart_px[0], arrivee_px[0]) + marge + 1, colonnes)
+    y1 = min(max(depart_px[1], arrivee_px[1]) + marge + 1, lignes)
+    return x0, y0, x1, y1
+
+
+def cout_ligne_droite(cout, depart, arrivee):
+    """
+    Calcule le coût du chemin 8-connexe rectiligne entre deux pixels d'une surface de coût.
+
+    Ce chemin est admissible : son coût majore celui du chemin optimal et borne la recherche de `chemin_a_etoile`.
+
+    Parameters
+    ----------
+    cout : np.ndarray
+        Surface de coût 2D.
+    depart, arrivee : tuple of int
+        Pixels (colonne, ligne) dans le repère de la surface.
+
+    Returns
+    -------
+    float
+        Coût du chemin rectiligne.
+    """
+    nb_pas = max(abs(arrivee[0] - depart[0]), abs(arrivee[1] - depart[1]))
+    if nb_pas == 0:
+        return 0.0
+    xs = np.rint(np.linspace(depart[0], arrivee[0], nb_pas + 1)).astype(np.int64)
+    ys = np.rint(np.linspace(depart[1], arrivee[1], nb_pas + 1)).astype(np.int64)
+    valeurs = cout[ys, xs]
+    longueurs = np.where((np.diff(xs) != 0) & (np.diff(ys) != 0), math.sqrt(2.0), 1.0)
+    return float(np.sum(longueurs * 0.5 * (valeurs[:-1] + valeurs[1:])))
+
+
+def chemin_a_etoile(cout, depart, arrivee):
+    """
+    Calcule le chemin de moindre coût entre deux pixels d'une surface de coût par l'algorithme A*.
+
+    A* est exécuté sous la forme d'un Dijkstra (scipy, en C) sur les coûts réduits w(u, v) - h(u) + h(v) du graphe
+    8-connexe de `construire_graphe_8_voisins`, h étant la distance octogonale à l'arrivée multipliée par le plus
+    petit coût de la surface : h est cohérente, les coûts réduits restent positifs et le chemin retourné est
+    optimal. La recherche est de plus bornée (`limit`) par le coût du chemin rectiligne (`cout_ligne_droite`) :
+    aucun nœud plus coûteux que cette solution admissible n'est développé.
+
+    Parameters
+    ----------
+    cout : np.ndarray
+        Surface de coût 2D strictement positive (typiquement un corridor du raster).
+    depart : tuple of int
+        Pixel de départ (colonne, ligne) dans le repère de la surface.
+    arrivee : tuple of int
+        Pixel d'arrivée (colonne, ligne) dans le repère de la surface.
+
+    Returns
+    -------
+    tuple
+        (pixels, noeuds_developpes) : liste des pixels (colonne, ligne) du chemin, départ et arrivée inclus
+        (None si l'arrivée est inaccessible), et nombre de nœuds développés.
+    """
+    lignes, colonnes = cout.shape
+    cout = np.asarray(cout, dtype=np.float64)
+    ax, ay = arrivee
+    source = depart[1] * colonnes + depart[0]
+    cible = ay * colonnes + ax
+
+    # Heuristique : distance octogonale à l'arrivée pondérée par le plus petit coût de la surface
+    ecart_x = np.abs(np.arange(colonnes, dtype=np.float64) - ax)[np.newaxis, :]
+    ecart_y = np.abs(np.arange(lignes, dtype=np.float64) - ay)[:, np.newaxis]
+    potentiel = np.maximum(ecart_x, ecart_y)
+    potentiel += (math.sqrt(2.0) - 1.0) * np.minimum(ecart_x, ecart_y)
+    potentiel *= float(cout.min())
+
+    graphe = construire_graphe_8_voisins(cout, potentiel=potentiel)
+    # Borne en coûts réduits, avec une tolérance pour les arrondis et les arêtes relevées à POIDS_MIN_ARETE
+    limite = cout_ligne_droite(cout, depart, arrivee) - potentiel.flat[source]
+    limite += 1e-9 * abs(limite) + POIDS_MIN_ARETE * cout.size
+    distances, predecesseurs = dijkstra(
+        graphe, directed=True, indices=source, return_predecessors=True, limit=limite
+    )
+    noeuds_developpes = int(np.count_nonzero(np.isfinite(distances)))
+    if not np.isfinite(distances[cible]):
+        return None, noeuds_developpes
+
+    chemin = [cible]
+    while chemin[-1] != source:
+        chemin.append(int(predecesseurs[chemin[-1]]))
+    chemin.reverse()
+    return [(n % colonnes, n // colonnes) for n in chemin], noeuds_developpes
+
+
+def construire_graphe_8_voisins(cout, potentiel=None):
+    """
+    Construit le graphe pondéré 8-connexe d'une surface de coût.
+
+    Le poids d'une arête est la longueur du pas (1 ou racine de 2) multipliée par la moyenne des coûts
+    de ses deux pixels. La matrice est remplie directement au format CSR, huit entrées par pixel : les voisins
+    hors de la surface sont des boucles de poids infini, jamais empruntées.
+
+    Parameters
+    ----------
+    cout : np.ndarray
+        Surface de coût 2D strictement positive.
+    potentiel : np.ndarray, optional
+        Heuristique cohérente h, de même forme que `cout` : les poids deviennent les coûts réduits
+        w(u, v) - h(u) + h(v), relevés à POIDS_MIN_ARETE. Par défaut None (poids bruts).
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        Matrice d'adjacence du graphe, indexée par pixel aplati (ligne * colonnes + colonne).
+    """
+    lignes, colonnes = cout.shape
+    nb_noeuds = lignes * colonnes
+    indices = np.arange(nb_noeuds, dtype=np.int32).reshape(lignes, colonnes)
+    poids = np.full((lignes, colonnes, 8), np.inf)
+    cibles = np.repeat(indices[:, :, np.newaxis], 8, axis=2)
+    for k, ((dy, dx), longueur) in enumerate(zip(DECALAGES_8_VOISINS, LONGUEURS_8_VOISINS)):
+        ys0, ys1 = max(0, -dy), lignes - max(0, dy)
+        xs0, xs1 = max(0, -dx), colonnes - max(0, dx)
+        if ys1 <= ys0 or xs1 <= xs0:
+            continue
+        origine = (slice(ys0, ys1), slice(xs0, xs1))
+        voisin = (slice(ys0 + dy, ys1 + dy), slice(xs0 + dx, xs1 + dx))
+        arete = poids[ys0:ys1, xs0:xs1, k]
+        np.add(cout[origine], cout[voisin], out=arete)
+        arete *= longueur * 0.5
+        if potentiel is not None:
+            arete -= potentiel[origine]
+            arete += potentiel[voisin]
+            np.maximum(arete, POIDS_MIN_ARETE, out=arete)
+        cibles[ys0:ys1, xs0:xs1, k] = indices[voisin]
+
+    return csr_matrix(
+        (poids.ravel(), cibles.ravel(), np.arange(0, 8 * nb_noeuds + 1, 8, dtype=np.int32)),
+        shape=(nb_noeuds, nb_noeuds)
+    )
+
+
+class ArbreMoindreCout:
+    """
+    Arbre des plus courts chemins (au sens du coût) issu d'un pixel source, sur une fenêtre bornée du raster.
+
+    Une fois l'arbre construit, le chemin vers n'importe quel pixel de la fenêtre s'obtient en remontant
+    les prédécesseurs, pour un coût proportionnel à la longueur du chemin.
+
+    Attributes
+    ----------
+    source_px : tuple of int
+        Pixel source (colonne, ligne) dans le repère du raster.
+    x0, y0 : int
+        Décalage du coin haut-gauche de la fenêtre dans le raster.
+    lignes, colonnes : int
+        Dimensions de la fenêtre.
+    predecesseurs : np.ndarray
+        Prédécesseur de chaque pixel aplati de la fenêtre (-9999 pour la source ou un pixel inaccessible).
+    cle : object
+        Identifiant libre permettant à l'appelant de vérifier que l'arbre est toujours d'actualité.
+
+    Methods
+    -------
+    contient(pixel)
+        Indique si le pixel appartient à la fenêtre de l'arbre.
+    chemin_vers(pixel)
+        Remonte l'arbre jusqu'à la source et retourne le chemin source -> pixel.
+    """
+
+    def __init__(self, source_px, x0, y0, lignes, colonnes, predecesseurs, cle=None):
+        self.source_px = source_px
+        self.x0 = x0
+        self.y0 = y0
+        self.lignes = lignes
+        self.colonnes = colonnes
+        self.predecesseurs = predecesseurs
+        self.cle = cle
+
+    def contient(self, pixel):
+        """
+        Indique si le pixel (colonne, ligne) appartient à la fenêtre de l'arbre.
+        """
+        px, py = pixel
+        return self.x0 <= px < self.x0 + self.colonnes and self.y0 <= py < self.y0 + self.lignes
+
+    def chemin_vers(self, pixel):
+        """
+        Remonte l'arbre depuis un pixel jusqu'à la source.
+
+        Parameters
+        ----------
+        pixel : tuple of int
+            Pixel cible (colonne, ligne) dans le repère du raster.
+
+        Returns
+        -------
+        list of tuple or None
+            Pixels (colonne, ligne) du chemin de la source vers la cible, ou None si la cible est hors fenêtre
+            ou inaccessible.
+        """
+        if not self.contient(pixel):
+            return None
+        px, py = pixel
+        source = (self.source_px[1] - self.y0) * self.colonnes + (self.source_px[0] - self.x0)
+        noeud = (py - self.y0) * self.colonnes + (px - self.x0)
+
+        chemin = []
+        while noeud != source:
+            if noeud < 0:
+                return None
+            chemin.append(noeud)
+            noeud = int(self.predecesseurs[noeud])
+        chemin.append(source)
+        chemin.reverse()
+
+        return [(n % self.colonnes + self.x0, n // self.colonnes + self.y0) for n in chemin]
+
+
+def construire_arbre_moindre_cout(cout, x0, y0, source_px, cle=None):
+    """
+    Construit l'arbre des chemins de moindre coût depuis un pixel source sur une surface de coût.
+
+    Parameters
+    ----------
+    cout : np.ndarray
+        Surface de coût de la fenêtre, strictement positive.
+    x0, y0 : int
+        Décalage du coin haut-gauche de la fenêtre dans le raster.
+    source_px : tuple of int
+        Pixel source (colonne, ligne) dans le repère du raster.
+    cle : object, optional
+        Identifiant transmis à l'arbre, par défaut None.
+
+    Returns
+    -------
+    ArbreMoindreCout
+        L'arbre des plus courts chemins.
+    """
+    lignes, colonnes = cout.shape
+    graphe = construire_graphe_8_voisins(cout)
+    source = (source_px[1] - y0) * colonnes + (source_px[0] - x0)
+    _, predecesseurs = dijkstra(graphe, directed=True, indices=source, return_predecessors=True)
+    return ArbreMoindreCout(source_px, x0, y0, lignes, colonnes, predecesseurs, cle=cle)
+
+
+def aretes_8_voisins(lignes, colonnes, dtype=np.int64):
+    """
+    Énumère, direction par direction, les origines des arêtes du graphe 8-connexe d'une grille.
+
+    Chaque arête est énumérée une seule fois ; sa destination se déduit de son origine par le décalage
+    aplati de sa direction, ce qui évite de conserver les deux extrémités de toutes les arêtes.
+
+    Parameters
+    ----------
+    lignes, colonnes : int
+        Dimensions de la grille.
+    dtype : numpy.dtype, optional
+        Type entier des indices aplatis, par défaut np.int64.
+
+    Returns
+    -------
+    list of tuple
+        Pour chaque direction (0 droite, 1 bas, 2 diagonale bas-droite, 3 diagonale bas-gauche),
+        le couple (origines, decalage) : indices aplatis des origines et décalage aplati vers la destination.
+    """
+    index = np.arange(lignes * colonnes, dtype=dtype).reshape(lignes, colonnes)
+    return [
+        (index[:, :-1].ravel(), 1),
+        (index[:-1, :].ravel(), colonnes),
+        (index[:-1, :-1].ravel(), colonnes + 1),
+        (index[:-1, 1:].ravel(), colonnes - 1),
+    ]
+
+
+class ArbreCouvrantMinimax:
+    """
+    Arbre couvrant maximal (crêtes) ou minimal (thalwegs) du graphe 8-connexe des pixels d'un MNT.
+
+    Dans un arbre couvrant maximal pondéré par l'altitude la plus basse de chaque arête, le chemin entre deux
+    pixels est un chemin minimax : son point le plus bas est le plus haut possible parmi tous les chemins
+    du raster. Symétriquement, l'arbre couvrant minimal pondéré par l'altitude la plus haute donne des
+    thalwegs dont le point le plus haut est le plus bas possible. L'arbre est enraciné une fois pour toutes ;
+    une requête remonte ensuite les deux pixels jusqu'à leur ancêtre commun, en O(longueur du chemin).
+
+    Attributes
+    ----------
+    lignes, colonnes : int
+        Dimensions du raster.
+    points_bas : bool
+        True pour l'arbre des thalwegs, False pour l'arbre des crêtes.
+    parents : np.ndarray
+        Parent de chaque pixel aplati dans l'arbre enraciné (-1 pour une racine ou un pixel sans donnée).
+    profondeurs : np.ndarray
+        Profondeur de chaque pixel dans l'arbre.
+    cle : object
+        Identifiant libre permettant à l'appelant de vérifier que l'arbre est toujours d'actualité.
+
+    Methods
+    -------
+    chemin(depart_px, arrivee_px)
+        Retourne le chemin minimax entre deux pixels.
+    """
+
+    def __init__(self, lignes, colonnes, points_bas, parents, profondeurs, cle=None):
+        self.lignes = lignes
+        self.colonnes = colonnes
+        self.points_bas = points_bas
+        self.parents = parents
+        self.profondeurs = profondeurs
+        self.cle = cle
+
+    def chemin(self, depart_px, arrivee_px):
+        """
+        Retourne le chemin minimax entre deux pixels par remontée jusqu'à leur ancêtre commun.
+
+        Parameters
+        ----------
+        depart_px : tuple of int
+            Pixel de départ (colonne, ligne).
+        arrivee_px : tuple of int
+            Pixel d'arrivée (colonne, ligne).
+
+        Returns
+        -------
+        list of tuple or None
+            Pixels (colonne, ligne) du chemin, départ et arrivée inclus, ou None si les deux pixels
+            ne sont pas reliés (zones séparées par des pixels sans donnée).
+        """
+        for px, py in (depart_px, arrivee_px):
+            if not (0 <= px < self.colonnes and 0 <= py < self.lignes):
+                return None
+        a = depart_px[1] * self.colonnes + depart_px[0]
+        b = arrivee_px[1] * self.colonnes + arrivee_px[0]
+        profondeur_a = int(self.profondeurs[a])
+        profondeur_b = int(self.profondeurs[b])
+
+        cote_depart = [a]
+        cote_arrivee = [b]
+        while profondeur_a > profondeur_b:
+            a = int(self.parents[a])
+            cote_depart.append(a)
+            profondeur_a -= 1
+        while profondeur_b > profondeur_a:
+            b = int(self.parents[b])
+            cote_arrivee.append(b)
+            profondeur_b -= 1
+        while a != b:
+            a = int(self.parents[a])
+            b = int(self.parents[b])
+            if a < 0 or b < 0:
+                return None
+            cote_depart.append(a)
+            cote_arrivee.append(b)
+
+        noeuds = cote_depart + cote_arrivee[-2::-1]
+        return [(n % self.colonnes, n // self.colonnes) for n in noeuds]
+
+
+def construire_arbre_couvrant_minimax(tableau, points_bas=False, nodata=None, cle=None, interrompre=None):
+    """
+    Construit l'arbre couvrant minimax d'un MNT (crêtes ou thalwegs).
+
+    Les arêtes du graphe 8-connexe sont pondérées par l'altitude la plus basse (crêtes) ou la plus haute
+    (thalwegs) de leurs extrémités. Les pixels sont classés une seule fois par `np.argsort` et chaque arête
+    reçoit une priorité entière unique dérivée de ces rangs, ce qui rend l'arbre déterministe sans trier
+    les arêtes elles-mêmes. L'union des composantes suit l'algorithme de Borůvka vectorisé :
+    à chaque tour, chaque composante retient sa meilleure arête sortante, puis les composantes fusionnées
+    sont étiquetées par saut de pointeurs. Le nombre de tours est au plus logarithmique en nombre de pixels.
+
+    Les altitudes sont lues sans copie lorsqu'elles sont déjà flottantes (float32 sinon). Les arêtes sont
+    conservées direction par direction sous la forme de leurs seules origines, en indices int32 tant que
+    la taille du raster le permet ; les priorités sont recalculées à chaque tour depuis les rangs des pixels.
+
+    Parameters
+    ----------
+    tableau : np.ndarray
+        Altitudes du MNT ; les valeurs non finies sont exclues du graphe.
+    points_bas : bool, optional
+        True pour l'arbre des thalwegs, False pour l'arbre des crêtes, par défaut False.
+    nodata : float, optional
+        Valeur sans donnée du raster, exclue du graphe, par défaut None.
+    cle : object, optional
+        Identifiant transmis à l'arbre, par défaut None.
+    interrompre : callable, optional
+        Fonction sans argument retournant True pour interrompre la construction, appelée entre deux étapes.
+
+    Returns
+    -------
+    ArbreCouvrantMinimax or None
+        L'arbre enraciné, ou None si la construction a été interrompue.
+    """
+    lignes, colonnes = tableau.shape[:2]
+    nb_noeuds = lignes * colonnes
+    type_index = np.int32 if nb_noeuds < np.iinfo(np.int32).max else np.int64
+    altitudes = np.asarray(tableau)
+    if altitudes.dtype.kind != 'f':
+        altitudes = altitudes.astype(np.float32)
+    altitudes = altitudes.reshape(-1)
+
+    # Rang de chaque pixel, du plus favorable (plus haut pour les crêtes, plus bas pour les thalwegs)
+    # au moins favorable ; un seul tri des pixels suffit.
+    finis = np.isfinite(altitudes)
+    if nodata is not None:
+        finis &= altitudes != nodata
+    ordre = np.argsort(altitudes, kind='stable')
+    if not points_bas:
+        ordre = ordre[::-1]
+    rangs = np.empty(nb_noeuds, dtype=type_index)
+    rangs[ordre] = np.arange(nb_noeuds, dtype=type_index)
+    del ordre
+
+    # Arêtes entre pixels valides, conservées par direction sous la forme de leurs origines
+    aretes = []
+    for origines, decalage in aretes_8_voisins(lignes, colonnes, dtype=type_index):
+        aretes.append((origines[finis[origines] & finis[origines + decalage]], decalage))
+    del finis
+
+    def priorites(rangs, origines, destinations, direction):
+        # Rang de l'extrémité la moins favorable, départagé par la direction (orthogonales d'abord)
+        # et le côté de cette extrémité : chaque arête reçoit une priorité unique.
+        rang_o = rangs[origines]
+        rang_d = rangs[destinations]
+        return np.maximum(rang_o, rang_d).astype(np.int64) * 8 + direction * 2 + (rang_d > rang_o)
+
+    # Borůvka : chaque composante retient l'arête sortante de plus petite priorité
+    sans_arete = np.iinfo(np.int64).max
+    composantes = np.arange(nb_noeuds, dtype=type_index)
+    aretes_arbre = []
+    while True:
+        if interrompre is not None and interrompre():
+            return None
+        # Élimination des arêtes devenues internes, puis meilleure priorité de chaque composante
+        meilleure = np.full(nb_noeuds, sans_arete, dtype=np.int64)
+        restantes = 0
+        for direction, (origines, decalage) in enumerate(aretes):
+            destinations = origines + decalage
+            comp_o = composantes[origines]
+            comp_d = composantes[destinations]
+            externes = comp_o != comp_d
+            origines = origines[externes]
+            aretes[direction] = (origines, decalage)
+            restantes += origines.size
+            if origines.size:
+                p = priorites(rangs, origines, destinations[externes], direction)
+                np.minimum.at(meilleure, comp_o[externes], p)
+                np.minimum.at(meilleure, comp_d[externes], p)
+        if restantes == 0:
+            break
+        if interrompre is not None and interrompre():
+            return None
+
+        # Chaque composante pointe vers la composante voisine de sa meilleure arête ; les paires
+        # mutuelles (même arête choisie des deux côtés) désignent la racine de la fusion.
+        pointeurs = np.arange(nb_noeuds, dtype=type_index)
+        mutuelles = []
+        for direction, (origines, decalage) in enumerate(aretes):
+            if not origines.size:
+                continue
+            destinations = origines + decalage
+            comp_o = composantes[origines]
+            comp_d = composantes[destinations]
+            p = priorites(rangs, origines, destinations, direction)
+            choisie_par_o = meilleure[comp_o] == p
+            choisie_par_d = meilleure[comp_d] == p
+            retenues = choisie_par_o | choisie_par_d
+            aretes_arbre.append((origines[retenues], destinations[retenues]))
+            pointeurs[comp_o[choisie_par_o]] = comp_d[choisie_par_o]
+            pointeurs[comp_d[choisie_par_d]] = comp_o[choisie_par_d]
+            mutuelles.append(comp_o[choisie_par_o & choisie_par_d])
+        del meilleure
+        mutuelles = np.concatenate(mutuelles)
+        mutuelles = np.minimum(mutuelles, pointeurs[mutuelles])
+        pointeurs[mutuelles] = mutuelles
+        while True:
+            suivants = pointeurs[pointeurs]
+            if np.array_equal(suivants, pointeurs):
+                break
+            pointeurs = suivants
+        composantes = pointeurs[composantes]
+    del aretes, rangs
+
+    if aretes_arbre:
+        arbre_o = np.concatenate([a[0] for a in aretes_arbre])
+        arbre_d = np.concatenate([a[1] for a in aretes_arbre])
+    else:
+        arbre_o = arbre_d = np.empty(0, dtype=type_index)
+
+    # Enracinement : un nœud virtuel relie la racine de chaque composante, un parcours en largeur
+    # donne alors les parents de tous les pixels en un seul appel.
+    racines = np.nonzero(composantes == np.arange(nb_noeuds, dtype=type_index))[0].astype(type_index)
+    virtuel = nb_noeuds
+    lignes_graphe = np.concatenate([arbre_o, np.full(racines.size, virtuel, dtype=type_index)])
+    colonnes_graphe = np.concatenate([arbre_d, racines])
+    graphe = csr_matrix(
+        (np.ones(lignes_graphe.size, dtype=np.int8), (lignes_graphe, colonnes_graphe)),
+        shape=(nb_noeuds + 1, nb_noeuds + 1)
+    )
+    _, predecesseurs = breadth_first_order(graphe, virtuel, directed=False, return_predecessors=True)
+    parents = predecesseurs[:nb_noeuds].astype(type_index)
+    parents[parents == virtuel] = -1
+
+    # Profondeurs par saut de pointeurs : profondeurs[i] est la distance de i à ancetres[i],
+    # qui double à chaque tour jusqu'à atteindre la racine.
+    profondeurs = (parents >= 0).astype(type_index)
+    ancetres = np.where(parents >= 0, parents, np.arange(nb_noeuds, dtype=type_index))
+    while True:
+        suivants = ancetres[ancetres]
+        if np.array_equal(suivants, ancetres):
+            break
+        profondeurs += profondeurs[ancetres]
+        ancetres = suivants
+
+    return ArbreCouvrantMinimax(lignes, colonnes, points_bas, parents, profondeurs, cle=cle)
@@ -0,0 +1,266 @@
+# utils/session_mnt.py
+
+
+import threading
+
+from osgeo import gdal
+
+from .acces_mnt import AccesseurMNT, MEMOIRE_CACHE_MNT_DEFAUT
+from .cache_mnt import obtenir_cache_disque_mnt
+
+# Nombre de sessions sans outil actif conservées ouvertes par le registre
+SESSIONS_INACTIVES_MAX = 2
+
+
+class SessionMNT:
+    """
+    Données et produits dérivés d'un MNT, partagés par tous les outils qui travaillent sur la même couche.
+
+    La session ouvre le MNT une seule fois (AccesseurMNT, adossé au cache disque) et conserve les produits coûteux déjà calculés
+    (ombrage, pentes, arbres couvrants, grille d'écoulement...) pour que le passage d'un outil à l'autre
+    n'entraîne aucun recalcul. Les outils prennent une référence sur la session et la libèrent lors de leur
+    nettoyage. Une session dont la dernière référence est libérée reste ouverte, pour l'outil suivant : elle n'est
+    fermée que lorsqu'elle est invalidée (couche supprimée, source modifiée, déchargement du plugin) ou évincée
+    par le registre, qui ne conserve que SESSIONS_INACTIVES_MAX sessions inactives. Une session invalidée encore
+    utilisée n'est fermée qu'une fois sa dernière référence libérée.
+
+    Attributes
+    ----------
+    id_couche : str
+        Identifiant de la couche raster dans le projet.
+    source : str
+        Source GDAL du MNT.
+    tableau_raster : AccesseurMNT
+        Accès fenêtré aux altitudes.
+    gt, inv_gt : tuple
+        Géotransformation du MNT et son inverse.
+    raster_lignes, raster_colonnes : int
+        Dimensions du MNT.
+    pentes_locales_degres : np.ndarray or TableauQuantifie or None
+        Pentes locales en degrés (quantifiées en mode compact).
+    produits : dict
+        Autres produits dérivés, indexés par une clé libre (ex. ('minimax', False), 'directions_d8').
+    references : int
+        Nombre d'outils utilisant la session.
+    invalide : bool
+        True lorsque la couche a été retirée du projet.
+
+    Methods
+    -------
+    acquerir()
+        Prend une référence sur la session.
+    liberer()
+        Rend une référence ; ferme la session si elle est invalidée et n'est plus utilisée, sinon la laisse ouverte.
+    fermer()
+        Libère l'ensemble des données de la session.
+    """
+
+    def __init__(self, couche_raster, memoire_max=MEMOIRE_CACHE_MNT_DEFAUT, compact=False):
+        """
+        Ouvre le MNT d'une couche raster.
+
+        Parameters
+        ----------
+        couche_raster : QgsRasterLayer
+            Couche du MNT.
+        memoire_max : int, optional
+            Plafond mémoire du cache de tuiles en octets, par défaut MEMOIRE_CACHE_MNT_DEFAUT.
+        compact : bool, optional
+            True pour conserver altitudes et pentes sous forme entière (voir AccesseurMNT), par défaut False.
+
+        Raises
+        ------
+        IOError
+            Si le MNT ne peut pas être ouvert ou si sa géotransformation n'est pas inversible.
+        """
+        self.id_couche = couche_raster.id()
+        self.source = couche_raster.dataProvider().dataSourceUri()
+        self.tableau_raster = AccesseurMNT(self.source, memoire_max=memoire_max,
+                                           cache_disque=obtenir_cache_disque_mnt(), compact=compact)
+        self.gt = self.tableau_raster.gt
+        self.inv_gt = gdal.InvGeoTransform(self.gt)
+        if self.inv_gt is None:
+            self.tableau_raster.fermer()
+            raise IOError(f"Géotransformation non inversible : {self.source}")
+        self.raster_lignes, self.raster_colonnes = self.tableau_raster.shape
+
+        self.pentes_locales_degres = None
+        self.produits = {}
+        self.references = 0
+        self.invalide = False
+        self.verrou = threading.Lock()
+
+    def acquerir(self):
+        """
+        Prend une référence sur la session.
+
+        Returns
+        -------
+        SessionMNT
+            La session elle-même.
+        """
+        with self.verrou:
+            self.references += 1
+        return self
+
+    def liberer(self):
+        """
+        Rend une référence ; ferme la session si elle est invalidée et n'est plus utilisée.
+
+        Une session valide sans référence reste ouverte, avec ses produits dérivés, jusqu'à son invalidation
+        ou son éviction par le registre (voir `RegistreSessionsMNT.evincer`).
+        """
+        with self.verrou:
+            self.references = max(self.references - 1, 0)
+            a_fermer = self.invalide and self.references == 0
+        if a_fermer:
+            self.fermer()
+
+    def fermer(self):
+        """
+        Libère l'ensemble des données de la session.
+        """
+        if self.tableau_raster is not None:
+            self.tableau_raster.fermer()
+            self.tableau_raster = None
+        self.pentes_locales_degres = None
+        self.produits = {}
+
+
+class RegistreSessionsMNT:
+    """
+    Registre des sessions MNT ouvertes, indexées par identifiant de couche.
+
+    Le registre appartient au plugin ; il est invalidé couche par couche lorsque le projet retire une couche.
+    Les sessions sont rangées de la moins à la plus récemment demandée ; au-delà de `sessions_inactives_max`
+    sessions sans référence, les plus anciennes sont fermées à l'ouverture d'une nouvelle session.
+
+    Attributes
+    ----------
+    sessions : dict
+        Sessions ouvertes, indexées par identifiant de couche.
+    memoire_max : int
+        Plafond mémoire du cache de tuiles de chaque session.
+    compact : bool
+        True pour ouvrir les nouvelles sessions en mode compact ; les sessions ouvertes ne changent pas.
+    sessions_inactives_max : int
+        Nombre maximal de sessions sans référence conservées ouvertes.
+
+    Methods
+    -------
+    session(couche_raster)
+        Retourne la session d'une couche, en l'ouvrant si nécessaire.
+    acquerir(couche_raster)
+        Retourne la session d'une couche en prenant une référence dessus.
+    invalider(id_couche)
+        Retire la session d'une couche supprimée du projet.
+    evincer()
+        Ferme les sessions sans référence les moins récemment demandées au-delà de la limite.
+    fermer_tout()
+        Retire et ferme toutes les sessions.
+    """
+
+    def __init__(self, memoire_max=MEMOIRE_CACHE_MNT_DEFAUT, compact=False,
+                 sessions_inactives_max=SESSIONS_INACTIVES_MAX):
+        """
+        Initialise un registre vide.
+
+        Parameters
+        ----------
+        memoire_max : int, optional
+            Plafond mémoire du cache de tuiles de chaque session, par défaut MEMOIRE_CACHE_MNT_DEFAUT.
+        compact : bool, optional
+            True pour ouvrir les sessions en mode compact, par défaut False.
+        sessions_inactives_max : int, optional
+            Nombre maximal de sessions sans référence conservées ouvertes, par défaut SESSIONS_INACTIVES_MAX.
+        """
+        self.sessions = {}
+        self.memoire_max = memoire_max
+        self.compact = compact
+        self.sessions_inactives_max = sessions_inactives_max
+
+    def session(self, couche_raster):
+        """
+        Retourne la session d'une couche, en l'ouvrant si nécessaire, sans prendre de référence.
+
+        Parameters
+        ----------
+        couche_raster : QgsRasterLayer
+            Couche du MNT.
+
+        Returns
+        -------
+        SessionMNT or None
+            La session, ou None si le MNT ne peut pas être ouvert.
+        """
+        session = self.sessions.pop(couche_raster.id(), None)
+        if session is not None:
+            # Réinsertion en fin de registre : session la plus récemment demandée
+            self.sessions[couche_raster.id()] = session
+        if session is not None and session.source != couche_raster.dataProvider().dataSourceUri():
+            # La source de la couche a changé : la session n'est plus valable
+            self.invalider(couche_raster.id())
+            session = None
+        if session is None:
+            try:
+                session = SessionMNT(couche_raster, memoire_max=self.memoire_max, compact=self.compact)
+            except IOError:
+                return None
+            self.sessions[couche_raster.id()] = session
+            self.evincer()
+        return session
+
+    def acquerir(self, couche_raster):
+        """
+        Retourne la session d'une couche en prenant une référence dessus.
+
+        Parameters
+        ----------
+        couche_raster : QgsRasterLayer
+            Couche du MNT.
+
+        Returns
+        -------
+        SessionMNT or None
+            La session, ou None si le MNT ne peut pas être ouvert.
+        """
+        session = self.session(couche_raster)
+        if session is not None:
+            session.acquerir()
+        return session
+
+    def invalider(self, id_couche):
+        """
+        Retire la session d'une couche supprimée du projet.
+
+        La session est fermée immédiatement si aucun outil ne l'utilise, sinon à la libération
+        de sa dernière référence.
+
+        Parameters
+        ----------
+        id_couche : str
+            Identifiant de la couche.
+        """
+        session = self.sessions.pop(id_couche, None)
+        if session is None:
+            return
+        with session.verrou:
+            session.invalide = True
+            a_fermer = session.references == 0
+        if a_fermer:
+            session.fermer()
+
+    def evincer(self):
+        """
+        Ferme les sessions sans référence les moins récemment demandées, au-delà de `sessions_inactives_max`.
+        """
+        inactives = [id_couche for id_couche, session in self.sessions.items() if session.references == 0]
+        for id_couche in inactives[:max(len(inactives) - self.sessions_inactives_max, 0)]:
+            self.invalider(id_couche)
+
+    def fermer_tout(self):
+        """
+        Retire et ferme toutes les sessions.
+        """
+        for id_couche in list(self.sessions):
+            self.invalider(id_couche)
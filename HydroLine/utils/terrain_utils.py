@@ -0,0 +1,409 @@
+# utils/terrain_utils.py
+
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.ndimage import median_filter
+
+from .parallele_utils import appliquer_par_bandes
+
+# Produits dérivés du MNT proposés par derivees_terrain
+PRODUITS_DERIVEES = ('pente', 'exposition', 'courbure_profil', 'courbure_plan')
+
+# Taille de fenêtre maximale de la médiane par tri vectorisé des fenêtres empilées
+TAILLE_MAX_MEDIANE_RAPIDE = 7
+
+
+def _derivees_premieres(z, taille_x, taille_y, methode):
+    """
+    Dérivées premières p = dz/dx (vers l'est) et q = dz/dy (vers le nord) au centre d'une fenêtre 3x3 glissante.
+
+    Parameters
+    ----------
+    z : np.ndarray
+        Bande d'altitudes float32 bordée d'un pixel de chaque côté.
+    taille_x, taille_y : float
+        Dimensions d'un pixel.
+    methode : str
+        'horn' (différences pondérées sur les 8 voisins) ou 'zt' (Zevenbergen-Thorne, 4 voisins).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (p, q) aux dimensions de la bande sans bordure.
+    """
+    if methode == 'horn':
+        a, b, c = z[:-2, :-2], z[:-2, 1:-1], z[:-2, 2:]
+        d, f = z[1:-1, :-2], z[1:-1, 2:]
+        g, h, i = z[2:, :-2], z[2:, 1:-1], z[2:, 2:]
+        p = (c + 2 * f + i) - (a + 2 * d + g)
+        p /= 8 * taille_x
+        q = (a + 2 * b + c) - (g + 2 * h + i)
+        q /= 8 * taille_y
+    elif methode == 'zt':
+        p = z[1:-1, 2:] - z[1:-1, :-2]
+        p /= 2 * taille_x
+        q = z[:-2, 1:-1] - z[2:, 1:-1]
+        q /= 2 * taille_y
+    else:
+        raise ValueError(f"Méthode de dérivation inconnue : {methode}")
+    return p, q
+
+
+def _noyau_derivees(bande, taille_x, taille_y, produits, methode, nodata):
+    """
+    Noyau de `derivees_terrain` : produits dérivés d'une bande, bords répliqués d'un pixel.
+    """
+    z = np.array(bande, dtype=np.float32)
+    if nodata is not None:
+        z[z == np.float32(nodata)] = np.nan
+    z = np.pad(z, 1, mode='edge')
+
+    p, q = _derivees_premieres(z, taille_x, taille_y, methode)
+    resultat = {}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if 'pente' in produits:
+            resultat['pente'] = np.degrees(np.arctan(np.hypot(p, q)))
+        if 'exposition' in produits:
+            exposition = np.degrees(np.arctan2(-p, -q))
+            exposition %= 360
+            exposition[(p == 0) & (q == 0)] = np.nan
+            resultat['exposition'] = exposition
+
+        if 'courbure_profil' in produits or 'courbure_plan' in produits:
+            e = z[1:-1, 1:-1]
+            r = (z[1:-1, :-2] + z[1:-1, 2:] - 2 * e) / (taille_x * taille_x)
+            t = (z[:-2, 1:-1] + z[2:, 1:-1] - 2 * e) / (taille_y * taille_y)
+            s = (z[:-2, 2:] - z[:-2, :-2] + z[2:, :-2] - z[2:, 2:]) / (4 * taille_x * taille_y)
+            p2 = p * p
+            q2 = q * q
+            pqs = 2 * p * q * s
+            g2 = p2 + q2
+            plat = g2 == 0
+            if 'courbure_profil' in produits:
+                profil = (r * p2 + pqs + t * q2) / (g2 * (1 + g2) ** 1.5)
+                profil[plat] = 0
+                resultat['courbure_profil'] = profil
+            if 'courbure_plan' in produits:
+                plan = (t * p2 - pqs + r * q2) / g2 ** 1.5
+                plan[plat] = 0
+                resultat['courbure_plan'] = plan
+
+    # Pixels sans donnée (la méthode de Horn n'utilise pas le pixel central)
+    sans_donnee = np.isnan(z[1:-1, 1:-1])
+    if sans_donnee.any():
+        for grille in resultat.values():
+            grille[sans_donnee] = np.nan
+    return resultat
+
+
+def derivees_terrain(mnt, taille_x, taille_y, produits=('pente',), methode='horn', nodata=None,
+                     hauteur_bande=None, backend=None, progression=None, interrompre=None):
+    """
+    Calcule pente, exposition et courbures d'un MNT, par bandes de lignes.
+
+    Chaque bande est lue avec une ligne de recouvrement au-dessus et au-dessous, convertie en float32,
+    puis les dérivées sont évaluées sur la fenêtre 3x3 de chaque pixel (bords du MNT répliqués). Seules les
+    grilles float32 des produits demandés ont la taille du MNT : les temporaires sont à l'échelle de la bande.
+    Les bandes sont réparties entre les cœurs par `appliquer_par_bandes`.
+
+    Conventions :
+    - pente en degrés ;
+    - exposition en degrés dans le sens horaire depuis le nord, direction de la plus forte descente
+      (NaN sur les zones planes) ;
+    - courbure de profil (le long de la pente, m⁻¹) négative sur les ruptures convexes, positive sur les concaves ;
+    - courbure en plan (le long des courbes de niveau, m⁻¹) positive sur les formes convergentes (talwegs),
+      négative sur les formes divergentes (croupes).
+    Les courbures utilisent les dérivées secondes de Zevenbergen-Thorne quelle que soit la méthode.
+
+    Parameters
+    ----------
+    mnt : np.ndarray or AccesseurMNT
+        Altitudes (lignes, colonnes) ; seul l'accès par tranches de lignes est utilisé.
+    taille_x, taille_y : float
+        Dimensions d'un pixel (valeurs absolues).
+    produits : tuple of str, optional
+        Produits à calculer parmi PRODUITS_DERIVEES, par défaut ('pente',).
+    methode : str, optional
+        'horn' ou 'zt' pour les dérivées premières, par défaut 'horn'.
+    nodata : float, optional
+        Valeur sans donnée du MNT ; les pixels voisins d'un pixel sans donnée valent NaN.
+    hauteur_bande : int, optional
+        Nombre de lignes traitées par bande ; None pour un choix automatique, par défaut None.
+    backend : str, optional
+        Moteur d'exécution (voir `appliquer_par_bandes`) ; None pour le moteur configuré, par défaut None.
+    progression : callable, optional
+        Fonction appelée avec l'avancement (0-100) après chaque bande.
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner le calcul.
+
+    Returns
+    -------
+    dict or None
+        Grilles float32 des produits demandés, indexées par nom, ou None si le calcul a été interrompu.
+    """
+    inconnus = set(produits) - set(PRODUITS_DERIVEES)
+    if inconnus:
+        raise ValueError(f"Produits dérivés inconnus : {', '.join(sorted(inconnus))}")
+    if methode not in ('horn', 'zt'):
+        raise ValueError(f"Méthode de dérivation inconnue : {methode}")
+
+    return appliquer_par_bandes(
+        _noyau_derivees, mnt, halo=1, dtype=np.float32, sorties=tuple(produits), backend=backend,
+        hauteur_bande=hauteur_bande, progression=progression, interrompre=interrompre,
+        taille_x=abs(float(taille_x)), taille_y=abs(float(taille_y)), produits=tuple(produits),
+        methode=methode, nodata=nodata
+    )
+
+
+def _sommes_glissantes(valeurs, rayon, axe):
+    """
+    Sommes sur une fenêtre [i - rayon, i + rayon] tronquée aux bords, le long d'un axe, par différence
+    de sommes cumulées : coût constant par pixel quel que soit le rayon.
+    """
+    n = valeurs.shape[axe]
+    cumul = np.cumsum(valeurs, axis=axe)
+    forme = list(valeurs.shape)
+    forme[axe] = 1
+    cumul = np.concatenate((np.zeros(forme, dtype=cumul.dtype), cumul), axis=axe)
+    indices = np.arange(n)
+    haut = np.take(cumul, np.minimum(indices + rayon + 1, n), axis=axe)
+    bas = np.take(cumul, np.maximum(indices - rayon, 0), axis=axe)
+    haut -= bas
+    return haut
+
+
+def noyau_moyen(bande, taille, nodata=None):
+    """
+    Moyenne glissante sur une fenêtre carrée (filtres du pipeline de préparation, voir `pipeline_mnt`).
+
+    Filtre à somme glissante séparable (table de sommes cumulées ligne puis colonne) : le coût par pixel
+    ne dépend pas de la taille de la fenêtre. Seuls les pixels valides de la fenêtre sont moyennés, de
+    sorte que les zones sans donnée ne débordent pas sur les pixels valides ; la fenêtre est tronquée
+    aux bords du tableau.
+
+    Parameters
+    ----------
+    bande : np.ndarray
+        Valeurs à filtrer.
+    taille : int
+        Côté de la fenêtre en pixels.
+    nodata : float, optional
+        Valeur sans donnée ; les NaN sont aussi considérés sans donnée, par défaut None.
+
+    Returns
+    -------
+    np.ndarray
+        Valeurs filtrées en float32 ; les pixels sans donnée gardent `nodata` (NaN si elle n'est pas définie).
+    """
+    valeurs = np.array(bande, dtype=np.float64)
+    invalides = np.isnan(valeurs)
+    if nodata is not None:
+        invalides |= valeurs == nodata
+    rayon = taille // 2
+
+    if invalides.any():
+        valeurs[invalides] = 0
+        comptes = _sommes_glissantes(_sommes_glissantes((~invalides).astype(np.float32), rayon, 0), rayon, 1)
+    else:
+        # Nombre de pixels de la fenêtre tronquée : produit des longueurs en ligne et en colonne
+        lignes, colonnes = valeurs.shape
+        indices = np.arange(lignes)
+        hauteurs = np.minimum(indices + rayon, lignes - 1) - np.maximum(indices - rayon, 0) + 1
+        indices = np.arange(colonnes)
+        largeurs = np.minimum(indices + rayon, colonnes - 1) - np.maximum(indices - rayon, 0) + 1
+        comptes = np.outer(hauteurs, largeurs).astype(np.float32)
+
+    sommes = _sommes_glissantes(_sommes_glissantes(valeurs, rayon, 0), rayon, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        moyenne = (sommes / comptes).astype(np.float32)
+    moyenne[invalides] = np.nan if nodata is None else nodata
+    return moyenne
+
+
+def _mediane_empilee(bloc, rayon, invalides_presents):
+    """
+    Médiane sur fenêtres tronquées par tri vectorisé des fenêtres empilées ; les pixels hors du bloc ou sans
+    donnée valent NaN et sont ignorés. Retourne le bloc sans sa bordure de `rayon` pixels.
+    """
+    taille = 2 * rayon + 1
+    lignes = bloc.shape[0] - 2 * rayon
+    colonnes = bloc.shape[1] - 2 * rayon
+    resultat = np.empty((lignes, colonnes), dtype=np.float32)
+    # Lignes traitées ensemble : pile des fenêtres limitée à environ 32 Mo
+    pas = max(1, (32 * 1024 ** 2) // max(colonnes * taille * taille * 4, 1))
+    for y0 in range(0, lignes, pas):
+        y1 = min(y0 + pas, lignes)
+        fenetres = sliding_window_view(bloc[y0:y1 + 2 * rayon], (taille, taille))
+        fenetres = fenetres.reshape(y1 - y0, colonnes, taille * taille)
+        # Tri des fenêtres en place (les NaN sont rangés en fin), plus rapide qu'une sélection pixel par pixel
+        fenetres.sort(axis=-1)
+        if invalides_presents:
+            comptes = (~np.isnan(fenetres)).sum(axis=-1)
+            rangs = np.maximum(comptes - 1, 0) // 2
+            resultat[y0:y1] = np.take_along_axis(fenetres, rangs[..., None], axis=-1)[..., 0]
+        else:
+            resultat[y0:y1] = fenetres[..., (taille * taille) // 2]
+    return resultat
+
+
+def noyau_median(bande, taille, nodata=None):
+    """
+    Médiane glissante sur une fenêtre carrée (filtre des TIN rastérisés, voir `pipeline_mnt`).
+
+    Seule l'emprise des pixels valides de la bande est filtrée : une bande entièrement sans donnée est
+    rendue immédiatement. Jusqu'à TAILLE_MAX_MEDIANE_RAPIDE, les fenêtres sont empilées et triées de façon
+    vectorisée, en ignorant les pixels sans donnée et ceux hors du tableau (fenêtres tronquées aux bords) ;
+    au-delà, `scipy.ndimage.median_filter` est utilisé (bords en miroir, pixels sans donnée inclus).
+
+    Parameters
+    ----------
+    bande : np.ndarray
+        Valeurs à filtrer.
+    taille : int
+        Côté de la fenêtre en pixels (impair).
+    nodata : float, optional
+        Valeur sans donnée ; les NaN sont aussi considérés sans donnée, par défaut None.
+
+    Returns
+    -------
+    np.ndarray
+        Valeurs filtrées en float32 ; les pixels sans donnée gardent `nodata` (NaN si elle n'est pas définie).
+    """
+    valeurs = np.array(bande, dtype=np.float32)
+    invalides = np.isnan(valeurs)
+    if nodata is not None:
+        invalides |= valeurs == np.float32(nodata)
+    remplissage = np.float32(np.nan if nodata is None else nodata)
+    resultat = np.full(valeurs.shape, remplissage, dtype=np.float32)
+
+    lignes_valides = np.flatnonzero(~invalides.all(axis=1))
+    if lignes_valides.size == 0:
+        return resultat
+    colonnes_valides = np.flatnonzero(~invalides.all(axis=0))
+    r0, r1 = lignes_valides[0], lignes_valides[-1] + 1
+    c0, c1 = colonnes_valides[0], colonnes_valides[-1] + 1
+    rayon = taille // 2
+
+    if taille <= TAILLE_MAX_MEDIANE_RAPIDE:
+        # Emprise valide et son voisinage, bordée de NaN au-delà du tableau
+        e0, e1 = max(r0 - rayon, 0), min(r1 + rayon, valeurs.shape[0])
+        f0, f1 = max(c0 - rayon, 0), min(c1 + rayon, valeurs.shape[1])
+        bloc = valeurs[e0:e1, f0:f1]
+        bloc[invalides[e0:e1, f0:f1]] = np.nan
+        bloc = np.pad(bloc, ((rayon - (r0 - e0), rayon - (e1 - r1)), (rayon - (c0 - f0), rayon - (f1 - c1))),
+                      mode='constant', constant_values=np.nan)
+        invalides_presents = bool(np.isnan(bloc).any())
+        resultat[r0:r1, c0:c1] = _mediane_empilee(bloc, rayon, invalides_presents)
+    else:
+        resultat[:] = median_filter(valeurs, size=taille)
+
+    resultat[invalides] = remplissage
+    return resultat
+
+
+def noyau_ombrage(bande, taille_x, taille_y, azimut, altitude, facteur_z, multidirectionnel, nodata):
+    """
+    Ombrage 8 bits d'une bande, bords répliqués d'un pixel (noyau de `ombrage`).
+
+    Parameters
+    ----------
+    bande : np.ndarray
+        Altitudes.
+    taille_x, taille_y : float
+        Dimensions d'un pixel.
+    azimut, altitude : float
+        Direction et hauteur de la source lumineuse en degrés.
+    facteur_z : float
+        Exagération verticale.
+    multidirectionnel : bool
+        True pour combiner quatre sources pondérées selon l'exposition.
+    nodata : float or None
+        Valeur sans donnée.
+
+    Returns
+    -------
+    np.ndarray
+        Ombrage uint8 (0 : sans donnée).
+    """
+    z = np.array(bande, dtype=np.float32)
+    if nodata is not None:
+        z[z == np.float32(nodata)] = np.nan
+    sans_donnee = np.isnan(z)
+    z = np.pad(z, 1, mode='edge')
+
+    p, q = _derivees_premieres(z, taille_x, taille_y, 'horn')
+    del z
+    if facteur_z != 1:
+        p *= facteur_z
+        q *= facteur_z
+    norme = np.sqrt(1 + p * p + q * q)
+    hauteur = np.radians(altitude)
+
+    def eclairement(azimut_source):
+        # Produit scalaire de la normale (-p, -q, 1) et de la direction de la source
+        a = np.radians(azimut_source)
+        return (np.sin(hauteur) - np.cos(hauteur) * (p * np.sin(a) + q * np.cos(a))) / norme
+
+    with np.errstate(invalid='ignore'):
+        if multidirectionnel:
+            # Quatre sources pondérées selon l'exposition (méthode de gdaldem -multidirectional)
+            exposition = np.arctan2(-p, -q)
+            valeurs = sum(np.sin(exposition - np.radians(a)) ** 2 * eclairement(a)
+                          for a in (225.0, 270.0, 315.0, 360.0)) / 2
+        else:
+            valeurs = eclairement(azimut)
+        np.clip(valeurs, 0, 1, out=valeurs)
+        valeurs = np.rint(1 + 254 * valeurs)
+
+    # 0 : sans donnée, comme gdaldem
+    valeurs[np.isnan(valeurs) | sans_donnee] = 0
+    return valeurs.astype(np.uint8)
+
+
+def ombrage(mnt, taille_x, taille_y, azimut=315.0, altitude=45.0, facteur_z=1.0, multidirectionnel=False,
+            nodata=None, hauteur_bande=None, backend=None, progression=None, interrompre=None):
+    """
+    Calcule l'ombrage d'un MNT, par bandes de lignes, sans passer par un fichier intermédiaire.
+
+    Les pentes sont évaluées par la méthode de Horn (comme gdaldem) et l'éclairement est codé sur 8 bits :
+    1 (ombre) à 255 (pleine lumière), 0 pour les pixels sans donnée. Les bords du MNT sont calculés
+    en répliquant la dernière ligne ou colonne.
+
+    Parameters
+    ----------
+    mnt : np.ndarray or AccesseurMNT
+        Altitudes (lignes, colonnes) ; seul l'accès par tranches de lignes est utilisé.
+    taille_x, taille_y : float
+        Dimensions d'un pixel (valeurs absolues).
+    azimut : float, optional
+        Direction de la source lumineuse en degrés depuis le nord, sens horaire, par défaut 315.
+    altitude : float, optional
+        Hauteur de la source au-dessus de l'horizon en degrés, par défaut 45.
+    facteur_z : float, optional
+        Exagération verticale, par défaut 1.
+    multidirectionnel : bool, optional
+        True pour combiner quatre sources (225°, 270°, 315°, 360°) pondérées selon l'exposition, par défaut False.
+    nodata : float, optional
+        Valeur sans donnée du MNT, par défaut None.
+    hauteur_bande : int, optional
+        Nombre de lignes traitées par bande ; None pour un choix automatique, par défaut None.
+    backend : str, optional
+        Moteur d'exécution (voir `appliquer_par_bandes`) ; None pour le moteur configuré, par défaut None.
+    progression : callable, optional
+        Fonction appelée avec l'avancement (0-100).
+    interrompre : callable, optional
+        Fonction retournant True pour abandonner le calcul.
+
+    Returns
+    -------
+    np.ndarray or None
+        Ombrage uint8 aux dimensions du MNT, ou None si le calcul a été interrompu.
+    """
+    return appliquer_par_bandes(
+        noyau_ombrage, mnt, halo=1, dtype=np.uint8, backend=backend, hauteur_bande=hauteur_bande,
+        progression=progression, interrompre=interrompre,
+        taille_x=abs(float(taille_x)), taille_y=abs(float(taille_y)), azimut=float(azimut),
+        altitude=float(altitude), facteur_z=float(facteur_z), multidirectionnel=multidirectionnel, nodata=nodata
+    )